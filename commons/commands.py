@@ -414,6 +414,8 @@ M0TRACE = "m0trace -i $trace > $file"
 LIST_M0TRACE = "ls -ltr| grep m0|awk '{print $9}'"
 GREP_DP_BLOCK_FID = "grep -E \"prepare io fops|UTyp\" $file| cut -d , -f2"
 EMAP_LIST = "python3 /root/wrapper_runner.py -list_emap -m $path -parse_size $size >$file"
+EMAP_LIST_JSON = "python3 /root/wrapper_runner.py -list_emap -json -m $path -parse_size $size"
+EMAP_VERIFY = "python3 /root/wrapper_runner.py -verify_emap -m $path -parse_size $size"
 FETCH_ID_EMAP = "grep -n {} -e \"{}\"|awk 'END{{print $7}}'"
 
 # m0cp from data unit aligned offset 0
@@ -551,6 +553,9 @@ KUBECTL_GET_POD_CONTAINERS = "kubectl get pods {} -o jsonpath='{{.spec.container
 KUBECTL_GET_POD_IPS = 'kubectl get pods --no-headers -o ' \
                       'custom-columns=":metadata.name,:.status.podIP"'
 KUBECTL_GET_POD_NAMES = 'kubectl get pods --no-headers -o custom-columns=":metadata.name"'
+KUBECTL_GET_JSON = "kubectl get {} -o json"
+KUBECTL_GET_PODS_RESOURCE_VERSION = \
+    "kubectl get pods -o jsonpath='{.items[*].metadata.resourceVersion}'"
 KUBECTL_GET_REPLICASET = "kubectl get rs | grep '{}'"
 KUBECTL_GET_POD_DETAILS = "kubectl get pods --show-labels | grep '{}'"
 KUBECTL_CREATE_REPLICA = "kubectl scale --replicas={} deployment/{}"
@@ -211,6 +211,10 @@ class Rest:
     SSL_CERTIFIED = "https://"
     NON_SSL = "http://"
     JOSN_FILE = "json_report.json"
+    SESSION_POOL_SIZE = 32
+    SESSION_RETRIES = 3
+    SESSION_BACKOFF = 0.3
+    TOKEN_TTL = 300
     DELETE_SUCCESS_MSG = "Account Deleted Successfully."
     S3_ACCOUNTS = "s3_accounts"
     ACC_NAME = "account_name"
@@ -21,13 +21,12 @@
 import logging
 import sys
 
-from typing import Tuple, Any, Optional
+from typing import Tuple, Any, Optional, Iterator
 import gevent
 
 from gevent import Greenlet
 from gevent.queue import Queue
 from gevent.pool import Pool
-from gevent.pool import Group
 
 LOGGER = logging.getLogger(__name__)
 if sys.platform == "win32":
@@ -151,51 +150,113 @@ class GreenletThread(Greenlet):
 
 class GeventPool:
 
-    """Class for using Gevent Pool Capabilities"""
+    """
+    Class for using Gevent Pool Capabilities.
 
-    def __init__(self, no_of_threads: int) -> None:
+    Spawning blocks while the pool is full, so callers get backpressure instead of an
+    unbounded backlog of greenlets. Finished greenlets are evicted from the pool as they
+    complete. With keep_results their results are kept in ``responses``; with stream they
+    are handed to ``iter_results`` in completion order. Nothing is kept in module globals.
+    """
+
+    def __init__(self, no_of_threads: int, keep_results: bool = False,
+                 stream: bool = False) -> None:
         """
         :param no_of_threads: size of thread pool
+        :param keep_results: retain every greenlet and its name -> value for result(),
+            memory grows with the number of spawned greenlets, so only for bounded runs
+        :param stream: queue finished greenlets for iter_results
         """
         self.pool = Pool(no_of_threads)
-        self.group = Group()
+        self.group = self.pool
+        self.keep_results = keep_results
+        self.stream = stream
         self.responses = dict()
+        self.greenlets = list()
+        self.done = Queue()
+        self.spawned = 0
+        self.completed = 0
+        self.failed = 0
 
     def __del__(self):
         """cleanup all resources"""
         del self.pool
         del self.group
 
-    def add_handler(self, func: Any, *args: Any, **kwargs: Any) -> None:
+    @property
+    def in_flight(self) -> int:
+        """Number of spawned greenlets which are not finished yet."""
+        return self.spawned - self.completed - self.failed
+
+    def stats(self) -> dict:
+        """
+        :return: counters of spawned, in flight, completed and failed greenlets
+        """
+        return {"spawned": self.spawned, "in_flight": self.in_flight,
+                "completed": self.completed, "failed": self.failed}
+
+    def add_handler(self, func: Any, *args: Any, timeout: float = None,
+                    **kwargs: Any) -> Greenlet:
         """
-        method to check pool capability and spawn/group threads
+        method to wait for pool capacity and spawn/group threads
         :param func: function need to be spawned
         :param args: positional arguments to be passed to func
+        :param timeout: seconds to wait for a free slot, wait forever if None
         :param kwargs: keyword arguments to be passed to func
-        :return: None
+        :return: spawned greenlet
         """
-        if not self.pool.full():
-            self.spawn(func, *args, **kwargs)
-        else:
+        if self.pool.wait_available(timeout) <= 0:
             raise Exception("At maximum pool size")
+        return self.spawn(func, *args, **kwargs)
 
-    def spawn(self, func: Any, *args: Any, **kwargs: Any) -> None:
+    def spawn(self, func: Any, *args: Any, **kwargs: Any) -> Greenlet:
         """
+        Spawn func in the pool, blocking while the pool is full.
         :param func: method need to be operated with threads
         :param args: positional arguments to be passed to func
         :param kwargs: keyword arguments to be passed to func
-        :return: None
+        :return: spawned greenlet
         """
         g_obj = self.pool.spawn(func, *args, **kwargs)
-        THREADS.append(g_obj)
-        self._group(g_obj)
+        self.spawned += 1
+        if self.keep_results:
+            # Greenlet names are only unique among live greenlets, hold a reference
+            # for the pool lifetime so result() keys do not collide.
+            LOGGER.debug("Spawned %s", g_obj.name)
+            self.greenlets.append(g_obj)
+        g_obj.rawlink(self._on_done)
+        return g_obj
 
-    def _group(self, g_obj: object) -> None:
+    def _on_done(self, g_obj: Greenlet) -> None:
         """
-        :param g_obj: spawn object needs to be added in group
-        :return: None
+        Account a finished greenlet and publish its result.
+        :param g_obj: finished greenlet
         """
-        self.group.add(g_obj)
+        if g_obj.successful():
+            self.completed += 1
+        else:
+            self.failed += 1
+            LOGGER.error("%s failed: %s", g_obj.name, g_obj.exception)
+        if self.keep_results:
+            self.responses[g_obj.name] = g_obj.value
+        if self.stream:
+            self.done.put(g_obj)
+
+    def iter_results(self, timeout: float = None) -> Iterator[Tuple[str, bool, Any]]:
+        """
+        Yield results as greenlets complete until nothing is left in flight.
+        Requires the pool to be created with stream=True.
+        :param timeout: seconds to wait for the next completion, wait forever if None
+        :return: iterator of (greenlet name, successful, value or exception)
+        """
+        if not self.stream:
+            raise ValueError("GeventPool is not created with stream=True")
+        while self.in_flight or not self.done.empty():
+            g_obj = self.done.get(timeout=timeout)
+            if g_obj.successful():
+                yield g_obj.name, True, g_obj.value
+            else:
+                yield g_obj.name, False, g_obj.exception
 
     def join_group(self) -> None:
         """
@@ -203,9 +264,9 @@ class GeventPool:
         :return: None
         """
         LOGGER.debug("Waiting for all threads to complete\n")
-        self.group.join()
+        self.pool.join()
+        gevent.sleep(0)  # let completion callbacks of the last greenlets run
         LOGGER.debug("All Threads execution is completed")
-        self.responses = {g.name: g.value for g in THREADS}
 
     def wait_available(self, timeout: int = None) -> None:
         """
@@ -214,13 +275,13 @@ class GeventPool:
         """
         self.pool.wait_available(timeout)
 
-    def pool_map(self, func: object, args: Any) -> None:
+    def pool_map(self, func: object, args: Any) -> Iterator:
         """
         :param func: method need to be operated in thread
         :param args: function arguments
-        :return: None
+        :return: iterator of func results in completion order
         """
-        self.pool.imap_unordered(func, args)
+        return self.pool.imap_unordered(func, args)
 
     def shutdown(self) -> None:
         """
@@ -228,12 +289,13 @@ class GeventPool:
         :return: None
         """
         self.pool.kill()
-        gevent.killall(self.group)
-        THREADS.clear()
+        self.greenlets.clear()
         self.responses.clear()
+        while not self.done.empty():
+            self.done.get()
 
     def result(self) -> dict:
         """
-        :return: thread execution result
+        :return: thread execution result, empty unless created with keep_results=True
         """
         return self.responses
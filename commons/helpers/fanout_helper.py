@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Fan-out helper to run a command on many nodes, pods or containers concurrently.
+
+Commands on the same host share one pooled SSH transport (see host.SSH_POOL), and sshd
+allows 10 sessions per connection by default, so keep nworkers at or below that when all
+targets are reached through one node.
+"""
+import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Union
+
+from commons import commands
+from commons import constants as const
+from commons.worker import BoundedExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TargetResult:
+    """Outcome of a command on one target."""
+
+    def __init__(self, target: str, success: bool, output: Any = None,
+                 error: Exception = None, duration: float = 0.0) -> None:
+        self.target = target
+        self.success = success
+        self.output = output
+        self.error = error
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return f"TargetResult({self.target!r}, success={self.success}, " \
+               f"duration={self.duration:.3f})"
+
+    def as_dict(self) -> dict:
+        """
+        :return: result as dictionary
+        """
+        return {"target": self.target, "success": self.success, "output": self.output,
+                "error": str(self.error) if self.error else None, "duration": self.duration}
+
+
+def _timed(started: dict, target: str, func: Callable, *args, **kwargs) -> TargetResult:
+    """Run func, note its start time in started and wrap its outcome in a TargetResult."""
+    start = started[target] = time.perf_counter()
+    try:
+        output = func(*args, **kwargs)
+    except Exception as error:
+        return TargetResult(target, False, error=error, duration=time.perf_counter() - start)
+    return TargetResult(target, True, output, duration=time.perf_counter() - start)
+
+
+def run_on_all(targets: Union[Dict[str, Any], Iterable[Any]],
+               cmd: Union[str, Callable],
+               nworkers: int = 8,
+               timeout: float = None,
+               **kwargs) -> Dict[str, TargetResult]:
+    """
+    Run cmd on all targets concurrently with at most nworkers commands in flight.
+    A target which does not finish within timeout seconds of its start is reported as
+    failed with TimeoutError, without waiting for it.
+    :param targets: Host/LogicalNode objects, keyed by target name if given as dict
+        otherwise named by hostname. Any object is accepted when cmd is a callable.
+    :param cmd: Command passed to target.execute_cmd, or a callable invoked as cmd(target).
+    :param nworkers: Max number of concurrent commands.
+    :param timeout: Per target timeout in seconds, also used as the command timeout.
+    :param kwargs: Keyword arguments passed to execute_cmd or to the callable.
+    :return: Target name to TargetResult dict in the order of targets.
+    """
+    if not isinstance(targets, dict):
+        targets = {getattr(target, "hostname", str(target)): target for target in targets}
+    if timeout is not None and not callable(cmd):
+        kwargs.setdefault("timeout", timeout)
+    results = dict()
+    if not targets:
+        return results
+    started = dict()
+    executor = BoundedExecutor(nworkers=min(nworkers, len(targets)),
+                               max_queued=len(targets), name="fanout")
+    try:
+        futures = dict()
+        for name, target in targets.items():
+            if callable(cmd):
+                futures[name] = executor.submit(_timed, started, name, cmd, target, **kwargs)
+            else:
+                futures[name] = executor.submit(_timed, started, name, target.execute_cmd,
+                                                cmd, **kwargs)
+        for name, future in futures.items():
+            while name not in results:
+                try:
+                    results[name] = future.result(timeout=None if timeout is None else 0.05)
+                except FutureTimeoutError:
+                    begun = started.get(name)
+                    if begun is not None and time.perf_counter() - begun > timeout:
+                        results[name] = TargetResult(
+                            name, False, error=TimeoutError(f"{name} timed out"),
+                            duration=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_pending=True)
+    failed = [name for name, res in results.items() if not res.success]
+    LOGGER.debug("Fan-out on %s targets completed, failed: %s", len(results), failed)
+    return results
+
+
+def run_in_containers(node: Any, pod_containers: Dict[str, list], command: str,
+                      namespace: str = const.NAMESPACE, nworkers: int = 8,
+                      timeout: float = None, **kwargs) -> Dict[str, TargetResult]:
+    """
+    Run command with kubectl exec in every container of every pod concurrently.
+    :param node: LogicalNode object of the master node.
+    :param pod_containers: Pod name to list of container names dict.
+    :param command: Command to be run inside the containers.
+    :param namespace: Namespace of the pods.
+    :param nworkers: Max number of concurrent commands.
+    :param timeout: Per container timeout in seconds.
+    :param kwargs: Keyword arguments passed to execute_cmd.
+    :return: "pod/container" to TargetResult dict.
+    """
+    if timeout is not None:
+        kwargs.setdefault("timeout", timeout)
+    cmds = {f"{pod}/{cnt}": commands.KUBECTL_CMD.format("exec", pod, namespace,
+                                                        f"-c {cnt} -- {command}")
+            for pod, containers in pod_containers.items() for cnt in containers}
+    return run_on_all(cmds, lambda cmd, **kw: node.execute_cmd(cmd, **kw),
+                      nworkers=nworkers, timeout=timeout, **kwargs)
@@ -27,6 +27,7 @@ import xmltodict
 
 from commons import commands
 from commons import constants as const
+from commons.helpers import fanout_helper
 from commons.helpers.host import Host
 from commons.helpers.pods_helper import LogicalNode
 from commons.utils.assert_utils import assert_true
@@ -982,17 +983,25 @@ class Health(Host):
                 search_str = ["started", "online"]
             LOG.info("Getting services status for all pods")
             hctl_output = self.hctl_status_json(pod_name=pod_name)
+            if hostname is None:
+                resp = fanout_helper.run_on_all(pod_list, pod_obj.get_pod_hostname)
+                hostnames = dict()
+                for pod, res in resp.items():
+                    if not res.success:
+                        raise res.error
+                    hostnames[pod] = res.output
+            else:
+                hostnames = dict.fromkeys(pod_list, hostname)
             for pod in pod_list:
-                if hostname is None:
-                    hostname = pod_obj.get_pod_hostname(pod_name=pod)
+                pod_hostname = hostnames[pod]
                 prefix = None
-                if const.POD_NAME_PREFIX in hostname:
+                if const.POD_NAME_PREFIX in pod_hostname:
                     prefix = const.POD_NAME_PREFIX
-                elif const.SERVER_POD_NAME_PREFIX in hostname:
+                elif const.SERVER_POD_NAME_PREFIX in pod_hostname:
                     prefix = const.SERVER_POD_NAME_PREFIX
-                hostname = hostname + "." + prefix + const.POD_HCTL_POSTFIX
+                pod_hostname = pod_hostname + "." + prefix + const.POD_HCTL_POSTFIX
                 for node in hctl_output["nodes"]:
-                    if hostname == node["name"]:
+                    if pod_hostname == node["name"]:
                         services = node["svcs"]
                         for svc in services:
                             status = True if svc["status"] in search_str else False
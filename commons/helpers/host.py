@@ -18,6 +18,7 @@
 #
 """Interface module for establishing connections."""
 
+import atexit
 import logging
 import os
 import posixpath
@@ -25,8 +26,10 @@ import re
 import shutil
 import socket
 import stat
+import threading
 import time
 from typing import Any
+from typing import Iterator
 from typing import List
 from typing import Tuple
 from typing import Union
@@ -41,6 +44,126 @@ from commons import commands, const
 LOGGER = logging.getLogger(__name__)
 
 
+class SSHConnectionPool:
+    """
+    Process wide pool of authenticated SSH clients keyed by host and user.
+
+    paramiko multiplexes channels over one transport, so every command opens a new
+    channel on the pooled client instead of doing a TCP and SSH handshake. Dead
+    transports are detected on checkout and replaced transparently. A forked child
+    starts with an empty pool, the transport threads of inherited clients do not run in it.
+    """
+
+    def __init__(self) -> None:
+        self.clients = dict()
+        self._locks = dict()
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+        self.stats = {"handshakes": 0, "handshake_time": 0.0, "reconnects": 0,
+                      "commands": 0, "command_time": 0.0}
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        """Per connection lock, so only one thread handshakes with a host at a time."""
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def is_alive(client: paramiko.SSHClient) -> bool:
+        """
+        Check the client transport is still usable.
+        :param client: SSHClient object.
+        :return: True if transport is active.
+        """
+        transport = client.get_transport() if client else None
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (SSHException, EOFError, OSError):
+            return False
+        return True
+
+    def get(self, hostname: str, username: str, password: str, **kwargs) -> paramiko.SSHClient:
+        """
+        Get a connected client for hostname and username, connecting if required.
+        :param hostname: Host name or IP.
+        :param username: User name.
+        :param password: Password.
+        :param kwargs: Keyword arguments passed to AbsHost.connect on a new connection.
+        :return: SSHClient object.
+        """
+        if self.pid != os.getpid():
+            self.clear()
+        key = (hostname, username, password, kwargs.get("port", 22))
+        with self._key_lock(key):
+            client = self.clients.get(key)
+            if client is not None:
+                if self.is_alive(client):
+                    return client
+                LOGGER.debug("Pooled SSH connection to %s is dead, reconnecting", hostname)
+                client.close()
+                with self._lock:
+                    self.stats["reconnects"] += 1
+            start = time.perf_counter()
+            conn = AbsHost(hostname, username, password)
+            conn.connect(**kwargs)
+            with self._lock:
+                self.stats["handshakes"] += 1
+                self.stats["handshake_time"] += time.perf_counter() - start
+                self.clients[key] = conn.host_obj
+            return conn.host_obj
+
+    def owns(self, client: paramiko.SSHClient) -> bool:
+        """Check if client is managed by the pool."""
+        return any(client is pooled for pooled in list(self.clients.values()))
+
+    def discard(self, client: paramiko.SSHClient) -> None:
+        """
+        Close and drop a pooled client after its transport died. Closing a live client
+        kills the channels of every thread using it.
+        :param client: SSHClient object.
+        """
+        with self._lock:
+            for key, pooled in list(self.clients.items()):
+                if pooled is client:
+                    del self.clients[key]
+        client.close()
+
+    def record_command(self, duration: float) -> None:
+        """Account one command executed on a pooled connection."""
+        with self._lock:
+            self.stats["commands"] += 1
+            self.stats["command_time"] += duration
+
+    def clear(self) -> None:
+        """
+        Forget every pooled client without closing it, in a forked child. Closing would
+        act on the sockets still used by the parent, and locks may have been held by
+        parent threads at fork time.
+        """
+        self.clients = dict()
+        self._locks = dict()
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def close_all(self) -> None:
+        """Close every pooled client."""
+        with self._lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            client.close()
+
+
+SSH_POOL = SSHConnectionPool()
+# Retries of a channel refused on a live pooled connection and delay before the first one
+CHANNEL_RETRIES = 5
+CHANNEL_BACKOFF = 0.2
+atexit.register(SSH_POOL.close_all)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SSH_POOL.clear)
+
+
 class AbsHost:
     """Abstract class for establishing connections."""
 
@@ -134,7 +257,7 @@ class AbsHost:
         """
         Disconnects the host obj.
         """
-        if self.host_obj:
+        if self.host_obj and not SSH_POOL.owns(self.host_obj):
             self.host_obj.close()
         if self.shell_obj:
             self.shell_obj.close()
@@ -190,6 +313,7 @@ class Host(AbsHost):
         :param timeout: command and connect timeout.
         :param exc: Flag to disable/enable exception raising
         :param read_nbytes: maximum number of bytes to read.
+        :param pooled: Reuse the pooled connection of this host and user (default True).
         :return: stdout/strerr.
         """
         timer = time.time()
@@ -200,9 +324,13 @@ class Host(AbsHost):
         exc = kwargs.get('exc', True)
         if 'exc' in kwargs.keys():
             kwargs.pop('exc')
+        pooled = kwargs.pop('pooled', True) and not kwargs.get('shell')
         LOGGER.debug("Executing %s", cmd)
-        self.connect(**kwargs)  # fn will raise an exception
-        stdin, stdout, stderr = self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
+        if pooled:
+            stdin, stdout, stderr = self._pooled_exec(cmd, **kwargs)
+        else:
+            self.connect(**kwargs)  # fn will raise an exception
+            stdin, stdout, stderr = self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
         # above is non blocking call and timeout is set for SSL handshake and command
         if check_recv_ready:
             while time.time() - timer < timeout and not stdout.channel.exit_status_ready():
@@ -211,6 +339,8 @@ class Host(AbsHost):
                 raise TimeoutError('The script or command was not completed within estimated time')
         exit_status = stdout.channel.recv_exit_status()
         LOGGER.debug(exit_status)
+        if pooled:
+            SSH_POOL.record_command(time.time() - timer)
         if exit_status != 0:
             err = stderr.readlines()
             err = [r.strip().strip("\n").strip() for r in err]
@@ -234,6 +364,62 @@ class Host(AbsHost):
 
         return stdout.read(read_nbytes)
 
+    def stream_cmd(self, cmd: str, encoding: str = "utf-8", **kwargs) -> Iterator[str]:
+        """
+        Execute command on the pooled connection and yield its output lines as they are
+        received, so large outputs are processed in constant memory.
+        :param cmd: command user wants to execute on host.
+        :param encoding: encoding of the output, undecodable bytes are replaced.
+        :param timeout: command and connect timeout, also the max wait for a line.
+        :param exc: raise IOError if the command fails (default True).
+        :return: iterator of output lines.
+        """
+        timer = time.time()
+        exc = kwargs.pop('exc', True)
+        LOGGER.debug("Streaming %s", cmd)
+        _, stdout, stderr = self._pooled_exec(cmd, **kwargs)
+        # Binary file on the channel, so undecodable output does not abort the stream.
+        for line in stdout.channel.makefile("rb"):
+            yield line.decode(encoding, "replace")
+        exit_status = stdout.channel.recv_exit_status()
+        SSH_POOL.record_command(time.time() - timer)
+        if exit_status != 0 and exc:
+            err = [r.strip() for r in stderr.readlines()]
+            LOGGER.debug("Error: %s", str(err))
+            raise IOError(err or f"{cmd} exited with status {exit_status}")
+
+    def _pooled_exec(self, cmd: str, **kwargs) -> tuple:
+        """
+        Open a channel for cmd on the pooled connection of this host. The connection is
+        replaced once if its transport died; if only the channel was refused, e.g. sshd
+        MaxSessions reached by other threads, retry with backoff on the same connection.
+        :param cmd: command user wants to execute on host.
+        :param kwargs: connect keyword arguments, timeout is also used for the command.
+        :return: stdin, stdout and stderr channel files.
+        """
+        timeout = kwargs.get('timeout', 400)
+        reconnected = False
+        retries = 0
+        while True:
+            self.host_obj = SSH_POOL.get(self.hostname, self.username, self.password, **kwargs)
+            try:
+                return self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
+            except (SSHException, EOFError, OSError) as error:
+                transport = self.host_obj.get_transport()
+                if transport is None or not transport.is_active():
+                    if reconnected:
+                        raise
+                    reconnected = True
+                    LOGGER.debug("SSH connection to %s failed: %s", self.hostname, error)
+                    SSH_POOL.discard(self.host_obj)
+                    continue
+                # Other threads still use the connection, never close it here
+                if retries == CHANNEL_RETRIES:
+                    raise
+                LOGGER.debug("Command channel refused on %s: %s", self.hostname, error)
+                time.sleep(CHANNEL_BACKOFF * 2 ** retries)
+                retries += 1
+
     def path_exists(self, path: str) -> bool:
         """
         Check if file exists.
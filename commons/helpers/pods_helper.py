@@ -25,18 +25,35 @@ import logging
 import os
 import random
 import time
+from functools import wraps
 from typing import Tuple
 import json
 
 from commons import commands
 from commons import constants as const
+from commons.helpers import fanout_helper
 from commons.helpers.host import Host
+from commons.helpers.topology_helper import ClusterTopology
 
 log = logging.getLogger(__name__)
 
 namespace_map = {}
 
 
+def invalidates_topology(func):
+    """
+    Decorator for disruptive operations, drops the cached cluster topologies of every
+    namespace of the node afterwards.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            ClusterTopology.invalidate_host(self)
+    return wrapper
+
+
 class LogicalNode(Host):
     """Pods helper class. The Command builder should be written separately and will be
     using this class.
@@ -45,6 +62,11 @@ class LogicalNode(Host):
     kube_commands = ('create', 'apply', 'config', 'get', 'explain',
                      'autoscale', 'patch', 'scale', 'exec')
 
+    @property
+    def topology(self) -> ClusterTopology:
+        """Cached pods/nodes/services snapshot shared by all objects of this master node."""
+        return ClusterTopology.get(self)
+
     def get_service_logs(self, svc_name: str, namespace: str, options: '') -> Tuple:
         """Get logs of a pod or service."""
         cmd = commands.FETCH_LOGS.format(svc_name, namespace, options)
@@ -70,6 +92,7 @@ class LogicalNode(Host):
             resp = (resp.decode("utf8")).strip()
         return resp
 
+    @invalidates_topology
     def shutdown_node(self, options=None):
         """Function to shutdown any of the node."""
         try:
@@ -89,11 +112,8 @@ class LogicalNode(Host):
 
     def get_pod_name(self, pod_prefix: str = const.POD_NAME_PREFIX):
         """Function to get pod name with given prefix."""
-        output = self.execute_cmd(commands.CMD_POD_STATUS +
-                                  " -o=custom-columns=NAME:.metadata.name", read_lines=True)
-        for lines in output:
-            if pod_prefix in lines:
-                return True, lines.strip()
+        for pod_name in self.topology.pod_names(pod_prefix):
+            return True, pod_name
         return False, f"pod with prefix \"{pod_prefix}\" not found"
 
     def send_sync_command(self, pod_prefix):
@@ -105,12 +125,12 @@ class LogicalNode(Host):
         log.info("Run sync command on all containers of pods %s", pod_prefix)
         pod_dict = self.get_all_pods_containers(pod_prefix=pod_prefix)
         if pod_dict:
-            for pod, containers in pod_dict.items():
-                for cnt in containers:
-                    res = self.send_k8s_cmd(
-                        operation="exec", pod=pod, namespace=const.NAMESPACE,
-                        command_suffix=f"-c {cnt} -- sync", decode=True)
-                    log.info("Response for pod %s container %s: %s", pod, cnt, res)
+            results = fanout_helper.run_in_containers(self, pod_dict, "sync")
+            for target, res in results.items():
+                if not res.success:
+                    raise res.error
+                log.info("Response for pod/container %s: %s", target,
+                         res.output.decode("utf8").strip())
 
         return True
 
@@ -121,24 +141,13 @@ class LogicalNode(Host):
         :param pod_list: List of pods
         :return: Dict
         """
-        pod_containers = dict()
-        pod_list = pod_list if pod_list else list()
         if not pod_list:
             log.info("Get all data pod names of %s", pod_prefix)
-            output = self.execute_cmd(commands.CMD_POD_STATUS +
-                                      " -o=custom-columns=NAME:.metadata.name", read_lines=True)
-            for lines in output:
-                if pod_prefix in lines:
-                    pod_list.append(lines.strip())
-
-        for pod in pod_list:
-            cmd = commands.KUBECTL_GET_POD_CONTAINERS.format(pod)
-            output = self.execute_cmd(cmd=cmd, read_lines=True)
-            output = output[0].split()
-            pod_containers[pod] = output
+            pod_list = self.topology.pod_names(pod_prefix)
 
-        return pod_containers
+        return {pod: self.topology.containers(pod) for pod in pod_list}
 
+    @invalidates_topology
     def create_pod_replicas(self, num_replica, deploy=None, pod_name=None, set_name=None):
         """
         Helper function to delete/remove/create pod by changing number of replicas
@@ -191,6 +200,7 @@ class LogicalNode(Host):
                       LogicalNode.create_pod_replicas.__name__, error)
             return False, error
 
+    @invalidates_topology
     def delete_pod(self, pod_name, force=False):
         """
         Helper function to delete pod gracefully or forcefully using kubectl delete command
@@ -265,6 +275,7 @@ class LogicalNode(Host):
                       LogicalNode.get_num_replicas.__name__, error)
             return False, error
 
+    @invalidates_topology
     def delete_deployment(self, pod_name):
         """
         Helper function to delete deployment of given pod
@@ -293,6 +304,7 @@ class LogicalNode(Host):
                       LogicalNode.delete_deployment.__name__, error)
             return False, error
 
+    @invalidates_topology
     def recover_deployment_helm(self, deployment_name):
         """
         Helper function to recover the deleted deployment using helm
@@ -319,6 +331,7 @@ class LogicalNode(Host):
                       LogicalNode.recover_deployment_helm.__name__, error)
             return False, error
 
+    @invalidates_topology
     def recover_deployment_k8s(self, backup_path, deployment_name):
         """
         Helper function to recover the deleted deployment using kubectl
@@ -399,15 +412,7 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: dict
         """
-        pod_dict = {}
-        output = self.execute_cmd(cmd=commands.KUBECTL_GET_POD_IPS, read_lines=True)
-        for lines in output:
-            if pod_prefix in lines:
-                data = lines.strip()
-                pod_name = data.split()[0]
-                pod_ip = data.split()[1].replace("\n", "")
-                pod_dict[pod_name.strip()] = pod_ip.strip()
-        return pod_dict
+        return self.topology.pod_ips(pod_prefix)
 
     def get_container_of_pod(self, pod_name, container_prefix):
         """
@@ -416,15 +421,7 @@ class LogicalNode(Host):
         :param: container_prefix: Prefix to define container category
         :return: list
         """
-        cmd = commands.KUBECTL_GET_POD_CONTAINERS.format(pod_name)
-        output = self.execute_cmd(cmd=cmd, read_lines=True)
-        output = output[0].split()
-        container_list = []
-        for each in output:
-            if container_prefix in each:
-                container_list.append(each)
-
-        return container_list
+        return self.topology.containers(pod_name, container_prefix)
 
     def get_recent_pod_name(self, deployment_name=None):
         """
@@ -450,16 +447,7 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: list
         """
-        pods_list = []
-        log.debug("Executing : %s", commands.KUBECTL_GET_POD_NAMES)
-        output = self.execute_cmd(cmd=commands.KUBECTL_GET_POD_NAMES, read_lines=True)
-        pods = [line.strip().replace("\n", "") for line in output]
-        if pod_prefix is not None:
-            for each in pods:
-                if pod_prefix in each:
-                    pods_list.append(each)
-        else:
-            pods_list = pods
+        pods_list = self.topology.pod_names(pod_prefix)
         log.debug("Pods list : %s", pods_list)
         return pods_list
 
@@ -498,15 +486,7 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: dict
         """
-        pod_dict = {}
-        output = self.execute_cmd(cmd=commands.K8S_GET_CUSTOM_MGNT, read_lines=True)
-        for line in output:
-            if pod_prefix in line:
-                data = line.strip()
-                pod_name = data.split()[0]
-                node_fqdn = data.split()[1]
-                pod_dict[pod_name.strip()] = node_fqdn.strip()
-        return pod_dict
+        return self.topology.pod_nodes(pod_prefix)
 
     def get_pod_hostname(self, pod_name):
         """
@@ -515,6 +495,9 @@ class LogicalNode(Host):
         :return: str
         """
         log.info("Getting pod hostname for pod %s", pod_name)
+        pod = self.topology.pod(pod_name)
+        if not pod["host_network"]:
+            return pod["hostname"]
         cmd = commands.KUBECTL_GET_POD_HOSTNAME.format(pod_name)
         output = self.execute_cmd(cmd=cmd, read_lines=True)
         hostname = output[0].strip()
@@ -532,6 +515,7 @@ class LogicalNode(Host):
         hostname = output[0].strip()
         return hostname
 
+    @invalidates_topology
     def kill_process_in_container(self, pod_name, container_name, process_name=None, **kwargs):
         """
         Kill specific process in container
@@ -591,6 +575,7 @@ class LogicalNode(Host):
             deploy_list = [each for each in resp if pod_prefix in each]
         return deploy_list
 
+    @invalidates_topology
     def apply_k8s_deployment(self, file_path: str):
         """
         Apply the modified deployment file for pods, containers.
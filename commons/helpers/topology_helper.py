@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Cached snapshot of the k8s cluster topology.
+
+Two kubectl round trips (pods, then nodes and services, as json) build an in memory index
+which answers pod name, IP, node, container and hostname lookups. The snapshot is rebuilt
+when it is older than ttl seconds, after invalidate() (called by disruptive LogicalNode
+operations) or, with start_watch(), when the resource version of any pod changes.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+
+from commons import commands
+
+LOGGER = logging.getLogger(__name__)
+
+TOPOLOGY_TTL = 5
+
+
+class ClusterTopology:
+    """In memory index of pods, nodes and services of one namespace."""
+
+    _instances = dict()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, node: Any, namespace: str = None, ttl: float = TOPOLOGY_TTL) -> None:
+        """
+        :param node: LogicalNode (or Host) object of the master node.
+        :param namespace: Namespace, kubectl default namespace if None.
+        :param ttl: Max age of the snapshot in seconds, None to refresh only on invalidate.
+        """
+        self.node = node
+        self.namespace = namespace
+        self.ttl = ttl
+        self.pods = dict()
+        self.nodes = dict()
+        self.services = dict()
+        self.resource_version = None
+        self.refreshed_at = None
+        self.refreshes = 0
+        self._lock = threading.RLock()
+        self._watch_stop = threading.Event()
+        self._watch_thread = None
+
+    @classmethod
+    def get(cls, node: Any, namespace: str = None, ttl: float = TOPOLOGY_TTL):
+        """
+        Get the topology shared by all node objects of the same host and namespace.
+        :param node: LogicalNode object of the master node.
+        :param namespace: Namespace, kubectl default namespace if None.
+        :param ttl: Max age of the snapshot in seconds.
+        :return: ClusterTopology object.
+        """
+        key = (node.hostname, node.username, namespace)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(node, namespace, ttl)
+            return cls._instances[key]
+
+    @classmethod
+    def invalidate_host(cls, node: Any) -> None:
+        """
+        Invalidate the topologies of every namespace read through the master node, e.g.
+        after a disruptive operation in any of them.
+        :param node: LogicalNode object of the master node.
+        """
+        with cls._instances_lock:
+            topologies = [topology for key, topology in cls._instances.items()
+                          if key[:2] == (node.hostname, node.username)]
+        for topology in topologies:
+            topology.invalidate()
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        """Invalidate every shared topology, e.g. after a node failover."""
+        with cls._instances_lock:
+            topologies = list(cls._instances.values())
+        for topology in topologies:
+            topology.invalidate()
+
+    def _kubectl_json(self, resource: str) -> dict:
+        """Run kubectl get resource -o json and return the parsed response."""
+        cmd = commands.KUBECTL_GET_JSON.format(resource)
+        if self.namespace:
+            cmd = f"{cmd} -n {self.namespace}"
+        return json.loads(self.node.execute_cmd(cmd=cmd))
+
+    def refresh(self) -> None:
+        """Rebuild the snapshot from kubectl."""
+        with self._lock:
+            start = time.perf_counter()
+            pods = self._kubectl_json("pods")
+            # kubectl returns an empty resourceVersion for lists, use the ones of the pods
+            self.resource_version = self._pods_version(
+                [item["metadata"].get("resourceVersion", "") for item in pods.get("items", [])])
+            self.pods = {item["metadata"]["name"]: self._pod_info(item)
+                         for item in pods.get("items", [])}
+            others = self._kubectl_json("nodes,services").get("items", [])
+            self.nodes = {item["metadata"]["name"]: self._node_info(item)
+                          for item in others if item.get("kind") == "Node"}
+            self.services = {item["metadata"]["name"]: self._svc_info(item)
+                             for item in others if item.get("kind") == "Service"}
+            self.refreshed_at = time.monotonic()
+            self.refreshes += 1
+            LOGGER.debug("Topology of %s refreshed in %.3fs: %s pods, %s nodes",
+                         self.node.hostname, time.perf_counter() - start, len(self.pods),
+                         len(self.nodes))
+
+    @staticmethod
+    def _pods_version(versions: List[str]) -> str:
+        """Version of the pod list, changes when a pod is added, deleted or updated."""
+        return " ".join(sorted(versions))
+
+    @staticmethod
+    def _pod_info(item: dict) -> dict:
+        """Extract the indexed fields of a pod."""
+        spec = item.get("spec", {})
+        status = item.get("status", {})
+        owners = item["metadata"].get("ownerReferences") or [{}]
+        return {"name": item["metadata"]["name"],
+                "ip": status.get("podIP", "<none>"),
+                "node": spec.get("nodeName", "<none>"),
+                "phase": status.get("phase"),
+                "hostname": spec.get("hostname", item["metadata"]["name"]),
+                "host_network": spec.get("hostNetwork", False),
+                "containers": [cnt["name"] for cnt in spec.get("containers", [])],
+                "labels": item["metadata"].get("labels", {}),
+                "owner": (owners[0].get("kind"), owners[0].get("name"))}
+
+    @staticmethod
+    def _node_info(item: dict) -> dict:
+        """Extract the indexed fields of a node."""
+        addresses = {addr["type"]: addr["address"]
+                     for addr in item.get("status", {}).get("addresses", [])}
+        return {"name": item["metadata"]["name"],
+                "ip": addresses.get("InternalIP"),
+                "hostname": addresses.get("Hostname"),
+                "labels": item["metadata"].get("labels", {})}
+
+    @staticmethod
+    def _svc_info(item: dict) -> dict:
+        """Extract the indexed fields of a service."""
+        spec = item.get("spec", {})
+        return {"name": item["metadata"]["name"],
+                "cluster_ip": spec.get("clusterIP"),
+                "type": spec.get("type"),
+                "ports": spec.get("ports", [])}
+
+    def invalidate(self) -> None:
+        """Drop the snapshot, the next lookup rebuilds it."""
+        with self._lock:
+            self.refreshed_at = None
+
+    def _snapshot(self) -> Dict[str, dict]:
+        """Return the pod index, refreshing it if invalidated or expired."""
+        with self._lock:
+            if self.refreshed_at is None or (
+                    self.ttl is not None and time.monotonic() - self.refreshed_at > self.ttl):
+                self.refresh()
+            return self.pods
+
+    def pods_info(self) -> Dict[str, dict]:
+        """
+        :return: Pod name to indexed fields dict, must not be modified.
+        """
+        return self._snapshot()
+
+    def pod_names(self, pod_prefix: str = None) -> List[str]:
+        """
+        :param pod_prefix: Prefix to define the pod category.
+        :return: Names of pods containing pod_prefix, all pods if None.
+        """
+        return [name for name in self._snapshot() if pod_prefix is None or pod_prefix in name]
+
+    def pod(self, pod_name: str) -> dict:
+        """
+        :param pod_name: Name of the pod.
+        :return: Indexed fields of the pod.
+        :raises KeyError: If pod does not exist.
+        """
+        try:
+            return self._snapshot()[pod_name]
+        except KeyError:
+            # Pod may have been created after the snapshot was taken.
+            with self._lock:
+                self.refresh()
+                return self.pods[pod_name]
+
+    def pod_ips(self, pod_prefix: str = None) -> Dict[str, str]:
+        """
+        :param pod_prefix: Prefix to define the pod category.
+        :return: Pod name to pod IP dict.
+        """
+        return {name: pod["ip"] for name, pod in self._snapshot().items()
+                if pod_prefix is None or pod_prefix in name}
+
+    def pod_nodes(self, pod_prefix: str = None) -> Dict[str, str]:
+        """
+        :param pod_prefix: Prefix to define the pod category.
+        :return: Pod name to k8s node name dict.
+        """
+        return {name: pod["node"] for name, pod in self._snapshot().items()
+                if pod_prefix is None or pod_prefix in name}
+
+    def pods_on_node(self, node_name: str, pod_prefix: str = None) -> List[str]:
+        """
+        :param node_name: k8s node name.
+        :param pod_prefix: Prefix to define the pod category.
+        :return: Names of pods scheduled on node_name.
+        """
+        return [name for name, node in self.pod_nodes(pod_prefix).items() if node == node_name]
+
+    def containers(self, pod_name: str, container_prefix: str = None) -> List[str]:
+        """
+        :param pod_name: Name of the pod.
+        :param container_prefix: Prefix to define container category.
+        :return: Container names of the pod.
+        """
+        return [cnt for cnt in self.pod(pod_name)["containers"]
+                if container_prefix is None or container_prefix in cnt]
+
+    def start_watch(self, interval: float = 5) -> None:
+        """
+        Invalidate the snapshot in background whenever the resource version of a pod
+        changes, so long polls pick up pod restarts without waiting for ttl.
+        :param interval: Poll interval in seconds.
+        """
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch, args=(interval,),
+                                              name="topology-watch", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watch(self) -> None:
+        """Stop background refresh."""
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+        self._watch_thread = None
+
+    def _watch(self, interval: float) -> None:
+        """Poll the resource versions of the pods until stopped."""
+        cmd = commands.KUBECTL_GET_PODS_RESOURCE_VERSION
+        if self.namespace:
+            cmd = f"{cmd} -n {self.namespace}"
+        while not self._watch_stop.wait(interval):
+            try:
+                version = self._pods_version(
+                    self.node.execute_cmd(cmd=cmd).decode("utf8").split())
+            except Exception as error:
+                LOGGER.debug("Topology watch on %s failed: %s", self.node.hostname, error)
+                continue
+            if version != self.resource_version:
+                LOGGER.debug("Pods changed on %s, invalidating topology", self.node.hostname)
+                with self._lock:
+                    self.resource_version = version
+                    self.invalidate()
@@ -112,10 +112,12 @@ NGREENLETS = 32
 NUSERS = 10
 DATAGEN_HOME = '/var/log/datagen/'
 META_DATA_HOME = os.path.join(LOG_DIR, 'meta_data')
+BENCH_RESULTS_DB = os.path.join(LOG_DIR, 'bench_results.db')
 S3_ENDPOINT = "https://s3.seagate.com"
 DATASET_FILES = "/var/log/datagen/createdfile.txt"
 USER_JSON = '_usersdata'
 USER_META_JSON = '_user_metadata'
+DI_META_DB = 'di_metadata.db'
 UPLOADED_FILES = "uploadInfo.csv"
 DELETE_OP_FILE_NAME = "deleteInfo.csv"
 COM_DELETE_OP_FILENAME = "combinedDeleteInfo.csv"
@@ -126,6 +128,7 @@ FAILED_FILES_SERVER_ERROR = "FailedFilesServerError.csv"
 DESTRUCTIVE_TEST_RESULT = "/root/result_summary.csv"
 DELETE_PERCENTAGE = 10
 DOWNLOAD_HOME = '/var/log/'
+DI_READ_SIZE = 1024 * 1024
 
 S3_INSTANCES_PER_NODE = 1
 LOCAL_S3_CONFIG = os.path.join(tempfile.gettempdir(), 's3config.yaml')
@@ -19,6 +19,8 @@
 #
 """ Report Server client to update test results to Mongo DB"""
 import threading
+from http import HTTPStatus
+
 import requests
 from commons import errorcodes
 from commons.exceptions import CTException
@@ -27,6 +29,7 @@ from commons.utils import web_utils
 REPORT_SRV = "http://cftic2.pun.seagate.com:5000/"  # todo discover report server
 REPORT_SRV_CREATE = REPORT_SRV + "reportsdb/create"
 REPORT_SRV_UPDATE = REPORT_SRV + "reportsdb/update"
+REPORT_SRV_BULK_CREATE = REPORT_SRV + "reportsdb/bulk_create"
 
 
 class SingletonMixin:
@@ -129,42 +132,7 @@ class ReportClient(SingletonMixin):
             "db_password": ""
         }
        """
-        payload = {"OSVersion": data_kwargs.get('os', "CentOS"),
-                   "buildNo": data_kwargs.get('build'),
-                   "buildType": data_kwargs.get('build_type', "stable"),
-                   "clientHostname": data_kwargs.get('client_hostname', "autoclient"),
-                   "executionType": data_kwargs.get('execution_type', "R2Automated"),
-                   "healthCheckResult": data_kwargs.get('health_chk_res', "Pass"),
-                   "logCollectionDone": data_kwargs.get('are_logs_collected', True),
-                   "logPath": data_kwargs.get('log_path', "DemoPath"),
-                   "noOfNodes": data_kwargs.get('nodes', 1),  # CMN_CFG defaults 1
-                   "nodesHostname": data_kwargs.get('nodes_hostnames', []),  # CMN_CFG
-                   "testPlanLabel": data_kwargs['testPlanLabel'],  # get from TP
-                   "testExecutionLabel": data_kwargs['testExecutionLabel'],
-                   "testExecutionID": data_kwargs['test_exec_id'],
-                   "testExecutionTime": data_kwargs.get('test_exec_time', 0),
-                   "testID": data_kwargs['test_id'],
-                   "testIDLabels": data_kwargs['test_id_labels'],
-                   "testName": data_kwargs['test_name'],
-                   "testPlanID": data_kwargs['test_plan_id'],
-                   "testResult": data_kwargs['test_result'],
-                   "testStartTime": data_kwargs['start_time'],
-                   "testTags": data_kwargs.get('tags', []),
-                   # te component first element
-                   "testTeam": data_kwargs.get('test_team', "Automation"),
-                   "testType": data_kwargs.get('test_type', "Pytest"),  # use pytest default
-                   "feature": data_kwargs['feature'],
-                   "latest": data_kwargs['latest'],
-                   "db_username": data_kwargs.get("db_username"),
-                   "db_password": data_kwargs.get("db_password"),
-                   "drID": data_kwargs['dr_id'],
-                   "featureID": data_kwargs['feature_id'],
-                   "platformType": data_kwargs['platform_type'],
-                   "serverType": data_kwargs['server_type'],
-                   "enclosureType": data_kwargs['enclosure_type'],
-                   "failureString": data_kwargs.get('failure_string'),
-                   }
-
+        payload = self.db_payload(**data_kwargs)
         headers = {
             'Content-Type': 'application/json'
         }
@@ -172,6 +140,91 @@ class ReportClient(SingletonMixin):
         print(response.text.encode('utf8'))
         return response.status_code
 
+    @staticmethod
+    def db_payload(**data_kwargs):
+        """
+        Build the report server document of a test result.
+        :param data_kwargs: All parameters needed to update in DB, see create_db_entry
+        :return: Payload dict
+        """
+        return {"OSVersion": data_kwargs.get('os', "CentOS"),
+               "buildNo": data_kwargs.get('build'),
+               "buildType": data_kwargs.get('build_type', "stable"),
+               "clientHostname": data_kwargs.get('client_hostname', "autoclient"),
+               "executionType": data_kwargs.get('execution_type', "R2Automated"),
+               "healthCheckResult": data_kwargs.get('health_chk_res', "Pass"),
+               "logCollectionDone": data_kwargs.get('are_logs_collected', True),
+               "logPath": data_kwargs.get('log_path', "DemoPath"),
+               "noOfNodes": data_kwargs.get('nodes', 1),  # CMN_CFG defaults 1
+               "nodesHostname": data_kwargs.get('nodes_hostnames', []),  # CMN_CFG
+               "testPlanLabel": data_kwargs['testPlanLabel'],  # get from TP
+               "testExecutionLabel": data_kwargs['testExecutionLabel'],
+               "testExecutionID": data_kwargs['test_exec_id'],
+               "testExecutionTime": data_kwargs.get('test_exec_time', 0),
+               "testID": data_kwargs['test_id'],
+               "testIDLabels": data_kwargs['test_id_labels'],
+               "testName": data_kwargs['test_name'],
+               "testPlanID": data_kwargs['test_plan_id'],
+               "testResult": data_kwargs['test_result'],
+               "testStartTime": data_kwargs['start_time'],
+               "testTags": data_kwargs.get('tags', []),
+               # te component first element
+               "testTeam": data_kwargs.get('test_team', "Automation"),
+               "testType": data_kwargs.get('test_type', "Pytest"),  # use pytest default
+               "feature": data_kwargs['feature'],
+               "latest": data_kwargs['latest'],
+               "db_username": data_kwargs.get("db_username"),
+               "db_password": data_kwargs.get("db_password"),
+               "drID": data_kwargs['dr_id'],
+               "featureID": data_kwargs['feature_id'],
+               "platformType": data_kwargs['platform_type'],
+               "serverType": data_kwargs['server_type'],
+               "enclosureType": data_kwargs['enclosure_type'],
+               "failureString": data_kwargs.get('failure_string'),
+               }
+
+    def create_db_entries(self, entries):
+        """
+        Create DB entries of a batch of test results, one bulk_create request per set of
+        DB credentials. Falls back to one request per entry over a keep alive session if
+        the report server has no bulk_create endpoint or rejects the batch.
+        :param entries: List of data_kwargs dicts, see create_db_entry
+        :return: List of response status codes in order of entries, None if the request
+            of an entry failed
+        """
+        codes = [None] * len(entries)
+        batches = {}
+        for index, data_kwargs in enumerate(entries):
+            payload = self.db_payload(**data_kwargs)
+            creds = (payload.pop("db_username"), payload.pop("db_password"))
+            batches.setdefault(creds, []).append((index, payload))
+        for (db_username, db_password), batch in batches.items():
+            try:
+                response = self.session.post(
+                    REPORT_SRV_BULK_CREATE,
+                    json={"db_username": db_username, "db_password": db_password,
+                          "entries": [payload for _, payload in batch]},
+                    headers={'Content-Type': 'application/json'}, verify=False)
+            except requests.exceptions.RequestException:
+                continue
+            # One invalid entry fails the whole batch, create the entries one by one so
+            # the valid ones are kept and only the invalid ones get an error code
+            if response.status_code < 400 or response.status_code >= 500 or \
+                    response.status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                for index, _ in batch:
+                    codes[index] = response.status_code
+                continue
+            for index, payload in batch:
+                try:
+                    response = self.session.post(
+                        REPORT_SRV_CREATE,
+                        json=dict(payload, db_username=db_username, db_password=db_password),
+                        headers={'Content-Type': 'application/json'}, verify=False)
+                    codes[index] = response.status_code
+                except requests.exceptions.RequestException:
+                    pass
+        return codes
+
     def update_db_entry(self, **data_kwargs):
         """
         Update reports db entry at the end of execution.
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Background reporting of test results.
+
+Pytest hooks queue Jira status changes, report DB entries, log uploads and Jira comments
+and return; a worker thread sends them every interval. Status changes of the tests of a
+test execution are coalesced into one xray import, DB entries of an interval share one
+keep alive session and failed items are retried with exponential backoff. close()
+flushes the queue and spools what could not be sent to a JSON lines file, which
+requeue_spool() of the next session picks up.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable
+from typing import List
+
+from commons import params
+from commons.utils import system_utils
+
+LOGGER = logging.getLogger(__name__)
+
+SPOOL_FILE = "report_spool.jsonl"
+
+
+class ReportPipeline:
+    """Queue of reporting work drained by one worker thread."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, jira_factory: Callable = None, report_client=None,
+                 interval: float = 2.0, retries: int = 3, backoff: float = 2.0,
+                 spool_path: str = None) -> None:
+        """
+        :param jira_factory: Returns the JiraTask used for all Jira updates, called once
+            in the worker; Jira items are dropped if None.
+        :param report_client: ReportClient for DB entries; DB items are dropped if None.
+        :param interval: Max seconds an item waits before the worker sends it.
+        :param retries: Retries of a failed item before it is spooled.
+        :param backoff: Delay before the first retry, doubled on every retry.
+        :param spool_path: JSON lines file of items not sent at close.
+        """
+        self.jira_factory = jira_factory
+        self.report_client = report_client
+        self.interval = interval
+        self.retries = retries
+        self.backoff = backoff
+        self.spool_path = spool_path
+        self.failed = []
+        self._jira = None
+        self._statuses = {}
+        # te_id -> (attempts, due) of statuses merged back after a failed import
+        self._status_retries = {}
+        self._entries = []
+        self._tasks = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._flushing = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="report-pipeline", daemon=True)
+        self._thread.start()
+
+    def set_status(self, te_id: str, test_id: str, status: str, log_path: str = "") -> None:
+        """
+        Queue a Jira status change, a later status of the same test replaces it.
+        :param te_id: Test execution id.
+        :param test_id: Test id.
+        :param status: Executing, PASS, FAIL, BLOCKED.
+        :param log_path: Comment of a final status.
+        """
+        now = datetime.datetime.now().astimezone().isoformat(timespec='seconds')
+        with self._cond:
+            test = self._statuses.setdefault((te_id, test_id), {"testKey": test_id})
+            if status == 'Executing':
+                test["start"] = now
+            else:
+                test["finish"] = now
+                test["comment"] = log_path
+            test["status"] = status
+            self._cond.notify()
+
+    def add_db_entry(self, data_kwargs: dict) -> None:
+        """
+        Queue a report DB entry.
+        :param data_kwargs: Parameters of ReportClient.create_db_entry.
+        """
+        with self._cond:
+            self._entries.append(data_kwargs)
+            self._cond.notify()
+
+    def upload(self, local_path: str, remote_path: str, remove: bool = False,
+               comment: dict = None) -> None:
+        """
+        Queue upload of a file or directory to the NFS share.
+        :param local_path: File or directory to upload.
+        :param remote_path: Directory path on the NFS share.
+        :param remove: Remove the local file once uploaded.
+        :param comment: test_run_id and test_id to comment the uploaded path on.
+        """
+        self._add_task({"kind": "upload", "local_path": local_path,
+                        "remote_path": remote_path, "remove": remove, "comment": comment})
+
+    def add_comment(self, test_run_id: str, test_id: str, comment: str) -> None:
+        """Queue a Jira test run comment."""
+        self._add_task({"kind": "comment", "test_run_id": test_run_id, "test_id": test_id,
+                        "comment": comment})
+
+    def _add_task(self, task: dict) -> None:
+        """Queue a task for its first attempt."""
+        task.setdefault("attempts", 0)
+        task.setdefault("due", 0)
+        with self._cond:
+            self._tasks.append(task)
+            self._cond.notify()
+
+    def pending(self) -> int:
+        """Number of queued items."""
+        with self._cond:
+            return len(self._statuses) + len(self._entries) + len(self._tasks)
+
+    def _take(self) -> List[dict]:
+        """Take coalesced statuses, batched entries and due tasks, under the lock."""
+        tasks = []
+        by_te = {}
+        now = time.monotonic()
+        for key, test in list(self._statuses.items()):
+            if self._flushing or self._status_retries.get(key[0], (0, 0))[1] <= now:
+                by_te.setdefault(key[0], []).append(test)
+                del self._statuses[key]
+        tasks += [{"kind": "status", "te_id": te_id, "tests": tests,
+                   "attempts": self._status_retries.pop(te_id, (0, 0))[0]}
+                  for te_id, tests in by_te.items()]
+        if self._entries:
+            tasks.append({"kind": "db", "entries": self._entries, "attempts": 0})
+        self._entries = []
+        later = deque()
+        while self._tasks:
+            task = self._tasks.popleft()
+            (tasks if self._flushing or task["due"] <= now else later).append(task)
+        self._tasks = later
+        return tasks
+
+    def _run(self) -> None:
+        """Worker loop, sends queued items every interval."""
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._closed or self._flushing, self.interval)
+                if self._closed:
+                    return
+                tasks = self._take()
+                self._busy = bool(tasks)
+            for task in tasks:
+                self._execute(task)
+
+    def _execute(self, task: dict) -> None:
+        """Run a task, requeue it with backoff if it failed."""
+        try:
+            retry = getattr(self, f"_send_{task['kind']}")(task)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("Reporting %s failed: %s", task["kind"], error)
+            retry = task
+        if not retry:
+            return
+        retry["attempts"] = task["attempts"] + 1
+        if retry["attempts"] > self.retries:
+            LOGGER.error("Giving up reporting %s after %s attempts", task["kind"],
+                         retry["attempts"])
+            self.failed.append(retry)
+            return
+        retry["due"] = time.monotonic() + self.backoff * 2 ** (retry["attempts"] - 1)
+        with self._cond:
+            if retry["kind"] == "status":
+                self._merge_statuses(retry)
+            else:
+                self._tasks.append(retry)
+
+    def _merge_statuses(self, retry: dict) -> None:
+        """
+        Queue the statuses of a failed import again, under the lock. A status queued
+        since then for the same test is newer and wins, so an old status never
+        overwrites it in Jira.
+        """
+        for test in retry["tests"]:
+            key = (retry["te_id"], test["testKey"])
+            newer = self._statuses.get(key)
+            self._statuses[key] = dict(test, **newer) if newer else test
+        self._status_retries[retry["te_id"]] = (retry["attempts"], retry["due"])
+
+    def _jira_task(self):
+        """JiraTask of the pipeline, created on first use."""
+        if self._jira is None:
+            self._jira = self.jira_factory()
+        return self._jira
+
+    def _send_status(self, task: dict) -> dict:
+        """Send Jira status changes of a test execution in one request."""
+        if self.jira_factory is None:
+            return None
+        response = self._jira_task().update_tests_jira_status(task["te_id"], task["tests"])
+        if response.status_code >= 400:
+            LOGGER.warning("Jira status update of %s failed: %s %s", task["te_id"],
+                           response.status_code, response.text)
+            return task
+        LOGGER.debug("Updated Jira status of %s tests in %s", len(task["tests"]),
+                     task["te_id"])
+        return None
+
+    def _send_db(self, task: dict) -> dict:
+        """Create batch of DB entries, retry the ones which failed on the server side."""
+        if self.report_client is None:
+            return None
+        codes = self.report_client.create_db_entries(task["entries"])
+        failed = [entry for entry, code in zip(task["entries"], codes)
+                  if code is None or code >= 500]
+        rejected = [entry for entry, code in zip(task["entries"], codes)
+                    if code is not None and 400 <= code < 500]
+        for entry in rejected:
+            # Sending a rejected entry again gives the same error
+            LOGGER.error("Report server rejected DB entry of %s", entry.get("test_id"))
+        LOGGER.debug("Created %s of %s DB entries", len(codes) - len(failed) - len(rejected),
+                     len(codes))
+        return dict(task, entries=failed) if failed else None
+
+    def _send_upload(self, task: dict) -> dict:
+        """Upload a file to the NFS share, then queue its comment."""
+        resp = system_utils.mount_upload_to_server(host_dir=params.NFS_SERVER_DIR,
+                                                   mnt_dir=params.MOUNT_DIR,
+                                                   remote_path=task["remote_path"],
+                                                   local_path=task["local_path"])
+        if not resp[0]:
+            LOGGER.warning("Failed to upload %s: %s", task["local_path"], resp[1])
+            return task
+        LOGGER.info("Uploaded %s at location : %s", task["local_path"], resp[1])
+        if task["remove"] and os.path.isfile(task["local_path"]):
+            os.remove(task["local_path"])
+        if task["comment"] and self.jira_factory is not None:
+            name = os.path.basename(task["local_path"])
+            self._add_task({"kind": "comment", **task["comment"],
+                            "comment": f"Log file path: {os.path.join(resp[1], name)}"})
+        return None
+
+    def _send_comment(self, task: dict) -> dict:
+        """Add a Jira test run comment."""
+        if self.jira_factory is None:
+            return None
+        if not self._jira_task().update_execution_details(
+                test_run_id=task["test_run_id"], test_id=task["test_id"],
+                comment=task["comment"]):
+            return task
+        LOGGER.info("Added execution details comment in: %s", task["test_id"])
+        return None
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Send all queued items now, waiting retries included.
+        :param timeout: Max seconds to wait.
+        :return: True if the queue is empty.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._busy or self._statuses or self._entries or self._tasks:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def close(self, timeout: float = None) -> None:
+        """
+        Flush, stop the worker and spool the items which could not be sent.
+        :param timeout: Max seconds to wait for the flush.
+        """
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        with self._cond:
+            self._flushing = True
+            left = self._take() + self.failed
+        self.failed = []
+        if left:
+            LOGGER.error("%s reporting items could not be sent", len(left))
+            self._spool(left)
+
+    def _spool(self, tasks: List[dict]) -> None:
+        """Append tasks to the spool file, without DB passwords."""
+        if not self.spool_path:
+            return
+        with open(self.spool_path, "a") as spool:
+            for task in tasks:
+                if task["kind"] == "db":
+                    task = dict(task, entries=[dict(entry, db_password=None)
+                                               for entry in task["entries"]])
+                spool.write(json.dumps(dict(task, attempts=0, due=0), default=str) + "\n")
+        LOGGER.info("Spooled %s reporting items to %s", len(tasks), self.spool_path)
+
+    def requeue_spool(self, db_password: str = None) -> int:
+        """
+        Queue the items spooled by an earlier session and remove the spool file.
+        :param db_password: Password of spooled DB entries.
+        :return: Number of requeued items.
+        """
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return 0
+        with open(self.spool_path) as spool:
+            tasks = [json.loads(line) for line in spool if line.strip()]
+        os.remove(self.spool_path)
+        for task in tasks:
+            if task["kind"] == "db":
+                task["entries"] = [dict(entry, db_password=db_password)
+                                   for entry in task["entries"]]
+            self._add_task(task)
+        LOGGER.info("Requeued %s spooled reporting items", len(tasks))
+        return len(tasks)
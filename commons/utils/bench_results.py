@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Common result model of s3bench, hsbench, locust and jmeter runs.
+
+Parsers turn tool output into BenchmarkResult rows (one per operation), BenchmarkStore
+keeps them in a SQLite database and compare() flags regressions of a build against a
+baseline build. Throughput is in MB/s, latencies and durations in seconds and object
+sizes in bytes whatever unit the tool reports.
+"""
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import fields
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+from commons import params
+from commons.utils.log_analyzer import S3BenchLogAnalyzer
+
+LOGGER = logging.getLogger(__name__)
+
+SIZE_UNITS = {"b": 1, "k": 1024, "kb": 1024, "kib": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "mib": 1024 ** 2, "g": 1024 ** 3, "gb": 1024 ** 3, "gib": 1024 ** 3}
+# Metrics compared between builds, True if higher is better.
+COMPARED_METRICS = {"throughput": True, "iops": True, "latency_mean": False,
+                    "latency_p50": False, "latency_p90": False, "latency_p99": False,
+                    "latency_max": False, "error_count": False}
+
+
+def size_to_bytes(size) -> int:
+    """
+    :param size: Size as number of bytes or string like 4Kb, 1 MB, 0.0763 MB.
+    :return: Size in bytes.
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    text = str(size).strip().lower().replace(" ", "")
+    number = text.rstrip("abcdefghijklmnopqrstuvwxyz")
+    return int(float(number) * SIZE_UNITS.get(text[len(number):] or "b", 1))
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class BenchmarkResult:
+    """Result of one operation of a benchmark run."""
+
+    tool: str
+    operation: str
+    throughput: float = None
+    iops: float = None
+    latency_mean: float = None
+    latency_min: float = None
+    latency_p50: float = None
+    latency_p90: float = None
+    latency_p99: float = None
+    latency_max: float = None
+    error_count: int = 0
+    sample_count: int = None
+    object_size: int = None
+    clients: int = None
+    duration: float = None
+    build: str = None
+    run_id: str = None
+    timestamp: float = field(default_factory=time.time)
+    extra: dict = field(default_factory=dict)
+
+    def key(self) -> tuple:
+        """Workload identity of the result, compared across builds."""
+        return self.tool, self.operation, self.object_size, self.clients
+
+
+def parse_s3bench_log(log_path: str, **kwargs) -> List[BenchmarkResult]:
+    """
+    :param log_path: s3bench log file.
+    :param kwargs: BenchmarkResult fields common to all results e.g. build, run_id.
+    :return: One result per operation of the run.
+    """
+    summary = S3BenchLogAnalyzer().analyze(log_path)
+    params_ = summary["parameters"]
+    results = []
+    for operation, stats in summary["operations"].items():
+        latency = stats["latency"]
+        duration = stats.get("total_duration")
+        samples = params_.get("numSamples")
+        results.append(BenchmarkResult(
+            "s3bench", operation.lower(), throughput=stats.get("total_throughput"),
+            iops=samples / duration if samples and duration else None,
+            latency_min=latency.get("Min"), latency_p50=latency.get("50th"),
+            latency_p90=latency.get("90th"), latency_p99=latency.get("99th"),
+            latency_max=latency.get("Max"),
+            error_count=int(stats.get("number_of_errors") or 0),
+            sample_count=samples, object_size=params_.get("objectSize"),
+            clients=params_.get("numClients"), duration=duration, **kwargs))
+    return results
+
+
+def parse_hsbench_json(json_path: str, object_size=None, clients: int = None,
+                       **kwargs) -> List[BenchmarkResult]:
+    """
+    :param json_path: hsbench -j output file.
+    :param object_size: hsbench -z object size.
+    :param clients: hsbench -t threads.
+    :param kwargs: BenchmarkResult fields common to all results e.g. build, run_id.
+    :return: One result per mode of the TOTAL intervals.
+    """
+    with open(json_path, "r", encoding="utf-8") as json_file:
+        intervals = json.load(json_file)
+    results = []
+    for data in intervals:
+        if data.get("IntervalName") != "TOTAL":
+            continue
+        results.append(BenchmarkResult(
+            "hsbench", data["Mode"].lower(), throughput=data.get("Mbps"),
+            iops=data.get("Iops"), latency_mean=_ms(data.get("AvgLat")),
+            latency_min=_ms(data.get("MinLat")), latency_p99=_ms(data.get("NinetyNineLat")),
+            latency_max=_ms(data.get("MaxLat")), sample_count=data.get("Ops"),
+            object_size=size_to_bytes(object_size) if object_size else None,
+            clients=clients, duration=data.get("Seconds"), **kwargs))
+    return results
+
+
+def parse_locust_stats(csv_path: str, clients: int = None, **kwargs) -> List[BenchmarkResult]:
+    """
+    :param csv_path: <prefix>_stats.csv of locust --csv.
+    :param clients: Number of locust users.
+    :param kwargs: BenchmarkResult fields common to all results e.g. build, run_id.
+    :return: One result per request name, 'aggregated' for the totals.
+    """
+    results = []
+    with open(csv_path, "r", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            name = row.get("Name") or "aggregated"
+            content_size = _float(row.get("Average Content Size"))
+            rps = _float(row.get("Requests/s"))
+            results.append(BenchmarkResult(
+                "locust", f"{row.get('Type') or ''} {name}".strip().lower(),
+                throughput=rps * content_size / 1024 ** 2 if rps and content_size else None,
+                iops=rps, latency_mean=_ms(row.get("Average Response Time")),
+                latency_min=_ms(row.get("Min Response Time")),
+                latency_p50=_ms(row.get("50%") or row.get("Median Response Time")),
+                latency_p90=_ms(row.get("90%")), latency_p99=_ms(row.get("99%")),
+                latency_max=_ms(row.get("Max Response Time")),
+                error_count=int(_float(row.get("Failure Count")) or 0),
+                sample_count=int(_float(row.get("Request Count")) or 0),
+                object_size=int(content_size) if content_size else None, clients=clients,
+                **kwargs))
+    return results
+
+
+def parse_jmeter_statistics(json_path: str, clients: int = None,
+                            **kwargs) -> List[BenchmarkResult]:
+    """
+    :param json_path: statistics.json of the jmeter HTML report.
+    :param clients: Number of jmeter threads.
+    :param kwargs: BenchmarkResult fields common to all results e.g. build, run_id.
+    :return: One result per sampler label, 'total' for the totals.
+    """
+    with open(json_path, "r", encoding="utf-8") as json_file:
+        statistics = json.load(json_file)
+    results = []
+    for label, stats in statistics.items():
+        results.append(BenchmarkResult(
+            "jmeter", label.lower(), throughput=_kb(stats.get("receivedKBytesPerSec")),
+            iops=stats.get("throughput"), latency_mean=_ms(stats.get("meanResTime")),
+            latency_min=_ms(stats.get("minResTime")),
+            latency_p50=_ms(stats.get("medianResTime")),
+            latency_p90=_ms(stats.get("pct1ResTime")),
+            latency_p99=_ms(stats.get("pct3ResTime")),
+            latency_max=_ms(stats.get("maxResTime")),
+            error_count=int(stats.get("errorCount") or 0),
+            sample_count=int(stats.get("sampleCount") or 0), clients=clients, **kwargs))
+    return results
+
+
+def _float(value):
+    """Float of a number or numeric string, None if empty or 'N/A'."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ms(value):
+    """Seconds of a value in milliseconds."""
+    value = _float(value)
+    return value / 1000 if value is not None else None
+
+
+def _kb(value):
+    """MB of a value in KB."""
+    value = _float(value)
+    return value / 1024 if value is not None else None
+
+
+class BenchmarkStore:
+    """SQLite WAL backed store of benchmark results, one row per result."""
+
+    COLUMNS = [fld.name for fld in fields(BenchmarkResult)]
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, tool TEXT NOT NULL,"
+        " operation TEXT NOT NULL, throughput REAL, iops REAL, latency_mean REAL,"
+        " latency_min REAL, latency_p50 REAL, latency_p90 REAL, latency_p99 REAL,"
+        " latency_max REAL, error_count INTEGER, sample_count INTEGER, object_size INTEGER,"
+        " clients INTEGER, duration REAL, build TEXT, run_id TEXT, timestamp REAL,"
+        " extra TEXT)",
+        "CREATE INDEX IF NOT EXISTS results_build ON results (build, tool, operation)",
+    )
+
+    def __init__(self, db_path: str = None, timeout: float = 60) -> None:
+        """
+        :param db_path: Database file, params.BENCH_RESULTS_DB if None.
+        :param timeout: Seconds to wait for a lock held by another writer.
+        """
+        self.db_path = db_path or params.BENCH_RESULTS_DB
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connection() as conn:
+            for stmt in self.SCHEMA:
+                conn.execute(stmt)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return connection owned by current process and thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, results: Iterable[BenchmarkResult]) -> int:
+        """
+        :param results: Results to store.
+        :return: Number of results stored.
+        """
+        rows = []
+        for result in results:
+            row = asdict(result)
+            row["extra"] = json.dumps(row["extra"]) if row["extra"] else None
+            rows.append([row[col] for col in self.COLUMNS])
+        with self._connection() as conn:
+            conn.executemany(f"INSERT INTO results ({', '.join(self.COLUMNS)}) VALUES "
+                             f"({', '.join('?' * len(self.COLUMNS))})", rows)
+        LOGGER.debug("Stored %s benchmark results in %s", len(rows), self.db_path)
+        return len(rows)
+
+    def query(self, **filters) -> List[BenchmarkResult]:
+        """
+        :param filters: Column to value filters e.g. build="2.0.0-800", tool="s3bench".
+        :return: Matching results, oldest first.
+        """
+        unknown = set(filters) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}")
+        where = " AND ".join(f"{col} = ?" for col in filters) or "1"
+        rows = self._connection().execute(
+            f"SELECT * FROM results WHERE {where} ORDER BY timestamp, id",
+            list(filters.values())).fetchall()
+        return [self._to_result(row) for row in rows]
+
+    def builds(self, tool: str = None) -> List[str]:
+        """
+        :param tool: Only builds with results of tool.
+        :return: Builds in order of their first result.
+        """
+        sql = "SELECT build FROM results WHERE build IS NOT NULL"
+        args = []
+        if tool:
+            sql += " AND tool = ?"
+            args.append(tool)
+        sql += " GROUP BY build ORDER BY MIN(timestamp)"
+        return [row["build"] for row in self._connection().execute(sql, args)]
+
+    def _to_result(self, row: sqlite3.Row) -> BenchmarkResult:
+        """Convert a row to a result."""
+        values = {col: row[col] for col in self.COLUMNS}
+        values["extra"] = json.loads(values["extra"]) if values["extra"] else {}
+        return BenchmarkResult(**values)
+
+    def compare(self, baseline: str, candidate: str, threshold: float = 0.1,
+                **filters) -> List[dict]:
+        """
+        Compare results of candidate build with baseline build, see compare_results.
+        :param baseline: Baseline build.
+        :param candidate: Build to check.
+        :param threshold: Relative change of a metric flagged as regression.
+        :param filters: Further column filters e.g. tool="s3bench".
+        """
+        return compare_results(self.query(build=baseline, **filters),
+                               self.query(build=candidate, **filters), threshold)
+
+
+def compare_results(baseline: Iterable[BenchmarkResult], candidate: Iterable[BenchmarkResult],
+                    threshold: float = 0.1) -> List[dict]:
+    """
+    Compare metrics of the same workloads (tool, operation, object size, clients), repeated
+    runs of a workload are averaged.
+    :param baseline: Baseline results.
+    :param candidate: Results to check.
+    :param threshold: Relative change of a metric flagged as regression, any increase of
+        error_count is a regression.
+    :return: One dict per workload and metric with baseline, candidate, change (relative)
+        and regression keys.
+    """
+    base, cand = _average(baseline), _average(candidate)
+    report = []
+    for key in sorted(set(base) & set(cand), key=str):
+        for metric, higher_better in COMPARED_METRICS.items():
+            old, new = base[key].get(metric), cand[key].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            worse = -change if higher_better else change
+            regression = new > old if metric == "error_count" else worse > threshold
+            report.append({"tool": key[0], "operation": key[1], "object_size": key[2],
+                           "clients": key[3], "metric": metric, "baseline": old,
+                           "candidate": new, "change": change, "regression": regression})
+    regressions = [f"{row['tool']}/{row['operation']} {row['metric']}" for row in report
+                   if row["regression"]]
+    if regressions:
+        LOGGER.warning("Regressions: %s", regressions)
+    return report
+
+
+def _average(results: Iterable[BenchmarkResult]) -> Dict[tuple, dict]:
+    """Average compared metrics of results per workload."""
+    sums = {}
+    for result in results:
+        metrics = sums.setdefault(result.key(), {})
+        for metric in COMPARED_METRICS:
+            value = getattr(result, metric)
+            if value is not None:
+                total, count = metrics.get(metric, (0.0, 0))
+                metrics[metric] = (total + value, count + 1)
+    return {key: {metric: total / count for metric, (total, count) in metrics.items()}
+            for key, metrics in sums.items()}
@@ -282,6 +282,20 @@ class JiraTask:
                                     params=None)
         return response
 
+    def update_tests_jira_status(self, test_exe_id, tests):
+        """
+        Update status of several tests of a test execution in one xray import.
+        :param test_exe_id: Test execution id
+        :param tests: List of xray test dicts with testKey, status and start or finish
+        """
+        data = json.dumps({"testExecutionKey": test_exe_id, "tests": tests})
+        jira_url = self.jira_url + "/rest/raven/1.0/import/execution"
+        response = requests.request("POST", jira_url, data=data,
+                                    auth=(self.jira_id, self.jira_password),
+                                    headers=self.headers,
+                                    params=None)
+        return response
+
     def get_test_details(self, test_exe_id: str) -> list:
         """
         Get details of the test cases in a test execution ticket.
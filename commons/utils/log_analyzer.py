@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Streaming analyzers for tool logs and traces.
+
+Sources are consumed one line at a time, so a multi-GB file or the stdout of a remote
+command (see Host.stream_cmd) is analyzed in constant memory, and every line is
+case folded once for all patterns of a search.
+"""
+import os
+import re
+from typing import Dict
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+LineSource = Union[str, os.PathLike, IO, Iterable[Union[str, bytes]]]
+
+S3BENCH_ERRORS = ["with error ", "panic", "status code", "flag provided but not defined",
+                  "InternalError", "ServiceUnavailable"]
+HSBENCH_ERRORS = ["failed ", "panic", "status code", "does not exist", "InternalError",
+                  "send request failed"]
+
+
+def iter_lines(source: LineSource, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Yield lines of source one at a time.
+    :param source: File path, file object or iterable of str/bytes lines.
+    :param encoding: Encoding of the file or bytes lines, undecodable bytes are replaced.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding=encoding, errors="replace") as log_file:
+            yield from log_file
+        return
+    for line in source:
+        yield line.decode(encoding, "replace") if isinstance(line, bytes) else line
+
+
+class PatternSet:
+    """
+    Literal patterns searched together, the line is case folded once per search.
+    Small sets are matched with substring search, which beats a regular expression
+    alternation in CPython; larger sets are compiled into one regular expression.
+    """
+
+    REGEX_MIN_PATTERNS = 16
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = True) -> None:
+        """
+        :param patterns: Literal strings to search for.
+        :param ignore_case: Match case insensitively.
+        """
+        self.patterns = list(patterns)
+        self.ignore_case = ignore_case
+        self._lookup = {self._key(pattern): pattern for pattern in self.patterns}
+        self._keys = list(self._lookup)
+        self._regex = None
+        if len(self._keys) >= self.REGEX_MIN_PATTERNS:
+            # Longest first so that a pattern is not shadowed by its own prefix.
+            self._regex = re.compile("|".join(
+                re.escape(key) for key in sorted(self._keys, key=len, reverse=True)))
+
+    def _key(self, text: str) -> str:
+        """Case folded text if matching case insensitively."""
+        return text.lower() if self.ignore_case else text
+
+    def search(self, line: str) -> Optional[str]:
+        """
+        :param line: Text to search in.
+        :return: Pattern found in line, None if no pattern is found.
+        """
+        line = self._key(line)
+        if self._regex is not None:
+            match = self._regex.search(line)
+            return self._lookup[match.group(0)] if match else None
+        for key in self._keys:
+            if key in line:
+                return self._lookup[key]
+        return None
+
+    def find_first(self, source: LineSource) -> Optional[Tuple[str, str]]:
+        """
+        Stop reading source at the first line with a pattern.
+        :param source: Lines to search in.
+        :return: Tuple of pattern and line, None if no pattern is found.
+        """
+        for line in iter_lines(source):
+            pattern = self.search(line)
+            if pattern:
+                return pattern, line
+        return None
+
+    def count(self, source: LineSource) -> Dict[str, int]:
+        """
+        :param source: Lines to search in.
+        :return: Pattern to number of lines with the pattern dict.
+        """
+        counts = dict.fromkeys(self.patterns, 0)
+        for line in iter_lines(source):
+            pattern = self.search(line)
+            if pattern:
+                counts[pattern] += 1
+        return counts
+
+
+class S3BenchLogAnalyzer:
+    """Extracts errors, error counts and per operation statistics from s3bench output."""
+
+    SECTION = re.compile(r"Results Summary for (\w+) Operation")
+    STAT = re.compile(r"^\s*(Total Transferred|Total Throughput|Total Duration|Number of Errors)"
+                      r"\s*:\s*([\d.]+)")
+    LATENCY = re.compile(r"^\s*(\w+) times (Max|Min|\d+\w\w %ile)\s*:\s*([\d.]+)")
+    PARAMETER = re.compile(r"^\s*(objectSize|numClients|numSamples)\s*:\s*([\d.]+)\s*(\w*)")
+    ERRORS_COUNT = "Errors Count:"
+    SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+    def __init__(self, errors: Iterable[str] = None) -> None:
+        """
+        :param errors: Error strings, S3BENCH_ERRORS if None.
+        """
+        self.errors = PatternSet(errors or S3BENCH_ERRORS)
+
+    def analyze(self, source: LineSource, stop_on_error: bool = False) -> dict:
+        """
+        Analyze s3bench output in one pass.
+        :param source: Log file path or lines.
+        :param stop_on_error: Stop at the first error string.
+        :return: dict with first_error (pattern, line) or None, errors (pattern to count),
+            error_counts (values of 'Errors Count:' lines), parameters (numClients,
+            numSamples and objectSize in bytes of the test parameters) and operations
+            (operation name to throughput/duration/errors and latency percentiles in seconds).
+        """
+        summary = {"first_error": None, "errors": dict.fromkeys(self.errors.patterns, 0),
+                   "error_counts": [], "parameters": {}, "operations": {}}
+        operation = None
+        for line in iter_lines(source):
+            error = self.errors.search(line)
+            if error:
+                summary["errors"][error] += 1
+                if summary["first_error"] is None:
+                    summary["first_error"] = (error, line)
+                    if stop_on_error:
+                        break
+            if self.ERRORS_COUNT in line and "reportFormat" not in line:
+                summary["error_counts"].append(int(line.split(":")[1].strip()))
+                continue
+            match = self.SECTION.search(line)
+            if match:
+                operation = summary["operations"].setdefault(
+                    match.group(1), {"latency": {}})
+                continue
+            if operation is None:
+                match = self.PARAMETER.match(line)
+                if match:
+                    name, value, unit = match.groups()
+                    summary["parameters"][name] = (
+                        int(float(value) * self.SIZE_UNITS.get(unit.upper(), 1))
+                        if name == "objectSize" else int(value))
+                continue
+            match = self.STAT.match(line)
+            if match:
+                operation[match.group(1).lower().replace(" ", "_")] = float(match.group(2))
+                continue
+            match = self.LATENCY.match(line)
+            if match:
+                operation["latency"][match.group(2).replace(" %ile", "")] = float(match.group(3))
+        return summary
+
+    @staticmethod
+    def parse_report(text: str) -> dict:
+        """
+        :param text: s3bench console output.
+        :return: Key to value dict of its 'key: value' lines.
+        """
+        report = {}
+        for line in text.split("\n"):
+            if ":" in line:
+                fields = line.split(":")
+                report[fields[0]] = fields[1].strip()
+        return report
+
+
+class M0TraceAnalyzer:
+    """Extracts DATA/PARITY target FIDs of written blocks from m0trace output."""
+
+    IO_FOPS = PatternSet(["prepare io fops", "UTyp"], ignore_case=False)
+
+    @classmethod
+    def block_fids(cls, source: LineSource, filtered: bool = False) -> Dict[str, str]:
+        """
+        Map every [D]/[P] unit line to the latest target fid ('tfid') line before it not
+        taken by another unit line.
+        :param source: m0trace output lines.
+        :param filtered: Lines are already the second field of the 'prepare io fops' and
+            'UTyp' lines, e.g. output of commands.GREP_DP_BLOCK_FID.
+        :return: dict of DATA<n>/PARITY<n> to fid.
+        """
+        fids = {}
+        counts = {"DATA": 0, "PARITY": 0}
+        tfids = []
+        for line in iter_lines(source):
+            if not filtered:
+                if not cls.IO_FOPS.search(line):
+                    continue
+                fields = line.split(",")
+                line = fields[1] if len(fields) > 1 else line
+            if "tfid" in line:
+                tfids.append(line.strip().split(" ")[-1][1:-1])  # strip the <>
+            for marker, block in (("[P]", "PARITY"), ("[D]", "DATA")):
+                if marker in line and tfids:
+                    fids[f"{block}{counts[block]}"] = tfids.pop()
+                    counts[block] += 1
+        return fids
@@ -23,6 +23,7 @@ import hashlib
 import hmac
 import json
 import logging
+import mmap
 import os
 import time
 import urllib
@@ -31,6 +32,9 @@ from hashlib import sha256
 from random import randint
 from random import shuffle
 from typing import Any
+from typing import Iterator
+from typing import Tuple
+from typing import Union
 
 import xmltodict
 
@@ -93,12 +97,28 @@ def create_str_to_sign(http_method, canonical_uri, headers):
     return str_to_sign
 
 
-def create_canonical_request(method, canonical_uri, body, epoch_t, host):
-    """Create canonical request."""
-    canonical_query_string = ""
-    signed_headers = 'host;x-amz-date'
-    payload_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
-    canonical_headers = 'host:' + host + '\n' + 'x-amz-date:' + get_timestamp(epoch_t) + '\n'
+def get_signed_headers(headers=None) -> str:
+    """Get the SignedHeaders value for host, x-amz-date and extra headers."""
+    return ';'.join(sorted(['host', 'x-amz-date'] + list((headers or {}).keys())))
+
+
+def create_canonical_request(method, canonical_uri, body, epoch_t, host, **kwargs):
+    """
+    Create canonical request.
+
+    :keyword query: Canonical query string.
+    :keyword payload_hash: Payload hash e.g. UNSIGNED-PAYLOAD, else sha256 of body.
+    :keyword headers: Extra lower case headers to be signed e.g. x-amz-content-sha256.
+    """
+    canonical_query_string = kwargs.get("query", "")
+    headers = dict(kwargs.get("headers") or {})
+    signed_headers = get_signed_headers(headers)
+    payload_hash = kwargs.get("payload_hash")
+    if payload_hash is None:
+        body = body if isinstance(body, (bytes, bytearray, memoryview)) else body.encode('utf-8')
+        payload_hash = hashlib.sha256(body).hexdigest()
+    headers.update({'host': host, 'x-amz-date': get_timestamp(epoch_t)})
+    canonical_headers = ''.join(f'{name}:{headers[name]}\n' for name in sorted(headers))
     canonical_request = method + '\n' + canonical_uri + '\n' + canonical_query_string + '\n' + \
         canonical_headers + '\n' + signed_headers + '\n' + payload_hash
 
@@ -126,7 +146,9 @@ def create_string_to_sign_v4(method='', canonical_uri='', body='', epoch_t=None,
     region = kwargs.get("region", S3_CFG["region"])
     host = kwargs.get("host")
     algorithm = kwargs.get("algorithm", 'AWS4-HMAC-SHA256')
-    canonical_request = create_canonical_request(method, canonical_uri, body, epoch_t, host)
+    canonical_request = create_canonical_request(
+        method, canonical_uri, body, epoch_t, host, query=kwargs.get("query", ""),
+        payload_hash=kwargs.get("payload_hash"), headers=kwargs.get("headers"))
     credential_scope = get_date(epoch_t) + '/' + region + '/' + service + '/' + 'aws4_request'
     string_to_sign = algorithm + '\n' + get_timestamp(epoch_t) + '\n' + credential_scope \
         + '\n' + hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
@@ -139,8 +161,11 @@ def sign_request_v4(method=None, canonical_uri='/', body='', epoch_t=None, host=
     """
     Calculate aws authentication headers.
 
-    signed_headers = 'host;x-amz-date'
+    signed_headers = 'host;x-amz-date' and extra headers
     algorithm = 'AWS4-HMAC-SHA256'
+    :keyword query: Canonical query string.
+    :keyword payload_hash: Payload hash e.g. UNSIGNED-PAYLOAD, else sha256 of body.
+    :keyword headers: Extra lower case headers to be signed e.g. x-amz-content-sha256.
     """
     service = kwargs.get("service", "s3")
     region = kwargs.get("region", S3_CFG["region"])
@@ -149,11 +174,13 @@ def sign_request_v4(method=None, canonical_uri='/', body='', epoch_t=None, host=
     credential_scope = get_date(epoch_t) + '/' + region + '/' + service + '/' + 'aws4_request'
     string_to_sign = create_string_to_sign_v4(
         method, canonical_uri, body, epoch_t, algorithm='AWS4-HMAC-SHA256', host=host,
-        service=service, region=region)
+        service=service, region=region, query=kwargs.get("query", ""),
+        payload_hash=kwargs.get("payload_hash"), headers=kwargs.get("headers"))
     signing_key = get_v4_signature_key(secret_key, get_date(epoch_t), region, service)
     signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
     authorization_header = 'AWS4-HMAC-SHA256' + ' ' + 'Credential=' + access_key + '/' + \
-                           credential_scope + ', ' + 'SignedHeaders=' + 'host;x-amz-date' + \
+                           credential_scope + ', ' + 'SignedHeaders=' + \
+                           get_signed_headers(kwargs.get("headers")) + \
                            ', ' + 'Signature=' + signature
 
     return authorization_header
@@ -263,6 +290,134 @@ def get_multipart_etag(parts):
     return f'"{multipart_etag}"'
 
 
+def get_part_sizes(obj_size, total_parts=1, chunk_size=5242880, aligned=True) -> list:
+    """
+    Get part sizes in bytes to split an object of obj_size same as get_(un)aligned_parts.
+
+    :param obj_size: Object size in bytes.
+    :param total_parts: No. of parts to be uploaded.
+    :param chunk_size: Chunk size in bytes, part size is multiple of chunk size.
+    :param aligned: Aligned part sizes else chunk size is padded with random unaligned bytes.
+    :return: List of part sizes, last part could be smaller.
+    """
+    part_chunks = max(1, int(int(obj_size) / int(chunk_size)) // int(total_parts))
+    unaligned = [104857, 209715, 314572, 419430, 524288,
+                 629145, 734003, 838860, 943718, 1048576]
+    part_sizes = []
+    remaining = int(obj_size)
+    while remaining > 0:
+        pad = 0 if aligned else unaligned[randint(0, len(unaligned) - 1)]  # nosec
+        part_sizes.append(min(remaining, (chunk_size + pad) * part_chunks))
+        remaining -= part_sizes[-1]
+    return part_sizes
+
+
+def iter_buffer_parts(buf, part_size: Union[int, list],
+                      random=False) -> Iterator[Tuple[int, memoryview, str]]:
+    """
+    Lazily split a buffer into multipart upload parts without copying it.
+
+    :param buf: Any object supporting buffer protocol e.g. bytes, bytearray, mmap.
+    :param part_size: Part size in bytes or list of part sizes.
+    :param random: Yield parts in random order.
+    :return: Iterator of (part_number, memoryview, content_md5), a view is released once
+        next part is requested.
+    """
+    view = memoryview(buf).cast('B')
+    if isinstance(part_size, list):
+        part_sizes = part_size
+    else:
+        part_sizes = [part_size] * (len(view) // part_size)
+        if len(view) % part_size:
+            part_sizes.append(len(view) % part_size)
+    offsets = []
+    offset = 0
+    for size in part_sizes:
+        offsets.append(offset)
+        offset += size
+    part_numbers = list(range(1, len(part_sizes) + 1))
+    if random:
+        shuffle(part_numbers)
+    try:
+        for part_number in part_numbers:
+            start = offsets[part_number - 1]
+            part = view[start:start + part_sizes[part_number - 1]]
+            try:
+                yield part_number, part, calc_contentmd5(part)
+            finally:
+                part.release()
+    finally:
+        view.release()
+
+
+def iter_file_parts(file_path, part_size: Union[int, list],
+                    random=False) -> Iterator[Tuple[int, memoryview, str]]:
+    """
+    Lazily split a file into multipart upload parts using mmap.
+
+    Unlike get_aligned_parts/get_unaligned_parts whole file is never read in memory, pages
+    are faulted in as a part is consumed so any object size could be uploaded.
+    :param file_path: Path of object file.
+    :param part_size: Part size in bytes or list of part sizes, see get_part_sizes.
+    :param random: Yield parts in random order.
+    :return: Iterator of (part_number, memoryview, content_md5).
+    """
+    try:
+        with open(file_path, "rb") as fptr:
+            if not os.fstat(fptr.fileno()).st_size:
+                yield from iter_buffer_parts(b'', part_size, random)
+                return
+            with mmap.mmap(fptr.fileno(), 0, access=mmap.ACCESS_READ) as mem:
+                yield from iter_buffer_parts(mem, part_size, random)
+    except OSError as error:
+        LOGGER.error(str(error))
+        raise error from OSError
+
+
+class MultipartChecksum:
+    """
+    Running ETag and sha256 accumulator for multipart uploads.
+
+    Parts could be added in any order, etag() matches get_multipart_etag and
+    checksum(part_level=True) matches calc_checksum(file_path, part_size) for equal sized
+    parts. checksum() matches calc_checksum(file_path) and needs parts in ascending order.
+    """
+
+    def __init__(self):
+        self.md5_digests = {}
+        self.sha256_digests = {}
+        self.size = 0
+        self._object_sha256 = sha256()
+        self._in_order = True
+
+    def update(self, part_number: int, data) -> None:
+        """Add a part's data to running checksums."""
+        if self.md5_digests and part_number <= max(self.md5_digests):
+            self._in_order = False
+        self.md5_digests[part_number] = md5(data).digest()  # nosec - s3 ETag based on md5.
+        self.sha256_digests[part_number] = sha256(data).digest()
+        if self._in_order:
+            self._object_sha256.update(data)
+        self.size += len(data)
+
+    def etag(self) -> str:
+        """Expected ETag of completed multipart upload."""
+        md5_digests = [self.md5_digests[num] for num in sorted(self.md5_digests)]
+        multipart_etag = md5(b''.join(md5_digests)).hexdigest() + '-' + str(  # nosec
+            len(md5_digests))
+        return f'"{multipart_etag}"'
+
+    def checksum(self, part_level: bool = False) -> str:
+        """Checksum in calc_checksum format."""
+        if part_level:
+            hash_digests = [self.sha256_digests[num] for num in sorted(self.sha256_digests)]
+        else:
+            if not self._in_order:
+                raise ValueError("Object checksum needs parts to be added in ascending order")
+            hash_digests = [self._object_sha256.digest()]
+        return sha256(b''.join(hash_digests)).hexdigest() + '-' + str(len(hash_digests))
+
+
 def get_aligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False) -> dict:
     r"""
     Get aligned parts.
@@ -29,6 +29,7 @@ from commons.constants import COLLECTION_FILE
 from commons.constants import COLLECTION_SCRIPT_PATH
 from commons.constants import PROFILE_FILE
 from commons.constants import PROFILE_FILE_PATH
+from commons.helpers.fanout_helper import run_on_all
 from commons.helpers.pods_helper import LogicalNode
 
 # check and set pytest logging level as Globals.LOG_LEVEL
@@ -108,8 +109,12 @@ class TopStatsCollection:
         if not res:
             LOGGER.info("Process IDs of cmd %s is empty", cmd)
             return False
-        for pid in res:
-            self.master_node_list[0].execute_cmd(cmd=KILL_CMD.format(pid))
+        node = self.master_node_list[0]
+        results = run_on_all({pid: KILL_CMD.format(pid) for pid in res},
+                             lambda kill_cmd: node.execute_cmd(cmd=kill_cmd))
+        for result in results.values():
+            if not result.success:
+                raise result.error
         return True
 
     def copy_remove_files_from_remote(self, dir_path, local_path):
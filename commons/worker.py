@@ -18,10 +18,18 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 """Worker pool to perform similar tasks"""
+import bisect
+import heapq
 import logging
 import queue
 import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import InvalidStateError
 from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from threading import Thread
 from commons.constants import NWORKERS
 
@@ -84,3 +92,235 @@ class Workers(object):
         logger.info('Joining all threads to main thread')
         for i in range(len(self.w_workers)):
             self.w_workers[i].join()
+
+
+#: Upper bounds in seconds of latency histogram buckets, last bucket is unbounded.
+LATENCY_BUCKETS = tuple(0.001 * 2 ** i for i in range(18))
+
+
+class ExecutorStats:
+    """Thread safe counters and latency histogram of a BoundedExecutor."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.retried = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def incr(self, **counters) -> None:
+        """Add deltas to named counters."""
+        with self.lock:
+            for name, delta in counters.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def observe(self, latency: float) -> None:
+        """Add a task latency in seconds to histogram."""
+        with self.lock:
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def percentile(self, pct: float) -> float:
+        """Estimate latency percentile as upper bound of the histogram bucket."""
+        with self.lock:
+            total = sum(self.histogram)
+            if not total:
+                return 0.0
+            rank = pct / 100.0 * total
+            seen = 0
+            for i, count in enumerate(self.histogram):
+                seen += count
+                if seen >= rank:
+                    return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+    def as_dict(self) -> dict:
+        """Snapshot of all counters."""
+        with self.lock:
+            return dict(queued=self.queued, running=self.running, completed=self.completed,
+                        failed=self.failed, cancelled=self.cancelled,
+                        timed_out=self.timed_out, retried=self.retried,
+                        histogram=list(self.histogram))
+
+
+class BoundedExecutor:
+    """
+    A fixed size thread pool with bounded submission queue, futures and counters.
+    submit blocks once max_queued tasks are waiting, so producers can not run ahead of
+    the pool. Failed tasks are retried upto retries times if retry_hook allows it.
+    A task which does not finish within its timeout gets TimeoutError on its future, the
+    thread is not interrupted and its late result is dropped.
+    Setting stop_event stops picking queued tasks and cancels their futures.
+    Usage:
+    with BoundedExecutor(nworkers=8, stop_event=event) as executor:
+        futures = [executor.submit(func, item, timeout=60) for item in items]
+    print(executor.stats.as_dict())
+    """
+
+    def __init__(self,
+                 nworkers: int = NWORKERS,
+                 max_queued: int = None,
+                 stop_event: threading.Event = None,
+                 retries: int = 0,
+                 retry_hook: Callable[[BaseException, int], bool] = None,
+                 backoff: float = 0,
+                 name: str = 'executor') -> None:
+        """
+        :param nworkers: Number of worker threads.
+        :param max_queued: Max tasks waiting in queue, defaults to 2 * nworkers.
+        :param stop_event: Event to gracefully cancel queued tasks.
+        :param retries: Number of retries of a failed task.
+        :param retry_hook: Called with exception and attempt number, returns False to
+            stop retrying. Retries on all exceptions when not given.
+        :param backoff: Sleep of backoff * attempt seconds before a retry.
+        :param name: Prefix for worker thread names.
+        """
+        self.stop_event = stop_event if stop_event else threading.Event()
+        self.retries = retries
+        self.retry_hook = retry_hook
+        self.backoff = backoff
+        self.stats = ExecutorStats()
+        self._queue = queue.Queue(maxsize=max_queued or 2 * nworkers)
+        self._deadlines = []
+        self._deadline_cv = threading.Condition()
+        self._shutdown = False
+        self._workers = []
+        for i in range(nworkers):
+            thread = Thread(target=self._worker, name=f'{name}-{i}', daemon=True)
+            thread.start()
+            self._workers.append(thread)
+        self._watchdog = Thread(target=self._watch_deadlines, name=f'{name}-watchdog',
+                                daemon=True)
+        self._watchdog.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown(wait=True)
+
+    def submit(self, func: Callable, *args, timeout: float = None, **kwargs) -> Future:
+        """
+        Queue func(*args, **kwargs), blocks while queue is full.
+        :param timeout: Seconds from submit after which future fails with TimeoutError.
+        :return: Future, already cancelled if executor is stopped.
+        """
+        future = Future()
+        if self._shutdown or self.stop_event.is_set():
+            future.cancel()
+            self.stats.incr(cancelled=1)
+            return future
+        if timeout is not None:
+            with self._deadline_cv:
+                heapq.heappush(self._deadlines, (time.monotonic() + timeout, id(future), future))
+                self._deadline_cv.notify()
+        self.stats.incr(queued=1)
+        while True:
+            try:
+                self._queue.put((future, func, args, kwargs), timeout=0.5)
+                return future
+            except queue.Full:
+                if self.stop_event.is_set():
+                    self.stats.incr(queued=-1, cancelled=int(future.cancel()))
+                    return future
+
+    def map(self, func: Callable, iterable: Iterable, timeout: float = None) -> Iterator[Any]:
+        """Submit func for every item and yield results in order, raises task exception."""
+        futures = [self.submit(func, item, timeout=timeout) for item in iterable]
+        for future in futures:
+            yield future.result()
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """Stop accepting tasks and stop workers once queued tasks are done."""
+        if cancel_pending:
+            self.stop_event.set()
+        if not self._shutdown:
+            self._shutdown = True
+            for _ in self._workers:
+                self._queue.put(None)
+            with self._deadline_cv:
+                self._deadline_cv.notify()
+        if wait:
+            for thread in self._workers:
+                thread.join()
+            logger.info('shutdown all workers, stats %s', self.stats.as_dict())
+
+    def _run(self, future, func, args, kwargs):
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except BaseException as error:
+                attempt += 1
+                if attempt > self.retries or self.stop_event.is_set() or future.done() or (
+                        self.retry_hook and not self.retry_hook(error, attempt)):
+                    raise
+                self.stats.incr(retried=1)
+                logger.debug('Retrying %s attempt %s after %s', func, attempt, error)
+                if self.backoff:
+                    time.sleep(self.backoff * attempt)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, func, args, kwargs = item
+            self.stats.incr(queued=-1)
+            if self.stop_event.is_set():
+                if future.cancel():
+                    self.stats.incr(cancelled=1)
+                continue
+            with self._deadline_cv:
+                # A task timed out while queued is done and counted by the watchdog
+                if future.done() and not future.cancelled():
+                    continue
+                if not future.set_running_or_notify_cancel():
+                    self.stats.incr(cancelled=1)
+                    continue
+            self.stats.incr(running=1)
+            start = time.perf_counter()
+            try:
+                result = self._run(future, func, args, kwargs)
+            except BaseException as error:
+                self.stats.incr(running=-1, failed=1)
+                self._set(future, exception=error)
+            else:
+                self.stats.incr(running=-1, completed=1)
+                self._set(future, result=result)
+            self.stats.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _set(future, result=None, exception=None):
+        """Set outcome unless watchdog has already timed out the future."""
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            logger.debug('Dropped result of timed out task')
+
+    def _watch_deadlines(self):
+        with self._deadline_cv:
+            while not (self._shutdown and not self._deadlines):
+                if not self._deadlines:
+                    self._deadline_cv.wait()
+                    continue
+                deadline, _, future = self._deadlines[0]
+                now = time.monotonic()
+                if future.done():
+                    heapq.heappop(self._deadlines)
+                    continue
+                if deadline > now:
+                    self._deadline_cv.wait(deadline - now)
+                    continue
+                heapq.heappop(self._deadlines)
+                try:
+                    future.set_exception(TimeoutError('Task timed out'))
+                    self.stats.incr(timed_out=1)
+                except InvalidStateError:
+                    pass
@@ -21,6 +21,7 @@
 import ast
 import csv
 import datetime
+import functools
 import glob
 import json
 import logging
@@ -37,7 +38,6 @@ from threading import Thread
 from typing import List
 
 import pytest
-import requests
 from _pytest.main import Session
 from filelock import FileLock
 from strip_ansi import strip_ansi
@@ -46,6 +46,7 @@ from commons import Globals
 from commons import cortxlogging
 from commons import params
 from commons import report_client
+from commons import report_pipeline
 from commons import constants as const
 from commons.helpers.health_helper import Health
 from commons.utils import assert_utils
@@ -65,6 +66,7 @@ LOG_DIR = 'log'
 CACHE = LRUCache(1024 * 10)
 CACHE_JSON = 'nodes-cache.yaml'
 REPORT_CLIENT = None
+REPORT_PIPELINE = None
 DT_PATTERN = '%Y-%m-%d_%H:%M:%S'
 
 LOGGER = logging.getLogger(__name__)
@@ -285,7 +287,9 @@ def read_dist_test_list_csv() -> List:
 
 @pytest.hookimpl(trylast=True)
 def pytest_sessionfinish(session, exitstatus):
-    """Remove handlers from all loggers."""
+    """Flush pending reporting and remove handlers from all loggers."""
+    if REPORT_PIPELINE:
+        REPORT_PIPELINE.close(timeout=600)
     # todo add html hook file = session.config._htmlfile
     loggers = [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values())
     for _logger in loggers:
@@ -453,9 +457,20 @@ def pytest_sessionstart(session: Session) -> None:
     """
     # db_user, db_passwd = CMN_CFG.db_user, CMN_CFG.db_passwd
     # init_instance db_user=None, db_passwd=None
-    global REPORT_CLIENT
+    global REPORT_CLIENT, REPORT_PIPELINE
     report_client.ReportClient.init_instance()
     REPORT_CLIENT = report_client.ReportClient.get_instance()
+    if not session.config.option.local:
+        jira_factory = None
+        if Globals.JIRA_UPDATE:
+            # Credentials may be prompted for, so read them here and login in the worker.
+            jira_id, jira_pwd = get_jira_credential()
+            jira_factory = functools.partial(jira_utils.JiraTask, jira_id, jira_pwd)
+        REPORT_PIPELINE = report_pipeline.ReportPipeline(
+            jira_factory=jira_factory, report_client=REPORT_CLIENT,
+            spool_path=os.path.join(LOG_DIR, 'latest', report_pipeline.SPOOL_FILE))
+        if os.path.exists(REPORT_PIPELINE.spool_path):
+            REPORT_PIPELINE.requeue_spool(get_db_credential()[1])
     reset_imported_module_log_level(session)
 
 
@@ -589,19 +604,20 @@ def pytest_collection(session):
     return items
 
 
-# pylint: disable=too-many-arguments
-def db_and_jira_update(task, test_id, item, call, status, db_user, db_pass):
+def db_and_jira_update(test_id, item, call, status):
+    """Queue Jira status and report DB entry of a finished test."""
     try:
         jira_update = ast.literal_eval(str(item.config.option.jira_update))
         db_update = ast.literal_eval(str(item.config.option.db_update))
         if jira_update:
-            task.update_test_jira_status(item.config.option.te_tkt, test_id, status)
+            REPORT_PIPELINE.set_status(item.config.option.te_tkt, test_id, status)
         if db_update:
+            db_user, db_pass = get_db_credential()
             payload = create_report_payload(item, call, status, db_user, db_pass)
-            REPORT_CLIENT.create_db_entry(**payload)
-    except (requests.exceptions.RequestException, Exception) as fault:
+            REPORT_PIPELINE.add_db_entry(payload)
+    except Exception as fault:
         LOGGER.exception(str(fault))
-        LOGGER.error("Failed to execute DB update for %s", test_id)
+        LOGGER.error("Failed to queue DB update for %s", test_id)
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -636,7 +652,6 @@ def pytest_runtest_makereport(item, call):
     pass_file = 'passed_tests.log'
     current_file = 'other_test_calls.log'
     jira_update = ast.literal_eval(str(item.config.option.jira_update))
-    db_update = ast.literal_eval(str(item.config.option.db_update))
     test_id = CACHE.lookup(report.nodeid)
     if report.when == 'setup':
         Globals.CSM_LOGS = f"{LOG_DIR}/latest/{test_id}_Gui_Logs/"
@@ -647,14 +662,8 @@ def pytest_runtest_makereport(item, call):
         if report.when == 'setup' and item.rep_setup.failed:
             # Fail eagerly in Jira, when you know setup failed.
             # The status is again anyhow updated in teardown as it was earlier.
-            try:
-                if jira_update:
-                    jira_id, jira_pwd = get_jira_credential()
-                    task = jira_utils.JiraTask(jira_id, jira_pwd)
-                    task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-            except (requests.exceptions.RequestException, Exception) as fault:
-                LOGGER.exception(str(fault))
-                LOGGER.error("Failed to execute Jira update for %s", test_id)
+            if jira_update:
+                REPORT_PIPELINE.set_status(item.config.option.te_tkt, test_id, 'FAIL')
         elif report.when == 'teardown':
             try:
                 remote_path = os.path.join(params.NFS_BASE_DIR,
@@ -665,55 +674,17 @@ def pytest_runtest_makereport(item, call):
                                            )
                 setattr(report, "logpath", remote_path)
                 setattr(item, "logpath", remote_path)
-                if jira_update:
-                    db_user, db_pass = get_db_credential()
-                    jira_id, jira_pwd = get_jira_credential()
-                    task = jira_utils.JiraTask(jira_id, jira_pwd)
-
                 if item.rep_setup.failed or item.rep_teardown.failed:
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-                        if db_update:
-                            # capture exec info
-                            payload = create_report_payload(item, call, 'FAIL', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    db_and_jira_update(test_id, item, call, 'FAIL')
                 elif item.rep_setup.passed and (item.rep_call.failed or item.rep_teardown.failed):
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'FAIL', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    db_and_jira_update(test_id, item, call, 'FAIL')
                 elif item.rep_setup.passed and item.rep_call.passed and item.rep_teardown.passed:
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'PASS')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'PASS', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    db_and_jira_update(test_id, item, call, 'PASS')
                 elif item.rep_setup.skipped and \
                         (item.rep_teardown.skipped or item.rep_teardown.passed):
                     # Jira reporting of skipped cases does not contain skipped option
                     # Reporting it blocked and updating db.
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'BLOCKED')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'BLOCKED', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    db_and_jira_update(test_id, item, call, 'BLOCKED')
 
             except Exception as exception:
                 LOGGER.error("Exception %s occurred in reporting for test %s.",
@@ -749,7 +720,7 @@ def pytest_runtest_makereport(item, call):
 
 def upload_supporting_logs(test_id: str, remote_path: str, log: str):
     """
-    Upload all supporting (s3bench) log files to nfs share
+    Queue upload of all supporting (s3bench) log files to nfs share
     :param test_id: test number in file name
     :param remote_path: path on NFS share
     :param log: log file string e.g. s3bench
@@ -762,17 +733,7 @@ def upload_supporting_logs(test_id: str, remote_path: str, log: str):
         support_logs = glob.glob(f"{LOG_DIR}/latest/logs-cortx-cloud-*")
     LOGGER.debug("support logs is %s", support_logs)
     for support_log in support_logs:
-        resp = system_utils.mount_upload_to_server(host_dir=params.NFS_SERVER_DIR,
-                                                   mnt_dir=params.MOUNT_DIR,
-                                                   remote_path=remote_path,
-                                                   local_path=support_log)
-        if resp[0]:
-            LOGGER.info("Supporting log files are uploaded at location : %s", resp[1])
-            if os.path.isfile(support_log):
-                os.remove(support_log)
-                LOGGER.info("Removed the files from local path after uploading to NFS share")
-        else:
-            LOGGER.error("Failed to supporting log file at location %s", resp[1])
+        REPORT_PIPELINE.upload(support_log, remote_path, remove=True)
 
 
 def check_cortx_cluster_health():
@@ -898,9 +859,7 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
     if report.when == 'setup' and report.outcome == 'passed':
         # If you reach here and when you know setup passed.
         if Globals.JIRA_UPDATE:
-            jira_id, jira_pwd = get_jira_credential()
-            task = jira_utils.JiraTask(jira_id, jira_pwd)
-            task.update_test_jira_status(Globals.TE_TKT, test_id, 'Executing')
+            REPORT_PIPELINE.set_status(Globals.TE_TKT, test_id, 'Executing')
     elif report.when == 'call':
         pass
     elif report.when == 'teardown':
@@ -915,37 +874,15 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
         with open(test_log, 'w') as fp:
             for rec in logs:
                 fp.write(rec + '\n')
-        LOGGER.info("Uploading test log file to NFS server")
         remote_path = getattr(report, 'logpath').replace(":", "_")
-        resp = system_utils.mount_upload_to_server(host_dir=params.NFS_SERVER_DIR,
-                                                   mnt_dir=params.MOUNT_DIR,
-                                                   remote_path=remote_path,
-                                                   local_path=test_log)
-        if resp[0]:
-            LOGGER.info("Log file is uploaded at location : %s", resp[1])
-        else:
-            LOGGER.error("Failed to upload log file at location %s", resp[1])
-        upload_supporting_logs(test_id, remote_path, "s3bench")
-        upload_supporting_logs(test_id, remote_path, "")
-        upload_supporting_logs(test_id, remote_path, "csm_gui")
-        LOGGER.info("Adding log file path to %s", test_id)
-        comment = "Log file path: {}".format(os.path.join(resp[1], name))
+        comment = None
         if Globals.JIRA_UPDATE:
-            jira_id, jira_pwd = get_jira_credential()
-            task = jira_utils.JiraTask(jira_id, jira_pwd)
             try:
                 if Globals.tp_meta['te_meta']['te_id'] == Globals.TE_TKT:
                     test_run_id = next(d['test_run_id'] for i, d in enumerate(
                         Globals.tp_meta['test_meta']) if d['test_id'] ==
                                        test_id)
-                    resp = task.update_execution_details(
-                        test_run_id=test_run_id, test_id=test_id,
-                        comment=comment)
-                    if resp:
-                        LOGGER.info("Added execution details comment in: %s",
-                                    test_id)
-                    else:
-                        LOGGER.error("Failed to comment to %s", test_id)
+                    comment = {"test_run_id": test_run_id, "test_id": test_id}
                 else:
                     LOGGER.error("Failed to get correct TE id. \nExpected: "
                                  "%s\nActual: %s", Globals.TE_TKT,
@@ -953,6 +890,12 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
             except KeyError:
                 LOGGER.error("KeyError: Failed to add log file path to %s",
                              test_id)
+        LOGGER.info("Queueing upload of test log file to NFS server")
+        # The execution details comment with the log file path is added once uploaded.
+        REPORT_PIPELINE.upload(test_log, remote_path, comment=comment)
+        upload_supporting_logs(test_id, remote_path, "s3bench")
+        upload_supporting_logs(test_id, remote_path, "")
+        upload_supporting_logs(test_id, remote_path, "csm_gui")
 
 
 @pytest.fixture(scope='function')
@@ -21,6 +21,8 @@ Utility Class for target locking using DB
 # -*- coding: utf-8 -*-
 import os
 import json
+import threading
+import time
 from http import HTTPStatus
 import requests
 import logging
@@ -30,6 +32,13 @@ from commons import constants as common_cnst
 
 LOGGER = logging.getLogger(__name__)
 
+# Seconds a lock is kept without heartbeat, heartbeats are sent every third of it
+LOCK_LEASE = 300
+# Seconds of one acquire long poll on the server
+LOCK_WAIT = 60
+# Max seconds between retries of failed acquire requests
+MAX_RETRY_DELAY = 60
+
 
 class LockingServer:
     """
@@ -305,3 +314,79 @@ class LockingServer:
                 LOGGER.exception(str(fault))
                 LOGGER.error("Failed to do patch request on db")
             return lock_released
+
+    def _lock_request(self, endpoint, payload, timeout=None):
+        """
+            POST payload to a lock endpoint, None if the request failed
+        """
+        payload.update(
+            {"db_username": self.db_username,
+             "db_password": self.db_password})
+        try:
+            return requests.request("POST", self.host + self.db_collection + "lock/" + endpoint,
+                                    headers=self.headers, data=json.dumps(payload),
+                                    timeout=timeout)
+        except requests.exceptions.RequestException as fault:
+            LOGGER.exception(str(fault))
+            LOGGER.error("Failed to do lock/%s request on db", endpoint)
+        return None
+
+    def acquire(self, target_list, client, lock_type, lease=LOCK_LEASE):
+        """
+            Block until client holds a lock on one of the targets.
+            Waits in long polls on the server, which serves waiters of the same targets in
+            arrival order and wakes them up on release. A shared lock joins a target in
+            parallel use before taking a free one.
+            :return: Locked target
+        """
+        delay = 1
+        while True:
+            response = self._lock_request(
+                "acquire", {"client": client, "targets": list(target_list),
+                            "lock_type": lock_type, "lease": lease, "timeout": LOCK_WAIT},
+                timeout=LOCK_WAIT + 30)
+            if response is not None and response.status_code == HTTPStatus.OK:
+                return response.json()["result"]["target"]
+            if response is not None and response.status_code == HTTPStatus.NO_CONTENT:
+                delay = 1
+                continue
+            if response is not None:
+                LOGGER.error("Failed to acquire lock on %s: %s %s", target_list,
+                             response.status_code, response.text)
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def heartbeat(self, target_name, client, lease=LOCK_LEASE):
+        """
+            Renew lease of client on target
+            :return: False if client has no lock on target anymore
+        """
+        response = self._lock_request("heartbeat", {"target": target_name, "client": client,
+                                                    "lease": lease}, timeout=30)
+        if response is not None and response.status_code == HTTPStatus.NOT_FOUND:
+            LOGGER.error("Lock of %s on %s is lost", client, target_name)
+            return False
+        return True
+
+    def start_heartbeat(self, target_name, client, lease=LOCK_LEASE):
+        """
+            Renew lease of client on target in a background thread until the returned
+            event is set or the lock is lost.
+        """
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(lease / 3):
+                if not self.heartbeat(target_name, client, lease):
+                    return
+
+        threading.Thread(target=renew, name="lock-heartbeat", daemon=True).start()
+        return stop
+
+    def release_target(self, target_name, client):
+        """
+            Release lock of client on target taken with acquire
+        """
+        response = self._lock_request("release", {"target": target_name, "client": client},
+                                      timeout=30)
+        return response is not None and response.status_code == HTTPStatus.OK
@@ -23,12 +23,12 @@ import getpass
 import json
 import os
 import pathlib
-import secrets
 import threading
+import time
 import random
 import uuid
 import logging
-from collections import deque
+from collections import OrderedDict
 from typing import Tuple
 from typing import Optional
 from typing import Any
@@ -184,80 +184,126 @@ def stop_parallel_io(io_thread, stop):
 
 class LRUCache:
     """
-    In memory cache for storing test id and test node information
+    In memory cache for storing test id and test node information.
+    Lookups refresh recency and the least recently used entry is evicted when the
+    cache is full. Entries older than ttl seconds are treated as missing.
     """
 
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int, ttl: float = None) -> None:
+        """
+        :param size: Maximum number of entries.
+        :param ttl: Optional time to live of an entry in seconds.
+        """
         self.maxsize = size
-        self.fifo = deque()
-        self.table = dict()
+        self.ttl = ttl
+        self.table = OrderedDict()
+        self.expiry = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
         self._lock = threading.Lock()
 
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _add(self, key: str) -> None:
+        """Hook called with the lock held when a new key is added."""
+
+    def _remove(self, key: str) -> Any:
+        """Remove key with the lock held and return its value."""
+        self.expiry.pop(key, None)
+        return self.table.pop(key)
+
+    def _expired(self, key: str) -> bool:
+        """Remove key with the lock held if its ttl is over."""
+        if self.ttl is None or self.expiry[key] > time.monotonic():
+            return False
+        self._remove(key)
+        self.expirations += 1
+        return True
+
     def store(self, key: str, value: str) -> None:
         """
-        Stores the key and value and evicts left most old entry.
+        Stores the key and value and evicts least recently used entry.
         :param key:
         :param value:
         """
-        self._lock.acquire()
-        if key not in self.table:
-            self.fifo.append(key)
-        self.table[key] = value
-
-        if len(self.fifo) > self.maxsize:
-            del_key = self.fifo.popleft()
-            try:
-                del self.table[del_key]
-            except KeyError as ke:
-                pass
-        self._lock.release()
+        with self._lock:
+            if key in self.table:
+                self.table.move_to_end(key)
+            else:
+                self._add(key)
+            self.table[key] = value
+            if self.ttl is not None:
+                self.expiry[key] = time.monotonic() + self.ttl
+            while len(self.table) > self.maxsize:
+                self._remove(next(iter(self.table)))
+                self.evictions += 1
 
     def lookup(self, key: str) -> str:
         """
         Lookup cache for key.
         :param key:
         :return: val of entry
+        :raises KeyError: if key is not cached or expired
         """
-        self._lock.acquire()
-        try:
-            val = self.table[key]
-        finally:
-            self._lock.release()
-        return val
+        with self._lock:
+            if key not in self.table or self._expired(key):
+                self.misses += 1
+                raise KeyError(key)
+            self.table.move_to_end(key)
+            self.hits += 1
+            return self.table[key]
 
     def delete(self, key: str) -> None:
         """
-        Removes the table entry. The fifo list entry is removed whenever we
-        cache is full.
+        Removes the table entry.
         """
-        self._lock.acquire()
-        try:
-            del self.table[key]
-        except KeyError as ke:
-            pass
-        try:
-            self.fifo.remove(key)
-        except ValueError as ve:
-            pass
-        finally:
-            self._lock.release()
+        with self._lock:
+            if key in self.table:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """
+        :return: size, hit, miss, eviction and expiration counters
+        """
+        with self._lock:
+            return {"size": len(self.table), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expirations": self.expirations}
 
 
 class InMemoryDB(LRUCache):
-    """In memory storage"""
+    """
+    In memory storage.
+    Keys are also kept in an array with a key to position index so that a random
+    entry is picked and removed in O(1) by swapping it with the last element.
+    """
+
+    def __init__(self, size: int, ttl: float = None) -> None:
+        super().__init__(size, ttl)
+        self.keys = list()
+        self.index = dict()
+
+    def _add(self, key: str) -> None:
+        self.index[key] = len(self.keys)
+        self.keys.append(key)
+
+    def _remove(self, key: str) -> Any:
+        pos = self.index.pop(key)
+        last = self.keys.pop()
+        if last != key:
+            self.keys[pos] = last
+            self.index[last] = pos
+        return super()._remove(key)
 
     def pop_one(self) -> tuple:
         """
         Pop one table entry randomly.
         """
-        self._lock.acquire()
-        keys = list(self.table.keys())
-        if len(keys) == 0:
-            self._lock.release()
+        with self._lock:
+            while self.keys:
+                key = self.keys[random.randrange(len(self.keys))]  # nosec
+                if not self._expired(key):
+                    return key, self._remove(key)
             return False, False
-        key = secrets.choice(keys)
-        try:
-            val = self.table.pop(key)
-        finally:
-            self._lock.release()
-        return key, val
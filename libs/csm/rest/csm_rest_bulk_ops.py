@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Bulk create/read/list/update/delete of CSM users, S3 accounts and IAM users over REST.
+
+Requests go through the pooled RestClient session from a bounded worker pool, optionally
+paced to a request rate. Every operation reports latency percentiles/histogram and error
+classes. With a journal file, completed entities are recorded and skipped when the same
+run is resumed; create of an existing entity (409) and delete of a missing one (404) are
+treated as done so reruns are idempotent.
+"""
+import json
+import os
+import threading
+import time
+from http import HTTPStatus
+
+from commons.constants import Rest as const
+from commons.constants import S3_ENGINE_RGW
+from commons.worker import BoundedExecutor
+from commons.worker import ExecutorStats
+from commons.worker import LATENCY_BUCKETS
+from config import CMN_CFG
+from libs.csm.rest.csm_rest_core_lib import TOKEN_CACHE
+from libs.csm.rest.csm_rest_test_lib import RestTestLib
+
+BULK_OPS = ("create", "read", "list", "update", "delete")
+
+
+class RateLimiter:
+    """Paces callers to at most rate acquisitions per second across threads."""
+
+    def __init__(self, rate):
+        """
+        :param rate: acquisitions per second, no limit if None or 0
+        """
+        self.interval = 1.0 / rate if rate else 0
+        self.next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may issue the next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_time)
+            self.next_time = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BulkJournal:
+    """Append only JSON lines record of entities done per entity type and operation."""
+
+    def __init__(self, path):
+        """
+        :param path: journal file path, appended to if it exists
+        """
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as journal:
+                for line in journal:
+                    entry = json.loads(line)
+                    self.done.add((entry["entity"], entry["op"], entry["name"]))
+        self._file = open(path, "a")
+
+    def is_done(self, entity, op, name):
+        """Check if op on name was completed by an earlier run."""
+        return (entity, op, name) in self.done
+
+    def record(self, entity, op, name):
+        """Record op on name as completed."""
+        with self._lock:
+            self.done.add((entity, op, name))
+            self._file.write(json.dumps({"entity": entity, "op": op, "name": name}) + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Close journal file."""
+        self._file.close()
+
+
+class OpReport:
+    """Counters, error classes and latencies of one bulk operation."""
+
+    def __init__(self, entity, op):
+        self.entity = entity
+        self.op = op
+        self.stats = ExecutorStats()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors = dict()
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.responses = dict()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, name, latency, error=None, body=None):
+        """
+        Account one request.
+        :param name: entity name
+        :param latency: request latency in seconds
+        :param error: error class if the request failed
+        :param body: parsed response kept for the caller
+        """
+        self.stats.observe(latency)
+        with self._lock:
+            self.latency_sum += latency
+            self.latency_max = max(self.latency_max, latency)
+            if error:
+                self.failed += 1
+                self.errors[error] = self.errors.get(error, 0) + 1
+            else:
+                self.ok += 1
+                if body is not None:
+                    self.responses[name] = body
+
+    def as_dict(self):
+        """
+        :return: report of the operation
+        """
+        count = self.ok + self.failed
+        return {"entity": self.entity, "op": self.op, "count": count, "ok": self.ok,
+                "failed": self.failed, "skipped": self.skipped, "errors": dict(self.errors),
+                "duration": self.duration,
+                "ops_per_sec": count / self.duration if self.duration else 0.0,
+                "latency": {"mean": self.latency_sum / count if count else 0.0,
+                            "p50": self.stats.percentile(50),
+                            "p90": self.stats.percentile(90),
+                            "p99": self.stats.percentile(99),
+                            "max": self.latency_max},
+                "histogram": dict(zip([*LATENCY_BUCKETS, float("inf")],
+                                      self.stats.histogram))}
+
+
+class RestBulkOps(RestTestLib):
+    """Bulk CRUD engine for CSM users, S3 accounts and IAM users."""
+
+    def _entity(self, entity, password=None):
+        """
+        REST description of an entity type.
+        :param entity: csm_user, s3_account or iam_user
+        :param password: password of created S3 accounts/CSM users, config default if None
+        :return: dict with endpoints and payload builders
+        """
+        iam_endpoint = self.config["s3_iam_user_endpoint"]
+        iam = {"endpoint": iam_endpoint,
+               "list_endpoint": self.config.get("iam_users_endpoint", iam_endpoint),
+               "create": lambda name: {"uid": name, "display_name": name},
+               "update": lambda name: {"display_name": f"{name}-updated"}}
+        if entity == "iam_user" or (entity == "s3_account"
+                                    and CMN_CFG.get("s3_engine") == S3_ENGINE_RGW):
+            return iam
+        if entity == "s3_account":
+            endpoint = self.config["s3accounts_endpoint"]
+            password = password or self.config["test_s3account_password"]
+            return {"endpoint": endpoint, "list_endpoint": endpoint,
+                    "create": lambda name: {"account_name": name,
+                                            "account_email": f"{name}@seagate.com",
+                                            "password": password},
+                    "update": lambda name: {"password": password,
+                                            "reset_access_key": "false"}}
+        if entity == "csm_user":
+            endpoint = self.config["csmuser_endpoint"]
+            password = password or self.config["test_csmuser_password"]
+            return {"endpoint": endpoint, "list_endpoint": endpoint,
+                    "create": lambda name: {"username": name,
+                                            "password": password,
+                                            "role": "monitor",
+                                            "email": f"{name}@seagate.com",
+                                            "alert_notification": "true"},
+                    "update": lambda name: {"email": f"{name}.updated@seagate.com"}}
+        raise ValueError(f"Unsupported entity {entity}")
+
+    def _auth_headers(self, login_as, refresh=False):
+        """
+        Authorization header of login_as, reused from the token cache.
+        :param login_as: config key of the user or dict with username and password
+        :param refresh: drop the cached token and login again
+        :return: headers dict
+        """
+        key = self.login_cache_key(login_as)
+        if refresh:
+            TOKEN_CACHE.invalidate(key=key)
+        token = TOKEN_CACHE.get(key)
+        if token is None:
+            response = self.rest_login(login_as=login_as)
+            if response.status_code != const.SUCCESS_STATUS:
+                raise RuntimeError(f"Login as {login_as} failed: {response.status_code}")
+            token = response.headers["Authorization"]
+            TOKEN_CACHE.put(key, token, self.config.get("token_ttl"))
+        return {"Authorization": token}
+
+    def _request(self, spec, op, name):
+        """
+        Issue the REST request of op on name.
+        :return: response
+        """
+        endpoint = f"{spec['endpoint']}/{name}"
+        if op == "create":
+            return self.restapi.rest_call("post", endpoint=spec["endpoint"],
+                                          json_dict=spec["create"](name), headers=self.headers)
+        if op == "read":
+            return self.restapi.rest_call("get", endpoint=endpoint, headers=self.headers)
+        if op == "list":
+            return self.restapi.rest_call("get", endpoint=spec["list_endpoint"],
+                                          headers=self.headers)
+        if op == "update":
+            return self.restapi.rest_call("patch", endpoint=endpoint,
+                                          json_dict=spec["update"](name), headers=self.headers)
+        return self.restapi.rest_call("delete", endpoint=endpoint, headers=self.headers)
+
+    @staticmethod
+    def _classify(op, response):
+        """
+        :return: None if response means op is done, otherwise the error class
+        """
+        code = response.status_code
+        if code < 300 or (op == "create" and code == HTTPStatus.CONFLICT) or (
+                op == "delete" and code == HTTPStatus.NOT_FOUND):
+            return None
+        return f"HTTP {code}"
+
+    # pylint: disable=too-many-arguments
+    def run(self, entity, op, names, concurrency=16, rate=None, journal=None,
+            login_as="csm_admin_user", keep_responses=False, password=None):
+        """
+        Run op on every entity of names concurrently.
+        :param entity: csm_user, s3_account or iam_user
+        :param op: create, read, list, update or delete
+        :param names: entity names
+        :param concurrency: max requests in flight
+        :param rate: max requests per second, unlimited if None
+        :param journal: BulkJournal to skip and record completed entities
+        :param login_as: user performing the operations
+        :param keep_responses: keep parsed response body of successful requests, entities
+            done by an earlier run (409 on create, 404 on delete) have none
+        :param password: password of created S3 accounts/CSM users, config default if None
+        :return: OpReport
+        """
+        if op not in BULK_OPS:
+            raise ValueError(f"Unsupported operation {op}")
+        spec = self._entity(entity, password)
+        report = OpReport(entity, op)
+        limiter = RateLimiter(rate)
+        auth_lock = threading.Lock()
+        self.headers = self._auth_headers(login_as)
+
+        def call(name):
+            limiter.acquire()
+            start = time.perf_counter()
+            try:
+                headers = self.headers
+                response = self._request(spec, op, name)
+                if response.status_code == const.UNAUTHORIZED:
+                    with auth_lock:
+                        if self.headers is headers:
+                            self.headers = self._auth_headers(login_as, refresh=True)
+                    response = self._request(spec, op, name)
+                error = self._classify(op, response)
+            except Exception as exc:
+                report.add(name, time.perf_counter() - start, type(exc).__name__)
+                return
+            body = None
+            # A 409/404 body describes the error, not the entity
+            if keep_responses and response.status_code < 300 and response.content:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = response.text
+            report.add(name, time.perf_counter() - start, error, body)
+            if journal and not error:
+                journal.record(entity, op, name)
+
+        executor = BoundedExecutor(nworkers=concurrency, name=f"bulk-{op}")
+        try:
+            for name in names:
+                if journal and journal.is_done(entity, op, name):
+                    report.skipped += 1
+                    continue
+                executor.submit(call, name)
+        finally:
+            executor.shutdown(wait=True)
+        report.duration = time.perf_counter() - report.start
+        self.log.info("Bulk %s of %s: %s", op, entity,
+                      {k: v for k, v in report.as_dict().items() if k != "histogram"})
+        return report
+
+    # pylint: disable=too-many-arguments
+    def bulk_crud(self, entity, count, prefix=None, ops=("create", "read", "update", "delete"),
+                  concurrency=16, rate=None, journal_path=None, **kwargs):
+        """
+        Run ops in sequence on count entities named prefix0..prefix<count-1>.
+        Give the same prefix and journal_path to resume an interrupted run.
+        :param entity: csm_user, s3_account or iam_user
+        :param count: number of entities
+        :param prefix: entity name prefix, defaults to a time stamped one
+        :param ops: operations to run in order
+        :param concurrency: max requests in flight
+        :param rate: max requests per second, unlimited if None
+        :param journal_path: journal file for idempotent resume
+        :param kwargs: keyword arguments for run
+        :return: dict of op to report dict
+        """
+        prefix = prefix or f"bulk{entity.replace('_', '')}{int(time.time())}"
+        names = [f"{prefix}{i}" for i in range(count)]
+        journal = BulkJournal(journal_path) if journal_path else None
+        try:
+            return {op: self.run(entity, op, names, concurrency=concurrency, rate=rate,
+                                 journal=journal, **kwargs).as_dict()
+                    for op in ops}
+        finally:
+            if journal:
+                journal.close()
@@ -21,12 +21,108 @@
 
 import json
 import logging
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
 import requests
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from requests.packages.urllib3.util.retry import Retry
 from commons import constants
 from commons.constants import Rest as const
 from config import CMN_CFG
 
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(base_url, pool_size=const.SESSION_POOL_SIZE, retries=const.SESSION_RETRIES,
+                backoff=const.SESSION_BACKOFF):
+    """
+    Get the keep-alive session shared by all clients of base_url.
+    Connection errors and 502/503/504 responses of idempotent requests are retried with
+    exponential backoff.
+    :param base_url: scheme, host and port of the server
+    :param pool_size: max connections kept open to the server
+    :param retries: number of retries
+    :param backoff: backoff factor in seconds
+    :return: requests.Session
+    """
+    key = (base_url, pool_size, retries, backoff)
+    with _SESSIONS_LOCK:
+        if key not in _SESSIONS:
+            session = requests.Session()
+            # Clients of different users share the session, never carry cookies across them
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            retry = Retry(total=retries, backoff_factor=backoff,
+                          status_forcelist=(502, 503, 504), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+            session.mount(base_url, adapter)
+            _SESSIONS[key] = session
+        return _SESSIONS[key]
+
+
+class TokenCache:
+    """
+    Authorization headers of logged in users, reused until ttl expires or the server
+    rejects them with 401.
+    """
+
+    def __init__(self, ttl=const.TOKEN_TTL):
+        """
+        :param ttl: seconds a token is reused after login
+        """
+        self.ttl = ttl
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        :param key: login key, e.g. (base url, username, password)
+        :return: cached Authorization header value or None
+        """
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._tokens.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, token, ttl=None):
+        """
+        :param key: login key
+        :param token: Authorization header value
+        :param ttl: seconds to keep the token, defaults to cache ttl
+        """
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def invalidate(self, key=None, token=None):
+        """
+        Drop cached token of key, or every entry holding token (e.g. after logout).
+        :param key: login key
+        :param token: Authorization header value
+        """
+        with self._lock:
+            if key is not None:
+                self._tokens.pop(key, None)
+            if token is not None:
+                for cached_key in [k for k, v in self._tokens.items() if v[0] == token]:
+                    del self._tokens[cached_key]
+
+    def clear(self):
+        """Drop all cached tokens."""
+        with self._lock:
+            self._tokens.clear()
+
+
+TOKEN_CACHE = TokenCache()
+
+
 class RestClient:
     """
         This is the class for rest calls
@@ -40,14 +136,20 @@ class RestClient:
         requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
         self.log = logging.getLogger(__name__)
         self._config = config
-        self._request = {"get": requests.get, "post": requests.post,
-                         "patch": requests.patch, "delete": requests.delete,
-                         "put": requests.put}
         self._base_url = "{}:{}".format(
             self._config["mgmt_vip"], str(self._config["port"]))
         self._json_file_path = self._config[
             "jsonfile"] if 'jsonfile' in self._config else const.JOSN_FILE
         self.secure_connection = self._config["secure"]
+        set_secure = const.SSL_CERTIFIED if self.secure_connection else const.NON_SSL
+        self.session = get_session(
+            set_secure + self._base_url,
+            pool_size=self._config.get("pool_size", const.SESSION_POOL_SIZE),
+            retries=self._config.get("max_retries", const.SESSION_RETRIES),
+            backoff=self._config.get("backoff_factor", const.SESSION_BACKOFF))
+        self._request = {"get": self.session.get, "post": self.session.post,
+                         "patch": self.session.patch, "delete": self.session.delete,
+                         "put": self.session.put}
 
     # pylint: disable=too-many-arguments
     def rest_call(self, request_type, endpoint=None,
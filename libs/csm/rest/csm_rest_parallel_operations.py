@@ -23,11 +23,12 @@ from commons.constants import Rest as rest_const
 from commons.commands import GET_MAX_USERS
 from commons.commands import GET_REQUEST_USAGE
 from libs.jmeter.jmeter_integration import JmeterInt
+from libs.csm.rest.csm_rest_bulk_ops import RestBulkOps
 from libs.csm.rest.csm_rest_test_lib import RestTestLib
 
 
 # pylint: disable-msg=unexpected-keyword-arg
-class RestParallelOps(RestTestLib):
+class RestParallelOps(RestBulkOps):
     """RestIamUser contains all the Rest API calls for iam user operations"""
 
     def __init__(self):
@@ -230,6 +231,32 @@ class RestParallelOps(RestTestLib):
         result = self.execute_max_user_loop(jmx_file, users, request_limit, ops = "delete")
         return result
 
+    def bulk_csm_users(self, users: int, ops=("create", "delete"), **kwargs):
+        """
+        Create/read/update/delete CSM users natively, without jmeter, using the CSM
+        request usage limit as concurrency.
+        :param users: Number of users
+        :param ops: Operations to be run in order
+        :param kwargs: Keyword arguments for RestBulkOps.bulk_crud
+        :return: dict of operation to report
+        """
+        kwargs.setdefault("concurrency", self.get_request_usage_limit())
+        return self.bulk_crud("csm_user", users, prefix=kwargs.pop("prefix", "newmanageuser"),
+                              ops=ops, **kwargs)
+
+    def bulk_iam_users(self, users: int, ops=("create", "delete"), **kwargs):
+        """
+        Create/read/update/delete IAM users natively, without jmeter, using the CSM
+        request usage limit as concurrency.
+        :param users: Number of users
+        :param ops: Operations to be run in order
+        :param kwargs: Keyword arguments for RestBulkOps.bulk_crud
+        :return: dict of operation to report
+        """
+        kwargs.setdefault("concurrency", self.get_request_usage_limit())
+        return self.bulk_crud("iam_user", users, prefix=kwargs.pop("prefix", "newiamuser_"),
+                              ops=ops, **kwargs)
+
     def write_users_to_delete_csv(self, users:int):
         """
         Creates a csv with list of users to be deleted
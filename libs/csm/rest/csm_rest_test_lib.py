@@ -30,6 +30,7 @@ from commons.exceptions import CTException
 from config import CSM_REST_CFG
 from config import CMN_CFG
 from libs.csm.rest.csm_rest_core_lib import RestClient
+from libs.csm.rest.csm_rest_core_lib import TOKEN_CACHE
 
 
 class RestTestLib:
@@ -200,11 +201,22 @@ class RestTestLib:
             login_type = kwargs.pop("login_as") if "login_as" in kwargs else "csm_admin_user"
             # Checking the requirements to authorize
             authorized = kwargs.pop("authorized") if "authorized" in kwargs else True
+            login_key = self.login_cache_key(login_type)
+            token = TOKEN_CACHE.get(login_key) if authorized else None
+            if token:
+                self.headers = {'Authorization': token}
+                result = func(self, *args, **kwargs)
+                if getattr(result, "status_code", None) != const.UNAUTHORIZED:
+                    return result
+                self.log.debug("Cached token of %s is rejected, logging in again", login_type)
+                TOKEN_CACHE.invalidate(key=login_key)
             # Fetching the login response
             self.log.debug("user will be logged in as %s", login_type)
             response = self.rest_login(login_as=login_type)
             if authorized and response.status_code == const.SUCCESS_STATUS:
                 self.headers = {'Authorization': response.headers['Authorization']}
+                TOKEN_CACHE.put(login_key, response.headers['Authorization'],
+                                self.config.get("token_ttl"))
             else:
                 self.log.error("Authentication request failed in %s.\nResponse code : %s",
                                RestTestLib.authenticate_and_login.__name__, response.status_code)
@@ -216,6 +228,15 @@ class RestTestLib:
 
         return create_authenticate_header
 
+    def login_cache_key(self, login_as):
+        """
+        Key of the token cache for login_as, changes when the user password is updated.
+        :param login_as: config key of the user or dict with username and password
+        :return: tuple
+        """
+        user = login_as if isinstance(login_as, dict) else self.config.get(login_as, {})
+        return (self.config.get("mgmt_vip"), user.get("username"), user.get("password"))
+
     @staticmethod
     def rest_logout(func):
         """
@@ -236,6 +257,7 @@ class RestTestLib:
             # logout session.
             resp = self.restapi.rest_call(
                 "post", endpoint=self.config["rest_logout_endpoint"], headers=self.headers)
+            TOKEN_CACHE.invalidate(token=self.headers.get("Authorization"))
             if resp.status_code != const.SUCCESS_STATUS:
                 raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
             return response
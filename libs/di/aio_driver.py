@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""asyncio based S3 I/O driver for DI workloads.
+Runs upload, download-verify and delete mixes for thousands of virtual clients on a single
+event loop per process instead of a process per user and a thread per request.
+Requests are signed with s3_utils.sign_request_v4 and sent with aiohttp.
+"""
+import os
+import csv
+import ssl
+import sys
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import logging
+import datetime
+import threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from urllib.parse import quote
+from urllib.parse import urlparse
+from config import CMN_CFG
+from config import S3_CFG
+from commons import params
+from commons.utils import config_utils
+from commons.utils import s3_utils
+from libs.di import data_man
+from libs.di import data_generator
+from libs.di.downloader import percentile
+
+try:
+    import aiohttp
+    from yarl import URL
+except ModuleNotFoundError as error:
+    logging.error(error)
+
+try:
+    if sys.platform in ['linux', 'linux2']:
+        import fcntl
+except ModuleNotFoundError as error:
+    logging.error(error)
+
+LOGGER = logging.getLogger(__name__)
+
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+OP_UPLOAD = 'upload'
+OP_VERIFY = 'verify'
+OP_DELETE = 'delete'
+DEFAULT_OP_MIX = {OP_UPLOAD: 1}
+# Seconds between writes of upload and delete metadata of a running shard
+RECORD_INTERVAL = 10
+
+
+class AsyncS3Client:
+    """Minimal path style S3 client for object PUT, GET and DELETE over aiohttp."""
+
+    def __init__(self, session, endpoint, access_key, secret_key, region=None):
+        self.session = session
+        self.endpoint = endpoint.rstrip('/')
+        self.host = urlparse(self.endpoint).netloc
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region or S3_CFG.get('region', 'us-east-1')
+
+    def _request_args(self, method, bucket, key, headers=None):
+        """Return signed url and headers for a request."""
+        canonical_uri = f'/{quote(bucket)}/{quote(key)}'
+        epoch_t = datetime.datetime.utcnow()
+        signed = {'x-amz-content-sha256': UNSIGNED_PAYLOAD}
+        req_headers = dict(headers or {})
+        req_headers.update(signed)
+        req_headers['x-amz-date'] = s3_utils.get_timestamp(epoch_t)
+        req_headers['Authorization'] = s3_utils.sign_request_v4(
+            method, canonical_uri, '', epoch_t, self.host, region=self.region,
+            access_key=self.access_key, secret_key=self.secret_key,
+            payload_hash=UNSIGNED_PAYLOAD, headers=signed)
+        return URL(self.endpoint + canonical_uri, encoded=True), req_headers
+
+    async def put_object(self, bucket, key, body, content_md5=None):
+        """Upload body and return ETag."""
+        headers = {'Content-MD5': content_md5} if content_md5 else None
+        url, headers = self._request_args('PUT', bucket, key, headers)
+        async with self.session.put(url, data=body, headers=headers) as resp:
+            await resp.read()
+            resp.raise_for_status()
+            return resp.headers.get('ETag')
+
+    async def get_object_md5(self, bucket, key, read_size=params.DI_READ_SIZE):
+        """Stream object body into md5 and return md5 hex digest and size."""
+        url, headers = self._request_args('GET', bucket, key)
+        async with self.session.get(url, headers=headers) as resp:
+            resp.raise_for_status()
+            file_hash = hashlib.md5()
+            nbytes = 0
+            async for chunk in resp.content.iter_chunked(read_size):
+                file_hash.update(chunk)
+                nbytes += len(chunk)
+            return file_hash.hexdigest(), nbytes
+
+    async def delete_object(self, bucket, key):
+        """Delete an object."""
+        url, headers = self._request_args('DELETE', bucket, key)
+        async with self.session.delete(url, headers=headers) as resp:
+            await resp.read()
+            resp.raise_for_status()
+
+
+class AsyncIODriver:
+    """
+    Drive DI workload for virtual clients with asyncio.
+    Virtual client i works on (user, bucket) target i % len(targets) and picks operations
+    from op_mix weights, verify and delete act on objects uploaded by same client.
+    Clients are sharded across nprocs processes, each running one event loop.
+    Usage:
+    driver = AsyncIODriver(users, nclients=5000, op_mix={'upload': 6, 'verify': 3, 'delete': 1})
+    summary = driver.run(nops=100, stop_event=event)
+    """
+
+    def __init__(self, users, nclients=1000, op_mix=None, nprocs=None, max_inflight=512,
+                 prefs=None, read_size=params.DI_READ_SIZE):
+        """
+        :param users: Users dict with accesskey, secretkey and buckets.
+        :param nclients: Number of virtual clients.
+        :param op_mix: Dict of operation to relative weight.
+        :param nprocs: Number of event loop processes, defaults to cpu count.
+        :param max_inflight: Max concurrent connections per process.
+        :param prefs: Preferences e.g. c_ratio of generated data.
+        :param read_size: Read size used while streaming GET body.
+        """
+        self.users = users
+        self.targets = [(user, bucket) for user, udict in users.items()
+                        for bucket in udict['buckets']]
+        self.nclients = nclients
+        self.op_mix = op_mix or DEFAULT_OP_MIX
+        self.nprocs = min(nprocs or os.cpu_count() or 1, nclients)
+        self.max_inflight = max_inflight
+        self.prefs = prefs or dict()
+        self.read_size = read_size
+        self.endpoint = CMN_CFG.get('s3_url', params.S3_ENDPOINT)
+        # Metadata recorder of a shard process, one thread and one DataManager connection
+        self._recorder = None
+        self._change_manager = None
+
+    def run(self, nops=None, duration=None, stop_event=None, nops_per_target=None):
+        """
+        Run workload till every client completes nops, duration expires or stop_event is set.
+        :param nops_per_target: Operations per (user, bucket) target split across its
+            clients, used instead of nops.
+        :return: summary dict with per operation counts, errors, bytes and latencies.
+        """
+        if not self.targets:
+            raise ValueError('Users should have at least one bucket')
+        if nops is None and nops_per_target is None and duration is None \
+                and stop_event is None:
+            raise ValueError('One of nops, duration or stop_event is needed to stop workload')
+        results = mp.Queue()
+        # A threading.Event of the caller is copied into forked shards, so shards watch
+        # their own mp.Event which a thread sets when the caller's event is set
+        shard_stop = mp.Event()
+        collected = threading.Event()
+        bridge = None
+        if stop_event is not None:
+            bridge = threading.Thread(target=self._bridge_stop,
+                                      args=(stop_event, shard_stop, collected),
+                                      name='aio-stop-bridge', daemon=True)
+            bridge.start()
+        jobs = [mp.Process(target=self._run_shard,
+                           args=(shard, (nops, nops_per_target), duration, shard_stop,
+                                 results))
+                for shard in range(self.nprocs)]
+        start = time.perf_counter()
+        for job in jobs:
+            job.start()
+        shards = [results.get() for _ in jobs]
+        collected.set()
+        for job in jobs:
+            job.join()
+        if bridge is not None:
+            bridge.join()
+        return self._summarize(shards, time.perf_counter() - start)
+
+    @staticmethod
+    def _bridge_stop(stop_event, shard_stop, collected):
+        """Set shard_stop once stop_event is set, until results are collected."""
+        while not collected.wait(0.2):
+            if stop_event.is_set():
+                shard_stop.set()
+                return
+
+    def _run_shard(self, shard, nops, duration, stop_event, results):
+        """Process entry point."""
+        self._recorder = ThreadPoolExecutor(max_workers=1)
+        try:
+            stats = asyncio.run(self._run_loop(shard, nops, duration, stop_event))
+        except Exception as fault:
+            LOGGER.exception(fault)
+            stats = self._new_stats()
+        finally:
+            self._recorder.shutdown()
+        results.put(stats)
+
+    def _client_nops(self, cid, nops, nops_per_target):
+        """Operations of client cid, nops_per_target is split exactly across its clients."""
+        if nops_per_target is None:
+            return nops
+        ntargets = len(self.targets)
+        target = cid % ntargets
+        nclients = self.nclients // ntargets + (1 if target < self.nclients % ntargets else 0)
+        return nops_per_target // nclients + (
+            1 if cid // ntargets < nops_per_target % nclients else 0)
+
+    @staticmethod
+    def _new_stats():
+        return {op: dict(count=0, errors=0, mismatch=0, bytes=0, latencies=array('d'))
+                for op in (OP_UPLOAD, OP_VERIFY, OP_DELETE)}
+
+    async def _run_loop(self, shard, nops, duration, stop_event):
+        nops, nops_per_target = nops
+        stats = self._new_stats()
+        uploaded, deleted = [], []
+        ssl_ctx = False
+        if S3_CFG.get('validate_certs') and os.path.exists(S3_CFG.get('s3_cert_path', '')):
+            ssl_ctx = ssl.create_default_context(cafile=S3_CFG['s3_cert_path'])
+        connector = aiohttp.TCPConnector(limit=self.max_inflight, ssl=ssl_ctx)
+        deadline = time.monotonic() + duration if duration else None
+        async with aiohttp.ClientSession(connector=connector) as session:
+            clients = dict()
+            for user, udict in self.users.items():
+                clients[user] = AsyncS3Client(session, self.endpoint, udict['accesskey'],
+                                              udict['secretkey'])
+            tasks = []
+            for cid in range(shard, self.nclients, self.nprocs):
+                user, bucket = self.targets[cid % len(self.targets)]
+                tasks.append(self._virtual_client(
+                    clients[user], user, bucket,
+                    self._client_nops(cid, nops, nops_per_target), deadline, stop_event, stats,
+                    uploaded, deleted))
+            done = asyncio.Event()
+            recorder = asyncio.ensure_future(self._record_periodically(uploaded, deleted,
+                                                                       done))
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                done.set()
+                await recorder
+                await self._flush_records(uploaded, deleted)
+        return stats
+
+    async def _record_periodically(self, uploaded, deleted, done):
+        """Record metadata every RECORD_INTERVAL till done, so a stopped run keeps it."""
+        while not done.is_set():
+            try:
+                await asyncio.wait_for(done.wait(), RECORD_INTERVAL)
+            except asyncio.TimeoutError:
+                await self._flush_records(uploaded, deleted)
+
+    async def _flush_records(self, uploaded, deleted):
+        """Record and clear uploads and deletes done since the last flush."""
+        if not uploaded and not deleted:
+            return
+        batch = (list(uploaded), list(deleted))
+        uploaded.clear()
+        deleted.clear()
+        await asyncio.get_running_loop().run_in_executor(self._recorder, self._record, *batch)
+
+    # pylint: disable=too-many-arguments
+    async def _virtual_client(self, client, user, bucket, nops, deadline, stop_event, stats,
+                              uploaded, deleted):
+        objects = []
+        ops = list(self.op_mix.keys())
+        weights = list(self.op_mix.values())
+        gen = data_generator.SeededDataGenerator(c_ratio=self.prefs.get('c_ratio', 2))
+        done = 0
+        while nops is None or done < nops:
+            if stop_event is not None and stop_event.is_set():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            op = random.choices(ops, weights)[0]
+            if op != OP_UPLOAD and not objects:
+                op = OP_UPLOAD
+            start = time.perf_counter()
+            try:
+                if op == OP_UPLOAD:
+                    nbytes, matched = await self._upload(client, gen, user, bucket, objects,
+                                                         uploaded)
+                elif op == OP_VERIFY:
+                    nbytes, matched = await self._verify(client, bucket, objects)
+                else:
+                    nbytes, matched = await self._delete(client, user, bucket, objects,
+                                                         deleted)
+            except Exception as fault:
+                LOGGER.error(f'{op} failed for user {user} bucket {bucket}: {fault}')
+                stats[op]['errors'] += 1
+            else:
+                stats[op]['count'] += 1
+                stats[op]['bytes'] += nbytes
+                stats[op]['mismatch'] += 0 if matched else 1
+                stats[op]['latencies'].append(time.perf_counter() - start)
+            done += 1
+
+    async def _upload(self, client, gen, user, bucket, objects, uploaded):
+        seed = gen.get_random_seed()
+        size = random.sample(data_generator.SMALL_BLOCK_SIZES, 1)[0]
+        buf, csum = gen.generate(size, seed=seed)
+        name = gen.get_object_name(csum)
+        digest = hashlib.md5(buf)
+        await client.put_object(bucket, name, buf,
+                                base64.b64encode(digest.digest()).decode('utf-8'))
+        md5sum = digest.hexdigest()
+        objects.append((name, md5sum))
+        uploaded.append((user, bucket, dict(name=name, checksum=md5sum, seed=seed, size=size,
+                                            c_ratio=gen.compression_ratio,
+                                            d_ratio=gen.dedupe_ratio, mtime=time.time())))
+        return size, True
+
+    async def _verify(self, client, bucket, objects):
+        name, md5sum = random.choice(objects)
+        csum, nbytes = await client.get_object_md5(bucket, name, self.read_size)
+        if csum != md5sum:
+            LOGGER.error(f'checksum {csum} does not match {md5sum} for {bucket}/{name}')
+        return nbytes, csum == md5sum
+
+    @staticmethod
+    async def _delete(client, user, bucket, objects, deleted):
+        name, md5sum = objects.pop(random.randrange(len(objects)))
+        await client.delete_object(bucket, name)
+        deleted.append((user, bucket, name, md5sum))
+        return 0, True
+
+    @staticmethod
+    def _append_rows(fpath, rows):
+        if not rows:
+            return
+        with open(fpath, 'a', newline='') as fp:
+            wr = csv.writer(fp, quoting=csv.QUOTE_NONE, delimiter=',', quotechar='',
+                            escapechar='\\')
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            wr.writerows(rows)
+            fcntl.flock(fp, fcntl.LOCK_UN)
+
+    def _record(self, uploaded, deleted):
+        """Record uploads and deletes for DataIntegrityValidator and DataManager."""
+        self._append_rows(params.UPLOADED_FILES, [
+            [user, bucket, fdict['name'], fdict['checksum']] for user, bucket, fdict in uploaded])
+        self._append_rows(params.DELETE_OP_FILE_NAME, [list(row) for row in deleted])
+        if self._change_manager is None:
+            self._change_manager = data_man.DataManager()
+        change_manager = self._change_manager
+        by_bucket = dict()
+        for user, bucket, fdict in uploaded:
+            by_bucket.setdefault((user, bucket), list()).append(fdict)
+        for (user, bucket), fdicts in by_bucket.items():
+            change_manager.add_files_to_bucket(user, bucket, fdicts)
+        for user, bucket, name, _ in deleted:
+            change_manager.delete_file_from_bucket(user, bucket, name)
+
+    def _summarize(self, shards, duration):
+        summary = dict(duration=duration, nclients=self.nclients, nprocs=self.nprocs)
+        for op in (OP_UPLOAD, OP_VERIFY, OP_DELETE):
+            latencies = sorted(lat for shard in shards for lat in shard[op]['latencies'])
+            nbytes = sum(shard[op]['bytes'] for shard in shards)
+            summary[op] = dict(
+                count=sum(shard[op]['count'] for shard in shards),
+                errors=sum(shard[op]['errors'] for shard in shards),
+                mismatch=sum(shard[op]['mismatch'] for shard in shards),
+                bytes=nbytes,
+                throughput_mbps=nbytes / (1024 * 1024) / duration if duration else 0.0,
+                latency_p50=percentile(latencies, 50),
+                latency_p99=percentile(latencies, 99))
+        LOGGER.info(f'Async DI workload summary {summary}')
+        return summary
+
+
+class AsyncUploader:
+    """Drop in replacement of uploader.Uploader for RunDataCheckManager asyncio backend."""
+
+    def __init__(self, clients_per_bucket=10, nprocs=None):
+        self.clients_per_bucket = clients_per_bucket
+        self.nprocs = nprocs
+
+    def start(self, users, buckets, files_count, prefs, stop_event, future_obj=None):
+        """Upload files_count objects in every bucket of every user."""
+        LOGGER.info(f'Starting async uploads for users {users}')
+        users_path = os.path.join(params.LOG_DIR, params.USER_JSON)
+        config_utils.create_content_json(users_path, users, ensure_ascii=False)
+        nbuckets = sum(len(udict['buckets']) for udict in users.values())
+        clients_per_bucket = max(1, min(self.clients_per_bucket, files_count))
+        driver = AsyncIODriver(users, nclients=nbuckets * clients_per_bucket,
+                               nprocs=self.nprocs, prefs=prefs)
+        if future_obj:
+            future_obj.value = True
+        summary = driver.run(nops_per_target=files_count, stop_event=stop_event)
+        LOGGER.info(f'Upload completed for users {users}, summary {summary[OP_UPLOAD]}')
+        return summary
@@ -18,7 +18,9 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 """Generate test data for S3 I/O with desired compression, duplication and formats.
-Size could be as small as 1 byte to 1 GB.
+Size could be as small as 1 byte to 1 GB. SeededDataGenerator can stream objects of any
+size in bounded memory and regenerate any object, part or byte range from
+(seed, size, ratios).
 """
 import os
 import logging
@@ -30,9 +32,13 @@ import string
 from typing import Union
 from typing import Tuple
 from typing import Any
+from typing import Iterator
+from typing import List
+import numpy as np
 from Crypto.Cipher import AES
 from pathlib import Path
 from commons import params
+from commons.utils.s3_utils import calc_contentmd5
 from libs.di.file_formats import *
 
 KB = 1024
@@ -45,6 +51,10 @@ U_LIMIT = 10 ** 6
 CMPR_RATIOS = (1, 2, 3, 4, 5, 6, 7, 8)
 SMALL_BLOCK_SIZES = [4 * KB, 8 * KB, 16 * KB, 32 * KB, 64 * KB, 128 * KB]
 MEDIUM_BLOCK_SIZES = [4 * MB, 8 * MB, 16 * MB, 21 * MB, 32 * MB, 64 * MB, 128 * MB]
+MAX_OBJECT_SIZE = 5 * KB * MB
+DEDUPE_BLOCK_SIZE = 4 * KB
+GEN_CHUNK_SIZE = 8 * MB
+PHILOX_WORD_BYTES = 32
 
 LOGGER = logging.getLogger(__name__)
 
@@ -156,13 +166,7 @@ class DataGenerator:
                          data_folder_prefix: str,
                          min_sz: int = 5,
                          max_sz: int = 10) -> str:
-        name = ''
-        ext = random.sample(all_extensions, 1)[0]
-        for i in range(random.randrange(min_sz, max_sz)):
-            name += random.choice(string.ascii_letters + string.digits + '_-')
-        if self.append_csum_file_name:
-            name += '_' + csum
-        name += '_' + 'cx' + ext
+        name = self.get_object_name(csum, min_sz, max_sz)
         if size < 1024:
             iosize = 1024
         elif (size >= 1024) & (size < 1024 * 1024):
@@ -179,6 +183,20 @@ class DataGenerator:
         name = os.path.join(params.DATAGEN_HOME, data_folder_prefix, name)
         return self.__save_data_to_file(fbuf, iosize, name, off, size)
 
+    def get_object_name(self,
+                        csum: str,
+                        min_sz: int = 5,
+                        max_sz: int = 10) -> str:
+        """Random object/file name with a known extension and optionally embedded checksum."""
+        name = ''
+        ext = random.choice(tuple(all_extensions))
+        for i in range(random.randrange(min_sz, max_sz)):
+            name += random.choice(string.ascii_letters + string.digits + '_-')
+        if self.append_csum_file_name:
+            name += '_' + csum
+        name += '_' + 'cx' + ext
+        return name
+
     # pylint: disable=max-args, R0201
     def __save_data_to_file(self, fbuf, iosize, name, off, size):
         with open(name, 'wb', 512 * 1024) as fd:  # buffer size
@@ -234,6 +252,168 @@ class DataGenerator:
         return buffer
 
 
+class SeededDataGenerator(DataGenerator):
+    """Vectorized data generator which is reproducible from (seed, size, c_ratio, d_ratio).
+
+    Object is laid out in fixed blocks of DEDUPE_BLOCK_SIZE. Block i maps to unique block
+    i % nunique where nunique = ceil(nblocks / d_ratio). Every unique block is filled from
+    a Philox counter mode key stream keyed by seed and positioned at the unique block id,
+    only first block_size / c_ratio bytes are kept random and the rest is zeroed.
+    So any block can be regenerated without producing the blocks before it.
+    Usage:
+    d = SeededDataGenerator(c_ratio=2, d_ratio=2)
+    buf, csum = d.generate(1024 * 1024, seed=10)
+    for chunk in d.generate_chunks(5 * 1024 ** 3, seed=10):
+        consume(chunk)
+    assert d.generate_range(1024 * 1024, 10, 4096, 100) == buf[4096:4196]
+    """
+
+    def __init__(self,
+                 c_ratio: float = 1,
+                 d_ratio: float = 1,
+                 block_size: int = DEDUPE_BLOCK_SIZE,
+                 chunk_size: int = GEN_CHUNK_SIZE,
+                 embed_csum_in_name: bool = True) -> None:
+        if c_ratio < 1 or d_ratio < 1:
+            raise ValueError("Compression and dedupe ratio should be >= 1")
+        if block_size % PHILOX_WORD_BYTES or chunk_size % block_size:
+            raise ValueError(f"Block size should be multiple of {PHILOX_WORD_BYTES} and "
+                             f"chunk size should be multiple of block size")
+        super().__init__(c_ratio=1, embed_csum_in_name=embed_csum_in_name)
+        self.compression_ratio = c_ratio
+        self.compressibility = int(100 - (1.0 / self.compression_ratio * 100))
+        self.dedupe_ratio = d_ratio
+        self.block_size = block_size
+        self.chunk_size = chunk_size
+        self.random_len = max(1, int(round(block_size / c_ratio)))
+
+    def generate(self,
+                 size: int,
+                 datatype: int = DEFAULT_DATA_TYPE,
+                 seed: int = None) -> Tuple[bytes, str]:
+        """Generate exactly size bytes in a single buffer along with sha1 checksum.
+        Use generate_chunks for large objects.
+        """
+        if seed is None:
+            seed = self.get_random_seed()
+        if not 0 <= size <= MAX_OBJECT_SIZE:
+            raise ValueError(f"Size {size} should be between 0 and {MAX_OBJECT_SIZE}")
+        buf = bytearray(size)
+        csum = hashlib.sha1()
+        off = 0
+        for chunk in self.generate_chunks(size, seed=seed, datatype=datatype):
+            buf[off:off + len(chunk)] = chunk
+            csum.update(chunk)
+            off += len(chunk)
+        return bytes(buf), csum.hexdigest()
+
+    def generate_chunks(self,
+                        size: int,
+                        seed: int,
+                        datatype: int = DEFAULT_DATA_TYPE,
+                        offset: int = 0,
+                        length: int = None,
+                        chunk_size: int = None) -> Iterator[memoryview]:
+        """
+        Yield the bytes [offset, offset + length) of object (seed, size) in chunks.
+        Memory usage is bounded by chunk size irrespective of object size.
+        :param size: Total object size, needed to derive dedupe layout.
+        :param seed: Seed to generate key stream.
+        :param datatype: DEFAULT_DATA_TYPE or ZEROED_DATA_TYPE.
+        :param offset: Start offset within the object.
+        :param length: Number of bytes to yield, till end of object if None.
+        :param chunk_size: Bytes per yielded chunk, rounded up to block size.
+        :return: Iterator of memoryviews, a view is valid only till next iteration.
+        """
+        end = size if length is None else min(size, offset + length)
+        if offset < 0 or offset > end:
+            raise ValueError(f"Invalid range offset {offset} length {length} for size {size}")
+        chunk_size = chunk_size or self.chunk_size
+        chunk_blocks = max(1, -(-chunk_size // self.block_size))
+        nblocks = -(-size // self.block_size)
+        nunique = max(1, int(-(-nblocks // self.dedupe_ratio)))
+        first_block = offset // self.block_size
+        last_block = -(-end // self.block_size)
+        for blk in range(first_block, last_block, chunk_blocks):
+            nblk = min(chunk_blocks, last_block - blk)
+            if datatype == ZEROED_DATA_TYPE:
+                blocks = np.zeros((nblk, self.block_size), dtype=np.uint8)
+            else:
+                blocks = self._get_blocks(seed, blk, nblk, nunique)
+            view = memoryview(blocks).cast('B')
+            lo = max(offset - blk * self.block_size, 0)
+            hi = min(end - blk * self.block_size, nblk * self.block_size)
+            yield view[lo:hi]
+
+    def generate_range(self,
+                       size: int,
+                       seed: int,
+                       offset: int,
+                       length: int,
+                       datatype: int = DEFAULT_DATA_TYPE) -> bytes:
+        """Regenerate the byte range [offset, offset + length) of object (seed, size)."""
+        return b''.join(bytes(chunk) for chunk in self.generate_chunks(
+            size, seed, datatype=datatype, offset=offset, length=length))
+
+    def generate_parts(self,
+                       size: int,
+                       seed: int,
+                       part_size: Union[int, List[int]],
+                       datatype: int = DEFAULT_DATA_TYPE,
+                       random_order: bool = False) -> Iterator[Tuple[int, memoryview, str]]:
+        """
+        Lazily yield multipart upload parts of object (seed, size).
+        Only one part is held in memory at a time, so objects larger than client memory
+        could be uploaded and parts could be regenerated in any order.
+        :param size: Total object size.
+        :param seed: Seed to generate key stream.
+        :param part_size: Part size in bytes or list of part sizes e.g. s3_utils.get_part_sizes.
+        :param datatype: DEFAULT_DATA_TYPE or ZEROED_DATA_TYPE.
+        :param random_order: Yield parts in random order.
+        :return: Iterator of (part_number, memoryview, content_md5).
+        """
+        if isinstance(part_size, list):
+            part_sizes = part_size
+        else:
+            part_sizes = [part_size] * (size // part_size)
+            if size % part_size:
+                part_sizes.append(size % part_size)
+        offsets = [0]
+        for psize in part_sizes[:-1]:
+            offsets.append(offsets[-1] + psize)
+        part_numbers = list(range(1, len(part_sizes) + 1))
+        if random_order:
+            random.shuffle(part_numbers)
+        for part_number in part_numbers:
+            psize = part_sizes[part_number - 1]
+            part = next(self.generate_chunks(
+                size, seed, datatype=datatype, offset=offsets[part_number - 1], length=psize,
+                chunk_size=psize + self.block_size), memoryview(b''))
+            yield part_number, part, calc_contentmd5(part)
+
+    def _get_blocks(self, seed, first, count, nunique):
+        """Return (count, block_size) uint8 array for object blocks [first, first + count)."""
+        start = first % nunique
+        if count >= nunique:
+            table = self._get_unique_blocks(seed, 0, nunique)
+            return table[np.arange(first, first + count) % nunique]
+        if start + count <= nunique:
+            return self._get_unique_blocks(seed, start, count)
+        head = nunique - start
+        return np.concatenate((self._get_unique_blocks(seed, start, head),
+                               self._get_unique_blocks(seed, 0, count - head)))
+
+    def _get_unique_blocks(self, seed, first, count):
+        """Key stream for unique blocks [first, first + count) with compressible tail zeroed."""
+        counter = first * (self.block_size // PHILOX_WORD_BYTES)
+        bit_gen = np.random.Philox(key=seed, counter=[counter, 0, 0, 0])
+        words = bit_gen.random_raw(count * self.block_size // 8).astype('<u8', copy=False)
+        blocks = words.view(np.uint8).reshape(count, self.block_size)
+        if self.random_len < self.block_size:
+            blocks[:, self.random_len:] = 0
+        return blocks
+
+
 if __name__ == '__main__':
     # Test Data Generator here.
     d = DataGenerator(c_ratio=1)
@@ -26,7 +26,10 @@ It never talks to server to get any state from server.
 It should be used for validation when data is stored with the cortx-test
 framework. It acts as a hash cache storing the server state on client side.
 
- The structure of the client hash cache is as shown below
+ Objects are stored in a SQLite database in WAL mode under META_DATA_HOME keyed by
+ (user, bucket, name, version). Every add or delete appends a new version so inserts
+ and lookups are indexed and multiple uploader processes can write concurrently.
+ The structure returned to callers is same as the older per user json cache
 {
  user1={ user=user1,
         email=user1@seagate.com,
@@ -45,8 +48,11 @@ framework. It acts as a hash cache storing the server state on client side.
 }
 """
 import os
+import json
+import sqlite3
 import logging
 import threading
+import time
 import random
 import multiprocessing
 from commons import params
@@ -61,17 +67,164 @@ C_LEVEL_BUCKET = 3
 
 LOGGER = logging.getLogger(__name__)
 
+FILE_DICT_KEYS = ('name', 'checksum', 'size', 'seed', 'mtime')
+
+
+class MetadataStore:
+    """SQLite WAL backed append only store of object metadata.
+
+    Connections are opened lazily per process and thread, so a store created in parent
+    process can be used by mp.Process workers and their threads.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS objects ("
+        " user TEXT NOT NULL, bucket TEXT NOT NULL, name TEXT NOT NULL,"
+        " version INTEGER NOT NULL, checksum TEXT, size INTEGER, seed INTEGER,"
+        " mtime REAL, deleted INTEGER NOT NULL DEFAULT 0, attrs TEXT,"
+        " PRIMARY KEY (user, bucket, name, version))",
+        "CREATE VIEW IF NOT EXISTS latest_objects AS SELECT o.* FROM objects o"
+        " WHERE o.version = (SELECT MAX(version) FROM objects l WHERE l.user = o.user"
+        " AND l.bucket = o.bucket AND l.name = o.name)",
+    )
+    INSERT = ("INSERT INTO objects (user, bucket, name, version, checksum, size, seed, mtime,"
+              " deleted, attrs) SELECT ?, ?, ?, COALESCE(MAX(version), 0) + 1, ?, ?, ?, ?, ?, ?"
+              " FROM objects WHERE user = ? AND bucket = ? AND name = ?")
+
+    # Insert of a merged row, skipped if a version with the same checksum, mtime and delete
+    # flag is already present so merging the same store again adds nothing
+    MERGE = ("INSERT INTO objects (user, bucket, name, version, checksum, size, seed, mtime,"
+             " deleted, attrs) SELECT * FROM (SELECT ?, ?, ?, COALESCE(MAX(version), 0) + 1,"
+             " ?, ?, ?, ?, ?, ? FROM objects WHERE user = ? AND bucket = ? AND name = ?)"
+             " WHERE NOT EXISTS (SELECT 1 FROM objects WHERE user = ? AND bucket = ?"
+             " AND name = ? AND checksum IS ? AND mtime IS ? AND deleted = ?)")
+
+    def __init__(self, db_path: str = None, timeout: float = 60) -> None:
+        if db_path is None:
+            if not os.path.exists(params.META_DATA_HOME):
+                system_utils.mkdirs(params.META_DATA_HOME)
+            db_path = os.path.join(params.META_DATA_HOME, params.DI_META_DB)
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as conn:
+            for stmt in self.SCHEMA:
+                conn.execute(stmt)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return connection owned by current process and thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _insert_args(user, bucket, file_dict, deleted=0):
+        attrs = {k: v for k, v in file_dict.items() if k not in FILE_DICT_KEYS}
+        return (user, bucket, file_dict['name'], file_dict.get('checksum'),
+                file_dict.get('size'), file_dict.get('seed'), file_dict.get('mtime'), deleted,
+                json.dumps(attrs) if attrs else None, user, bucket, file_dict['name'])
+
+    @staticmethod
+    def to_file_dict(row: sqlite3.Row) -> dict:
+        """Convert a row to file dict in the format stored by older json cache."""
+        fdict = dict(name=row['name'], checksum=row['checksum'], sz=row['size'],
+                     seed=row['seed'], mtime=row['mtime'], version=row['version'])
+        if row['attrs']:
+            fdict.update(json.loads(row['attrs']))
+        if row['deleted']:
+            fdict['deleted'] = True
+        return fdict
+
+    def put(self, user: str, bucket: str, file_dict: dict, deleted: bool = False) -> None:
+        """Append a new version of an object."""
+        self.put_many(user, bucket, [file_dict], deleted)
+
+    def put_many(self, user: str, bucket: str, file_dicts: list, deleted: bool = False) -> None:
+        """Append new versions of objects in a single transaction."""
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(self.INSERT, [self._insert_args(user, bucket, fdict, int(deleted))
+                                           for fdict in file_dicts])
+
+    def get(self, user: str, bucket: str, name: str, version: int = None):
+        """Return latest or specific version of an object as row or None."""
+        query = 'SELECT * FROM objects WHERE user = ? AND bucket = ? AND name = ?'
+        args = [user, bucket, name]
+        if version is None:
+            query += ' ORDER BY version DESC LIMIT 1'
+        else:
+            query += ' AND version = ?'
+            args.append(version)
+        return self._connection().execute(query, args).fetchone()
+
+    def versions(self, user: str, bucket: str, name: str) -> list:
+        """Return all versions of an object oldest first."""
+        return self._connection().execute(
+            'SELECT * FROM objects WHERE user = ? AND bucket = ? AND name = ? ORDER BY version',
+            (user, bucket, name)).fetchall()
+
+    def iter_latest(self, user: str = None, bucket: str = None, include_deleted: bool = False):
+        """Iterate latest version of objects optionally filtered on user and bucket."""
+        query = 'SELECT * FROM latest_objects WHERE 1 = 1'
+        args = []
+        if user is not None:
+            query += ' AND user = ?'
+            args.append(user)
+        if bucket is not None:
+            query += ' AND bucket = ?'
+            args.append(bucket)
+        if not include_deleted:
+            query += ' AND deleted = 0'
+        return self._connection().execute(query + ' ORDER BY user, bucket, name', args)
+
+    def merge(self, db_path: str) -> int:
+        """
+        Append object versions from another store which are not present yet and return
+        number of rows merged. Merging the same store again merges nothing.
+        """
+        conn = self._connection()
+        conn.execute('ATTACH DATABASE ? AS other', (db_path,))
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                rows = conn.execute('SELECT * FROM other.objects ORDER BY version').fetchall()
+                changes = conn.total_changes
+                conn.executemany(self.MERGE, [
+                    (row['user'], row['bucket'], row['name'], row['checksum'], row['size'],
+                     row['seed'], row['mtime'], row['deleted'], row['attrs'], row['user'],
+                     row['bucket'], row['name'], row['user'], row['bucket'], row['name'],
+                     row['checksum'], row['mtime'], row['deleted']) for row in rows])
+                merged = conn.total_changes - changes
+        finally:
+            conn.execute('DETACH DATABASE other')
+        return merged
+
+    def close(self) -> None:
+        """Close connection of current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
 
 class DataManager(object):
     """ Save objects meta data that went to storage for each test."""
 
-    def __init__(self):
+    def __init__(self, db_path=None):
         self.buckets = list()
         self.change_tracker = dict()
         self.state = dict()
         self.rlock = threading.Lock()
         self.wlock = threading.Lock()
         self.plock = multiprocessing.Lock()
+        self.store = MetadataStore(db_path)
 
     def prepare_file_data(self, user):
         """Read data before saving."""
@@ -104,17 +257,15 @@ class DataManager(object):
         if user is None:
             raise ValueError('user is mandatory')
 
-        fpath = self.prepare_file_data(user)
-        # improve with ijson lib
-        data = config_utils.read_content_json(fpath=fpath)
-        if data:
-            if user != data['name']:
-                return None
-            if not data['buckets']:
-                return None
-            return data['buckets']
-        else:
+        buckets = dict()
+        for row in self.store.iter_latest(user=user):
+            if row['bucket'] not in buckets:
+                buckets[row['bucket']] = self.get_container(level=C_LEVEL_BUCKET)
+                buckets[row['bucket']]['name'] = row['bucket']
+            buckets[row['bucket']]['files'].append(self.store.to_file_dict(row))
+        if not buckets:
             return None
+        return list(buckets.values())
 
     def get_files_within_bucket(self, bkt_container, bucket):
         if bucket is not None and bkt_container:
@@ -123,10 +274,16 @@ class DataManager(object):
             return bkt_container['files']
         return None
 
-    def get_file_within_bucket(self, name, bkt_container, bucket):
+    def get_file_within_bucket(self, name, bkt_container, bucket, user=None):
         """Find file within a bucket and return None if not.
-        Returns the same dict object within bucket container.
+        Looks up the store when user is given else returns the same dict object
+        within bucket container.
         """
+        if bucket is not None and user is not None:
+            row = self.store.get(user, bucket, name)
+            if row is None or row['deleted']:
+                return None
+            return self.store.to_file_dict(row)
         if bucket is not None and bkt_container:
             for _file_dict in bkt_container['files']:
                 if _file_dict['name'] == name:
@@ -151,57 +308,25 @@ class DataManager(object):
         """Protected API."""
         return True if bucket in self.buckets else False
 
-    def _get_bucket_container_from_buckets(self, data, bucket, user):
-        """Protected get bucket container API."""
-        if user is None:
-            raise ValueError('user is mandatory')
-        if data:
-            if user != data['name'] or not data['buckets']:
-                container = self.get_container(level=C_LEVEL_BUCKET)
-                container['name'] = bucket
-                return container, False
-            for bkt in data['buckets']:
-                if bkt['name'] == bucket:
-                    return bkt, True
-        # means create a container for caller
-        container = self.get_container(level=C_LEVEL_BUCKET)
-        container['name'] = bucket
-        return container, False  # anyway return an empty container
-
     def add_file_to_bucket(self, user, bucket, file_dict):
-        """The updates within process will be in-memory and then persisted to json."""
-        file_obj, checksum = file_dict['name'], file_dict['checksum']
-        size, seed, mtime = file_dict['size'], file_dict['seed'], file_dict['mtime']
-        data = dict()
+        """Append file metadata as a new version of object in the store."""
         if bucket is not None:
-            with self.wlock:
-                fpath = self.prepare_file_data(user)
-                data = config_utils.read_content_json(fpath=fpath)
-                if not data or user != data['name']:
-                    data = self.get_container(level=C_LEVEL_USER)
-                    data['name'] = user
-                bkt_container, flag = self._get_bucket_container_from_buckets(data, bucket, user)
-
-                # usage files = self.get_files_within_bucket(bkt_container, user, bucket)
-                fdict = self.get_file_within_bucket(file_obj, bkt_container, bucket)
-                if not fdict:
-                    # format of fdict is name=a.txt, chksum=abcd, seed=1, size=1024
-                    fdict = dict(name=file_obj, checksum=checksum,
-                                 sz=size, seed=seed, mtime=mtime)
-                    bkt_container['files'].append(fdict)
-                else:
-                    fdict['checksum'] = checksum
-                    fdict['sz'] = size
-                    fdict['seed'] = seed
-                    fdict['mtime'] = mtime
-
-                if not flag:
-                    data['buckets'].append(bkt_container)
-
-                self.store_file_data(data, user)
-
-    def delete_file_from_bucket(self):
-        raise NotImplementedError('coming soon')
+            self.store.put(user, bucket, file_dict)
+
+    def add_files_to_bucket(self, user, bucket, file_dicts):
+        """Bulk append metadata of files in a single transaction."""
+        if bucket is not None and file_dicts:
+            self.store.put_many(user, bucket, file_dicts)
+
+    def delete_file_from_bucket(self, user, bucket, name):
+        """Record a delete marker as latest version of object.
+        Returns False if object is not known or already deleted.
+        """
+        row = self.store.get(user, bucket, name)
+        if row is None or row['deleted']:
+            return False
+        self.store.put(user, bucket, dict(name=name, mtime=time.time()), deleted=True)
+        return True
 
     def update_file_in_bucket(self):
         raise NotImplementedError('Currently add file takes care of it')
@@ -216,13 +341,25 @@ class DataManager(object):
                     return e
         return dict()
 
-    def collect_test_run_client_state(self):
-        """Combine cache for all test runners from a single target setup"""
-        raise NotImplementedError('we might need this for implementing DI TP.')
-
-    def get_versions_of_object(self, user):
-        """Will be applicable in future."""
-        raise NotImplementedError('Versioning not supported on Object Store.')
+    def collect_test_run_client_state(self, db_paths=None):
+        """Combine cache for all test runners from a single target setup.
+        :param db_paths: Metadata stores of other runners to be merged in this store.
+        :return: dict of user to dict of bucket and count of live objects.
+        """
+        for db_path in db_paths or list():
+            if os.path.abspath(db_path) == os.path.abspath(self.store.db_path):
+                continue
+            count = self.store.merge(db_path)
+            LOGGER.info(f'Merged {count} object versions from {db_path}')
+        state = dict()
+        for row in self.store.iter_latest():
+            buckets = state.setdefault(row['user'], dict())
+            buckets[row['bucket']] = buckets.get(row['bucket'], 0) + 1
+        return state
+
+    def get_versions_of_object(self, user, bucket, name):
+        """Return all known versions of an object oldest first including delete markers."""
+        return [self.store.to_file_dict(row) for row in self.store.versions(user, bucket, name)]
 
 
 def dummy_test(change_manager, user, keys, file_dicts, nbuckets):
@@ -21,13 +21,14 @@
 """
 import logging
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from logging.handlers import SysLogHandler
 from config import DATA_PATH_CFG
 from config import CMN_CFG
 from commons.utils import assert_utils
-from commons.utils.system_utils import run_local_cmd
 from commons.params import S3_ENDPOINT
+from scripts.s3_bench.s3loadgen import S3LoadGen
 
 LOGGER = logging.getLogger(__name__)
 
@@ -88,12 +89,29 @@ def _init_s3_conn(access_key, secret_key, user_name):
     return s3
 
 
+def init_s3_client(user_name, keys, max_pool_connections=32):
+    """Create s3 client on a new boto3 session.
+    A client is thread safe, so a process creates one per user and shares it across threads.
+    """
+    access_key, secret_key = keys[0], keys[1]
+    client = None
+    try:
+        session = boto3.session.Session()
+        client = session.client('s3', aws_access_key_id=access_key,
+                                aws_secret_access_key=secret_key,
+                                endpoint_url=CMN_CFG.get('s3_url', S3_ENDPOINT),
+                                config=Config(max_pool_connections=max_pool_connections))
+        LOGGER.info(f's3 client created for user {user_name}')
+    except (ClientError, Exception) as exc:
+        LOGGER.error(
+            f'could not create s3 client for user {user_name} with '
+            f'access key {access_key} exception:{exc}')
+    return client
+
+
 def run_s3bench(test_conf, bucket, keys):
     """
-    concurrent users operations using S3bench
-    yum install go
-    go get github.com/igneous-systems/s3bench
-    git clone https://github.com/igneous-systems/s3bench at /root/go/src/
+    concurrent users operations using the native s3bench load generator
     :param keys: access key and secret key
     :param test_conf: test config
     :type test_conf: dict
@@ -103,20 +121,15 @@ def run_s3bench(test_conf, bucket, keys):
     """
     LOGGER.info("concurrent users TC using S3bench")
     access_key, secret_key = keys
-    cmd = DATA_PATH_CFG["data_path"]["s3bench_cmd"].format(access_key,
-                                                           secret_key,
-                                                           bucket,
-                                                           DATA_PATH_CFG["data_path"]["endpoint"],
-                                                           DATA_PATH_CFG["data_path"]["clients"],
-                                                           DATA_PATH_CFG["data_path"]["samples"],
-                                                           test_conf["obj_prefix"],
-                                                           DATA_PATH_CFG["data_path"]["obj_size"])
-    resp = run_local_cmd(cmd)
+    loadgen = S3LoadGen(access_key, secret_key, bucket=bucket,
+                        end_point=DATA_PATH_CFG["data_path"]["endpoint"],
+                        num_clients=int(DATA_PATH_CFG["data_path"]["clients"]),
+                        num_sample=int(DATA_PATH_CFG["data_path"]["samples"]),
+                        obj_name_pref=test_conf["obj_prefix"],
+                        obj_size=DATA_PATH_CFG["data_path"]["obj_size"],
+                        validate_certs=False)
+    resp = loadgen.run()
     LOGGER.debug(resp)
-    assert_utils.assert_true(resp[0], resp[1])
-    assert_utils.assert_is_not_none(resp[1], resp)
-    resp_split = resp[1].split("\\n")
-    resp_filtered = [i for i in resp_split if 'Number of Errors' in i]
-    for response in resp_filtered:
-        LOGGER.debug(response)
-        assert_utils.assert_equal(int(response.split(":")[1].strip()), 0, response)
+    for operation, stats in resp["operations"].items():
+        assert_utils.assert_equal(stats["number_of_errors"], 0,
+                                  f"{operation} errors: {stats['errors']}")
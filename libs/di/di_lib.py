@@ -334,19 +334,22 @@ def restart_s3_processes_k8s():
     return False
 
 
-def get_random_ranges(size: int, greater_than_unit_size: bool = False):
+def get_random_ranges(size: int, greater_than_unit_size: bool = False,
+                      rand: random.Random = None):
     """
     will return random range
     :param size: in bytes
     :param greater_than_unit_size: true/false
     if true, range will be returned between 1 MB and rest of size
+    :param rand: seeded Random for reproducible ranges, SystemRandom if None
     """
     start = 0
     end = size
     if greater_than_unit_size:
         start = 1 * MB
-    first = random.SystemRandom().randint(start, end)
-    second = random.SystemRandom().randint(start, end)
+    rand = rand or random.SystemRandom()
+    first = rand.randint(start, end)
+    second = rand.randint(start, end)
     if second < first:
         return second, first
     return first, second
@@ -28,6 +28,7 @@ from http import HTTPStatus
 from config import DI_CFG
 from commons.utils import assert_utils
 from libs.s3 import cortxcli_test_lib as cctl
+from libs.csm.rest.csm_rest_bulk_ops import RestBulkOps
 from libs.csm.rest.csm_rest_s3user import RestS3user
 from libs.s3.s3_restapi_test_lib import S3AccountOperationsRestAPI
 from libs.s3.iam_test_lib import IamTestLib
@@ -108,14 +109,13 @@ class ManagementOPs:
         :return:
         """
         LOGGER.info(f"Creating Cortx s3 account users with {use_cortx_cli}")
-        if use_cortx_cli:
-            s3acc_obj = cctl.CortxCliTestLib()
-            s3acc_obj.open_connection()
-        else:
-            s3acc_obj = RestS3user()
         ts = time.strftime("%Y%m%d_%H%M%S")
         users = {"{}{}_{}".format(cls.user_prefix, i, ts): dict() for i in range(1, nusers + 1)}
         s3_user_passwd = DI_CFG["DiUserConfig"]["s3_account"]["password"]
+        if not use_cortx_cli:
+            return cls.create_account_users_bulk(list(users), s3_user_passwd)
+        s3acc_obj = cctl.CortxCliTestLib()
+        s3acc_obj.open_connection()
         for i in range(1, nusers + 1):
             udict = dict()
             user = "{}{}_{}".format(cls.user_prefix, i, ts)
@@ -123,17 +123,9 @@ class ManagementOPs:
             udict.update({'user_name': user})
             udict.update({'emailid': email})
             udict.update({'password': s3_user_passwd})
-            if use_cortx_cli:
-                result, acc_details = s3acc_obj.create_account_cortxcli(
-                    user, email, s3_user_passwd)
-                assert_utils.assert_true(result, 'S3 account user not created.')
-            else:
-                resp = s3acc_obj.create_an_account(
-                    user, s3_user_passwd)
-                assert_utils.assert_equal(
-                    resp.status_code, 201,
-                    'S3 account user not created.')
-                acc_details = json.loads(resp.text)
+            result, acc_details = s3acc_obj.create_account_cortxcli(
+                user, email, s3_user_passwd)
+            assert_utils.assert_true(result, 'S3 account user not created.')
 
             LOGGER.info("Created s3 account %s", user)
             udict.update({'accesskey': acc_details["access_key"]})
@@ -142,6 +134,35 @@ class ManagementOPs:
         LOGGER.debug("Users %s created for I/O", users)
         return users
 
+    @classmethod
+    def create_account_users_bulk(cls, user_names: list, password: str,
+                                  concurrency: int = 16) -> dict:
+        """
+        Creates s3 account users concurrently over REST.
+        :param user_names: names of the accounts
+        :param password: account password
+        :param concurrency: max requests in flight
+        :return: dict of user name to account details
+        """
+        report = RestBulkOps().run("s3_account", "create", user_names, concurrency=concurrency,
+                                   keep_responses=True, password=password)
+        assert_utils.assert_equal(report.failed, 0,
+                                  f'S3 account users not created: {report.errors}')
+        # Keys are returned only on create, they are unknown for accounts which existed
+        unknown = [user for user in user_names if user not in report.responses]
+        assert_utils.assert_equal(unknown, [],
+                                  f'S3 account users already exist, keys unknown: {unknown}')
+        users = dict()
+        for user in user_names:
+            acc_details = report.responses[user]
+            keys = acc_details["keys"][0] if "keys" in acc_details else acc_details
+            users[user] = {'user_name': user, 'emailid': user + cls.email_suffix,
+                           'password': password, 'accesskey': keys["access_key"],
+                           'secretkey': keys["secret_key"]}
+        LOGGER.info("Created %s s3 accounts, create latency %s", len(users),
+                    report.as_dict()["latency"])
+        return users
+
     @classmethod
     def create_buckets(cls, nbuckets, users=None, use_cortxcli=False):
         """
@@ -60,8 +60,17 @@ class ASyncIO:
 
 class RunDataCheckManager(ASyncIO):
 
-    def __init__(self, users):
-        self.uploader = uploader.Uploader()
+    def __init__(self, users, backend='threads'):
+        """
+        :param users: User dict with user and bucket information
+        :param backend: 'threads' for the boto3 thread uploader or 'asyncio' for the
+            aiohttp based driver which keeps thousands of requests in flight
+        """
+        if backend == 'asyncio':
+            from libs.di import aio_driver
+            self.uploader = aio_driver.AsyncUploader()
+        else:
+            self.uploader = uploader.Uploader()
         self.users = users
         self.future_value = Value('b', False)
         self.future_thread_value = threading.Event()
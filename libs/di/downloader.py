@@ -19,23 +19,225 @@
 #
 """Download S3 files in multiple threads and micro threads.
 Simulates parallel downloads.
+Objects are streamed into the hasher, nothing is written to local disk. Uploaded objects
+manifest is sharded across processes each having its own boto3 sessions and thread pool.
+Sampled mode verifies random byte ranges of a fraction of objects against data regenerated
+from their seed.
 """
 import os
 import logging
 import csv
-import queue
+import time
+import random
 import hashlib
-from pathlib import Path
+import threading
+import multiprocessing as mp
+from array import array
 from commons import params
-from commons import worker
-from commons.utils import system_utils
+from commons.worker import BoundedExecutor
 from libs.di import di_base
+from libs.di import di_lib
+from libs.di import data_man
+from libs.di import data_generator
 from libs.di.di_mgmt_ops import ManagementOPs
 from libs.di import uploader
 
 LOGGER = logging.getLogger(__name__)
 
 
+def stream_md5(client, bucket, key, read_size=params.DI_READ_SIZE):
+    """Stream object body into md5 hasher.
+    :return: tuple of md5 hex digest and object size.
+    """
+    body = client.get_object(Bucket=bucket, Key=key)['Body']
+    file_hash = hashlib.md5()
+    nbytes = 0
+    try:
+        for chunk in body.iter_chunks(chunk_size=read_size):
+            file_hash.update(chunk)
+            nbytes += len(chunk)
+    finally:
+        body.close()
+    return file_hash.hexdigest(), nbytes
+
+
+def read_deleted_objects():
+    """Read deleted objects file and return dict of (user, bucket, object) to checksum."""
+    deleted = dict()
+    if os.path.exists(params.DELETE_OP_FILE_NAME):
+        with open(params.DELETE_OP_FILE_NAME, newline='') as f:
+            for ent in csv.reader(f):
+                if len(ent) == 4:
+                    deleted[(ent[0], ent[1], ent[2])] = ent[3]
+                else:
+                    LOGGER.error("Skipped considering deleted file {}".format(ent))
+    return deleted
+
+
+def percentile(sorted_values, pct):
+    """Nearest rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_pipelined(items, verify, nthreads=params.NWORKERS, stop_event=None):
+    """
+    Run verify(item) for items on a BoundedExecutor which keeps at most 2 * nthreads queued.
+    verify returns tuple of (matched, nbytes) and raises on server error.
+    :return: dict of stats, latencies and failed items.
+    """
+    stats = dict(verified=0, bytes=0, mismatch=0, server_error=0, latencies=array('d'),
+                 failed_files=list(), failed_files_server_error=list())
+    lock = threading.Lock()
+
+    def _verify(item):
+        start = time.perf_counter()
+        try:
+            matched, nbytes = verify(item)
+        except Exception as fault:
+            LOGGER.error(f'Final object download failed for {item} with exception {fault}')
+            with lock:
+                stats['server_error'] += 1
+                stats['failed_files_server_error'].append(item)
+            return
+        with lock:
+            stats['latencies'].append(time.perf_counter() - start)
+            stats['verified'] += 1
+            stats['bytes'] += nbytes
+            if not matched:
+                stats['mismatch'] += 1
+                stats['failed_files'].append(item)
+
+    with BoundedExecutor(nworkers=nthreads, stop_event=stop_event, name='verify') as executor:
+        for item in items:
+            executor.submit(_verify, item)
+    return stats
+
+
+def init_clients(users, nthreads):
+    """Create s3 client per user for current process."""
+    return {user: di_base.init_s3_client(user, [udict['accesskey'], udict['secretkey']],
+                                         max_pool_connections=nthreads)
+            for user, udict in users.items()}
+
+
+def verify_shard(shard, nshards, users, nthreads=params.NWORKERS):
+    """
+    Verify every nshards-th object of uploaded objects manifest starting at shard.
+    Runs in a pool process with its own s3 clients and thread pool.
+    :return: dict of shard stats, latencies and failed items.
+    """
+    clients = init_clients(users, nthreads)
+    deleted = read_deleted_objects()
+    counts = dict(uploaded=0, skipped=0)
+
+    def _items():
+        with open(params.UPLOADED_FILES, newline='') as f:
+            for ix, ent in enumerate(csv.reader(f)):
+                if ix % nshards != shard or ent[0] not in users:
+                    continue
+                counts['uploaded'] += 1
+                if (ent[0], ent[1], ent[2]) in deleted:
+                    counts['skipped'] += 1
+                    continue
+                yield dict(user=ent[0], bucket=ent[1], objectpath=ent[2], objcsum=ent[3])
+
+    def _verify(kwargs):
+        csum, nbytes = stream_md5(clients[kwargs['user']], kwargs['bucket'],
+                                  kwargs['objectpath'])
+        if csum == kwargs['objcsum'].strip():
+            LOGGER.debug(f"download object checksum {csum} matches for {kwargs['objectpath']}")
+            return True, nbytes
+        LOGGER.error(f"download object checksum {csum} does not match provided checksum "
+                     f"{kwargs['objcsum']} for file {kwargs['objectpath']}")
+        return False, nbytes
+
+    stats = run_pipelined(_items(), _verify, nthreads)
+    stats.update(counts)
+    return stats
+
+
+def verify_sampled_shard(shard, nshards, users, sample_rate, nranges,
+                         nthreads=params.NWORKERS, rand_seed=None):
+    """
+    Verify a random sample of objects known to DataManager with ranged GETs.
+    Sampled ranges are regenerated locally from object seed and compared byte to byte.
+    With rand_seed the same objects and ranges are verified on every run.
+    :return: dict of shard stats, latencies and failed items.
+    """
+    clients = init_clients(users, nthreads)
+    rand = random.Random(None if rand_seed is None else rand_seed + shard)
+    store = data_man.MetadataStore()
+    counts = dict(uploaded=0, skipped=0, sampled=0, unverifiable=0)
+
+    def _items():
+        for ix, row in enumerate(store.iter_latest()):
+            if ix % nshards != shard or row['user'] not in users:
+                continue
+            counts['uploaded'] += 1
+            if rand.random() >= sample_rate:
+                continue
+            fdict = store.to_file_dict(row)
+            if 'c_ratio' not in fdict or not fdict['sz']:
+                counts['unverifiable'] += 1
+                continue
+            counts['sampled'] += 1
+            ranges = [di_lib.get_random_ranges(fdict['sz'] - 1, rand=rand)
+                      for _ in range(nranges)]
+            yield dict(user=row['user'], bucket=row['bucket'], objectpath=row['name'],
+                       seed=fdict['seed'], size=fdict['sz'], c_ratio=fdict['c_ratio'],
+                       d_ratio=fdict.get('d_ratio', 1), ranges=ranges)
+
+    def _verify(kwargs):
+        gen = data_generator.SeededDataGenerator(c_ratio=kwargs['c_ratio'],
+                                                 d_ratio=kwargs['d_ratio'])
+        nbytes = 0
+        for first, last in kwargs['ranges']:
+            body = clients[kwargs['user']].get_object(
+                Bucket=kwargs['bucket'], Key=kwargs['objectpath'],
+                Range=f'bytes={first}-{last}')['Body']
+            try:
+                data = body.read()
+            finally:
+                body.close()
+            nbytes += len(data)
+            if data != gen.generate_range(kwargs['size'], kwargs['seed'], first,
+                                          last - first + 1):
+                LOGGER.error(f"range {first}-{last} of object {kwargs['objectpath']} "
+                             f"does not match regenerated data")
+                return False, nbytes
+        return True, nbytes
+
+    stats = run_pipelined(_items(), _verify, nthreads)
+    stats.update(counts)
+    return stats
+
+
+def _verify_shard(args):
+    """Pool entry point."""
+    return verify_shard(*args)
+
+
+def _verify_sampled_shard(args):
+    """Pool entry point."""
+    return verify_sampled_shard(*args)
+
+
+def detection_upper_bound(nsampled, nfailed, confidence):
+    """
+    Upper bound of fraction of corrupted objects at given confidence when no corruption
+    is found in nsampled objects, 1 - (1 - confidence) ** (1 / nsampled).
+    Observed failure rate is returned when corruption is found.
+    """
+    if nfailed:
+        return nfailed / nsampled
+    if not nsampled:
+        return 1.0
+    return 1 - (1 - confidence) ** (1.0 / nsampled)
+
+
 class DataIntegrityValidator:
     s3_objects = dict()
     failed_files = list()
@@ -43,146 +245,124 @@ class DataIntegrityValidator:
 
     @staticmethod
     def download_and_compare_chksum(kwargs):
-        """ Download file with s3cmd "s3://bucket/ObjectPath" test_output_file
-            compare downloaded file's md5sum with prior stored
+        """ Stream object "s3://bucket/ObjectPath" and
+            compare its md5sum with prior stored
         """
+        user = kwargs.get('user')
+        objectpath = kwargs.get('objectpath')
+        bucket = kwargs.get('bucket')
+        objcsum = kwargs.get('objcsum')
         try:
-            user = kwargs.get('user')
-            objectpath = kwargs.get('objectpath')
-            bucket = kwargs.get('bucket')
-            objcsum = kwargs.get('objcsum')
-            cwd = params.DOWNLOAD_HOME
-            basepath = os.path.join(cwd, user)
-            objpth = os.path.join(cwd, user, objectpath)
-            try:
-                if not os.path.exists(basepath):
-                    system_utils.mkdirs(basepath)
-            except (OSError, Exception) as fault:
-                LOGGER.error(f"Error {fault} while creating directory for user {user}")
-
-            try:
-                s3 = DataIntegrityValidator.s3_objects[user]
-            except Exception as fault:
-                print(fault)
-                LOGGER.error(f'No S3 Connection for user {kwargs} in S3 sessions list {fault}')
-                LOGGER.error(f"Won't be able to download object {kwargs} without connection")
-                return
-            try:
-                s3.meta.client.download_file(bucket, objectpath, objpth)
-                LOGGER.info(f'downloaded object : {kwargs}')
-            except Exception as e:
-                print(e)
-                LOGGER.error(f'Final object download failed for {kwargs} with exception {e}')
-                DataIntegrityValidator.failed_files_server_error.append(kwargs)
-            else:
-                print("Downloaded file '{}' from '{}'".format(objectpath, bucket))
-                filepath = objpth
-                sz = Path(filepath).stat().st_size
-                read_sz = 8192
-                csum = None
-                with open(filepath, 'rb') as fp:
-                    file_hash = hashlib.md5()
-                    if sz < read_sz:
-                        buf = fp.read(sz)
-                    else:
-                        buf = fp.read(read_sz)
-                    while buf:
-                        file_hash.update(buf)
-                        buf = fp.read(read_sz)
-                    csum = file_hash.hexdigest()
-                    try:
-                        os.unlink(filepath)
-                    except (OSError, Exception) as fault:
-                        LOGGER.error('Fault %s occurred duing unlink. Trying rm command', fault)
-                        rmLocalObject = "rm -rf " + str(filepath)
-                        os.system(rmLocalObject)
-
-                if objcsum == csum.strip():
-                    LOGGER.info(
-                        "download object checksum {} matches provided checksum {} for file {}".format(csum, objcsum,
-                                                                                                      objectpath))
-                else:
-                    LOGGER.error(
-                        "download object checksum {} does not matches provided checksum {} for file {}".format(csum,
-                                                                                                               objcsum,
-                                                                                                               objectpath))
-                    DataIntegrityValidator.failed_files.append(kwargs)
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
+            s3 = DataIntegrityValidator.s3_objects[user]
         except Exception as fault:
-            LOGGER.exception(fault)
-            LOGGER.error(f'Exception occurred for item {kwargs} with exception {fault}')
+            LOGGER.error(f'No S3 Connection for user {kwargs} in S3 sessions list {fault}')
+            LOGGER.error(f"Won't be able to download object {kwargs} without connection")
+            return
+        try:
+            csum, _ = stream_md5(s3.meta.client, bucket, objectpath)
+            LOGGER.info(f'downloaded object : {kwargs}')
+        except Exception as e:
+            LOGGER.error(f'Final object download failed for {kwargs} with exception {e}')
+            DataIntegrityValidator.failed_files_server_error.append(kwargs)
+            return
+        if objcsum == csum.strip():
+            LOGGER.info(
+                "download object checksum {} matches provided checksum {} for file {}".format(
+                    csum, objcsum, objectpath))
+        else:
+            LOGGER.error(
+                "download object checksum {} does not matches provided checksum {} for "
+                "file {}".format(csum, objcsum, objectpath))
+            DataIntegrityValidator.failed_files.append(kwargs)
 
     @classmethod
-    def verify_data_integrity(cls, users):
+    def verify_data_integrity(cls, users, nprocs=None, nthreads=params.NWORKERS):
         """
         UploadInfo File format supported is
         #user7,user7-8844buckets0,naPcn6qP47SkUPkxbP_PtJUVF1iv.json,7e2db9e2f7621db0ddfde4d294e92eca
-        Downloads the file and compare checksum.
-        :return:
+        Streams the objects and compare checksum. Manifest is sharded across nprocs
+        processes each running nthreads downloads.
+        :param users: Users dict with access and secret keys.
+        :param nprocs: Number of processes, defaults to cpu count.
+        :param nthreads: Number of download threads per process.
+        :return: summary dict with counts, throughput and latency percentiles.
         """
-        workers = worker.Workers()
-        workers.start_workers()
-        cls.s3_objects = di_base.init_s3_connections(users=users)
-        deletedFiles = list()
-        uploadedFiles = list()
-        deletedDict = dict()
         summary = dict()
-        with open(params.UPLOADED_FILES, newline='') as f:
-            reader = csv.reader(f)
-            # uploadedFiles = list(reader)
-            uploadedFiles = [el for el in list(reader) if el[0] in users.keys()]
-
-        if len(uploadedFiles) == 0:
-            print("uploaded data not found, exiting script")
+        if not os.path.exists(params.UPLOADED_FILES):
             LOGGER.info("uploaded data not found, exiting script")
-            workers.end_workers()
-            return
+            return summary
+        nprocs = nprocs or os.cpu_count() or 1
+        start = time.perf_counter()
+        with mp.Pool(processes=nprocs) as pool:
+            shards = pool.map(_verify_shard, [(shard, nprocs, users, nthreads)
+                                              for shard in range(nprocs)])
+        return cls._summarize(shards, time.perf_counter() - start)
 
-        if os.path.exists(params.DELETE_OP_FILE_NAME):
-            with open(params.DELETE_OP_FILE_NAME, newline='') as f:
-                reader = csv.reader(f)
-                deletedFiles = list(reader)
-        summary['deleted_files'] = len(deletedFiles)
+    @classmethod
+    def verify_data_integrity_sampled(cls, users, sample_rate=0.1, nranges=2, confidence=0.95,
+                                      nprocs=None, nthreads=params.NWORKERS, rand_seed=None):
+        """
+        Fast statistical DI check between fault injections.
+        A sample_rate fraction of objects known to DataManager is verified by reading
+        nranges random byte ranges (di_lib.get_random_ranges) and comparing them with data
+        regenerated from object seed. Run verify_data_integrity for a full sweep.
+        :param users: Users dict with access and secret keys.
+        :param sample_rate: Fraction of objects to be verified.
+        :param nranges: Number of ranged GETs per sampled object.
+        :param confidence: Confidence level for reported corruption upper bound.
+        :param nprocs: Number of processes, defaults to cpu count.
+        :param nthreads: Number of download threads per process.
+        :param rand_seed: Seed for reproducible sampling.
+        :return: summary dict, corruption_upper_bound is the max fraction of corrupted
+            objects at confidence level.
+        """
+        nprocs = nprocs or os.cpu_count() or 1
+        start = time.perf_counter()
+        with mp.Pool(processes=nprocs) as pool:
+            shards = pool.map(_verify_sampled_shard, [
+                (shard, nprocs, users, sample_rate, nranges, nthreads, rand_seed)
+                for shard in range(nprocs)])
+        summary = cls._summarize(shards, time.perf_counter() - start)
+        if not summary:
+            return summary
+        summary['sampled_files'] = sum(shard['sampled'] for shard in shards)
+        summary['checksum_verified'] = summary['sampled_files']
+        summary['unverifiable_files'] = sum(shard['unverifiable'] for shard in shards)
+        summary['sample_rate'] = sample_rate
+        summary['confidence'] = confidence
+        summary['corruption_upper_bound'] = detection_upper_bound(
+            summary['sampled_files'], summary['failed_files'], confidence)
+        LOGGER.info("Sampled {} of {} objects, corrupted fraction is below {:.4%} with {:.0%} "
+                    "confidence".format(summary['sampled_files'], summary['uploaded_files'],
+                                        summary['corruption_upper_bound'], confidence))
+        return summary
 
-        for f in deletedFiles:
-            if len(f) == 4:
-                deletedDict[(f[0], f[1], f[2])] = f[3]
-            else:
-                LOGGER.error("Skipped considering deleted file {}".format(f))
+    @classmethod
+    def _summarize(cls, shards, duration):
+        """Combine shard stats, write failed files and log summary."""
+        summary = dict()
+        uploaded = sum(shard['uploaded'] for shard in shards)
+        if uploaded == 0:
+            LOGGER.info("uploaded data not found, exiting script")
+            return summary
 
-        for i in range(1, params.NUSERS + 1):
-            try:
-                if not os.path.exists(os.path.join(params.DOWNLOAD_HOME,
-                                                   ManagementOPs.user_prefix + str(i))):
-                    system_utils.mkdirs(os.path.join(params.DOWNLOAD_HOME,
-                                                     ManagementOPs.user_prefix + str(i)))
-            except (OSError, Exception) as exe:
-                LOGGER.error(f"Error {exe} while creating directory for user {i}")
-
-        for ix, ent in enumerate(uploadedFiles, 1):
-            if (ent[0], ent[1], ent[2]) in deletedDict:
-                continue
-            workQ = queue.Queue()
-            workQ.func = cls.download_and_compare_chksum
-            kwargs = dict()
-            kwargs['user'] = ent[0]
-            kwargs['objectpath'] = ent[2]
-            kwargs['bucket'] = ent[1]
-            kwargs['objcsum'] = ent[3]
-            kwargs['accesskey'] = users.get(ent[0])['accesskey']
-            kwargs['secret'] = users.get(ent[0])['secretkey']
-            workQ.put(kwargs)
-            workers.wenque(workQ)
-            LOGGER.info(f"Enqueued item {ix} for download and checksum compare")
-            # if workQ is not None:
-            #    workQ.join()
-            # workQ = None
-        LOGGER.info(f"processed items {ix} for data integrity check")
-
-        summary['failed_files'] = len(cls.failed_files) + len(cls.failed_files_server_error)
-        summary['uploaded_files'] = ix
+        cls.failed_files = [item for shard in shards for item in shard['failed_files']]
+        cls.failed_files_server_error = [item for shard in shards
+                                         for item in shard['failed_files_server_error']]
+        latencies = sorted(lat for shard in shards for lat in shard['latencies'])
+        nbytes = sum(shard['bytes'] for shard in shards)
+        summary['uploaded_files'] = uploaded
+        summary['deleted_files'] = sum(shard['skipped'] for shard in shards)
         summary['checksum_verified'] = summary['uploaded_files'] - summary['deleted_files']
+        summary['checksum_mismatch'] = len(cls.failed_files)
+        summary['server_errors'] = len(cls.failed_files_server_error)
+        summary['failed_files'] = summary['checksum_mismatch'] + summary['server_errors']
+        summary['bytes_verified'] = nbytes
+        summary['duration'] = duration
+        summary['throughput_mbps'] = nbytes / (1024 * 1024) / duration if duration else 0.0
+        summary['objects_per_sec'] = len(latencies) / duration if duration else 0.0
+        summary['latency_p50'] = percentile(latencies, 50)
+        summary['latency_p99'] = percentile(latencies, 99)
 
         if len(cls.failed_files) > 0:
             keys = cls.failed_files[0].keys()
@@ -202,14 +382,15 @@ class DataIntegrityValidator:
                 wr = csv.DictWriter(fp, keys)
                 wr.writerows(cls.failed_files_server_error)
 
-        workers.end_workers()
-        LOGGER.info('Workers shutdown completed successfully')
         LOGGER.info("Test run summary Uploaded files {}  "
                     "Deleted Files {} ".format(summary['uploaded_files'],
                                                summary['deleted_files']))
         LOGGER.info("Failed files were {}  and "
                     "Checksum verified for Files {} ".format(summary['failed_files'],
                                                              summary['checksum_verified']))
+        LOGGER.info("Verified {} bytes in {:.2f}s, {:.2f} MB/s, p50 {:.4f}s p99 {:.4f}s".format(
+            nbytes, duration, summary['throughput_mbps'], summary['latency_p50'],
+            summary['latency_p99']))
         return summary
 
 
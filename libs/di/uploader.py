@@ -20,19 +20,20 @@
 
 """Multithreaded and greenlet based Upload tasks. Upload files and data blobs."""
 
+import io
 import os
 import sys
-import queue
 import random
 import logging
 import csv
 import hashlib
+import functools
 import time
 import multiprocessing as mp
 from multiprocessing import Manager, Event
 from boto3.s3.transfer import TransferConfig
 from commons.utils import config_utils
-from commons.worker import Workers
+from commons.worker import BoundedExecutor
 from commons import params
 from libs.di import di_base
 from libs.di import data_man
@@ -49,6 +50,62 @@ uploadObjects = []
 LOGGER = logging.getLogger(__name__)
 
 
+class HashingBufferReader(io.RawIOBase):
+    """Read only file object over an in-memory buffer which md5 hashes bytes as they are read.
+
+    Bytes are hashed once in offset order, so a seek back for a retried part does not
+    corrupt the digest. hexdigest() hashes any tail which was not read yet.
+    """
+
+    def __init__(self, buf) -> None:
+        super().__init__()
+        self._view = memoryview(buf).cast('B')
+        self._pos = 0
+        self._hashed = 0
+        self._md5 = hashlib.md5()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        self._pos = max(0, min(pos, len(self._view)))
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        if self._pos <= self._hashed < end:
+            self._md5.update(self._view[self._hashed:end])
+            self._hashed = end
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def hexdigest(self) -> str:
+        if self._hashed < len(self._view):
+            self._md5.update(self._view[self._hashed:])
+            self._hashed = len(self._view)
+        return self._md5.hexdigest()
+
+
 class Uploader:
     """Simulates Uploads client upto 10k."""
     tsfrConfig = TransferConfig(multipart_threshold=1024 * 1024 * 16,
@@ -59,6 +116,13 @@ class Uploader:
     def __init__(self):
         self.change_manager = data_man.DataManager()
 
+    @staticmethod
+    def _log_failure(bucket, file_number, future):
+        """Log the exception of a failed upload future."""
+        if not future.cancelled() and future.exception() is not None:
+            LOGGER.error("Upload of file %s in bucket %s failed: %s", file_number, bucket,
+                         future.exception())
+
     def upload(self, user, keys, buckets, files_count, prefs, stop_event, future_obj):
         user_name = user.replace('_', '-')
         timestamp = time.strftime(params.DT_PATTERN_PREFIX)
@@ -67,15 +131,13 @@ class Uploader:
                                              nworkers=params.NWORKERS)
         pool_len = len(s3connections)
 
-        workers = Workers()
-        workers.start_workers(func=self._upload)
+        executor = BoundedExecutor(nworkers=params.NWORKERS, stop_event=stop_event,
+                                   name=f'upload-{user}')
         if future_obj:
             future_obj.value = True
         for bucket in buckets:
             for ix in range(files_count):
                 if not stop_event.is_set():
-                    workQ = queue.Queue()
-                    workQ.func = self._upload
                     kwargs = dict()
                     kwargs['user'] = user
                     kwargs['bucket'] = bucket
@@ -83,8 +145,9 @@ class Uploader:
                     kwargs['pool_len'] = pool_len
                     kwargs['file_number'] = ix
                     kwargs['prefs'] = prefs
-                    workQ.put(kwargs)
-                    workers.wenque(workQ)
+                    future = executor.submit(self._upload, kwargs)
+                    future.add_done_callback(
+                        functools.partial(self._log_failure, bucket, ix))
                 else:
                     LOGGER.debug(
                         "Stop event has been set, remaining objects will be "
@@ -93,11 +156,12 @@ class Uploader:
                           " skipped.")
                     break
                 LOGGER.info(
-                    f"Enqueued item {ix} for download and checksum compare")
+                    f"Enqueued item {ix} for upload")
             LOGGER.info(
                 f"processed items {ix} to upload for user {user}")
-        workers.end_workers()
-        LOGGER.info('Upload Workers shutdown completed successfully')
+        executor.shutdown(wait=True)
+        LOGGER.info('Upload Workers shutdown completed successfully, stats %s',
+                    executor.stats.as_dict())
         if len(uploadObjects) > 0:
             with open(params.UPLOADED_FILES, 'a', newline='') as fp:
                 wr = csv.writer(
@@ -121,33 +185,67 @@ class Uploader:
         # get random size
         seed = data_generator.DataGenerator.get_random_seed()
         size = random.sample(data_generator.SMALL_BLOCK_SIZES, 1)[0]
-        gen = data_generator.DataGenerator(c_ratio=2)
+        gen = data_generator.SeededDataGenerator(c_ratio=2)
         buf, csum = gen.generate(size, seed=seed)
-        file_path = gen.save_buf_to_file(buf, csum, 1024 * 1024, prefix)
         s3 = s3connections[random.randint(0, pool_len - 1)]
+        if prefs.get('upload_via_file', False):
+            resp = self._upload_via_file(s3, gen, buf, csum, bucket, prefix)
+        else:
+            resp = self._upload_stream(s3, gen, buf, csum, bucket)
+        if not resp:
+            return
+        obj_name, md5sum, mtime = resp
+        print(f'uploaded object {obj_name} for user {user_name}')
+        row_data = [user_name, bucket, obj_name, md5sum]
+        uploadObjects.append(row_data)
+        file_object = dict(name=obj_name, checksum=md5sum, seed=seed,
+                           size=size, c_ratio=gen.compression_ratio,
+                           d_ratio=gen.dedupe_ratio, mtime=mtime)
+        self.change_manager.add_file_to_bucket(
+            user_name, bucket, file_object)
+
+    @staticmethod
+    def _upload_stream(s3, gen, buf, csum, bucket):
+        """
+        Upload generated buffer straight from memory, md5 is computed as boto reads the buffer.
+        :return: tuple of object name, md5 and mtime or None on failure.
+        """
+        obj_name = gen.get_object_name(csum)
+        reader = HashingBufferReader(buf)
+        try:
+            s3.meta.client.upload_fileobj(reader, bucket, obj_name,
+                                          Config=Uploader.tsfrConfig)
+        except Exception as e:
+            LOGGER.info(
+                f'{obj_name} in bucket {bucket} Upload caught exception: {e}')
+            return None
+        LOGGER.info(f'{obj_name} in bucket {bucket} Upload Done')
+        return obj_name, reader.hexdigest(), time.time()
+
+    @staticmethod
+    def _upload_via_file(s3, gen, buf, csum, bucket, prefix):
+        """
+        Debug path which saves generated buffer under DATAGEN_HOME before upload.
+        :return: tuple of object name, md5 and mtime or None on failure.
+        """
+        file_path = gen.save_buf_to_file(buf, csum, 1024 * 1024, prefix)
+        obj_name = os.path.basename(file_path)
         try:
             s3.meta.client.upload_file(str(file_path),
                                        bucket,
-                                       os.path.basename(file_path),
+                                       obj_name,
                                        Config=Uploader.tsfrConfig)
-            print(f'uploaded file {file_path} for user {user_name}')
         except Exception as e:
             LOGGER.info(
                 f'{file_path} in bucket {bucket} Upload caught exception: {e}')
-        else:
-            LOGGER.info(f'{file_path} in bucket {bucket} Upload Done')
-            with open(file_path, 'rb') as fp:
-                md5sum = hashlib.md5(fp.read()).hexdigest()
-            obj_name = os.path.basename(file_path)
-            stat_info = os.stat(file_path)
-            row_data = [user_name, bucket, obj_name, md5sum]
-            uploadObjects.append(row_data)
-            file_object = dict(name=obj_name, checksum=md5sum, seed=seed,
-                               size=size, mtime=stat_info.st_mtime)
-            self.change_manager.add_file_to_bucket(
-                user_name, bucket, file_object)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            return None
+        LOGGER.info(f'{file_path} in bucket {bucket} Upload Done')
+        with open(file_path, 'rb') as fp:
+            md5sum = hashlib.md5(fp.read()).hexdigest()
+        mtime = os.stat(file_path).st_mtime
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return obj_name, md5sum, mtime
 
     def start(self, users, buckets, files_count, prefs, stop_event, future_obj=None):
         LOGGER.info(f'Starting uploads for users {users}')
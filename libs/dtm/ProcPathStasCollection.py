@@ -26,6 +26,7 @@ from datetime import datetime
 from multiprocessing import Process
 
 from commons.constants import PID_WATCH_LIST, REQUIRED_MODULES
+from commons.helpers.fanout_helper import run_on_all
 from commons.helpers.pods_helper import LogicalNode
 from commons.params import LOG_DIR_NAME, LATEST_LOG_FOLDER
 from commons.commands import PROC_CMD
@@ -83,8 +84,12 @@ class EnableProcPathStatsCollection:
         function to collect pids and write them to a file
         :param worker_stat_files_dict: dictionary containing filename and worker object
         """
+        results = run_on_all(worker_stat_files_dict,
+                             lambda worker: self.get_pids(worker, PID_WATCH_LIST))
         for file_name, worker in worker_stat_files_dict.items():
-            pid_dict = self.get_pids(worker=worker, watch_list=PID_WATCH_LIST)
+            if not results[file_name].success:
+                raise results[file_name].error
+            pid_dict = results[file_name].output
             file_path = os.path.join(self.log_path, worker.hostname)
             with open("{}".format(file_path), 'a') as fp:
                 fp.write(f"\npids : {pid_dict} file_name : {file_name}\n")
@@ -41,9 +41,11 @@ from commons import pswdmanager
 from commons.constants import Rest as Const
 from commons.exceptions import CTException
 from commons.helpers.pods_helper import LogicalNode
+from commons.helpers.topology_helper import ClusterTopology
 from commons.utils import config_utils
 from commons.utils import system_utils
 from commons.utils.system_utils import run_local_cmd
+from commons.worker import BoundedExecutor
 from config import CMN_CFG
 from config import CSM_REST_CFG
 from config import HA_CFG
@@ -195,46 +197,58 @@ class HAK8s:
         return resp
 
     # pylint: disable-msg=too-many-locals
-    def delete_s3_acc_buckets_objects(self, s3_data: dict, obj_crud: bool = False):
+    def delete_s3_acc_buckets_objects(self, s3_data: dict, obj_crud: bool = False,
+                                      nworkers: int = 8):
         """
         This function deletes all s3 buckets objects(Versioned or unversioned) for the s3 account
-        and all s3 accounts
+        and all s3 accounts. Buckets are cleaned up in parallel.
         :param s3_data: Dictionary for s3 operation info
         :param obj_crud: If true, it will delete only objects of all buckets
+        :param nworkers: Number of buckets cleaned up in parallel
         :return: (bool, response)
         """
+        def _empty_bucket(s3_del, _bucket, s3_ver=None):
+            if s3_ver:
+                empty_versioned_bucket(s3_ver, _bucket)
+            obj_list = s3_del.object_list(_bucket)
+            LOGGER.debug("List of object response for %s bucket is %s", _bucket, obj_list)
+            response = s3_del.delete_multiple_objects(_bucket, obj_list[1], quiet=True)
+            LOGGER.debug("Delete multiple objects response %s", response)
+            if s3_ver:
+                s3_del.delete_bucket(_bucket, force=True)
+
         try:
             if obj_crud:
+                with BoundedExecutor(nworkers=nworkers, name="obj-cleanup") as executor:
+                    futures = []
+                    for details in s3_data.values():
+                        s3_del = S3TestLib(endpoint_url=S3_CFG["s3_url"],
+                                           access_key=details['accesskey'],
+                                           secret_key=details['secretkey'])
+                        bucket_list = s3_del.bucket_list()[1]
+                        for _bucket in bucket_list:
+                            futures.append(executor.submit(_empty_bucket, s3_del, _bucket))
+                    for future in futures:
+                        future.result()
+                return True, "Successfully performed Objects Delete operation"
+            with BoundedExecutor(nworkers=nworkers, name="s3-cleanup") as executor:
                 for details in s3_data.values():
                     s3_del = S3TestLib(endpoint_url=S3_CFG["s3_url"],
                                        access_key=details['accesskey'],
                                        secret_key=details['secretkey'])
-                    bucket_list = s3_del.bucket_list()[1]
-                    for _bucket in bucket_list:
-                        obj_list = s3_del.object_list(_bucket)
-                        LOGGER.debug("List of object response for %s bucket is %s", _bucket,
-                                     obj_list)
-                        response = s3_del.delete_multiple_objects(_bucket, obj_list[1], quiet=True)
-                        LOGGER.debug("Delete multiple objects response %s", response)
-                return True, "Successfully performed Objects Delete operation"
-            for details in s3_data.values():
-                s3_del = S3TestLib(endpoint_url=S3_CFG["s3_url"],
-                                   access_key=details['accesskey'], secret_key=details['secretkey'])
-                s3_ver = S3VersioningTestLib(access_key=details['accesskey'],
-                                             secret_key=details['secretkey'],
-                                             endpoint_url=S3_CFG["s3_url"])
-                buckets = s3_del.bucket_list()[1]
-                LOGGER.info("Delete all versions and delete markers present for all the buckets.")
-                for _bucket in buckets:
-                    empty_versioned_bucket(s3_ver, _bucket)
-                    obj_list = s3_del.object_list(_bucket)
-                    LOGGER.debug("List of object response for %s bucket %s", _bucket, obj_list)
-                    response = s3_del.delete_multiple_objects(_bucket, obj_list[1], quiet=True)
-                    LOGGER.debug("Delete multiple objects response %s", response[1])
-                    s3_del.delete_bucket(_bucket, force=True)
-                response = self.s3_rest_obj.delete_s3_account(details['user_name'])
-                if not response[0]:
-                    return response
+                    s3_ver = S3VersioningTestLib(access_key=details['accesskey'],
+                                                 secret_key=details['secretkey'],
+                                                 endpoint_url=S3_CFG["s3_url"])
+                    buckets = s3_del.bucket_list()[1]
+                    LOGGER.info("Delete all versions and delete markers present for all the "
+                                "buckets.")
+                    futures = [executor.submit(_empty_bucket, s3_del, _bucket, s3_ver)
+                               for _bucket in buckets]
+                    for future in futures:
+                        future.result()
+                    response = self.s3_rest_obj.delete_s3_account(details['user_name'])
+                    if not response[0]:
+                        return response
             return True, "Successfully performed S3 clean up operations"
         except (ValueError, KeyError, CTException) as error:
             LOGGER.exception("%s %s: %s", Const.EXCEPTION_ERROR,
@@ -1584,6 +1598,7 @@ class HAK8s:
             cmd = common_cmd.K8S_CHANGE_POD_NODE.format(deploy, failover_node)
             try:
                 resp = pod_obj.execute_cmd(cmd=cmd, read_lines=True)
+                ClusterTopology.invalidate_host(pod_obj)
                 LOGGER.debug("Response: %s", resp)
                 LOGGER.info("Successfully failed over pod %s to node %s", pod, failover_node)
                 return True, resp
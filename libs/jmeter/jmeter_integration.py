@@ -27,6 +27,7 @@ import re
 import json
 from commons.commands import JMX_CMD
 from commons.utils import system_utils
+from commons.utils.bench_results import parse_jmeter_statistics
 from commons.utils import config_utils
 from config import JMETER_CFG, CSM_REST_CFG
 
@@ -212,3 +213,13 @@ class JmeterInt():
         data = config_utils.read_content_json(fpath)
         self.log.debug("Request Statistics : \n%s",json.dumps(data,indent=4, sort_keys=True))
         return int(data["Total"]["errorCount"]), int(data["Total"]["sampleCount"])
+
+    @staticmethod
+    def get_results(fpath, **kwargs):
+        """
+        Read the per sampler results from statistics.json file
+        :param fpath: Statistics.json file path
+        :param kwargs: clients and BenchmarkResult fields e.g. build, run_id
+        :return: list of BenchmarkResult
+        """
+        return parse_jmeter_statistics(fpath, **kwargs)
@@ -19,6 +19,7 @@
 
 """Failure Injection adapter which Handles motr emap, checksum, data corruption.
 """
+import json
 import logging
 import secrets
 from string import Template
@@ -80,6 +81,12 @@ class EmapCommand:
             option = "-corrupt_emap " + str(self.opts.get("corrupt_emap"))
             self.add_option(option)
 
+        if self.opts.get("key_offset") is not None and self.opts.get("rec_offset") is not None:
+            # Offsets of the record from emap list json output, skips metadata parsing
+            option = "-key_offset {} -rec_offset {}".format(self.opts.get("key_offset"),
+                                                            self.opts.get("rec_offset"))
+            self.add_option(option)
+
         if self.opts.get("metadata_db_path"):
             # Metadata DB path within each motr fid dir as shown below.
             # /etc/cortx/motr/m0d-0x7200000000000001\:0x32/db/o/100000000000000:2a'
@@ -244,6 +251,44 @@ class MotrCorruptionAdapter(InjectCorruption):
         LOGGER.debug("gob Parity %s", parity_checksum_list)
         return data_checksum_list, parity_checksum_list
 
+    def list_emap_records(self, pod: str, metadata_device, parse_size=PARSE_SIZE) -> list:
+        """
+        List EMAP records of the metadata device in a motr container.
+        :param pod: data pod name
+        :param metadata_device: metadata device path
+        :param parse_size: metadata size to parse
+        :return: list of record dicts with fid, device_id, key_offset, rec_offset, er_cs_nob,
+            checksum and crc fields
+        """
+        cmd = Template(common_cmd.EMAP_LIST_JSON).substitute(path=metadata_device,
+                                                             size=parse_size)
+        resp = self.master_node_list[0].send_k8s_cmd(
+            operation="exec", pod=pod, namespace=NAMESPACE,
+            command_suffix=f"-c {MOTR_CONTAINER_PREFIX}-001 -- {cmd}", decode=True)
+        records = [json.loads(line) for line in resp.splitlines() if line.startswith("{")]
+        LOGGER.debug("%s emap records on %s", len(records), pod)
+        return records
+
+    def verify_emap_records(self, pod: str, metadata_device, parse_size=PARSE_SIZE) -> dict:
+        """
+        Verify CRC of all EMAP records of the metadata device in a motr container.
+        :param pod: data pod name
+        :param metadata_device: metadata device path
+        :param parse_size: metadata size to parse
+        :return: dict with records, mismatches and mismatch_offsets counts and a report
+            list of per record fid, device_id, offsets, crc, computed_crc and crc_ok
+        """
+        cmd = Template(common_cmd.EMAP_VERIFY).substitute(path=metadata_device,
+                                                          size=parse_size)
+        # Exit status is non zero on mismatches, the report is on stdout either way.
+        resp = self.master_node_list[0].send_k8s_cmd(
+            operation="exec", pod=pod, namespace=NAMESPACE,
+            command_suffix=f"-c {MOTR_CONTAINER_PREFIX}-001 -- {cmd}; true", decode=True)
+        report = json.loads(resp[resp.index("{"):])
+        LOGGER.debug("%s of %s emap records on %s have CRC mismatch", report["mismatches"],
+                     report["records"], pod)
+        return report
+
     @staticmethod
     def get_metadata_device(master_node_obj: LogicalNode):
         """
@@ -276,17 +321,20 @@ class MotrCorruptionAdapter(InjectCorruption):
             LOGGER.debug("metadata device is %s", metadata_device)
         return metadata_device
 
-    def build_emap_command(self, fid: str, selected_meta_dev=None):
+    def build_emap_command(self, fid: str, selected_meta_dev=None, record: dict = None):
         """
         This method is used to build EMAP command
         fid: its the gob id which is to to be corrupt
         selected_meta_dev: metadata device path
+        record: record of fid from list_emap_records, corrupts it without parsing metadata
         """
         self.emap_bldr = EmapCommandBuilder()
         if (fid or selected_meta_dev) is None:
             return False, "metadata path or fid cannot be None"
         kwargs = dict(corrupt_emap=fid, parse_size="1048576",
                       metadata_db_path=selected_meta_dev)
+        if record:
+            kwargs.update(key_offset=record["key_offset"], rec_offset=record["rec_offset"])
         cmd = self.emap_bldr.build(**kwargs)
         return cmd
 
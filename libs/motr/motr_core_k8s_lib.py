@@ -46,7 +46,9 @@ from commons.params import MOTR_DI_ERR_INJ_FILE_LOCAL_PATH
 from commons.utils import system_utils
 from commons.utils import config_utils
 from commons.utils import assert_utils
+from commons.utils.log_analyzer import M0TraceAnalyzer
 from commons.helpers.pods_helper import LogicalNode
+from commons.helpers.topology_helper import ClusterTopology
 from commons.helpers.health_helper import Health
 
 log = logging.getLogger(__name__)
@@ -133,12 +135,8 @@ class MotrCoreK8s():
                          namespace=common_const.NAMESPACE):
         """Retrieves all pods by nodes with given pod name prefix."""
         node_pod_dict = {}
-        cmd = "| grep \"{}\" |awk '{{print $1}}'".format(prefix)
-        response = self.node_obj.send_k8s_cmd(
-            operation="get", pod="pods", namespace=namespace,
-            command_suffix=f"{cmd}", decode=True)
-        pod_list = [node.strip() for node in response.split('\n')]
-        for pod_name in pod_list:
+        topology = ClusterTopology.get(self.node_obj, namespace=namespace)
+        for pod_name in topology.pod_names(prefix):
             node_name = self.get_node_name_from_pod_name(pod_name)
             node_pod_dict[node_name] = pod_name
         return node_pod_dict
@@ -159,15 +157,11 @@ class MotrCoreK8s():
                            f"-- {common_cmd.MOTR_STATUS_CMD} {rc_node_cmd}",
             decode=True)
         data_pod_name = primary_cortx_node.split('.')[0]
-        k8_node_cmd = "| grep \"{}\" | awk '{{print $7}}'".format(data_pod_name)
-        primary_k8s_node = self.node_obj.send_k8s_cmd(
-            operation="get", pod="pods -o wide", namespace=common_const.NAMESPACE,
-            command_suffix=f"{k8_node_cmd}", decode=True)
-        client_pod_cmd = "| grep \"{}\" | awk '{{print $1}}' | grep \"{}\"".format(
-            primary_k8s_node, common_const.CLIENT_POD_NAME_PREFIX)
-        primary_client_pod = self.node_obj.send_k8s_cmd(
-            operation="get", pod="pods -o wide", namespace=common_const.NAMESPACE,
-            command_suffix=f"{client_pod_cmd}", decode=True)
+        topology = ClusterTopology.get(self.node_obj, namespace=common_const.NAMESPACE)
+        primary_k8s_node = [pod["node"] for name, pod in topology.pods_info().items()
+                            if data_pod_name in (name, pod["hostname"])][0]
+        primary_client_pod = topology.pods_on_node(
+            primary_k8s_node, common_const.CLIENT_POD_NAME_PREFIX)[0]
         return primary_client_pod + '.' + common_const.CORTX_CLIENT_SVC_POSTFIX
 
     def get_cortx_node_endpoints(self, cortx_node=None):
@@ -787,40 +781,19 @@ class MotrCoreK8s():
         log.info("Resp of trace: %s", resp)
         return filepath
 
-    def read_m0trace_log(self, filepath):
+    def read_m0trace_log(self, filepath, copy_local=False):
         """
         This method reads the log and fetch tfid belongs to DATA and PARITY block
+        :param filepath: m0trace output file on the master node
+        :param copy_local: Also copy the trace file to the local log folder
         returns dict of tfid with DATA and PARITY.
         """
-        tfid_list = []
-        checksum_dict = {}
-        data_blk = 0
-        parity_blk = 0
-        local_path = os.path.join(LOG_DIR, LATEST_LOG_FOLDER, filepath)
-        self.master_node_list[0].copy_file_to_local(filepath, local_path)
+        if copy_local:
+            local_path = os.path.join(LOG_DIR, LATEST_LOG_FOLDER, filepath)
+            self.master_node_list[0].copy_file_to_local(filepath, local_path)
         cmd = Template(common_cmd.GREP_DP_BLOCK_FID).substitute(file=filepath)
-        resp = self.master_node_list[0].execute_cmd(cmd, read_lines=True)
-        log.debug("output of m0trace utility %s", resp)
-        lines = str(resp).split("\\n")
-        for line in lines:
-            if "tfid" in line:
-                tfid_list.append(line)  # append the target fid in the list.
-            if '[P]' in line:
-                if tfid_list:
-                    tfid = tfid_list.pop()
-                    tfid = tfid.split(" ")
-                    fid = tfid[-1][1:-1]  # fetch target fid and strip the <>
-                    dict_schema = {"PARITY"+str(parity_blk): fid}  # create dictionary
-                    checksum_dict.update(dict_schema)
-                    parity_blk=parity_blk+1
-            if "[D]" in line:
-                if tfid_list:
-                    tfid = tfid_list.pop()
-                    tfid = tfid.split(" ")
-                    fid = tfid[-1][1:-1]  # fetch target fid and strip the <>
-                    dict_schema = {"DATA"+str(data_blk): fid}  # create dictionary
-                    checksum_dict.update(dict_schema)
-                    data_blk=data_blk+1
+        checksum_dict = M0TraceAnalyzer.block_fids(
+            self.master_node_list[0].stream_cmd(cmd), filtered=True)
         log.debug("DICT is %s", checksum_dict)
         return checksum_dict
 
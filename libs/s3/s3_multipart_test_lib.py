@@ -256,6 +256,38 @@ class S3MultipartTestLib(Multipart):
             LOGGER.exception(ERR_MSG, S3MultipartTestLib.upload_parts_sequential.__name__, error)
             raise CTException(err.S3_CLIENT_ERROR, error.args[0]) from error
 
+    def upload_parts_iter(self, upload_id: int = None, bucket_name: str = None,
+                          object_name: str = None, **kwargs) -> tuple:
+        """
+        Upload parts sequentially from a lazy part iterator for a specific multipart upload ID.
+
+        Parts are consumed one at a time from s3_utils.iter_file_parts or
+        SeededDataGenerator.generate_parts, so memory usage is bounded by part size.
+        :param upload_id: Multipart Upload ID.
+        :param bucket_name: Name of the bucket.
+        :param object_name: Name of the object.
+        :keyword parts: Iterator of (part_number, memoryview, content_md5).
+        :return: (Boolean, Dict of uploaded parts, expected multipart ETag and checksum).
+        """
+        try:
+            parts = kwargs.get("parts", None)
+            uploaded_parts = []
+            mpu_csum = s3_utils.MultipartChecksum()
+            for part_number, data, content_md5 in parts:
+                LOGGER.info("Uploading part: %s, data_len %s", part_number, len(data))
+                resp = super().upload_part(bytes(data), bucket_name, object_name,
+                                           upload_id=upload_id, part_number=part_number,
+                                           content_md5=content_md5)
+                uploaded_parts.append({"PartNumber": part_number, "ETag": resp["ETag"]})
+                mpu_csum.update(part_number, data)
+            uploaded_parts = sorted(uploaded_parts, key=lambda x: x['PartNumber'])
+            return True, {'uploaded_parts': uploaded_parts, 'expected_etag': mpu_csum.etag(),
+                          'checksum': mpu_csum.checksum(part_level=True),
+                          'size': mpu_csum.size}
+        except BaseException as error:
+            LOGGER.exception(ERR_MSG, S3MultipartTestLib.upload_parts_iter.__name__, error)
+            raise CTException(err.S3_CLIENT_ERROR, error.args[0]) from error
+
     def upload_multipart(self, body: str = None, bucket_name: str = None, object_name: str = None,
                          **kwargs) -> tuple:
         """
@@ -25,9 +25,10 @@
 import logging
 from datetime import datetime
 import json
-import pandas as pd
 
 from commons.utils.config_utils import read_yaml
+from commons.utils.log_analyzer import HSBENCH_ERRORS
+from commons.utils.log_analyzer import PatternSet
 from commons.utils.system_utils import path_exists, run_local_cmd, make_dirs
 
 LOGGER = logging.getLogger(__name__)
@@ -65,19 +66,11 @@ def check_log_file_error(file_path, errors=None):
     :return: errorFound: True (if error is seen) else False
     :rtype: Boolean
     """
-    if not errors:
-        errors = ["failed ", "panic", "status code",
-                  "does not exist", "InternalError", "send request failed"]
-    error_found = False
     LOGGER.info("Debug: Log File Path %s",file_path)
-    with open(file_path, "r", encoding="utf-8") as hs_log_file:
-        for line in hs_log_file:
-            for error in errors:
-                if error.lower() in line.lower():
-                    error_found = True
-                    LOGGER.error("%s Found in HSBench Run : %s",error, line)
-                    return error_found
-    return error_found
+    found = PatternSet(errors or HSBENCH_ERRORS).find_first(file_path)
+    if found:
+        LOGGER.error("%s Found in HSBench Run : %s", *found)
+    return bool(found)
 
 # pylint: disable-msg=too-many-arguments
 # pylint: disable-msg=too-many-locals
@@ -167,22 +160,13 @@ def parse_hsbench_output(file_path):
     :file_path: Generated JSON file after hsbench tool
     :return: dictionary/list of the content
     """
-    json_data = []
     keys = ['Mode', 'Seconds', 'Ops', 'Mbps',
             'Iops', 'MinLat', 'AvgLat', 'MaxLat']
-    values = []
     with open(file_path, 'r', encoding="utf-8") as list_ops:
         json_data = json.load(list_ops)
-    for data in json_data:
-        value = []
-        if data['IntervalName'] == 'TOTAL':
-            for key in keys:
-                value.append(data[key])
-            values.append(value)
-    table_op = pd.DataFrame(values, columns=keys)
-    table_op.reset_index(inplace=False)
-    data_dict = table_op.to_dict("records")
-    return data_dict
+    return [{key: data[key] for key in keys}
+            for data in json_data if data['IntervalName'] == 'TOTAL']
+
 
 def parse_metrics_value(metric_name, mode_type, operation, parse_data):
     """
@@ -197,12 +181,10 @@ def parse_metrics_value(metric_name, mode_type, operation, parse_data):
             if in_line_data['Mode'] == mode_type[0]:
                 if in_line_data[operation]:
                     return metric_name, str(in_line_data[operation]), in_line_data['Seconds']
-    vv1 = []
-    tt1 = []
+    values = []
+    seconds = []
     for in_line_data in parse_data:
-        for modes in mode_type:
-            if in_line_data['Mode'] == modes:
-                if in_line_data[operation]:
-                    vv1.append(int(in_line_data[operation]))
-                    tt1.append(int(in_line_data['Seconds']))
-    return metric_name, str(vv1[0]+vv1[1]), tt1[0]+tt1[1]
+        if in_line_data['Mode'] in mode_type and in_line_data[operation]:
+            values.append(int(in_line_data[operation]))
+            seconds.append(int(in_line_data['Seconds']))
+    return metric_name, str(sum(values)), sum(seconds)
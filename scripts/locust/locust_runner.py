@@ -24,6 +24,7 @@ import argparse
 import logging
 import time
 
+from commons.utils.log_analyzer import PatternSet
 from commons.utils.system_utils import run_local_cmd
 from scripts.locust import LOCUST_CFG
 
@@ -38,18 +39,14 @@ def check_log_file(file_path, errors):
     :return: errorFound: True (if error is seen) else False
     :rtype: Boolean
     """
-    error_found = False
     LOGGER.info("Debug: Log File Path %s", file_path)
-    with open(file_path, "r") as log_file:
-        for line in log_file:
-            for error in errors:
-                if error.lower() in line.lower():
-                    error_found = True
-                    LOGGER.info("checkLogFileError: Error Found in Locust Run : %s", line)
-                    return error_found
+    found = PatternSet(errors).find_first(file_path)
+    if found:
+        LOGGER.info("checkLogFileError: Error Found in Locust Run : %s", found[1])
+        return True
 
     LOGGER.info("No Error Found")
-    return error_found
+    return False
 
 
 # pylint: disable=too-many-arguments
@@ -64,15 +61,16 @@ def run_locust(
     :param users: number of concurrent users
     :param hatch_rate: rate at which number of user to be increase per sec
     :param duration: total time for execution
-    :return: tupple resp with over all execution and log and html file path
+    :return: tupple resp with over all execution and log, html and stats csv file path
     """
     upper_limit_cmd = "ulimit -n 100000"
     log_dir = "log/latest/"
     time_str = str(time.strftime("%Y%m%d-%H%M%S"))
     log_file = f"{log_dir}{test_id}-{LOCUST_CFG['default']['LOGFILE']}-{time_str}.log"
     html_file = f"{log_dir}{test_id}-{LOCUST_CFG['default']['HTMLFILE']}-{time_str}.html"
+    csv_prefix = f"{log_dir}{test_id}-{time_str}"
     locust_run_cmd = \
-        "locust --host={} -f {} --headless -u {} -r {} --run-time {} --html {} --logfile {}"
+        "locust --host={} -f {} --headless -u {} -r {} --run-time {} --html {} --logfile {} --csv {}"
     LOGGER.info("Setting ulimit for locust\n")
     locust_run_cmd = locust_run_cmd.format(
         host,
@@ -81,11 +79,13 @@ def run_locust(
         hatch_rate,
         duration,
         html_file,
-        log_file)
+        log_file,
+        csv_prefix)
     cmd = "{}; {}\n".format(upper_limit_cmd, locust_run_cmd)
     res = run_local_cmd(cmd)
     LOGGER.info("Locust run completed.")
-    res1 = {"log-file": log_file, "html-file": html_file}
+    res1 = {"log-file": log_file, "html-file": html_file,
+            "stats-file": f"{csv_prefix}_stats.csv"}
 
     return res, res1
 
@@ -97,9 +97,10 @@ if __name__ == '__main__':
                         str(time.strftime("-%Y%m%d-%H%M%S")), ".log"])
     HTML_FILE = "".join([LOCUST_CFG['default']['HTMLFILE'], str(
         time.strftime("-%Y%m%d-%H%M%S")), ".html"])
+    CSV_PREFIX = "".join(["locust", str(time.strftime("-%Y%m%d-%H%M%S"))])
     ULIMIT_CMD = "ulimit -n 100000"
     LOCUST_RUN_CMD = \
-        "locust --host={} -f {} --headless -u {} -r {} --run-time {} --html {} --logfile {}"
+        "locust --host={} -f {} --headless -u {} -r {} --run-time {} --html {} --logfile {} --csv {}"
 
     parser = argparse.ArgumentParser(description='Run locust tool.')
     parser.add_argument('file_path', help='locust.py file path')
@@ -117,6 +118,9 @@ if __name__ == '__main__':
     parser.add_argument(
         '--logfile', dest='log_file', help='specify the path to store logs', nargs='?',
         const=LOG_FILE, type=str, default=LOG_FILE)
+    parser.add_argument(
+        '--csv', dest='csv_prefix', help='specify the path prefix of the stats csv files',
+        nargs='?', const=CSV_PREFIX, type=str, default=CSV_PREFIX)
 
     args = parser.parse_args()
 
@@ -128,7 +132,8 @@ if __name__ == '__main__':
         args.hatch_rate,
         args.duration,
         HTML_FILE,
-        args.log_file)
+        args.log_file,
+        args.csv_prefix)
     CMD = "{}; {}\n".format(ULIMIT_CMD, LOCUST_RUN_CMD)
     run_local_cmd(CMD)
     LOGGER.info("Locust run completed.")
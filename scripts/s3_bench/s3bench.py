@@ -27,24 +27,30 @@ import os
 from datetime import datetime, timedelta
 
 from commons.utils import assert_utils
+from commons.utils.log_analyzer import S3BenchLogAnalyzer
 from commons.utils.config_utils import read_yaml
 from commons.utils.system_utils import path_exists, run_local_cmd, make_dirs, run_remote_cmd
 from commons.utils.system_utils import execute_cmd, make_remote_dirs
 from libs.s3 import ACCESS_KEY, SECRET_KEY
+from scripts.s3_bench.s3loadgen import S3LoadGen
 
 LOGGER = logging.getLogger(__name__)
 cfg_obj = read_yaml("scripts/s3_bench/config.yaml")[1]
 LOG_DIR = cfg_obj["log_dir"]
 S3_BENCH_PATH = cfg_obj["s3bench_path"]
 S3_BENCH_BINARY = cfg_obj["s3bench_binary"]
+S3_BENCH_ENGINE = cfg_obj.get("engine", "binary")
 
 
 def setup_s3bench(hostname: str = None, username: str = None, password: str = None, remote=False):
     """
     Configuring client machine with s3bench dependencies.
+    Nothing to install for the native engine on the local machine.
 
     :return bool: True/False
     """
+    if S3_BENCH_ENGINE == "native" and not remote:
+        return True
     ret = execute_cmd("s3bench --help 2>&1", hostname, username, password, remote=remote)
     if not ret[0]:
         LOGGER.info("ERROR: s3bench is not installed. Installing s3bench.")
@@ -102,23 +108,10 @@ def create_json_reps(list_resp):
     """
     Create json data
     :param list_resp:
-    :return: json response
+    :return: json response, one dict per response
     """
-    js_res = []
-    ds_dict = {}
     LOGGER.debug("list response %s", list_resp)
-    for res_el in list_resp:
-        # Splitting each response
-        split_res = res_el.split("\n")
-        for ele in split_res:
-            if ":" in ele:
-                list_split = ele.replace("\n", "").split(":")
-                # adding in single dictionary
-                ds_dict[list_split[0]] = list_split[1].strip()
-        # appending dictionary to list
-        js_res.append(ds_dict)
-
-    return js_res
+    return [S3BenchLogAnalyzer.parse_report(res_el) for res_el in list_resp]
 
 
 # pylint: disable-msg=too-many-arguments
@@ -144,32 +137,26 @@ def check_log_file_error(file_path, errors=None):
     :return: errorFound: True (if error is seen) else False
     :rtype: Boolean
     """
-    if not errors:
-        errors = ["with error ", "panic", "status code",
-                  "flag provided but not defined", "InternalError", "ServiceUnavailable"]
-    error_found = False
     LOGGER.info("Debug: Log File Path %s", file_path)
-    resp_filtered = []
-    with open(file_path, "r") as s3blog_obj:
-        for line in s3blog_obj:
-            for error in errors:
-                if error.lower() in line.lower():
-                    error_found = True
-                    LOGGER.error("%s Found in S3Bench Run: %s", error, line)
-                    return error_found
-            if 'Errors Count:' in line and "reportFormat" not in line:
-                resp_filtered.append(line)
-    LOGGER.info("'Error count' filtered list: %s", resp_filtered)
-    for response in resp_filtered:
-        error_found = int(response.split(":")[1].strip()) != 0
-    if not resp_filtered:
-        error_found = True
+    summary = S3BenchLogAnalyzer(errors).analyze(file_path, stop_on_error=True)
+    if summary["first_error"]:
+        LOGGER.error("%s Found in S3Bench Run: %s", *summary["first_error"])
+        return True
+    LOGGER.info("'Error count' filtered list: %s", summary["error_counts"])
+    return not summary["error_counts"] or summary["error_counts"][-1] != 0
 
-    return error_found
+
+def get_log_summary(file_path, errors=None):
+    """
+    Summarize an s3bench log in one pass
+    :param str file_path: s3bench log file
+    :param list(str) errors: error strings to be counted
+    :return: dict with error string counts, 'Errors Count' values and per operation
+        throughput, duration, number of errors and latency percentiles
+    """
+    return S3BenchLogAnalyzer(errors).analyze(file_path)
 
 
-# pylint: disable=too-many-arguments
-# pylint: disable-msg=too-many-locals
 def s3bench(
         access_key,
         secret_key,
@@ -212,6 +199,12 @@ def s3bench(
     :keyword int max_retries: maximum retry for any request
     :keyword int response_header_timeout: Response header Timeout in ms
     :keyword int httpclientimeout: Time limit in ms for requests made by this Client.
+    :keyword int connectTimeout: Time limit in ms to connect.
+        A native run waits connectTimeout for connections and the smaller of
+        response_header_timeout and httpclientimeout for each response read.
+    :keyword str engine: native (S3LoadGen) or binary, native is used only for local runs
+    :keyword stop_event: Event to stop a native run
+    :keyword dict obj_sizes: size to weight dict to mix object sizes in a native run
     :return: tuple with json response and log path
     """
     max_retries = kwargs.get("max_retries", None)
@@ -223,10 +216,35 @@ def s3bench(
     user = kwargs.get("user", None)
     pwd = kwargs.get("pwd", None)
 
+    engine = kwargs.get("engine", S3_BENCH_ENGINE)
+
     result = []
     # Creating log file
     log_path = create_log(result, log_file_prefix, num_clients, num_sample, obj_size, host=host,
                           user=user, pwd=pwd)
+    if engine == "native" and not remote:
+        if verbose:
+            LOGGER.warning("verbose is not supported by the native engine, ignored")
+        read_timeouts = [timeout for timeout in (response_header_timeout, httpclientimeout)
+                         if timeout]
+        LOGGER.info("Workload execution started.")
+        loadgen = S3LoadGen(access_key, secret_key, bucket=bucket, end_point=end_point,
+                            num_clients=num_clients, num_sample=num_sample,
+                            obj_name_pref=obj_name_pref,
+                            obj_size=kwargs.get("obj_sizes") or obj_size,
+                            skip_write=skip_write, skip_read=skip_read,
+                            skip_cleanup=skip_cleanup, validate=validate, duration=duration,
+                            region=region, validate_certs=validate_certs,
+                            stop_event=kwargs.get("stop_event"),
+                            max_retries=max_retries or 1,
+                            connect_timeout=connect_timeout / 1000 if connect_timeout else None,
+                            read_timeout=min(read_timeouts) / 1000 if read_timeouts else None)
+        loadgen.run()
+        result.append(loadgen.report())
+        with open(log_path, "a") as fd_write:
+            fd_write.write(result[0])
+        LOGGER.info("Workload execution completed.")
+        return create_json_reps(result), log_path
     LOGGER.info("Running s3 bench tool")
     # GO command formatter
     cmd = f"s3bench -accessKey={access_key} -accessSecret={secret_key} " \
@@ -0,0 +1,505 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+#
+
+"""
+Native S3 load generator with the knobs of s3bench.
+
+Clients are threads spread over worker processes, each thread with its own boto3 client.
+Every process writes, reads and deletes its share of the samples and sends cumulative
+per operation counters and latency histograms to the parent every report interval, so
+metrics() is live while the run is in progress. Setting the stop event (or calling stop())
+ends the run after the requests in flight.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Union
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from commons.utils.bench_results import size_to_bytes
+
+LOGGER = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in seconds, 4 buckets per doubling from 0.5ms.
+LATENCY_BUCKETS = tuple(0.0005 * 2 ** (i / 4) for i in range(80))
+OPERATIONS = ("Write", "Read", "Delete")
+REPORT_PERCENTILES = (99, 90, 75, 50, 25)
+
+
+def parse_duration(duration: Union[str, int, float, None]) -> float:
+    """
+    :param duration: Seconds or s3bench duration string e.g. 1h24m10s, 0h22m.
+    :return: Duration in seconds, None if duration is None.
+    """
+    if duration is None or isinstance(duration, (int, float)):
+        return duration
+    match = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?", duration.strip().lower())
+    if not match or not duration.strip():
+        raise ValueError(f"Invalid duration {duration}")
+    hours, mins, secs = (int(val or 0) for val in match.groups())
+    return hours * 3600 + mins * 60 + secs
+
+
+class OpStats:
+    """Counters and latency histogram of one operation, mergeable across processes."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = {}
+        self.nbytes = 0
+        self.latency_sum = 0.0
+        self.latency_min = None
+        self.latency_max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.first = None
+        self.last = None
+
+    def observe(self, start: float, latency: float, nbytes: int = 0, error: str = None) -> None:
+        """
+        Account one request.
+        :param start: Request start time (time.time()).
+        :param latency: Request latency in seconds.
+        :param nbytes: Bytes transferred.
+        :param error: Error class if the request failed.
+        """
+        self.count += 1
+        self.first = start if self.first is None else min(self.first, start)
+        self.last = max(self.last or 0, start + latency)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        self.nbytes += nbytes
+        self.latency_sum += latency
+        self.latency_min = latency if self.latency_min is None else min(self.latency_min,
+                                                                        latency)
+        self.latency_max = max(self.latency_max, latency)
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def merge(self, other: "OpStats") -> None:
+        """Add the counters of other."""
+        self.count += other.count
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+        self.nbytes += other.nbytes
+        self.latency_sum += other.latency_sum
+        if other.latency_min is not None:
+            self.latency_min = other.latency_min if self.latency_min is None else min(
+                self.latency_min, other.latency_min)
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram,
+                                                                other.histogram)]
+        if other.first is not None:
+            self.first = other.first if self.first is None else min(self.first, other.first)
+            self.last = max(self.last or 0, other.last)
+
+    def snapshot(self) -> dict:
+        """Picklable copy of the counters."""
+        values = vars(self).copy()
+        values["errors"] = dict(self.errors)
+        values["histogram"] = list(self.histogram)
+        return values
+
+    @classmethod
+    def from_snapshot(cls, values: dict) -> "OpStats":
+        """OpStats of a snapshot."""
+        stats = cls()
+        vars(stats).update(values)
+        return stats
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile interpolated within its histogram bucket."""
+        total = sum(self.histogram)
+        if not total:
+            return 0.0
+        rank = pct / 100.0 * total
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.latency_min), self.latency_max)
+            seen += count
+        return self.latency_max
+
+    def as_dict(self) -> dict:
+        """
+        :return: Counters, throughput in MB/s, latencies in seconds and histogram as
+            bucket upper bound to count.
+        """
+        ok_count = self.count - sum(self.errors.values())
+        duration = (self.last - self.first) if self.first is not None else 0.0
+        return {"count": self.count, "errors": dict(self.errors),
+                "number_of_errors": sum(self.errors.values()),
+                "total_transferred": self.nbytes / 1024 ** 2, "total_duration": duration,
+                "total_throughput": self.nbytes / 1024 ** 2 / duration if duration else 0.0,
+                "ops_per_sec": ok_count / duration if duration else 0.0,
+                "latency": {"Max": self.latency_max,
+                            **{f"{pct}th": self.percentile(pct)
+                               for pct in REPORT_PERCENTILES},
+                            "Min": self.latency_min or 0.0,
+                            "mean": self.latency_sum / ok_count if ok_count else 0.0},
+                "histogram": {bound: count for bound, count in
+                              zip([*LATENCY_BUCKETS, float("inf")], self.histogram) if count}}
+
+
+class _Worker:
+    """Load of one worker process, runs in the child."""
+
+    def __init__(self, spec: dict, index: int, nthreads: int, samples: List[int],
+                 stop_event: Any, results: Any) -> None:
+        self.spec = spec
+        self.index = index
+        self.nthreads = nthreads
+        self.samples = samples
+        self.stop_event = stop_event
+        self.results = results
+        self.stats = {op: OpStats() for op in OPERATIONS}
+        self.lock = threading.Lock()
+        self.payloads = {}
+        self.digests = {}
+        self.data = os.urandom(max(size for size, _ in spec["sizes"]))
+        self.clients = []
+
+    def client(self) -> Any:
+        """New boto3 client of the thread."""
+        session = boto3.session.Session()
+        return session.client(
+            "s3", endpoint_url=self.spec["end_point"], region_name=self.spec["region"],
+            aws_access_key_id=self.spec["access_key"],
+            aws_secret_access_key=self.spec["secret_key"],
+            verify=self.spec["validate_certs"],
+            config=Config(retries={"max_attempts": self.spec["max_retries"]},
+                          max_pool_connections=1, **self.spec["timeouts"]))
+
+    def size_of(self, sample: int) -> int:
+        """Object size of sample, fixed per sample so reads know what to expect."""
+        sizes = self.spec["sizes"]
+        if len(sizes) == 1:
+            return sizes[0][0]
+        rnd = random.Random(sample)
+        return rnd.choices([size for size, _ in sizes], [weight for _, weight in sizes])[0]
+
+    def payload(self, size: int) -> bytes:
+        """Object data of size bytes, shared by all objects of the size."""
+        if size not in self.payloads:
+            self.payloads[size] = self.data[:size]
+            self.digests[size] = hashlib.md5(self.payloads[size]).digest()
+        return self.payloads[size]
+
+    def request(self, client: Any, operation: str, sample: int) -> None:
+        """Issue one request and account it."""
+        key = f"{self.spec['obj_name_pref']}{sample}"
+        bucket = self.spec["bucket"]
+        size = self.size_of(sample)
+        body = self.payload(size)
+        error = None
+        nbytes = 0
+        start = time.time()
+        begin = time.perf_counter()
+        try:
+            if operation == "Write":
+                client.put_object(Bucket=bucket, Key=key, Body=body)
+                nbytes = size
+            elif operation == "Read":
+                data = client.get_object(Bucket=bucket, Key=key)["Body"].read()
+                nbytes = len(data)
+                if self.spec["validate"] and (nbytes != size or hashlib.md5(
+                        data).digest() != self.digests[size]):
+                    error = "checksum mismatch"
+            else:
+                client.delete_object(Bucket=bucket, Key=key)
+        except ClientError as exc:
+            error = f"HTTP {exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode')}"
+        except Exception as exc:  # pylint: disable=broad-except
+            error = type(exc).__name__
+        latency = time.perf_counter() - begin
+        with self.lock:
+            self.stats[operation].observe(start, latency, nbytes, error)
+
+    def phase(self, operation: str, deadline: float = None) -> None:
+        """Run operation on every sample of the process with nthreads clients."""
+        samples = iter(self.samples)
+        samples_lock = threading.Lock()
+
+        def client_loop(client):
+            while not self.stop_event.is_set():
+                if deadline is not None and time.time() >= deadline:
+                    return
+                with samples_lock:
+                    sample = next(samples, None)
+                if sample is None:
+                    return
+                self.request(client, operation, sample)
+
+        threads = [threading.Thread(target=client_loop, args=(client,),
+                                    name=f"loadgen-{operation}-{i}")
+                   for i, client in enumerate(self.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def report(self, done: bool = False) -> None:
+        """Send cumulative stats to the parent."""
+        with self.lock:
+            self.results.put((self.index, done, {op: stats.snapshot()
+                                                 for op, stats in self.stats.items()}))
+
+    def run(self) -> None:
+        """Run write/read rounds until samples or duration are done, then cleanup."""
+        stop_reports = threading.Event()
+
+        def reporter():
+            while not stop_reports.wait(self.spec["report_interval"]):
+                self.report()
+
+        thread = threading.Thread(target=reporter, name="loadgen-report", daemon=True)
+        thread.start()
+        try:
+            # Clients are reused across phases, creating one loads the botocore models.
+            self.clients = [self.client() for _ in range(self.nthreads)]
+            deadline = time.time() + self.spec["duration"] if self.spec["duration"] else None
+            while not self.stop_event.is_set():
+                if not self.spec["skip_write"]:
+                    self.phase("Write", deadline)
+                if not self.spec["skip_read"]:
+                    self.phase("Read", deadline)
+                if deadline is None or time.time() >= deadline:
+                    break
+            if not self.spec["skip_cleanup"]:
+                self.phase("Delete")
+        finally:
+            stop_reports.set()
+            thread.join()
+            self.report(done=True)
+
+
+def _worker_main(*args) -> None:
+    """Entry point of worker processes."""
+    _Worker(*args).run()
+
+
+# pylint: disable=too-many-instance-attributes
+class S3LoadGen:
+    """
+    Multi process S3 load generator.
+    Usage:
+    gen = S3LoadGen(access_key, secret_key, bucket="b1", obj_size={"4Kb": 3, "1Mb": 1})
+    gen.start()
+    print(gen.metrics()["Write"]["ops_per_sec"])
+    result = gen.wait()
+    """
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def __init__(self, access_key: str, secret_key: str, bucket: str = "bucketname",
+                 end_point: str = "https://s3.seagate.com", num_clients: int = 40,
+                 num_sample: int = 200, obj_name_pref: str = "loadgen_test_",
+                 obj_size: Union[str, int, Dict[Union[str, int], float]] = "4Kb",
+                 skip_write: bool = False, skip_read: bool = False,
+                 skip_cleanup: bool = False, validate: bool = True,
+                 duration: Union[str, float] = None, region: str = "us-east-1",
+                 validate_certs: bool = True, processes: int = None, stop_event: Any = None,
+                 max_retries: int = 1, report_interval: float = 1.0,
+                 connect_timeout: float = None, read_timeout: float = None) -> None:
+        """
+        :param access_key: S3 access key.
+        :param secret_key: S3 secret key.
+        :param bucket: Existing bucket to be used.
+        :param end_point: Endpoint for the operations.
+        :param num_clients: Number of concurrent clients.
+        :param num_sample: Number of objects written and read.
+        :param obj_name_pref: Name prefix for the objects.
+        :param obj_size: Object size e.g. 4Kb, 1Mb, or size to weight dict to mix sizes.
+        :param skip_write: Skip writing objects.
+        :param skip_read: Skip reading objects.
+        :param skip_cleanup: Skip deleting objects at the end of the run.
+        :param validate: Verify size and checksum of read objects.
+        :param duration: Repeat write and read rounds for seconds or 1h24m10s.
+        :param region: Region name.
+        :param validate_certs: Validate SSL certificates, or CA bundle path.
+        :param processes: Number of worker processes, min(cpu count, num_clients) if None.
+        :param stop_event: threading or multiprocessing Event to stop the run.
+        :param max_retries: Attempts of a request by botocore.
+        :param report_interval: Seconds between live metric updates of workers.
+        :param connect_timeout: Seconds to wait for a connection, botocore default if None.
+        :param read_timeout: Seconds to wait for data of a response, botocore default if None.
+        """
+        sizes = obj_size if isinstance(obj_size, dict) else {obj_size: 1}
+        self.sizes = [(size_to_bytes(size), weight) for size, weight in sizes.items()]
+        self.num_clients = num_clients
+        self.num_sample = num_sample
+        self.processes = max(1, min(processes or os.cpu_count() or 1, num_clients))
+        self.stop_event = stop_event
+        self.spec = {"access_key": access_key, "secret_key": secret_key, "bucket": bucket,
+                     "end_point": end_point, "region": region,
+                     "validate_certs": validate_certs, "obj_name_pref": obj_name_pref,
+                     "sizes": self.sizes, "skip_write": skip_write, "skip_read": skip_read,
+                     "skip_cleanup": skip_cleanup, "validate": validate,
+                     "duration": parse_duration(duration), "max_retries": max_retries,
+                     "report_interval": report_interval,
+                     "timeouts": {key: value for key, value in (
+                         ("connect_timeout", connect_timeout),
+                         ("read_timeout", read_timeout)) if value is not None}}
+        self._ctx = multiprocessing.get_context()
+        self._stop = self._ctx.Event()
+        self._results = None
+        self._workers = []
+        self._snapshots = {}
+        self._done = set()
+        self._lock = threading.Lock()
+        self._collector = None
+        self.started_at = None
+        self.ended_at = None
+
+    def start(self) -> None:
+        """Start worker processes, returns immediately."""
+        self._results = self._ctx.Queue()
+        self.started_at = time.time()
+        for index in range(self.processes):
+            nthreads = self.num_clients // self.processes + (
+                index < self.num_clients % self.processes)
+            samples = list(range(index, self.num_sample, self.processes))
+            worker = self._ctx.Process(
+                target=_worker_main, name=f"s3loadgen-{index}", daemon=True,
+                args=(self.spec, index, nthreads, samples, self._stop, self._results))
+            worker.start()
+            self._workers.append(worker)
+        self._collector = threading.Thread(target=self._collect, name="s3loadgen-collect",
+                                           daemon=True)
+        self._collector.start()
+        LOGGER.info("Started %s clients in %s processes, %s samples of %s bytes",
+                    self.num_clients, self.processes, self.num_sample,
+                    [size for size, _ in self.sizes])
+
+    def _collect(self) -> None:
+        """Receive worker snapshots until all workers are done."""
+        while len(self._done) < len(self._workers):
+            if self.stop_event is not None and self.stop_event.is_set():
+                self._stop.set()
+            try:
+                index, done, snapshot = self._results.get(timeout=0.2)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self._workers):
+                    # Workers died without a final report.
+                    break
+                continue
+            with self._lock:
+                self._snapshots[index] = snapshot
+                if done:
+                    self._done.add(index)
+        self.ended_at = time.time()
+
+    def stop(self) -> None:
+        """Stop issuing requests, workers exit after the requests in flight."""
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        """True while results are being collected."""
+        return self._collector is not None and self._collector.is_alive()
+
+    def metrics(self) -> Dict[str, dict]:
+        """
+        :return: Operation name to OpStats.as_dict() merged over all workers so far.
+        """
+        merged = {op: OpStats() for op in OPERATIONS}
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+        for snapshot in snapshots:
+            for op, values in snapshot.items():
+                merged[op].merge(OpStats.from_snapshot(values))
+        return {op: stats.as_dict() for op, stats in merged.items() if stats.count}
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Wait for the run to end.
+        :param timeout: Max seconds to wait, the run goes on if it expires.
+        :return: dict with parameters, operations (see metrics), stopped and duration.
+        """
+        self._collector.join(timeout)
+        if not self._collector.is_alive():
+            for worker in self._workers:
+                worker.join()
+        return self.result()
+
+    def run(self) -> dict:
+        """Start and wait for the run to end, see wait."""
+        self.start()
+        return self.wait()
+
+    def result(self) -> dict:
+        """
+        :return: dict with parameters, operations (see metrics), stopped and duration.
+        """
+        return {"parameters": {"bucket": self.spec["bucket"], "numClients": self.num_clients,
+                               "numSamples": self.num_sample, "processes": self.processes,
+                               "objectSize": dict(self.sizes)},
+                "operations": self.metrics(), "stopped": self._stop.is_set(),
+                "duration": (self.ended_at or time.time()) - (self.started_at or time.time())}
+
+    def report(self) -> str:
+        """
+        :return: Result in the s3bench text format, understood by check_log_file_error
+            and the s3bench result parsers.
+        """
+        result = self.result()
+        sizes = [size for size, _ in self.sizes]
+        lines = ["Test parameters",
+                 f"endpoint(s):      [{self.spec['end_point']}]",
+                 f"bucket:           {self.spec['bucket']}",
+                 f"objectNamePrefix: {self.spec['obj_name_pref']}",
+                 f"objectSize:       {sum(sizes) / len(sizes) / 1024 ** 2:.4f} MB",
+                 f"numClients:       {self.num_clients}",
+                 f"numSamples:       {self.num_sample}", ""]
+        errors = 0
+        for operation, stats in result["operations"].items():
+            errors += stats["number_of_errors"]
+            lines += [f"Results Summary for {operation} Operation(s)",
+                      f"Total Transferred: {stats['total_transferred']:.3f} MB",
+                      f"Total Throughput:  {stats['total_throughput']:.2f} MB/s",
+                      f"Total Duration:    {stats['total_duration']:.3f} s",
+                      f"Number of Errors:  {stats['number_of_errors']}",
+                      "------------------------------------"]
+            for name, latency in stats["latency"].items():
+                if name != "mean":
+                    name = name if name in ("Max", "Min") else f"{name} %ile"
+                    lines.append(f"{operation} times {name + ':':<12}{latency:.3f} s")
+            for error, count in stats["errors"].items():
+                lines.append(f"{operation} failed with error {error}: {count}")
+            lines.append("")
+        if result["stopped"]:
+            lines.append("Run stopped before completion")
+        lines.append(f"Errors Count:  {errors}")
+        return "\n".join(lines) + "\n"
@@ -17,11 +17,37 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
+"""
+Motr metadata parser.
+
+The metadata file or device is memory mapped once. read_metadata_file() finds b-tree node
+headers in a single pass and indexes their offsets per tree type, emap_records() decodes the
+EMAP keys and records of the indexed nodes with struct. Metadata words are little endian.
+"""
 
 import binascii
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import defaultdict
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    # Hashes are computed record by record without numpy.
+    np = None
 
 MAGIC_HEADER = b'33011ca5e511de77'
 MAGIC_FOOTER = b'33f007e7f007e777'
+HEADER_BYTES = struct.pack('<Q', int(MAGIC_HEADER, 16))
+FOOTER_BYTES = struct.pack('<Q', int(MAGIC_FOOTER, 16))
+FOOTER_WORD = int(MAGIC_FOOTER, 16)
+MAX_WORD = 0xffffffffffffffff
+CORRUPT_PATTERN = b'\x33\x33\x44\x44\x22\x22\x11\x11'
 
 typeDict = {b'01': 'RPC_PACKET', b'02': 'RPC_ITEM', b'03': 'BE_BTREE',
             b'04': 'BE_BNODE', b'05': 'BE_EMAP_KEY', b'06': 'BE_EMAP_REC',
@@ -32,13 +58,6 @@ typeDict = {b'01': 'RPC_PACKET', b'02': 'RPC_ITEM', b'03': 'BE_BTREE',
             b'13': 'POOLNODE', b'14': 'POOLDEV', b'15': 'POOL_SPARE_USAGE',
             b'16': 'CAS_STATE', b'17': 'CAS_CTG', b'22': 'WRONG_ENTRY', b'44': 'WRONG_ENTRY'}
 
-record_type_dict = {'BE_BTREE': [], 'BE_BNODE': [], 'BE_EMAP_KEY': [], 'BE_EMAP_REC': [],
-                    'BE_EMAP': [], 'BE_LIST': [], 'BE_SEG_HDR': [], 'BALLOC': [],
-                    'STOB_AD_0TYPE_REC': [], 'STOB_AD_DOMAIN': [], 'COB_DOMAIN': [],
-                    'COB_NSREC': [], 'BALLOC_GROUP_DESC': [], 'EXT': [], 'POOLNODE': [],
-                    'POOLDEV': [], 'POOL_SPARE_USAGE': [], 'CAS_STATE': [], 'CAS_CTG': [],
-                    'EXTRA': []}
-
 m0_btree_types = {b'01': "M0_BT_INVALID", b'02': "M0_BT_BALLOC_GROUP_EXTENTS",
                   b'03': "M0_BT_BALLOC_GROUP_DESC",
                   b'04': "M0_BT_EMAP_EM_MAPPING", b'05': "M0_BT_CAS_CTG",
@@ -47,23 +66,109 @@ m0_btree_types = {b'01': "M0_BT_INVALID", b'02': "M0_BT_BALLOC_GROUP_EXTENTS",
                   b'0a': "M0_BT_COB_FILEATTR_OMG",
                   b'0b': "M0_BT_COB_BYTECOUNT", b'0c': "M0_BT_CONFDB", b'0d': "M0_BT_UT_KV_OPS",
                   b'0e': "M0_BT_NR"}
+btree_type_names = {int(key, 16): name for key, name in m0_btree_types.items()}
 
-m0_btree_types_dict = {"M0_BT_INVALID": [], "M0_BT_BALLOC_GROUP_EXTENTS": [],
-                       "M0_BT_BALLOC_GROUP_DESC": [], "M0_BT_EMAP_EM_MAPPING": [],
-                       "M0_BT_CAS_CTG": [], "M0_BT_COB_NAMESPACE": [], "M0_BT_COB_OBJECT_INDEX": [],
-                       "M0_BT_COB_FILEATTR_BASIC": [], "M0_BT_COB_FILEATTR_EA": [],
-                       "M0_BT_COB_FILEATTR_OMG": [], "M0_BT_COB_BYTECOUNT": [], "M0_BT_CONFDB": [],
-                       "M0_BT_UT_KV_OPS": [], "M0_BT_NR": []}
+# Bytes to skip after a node header per tree type, 8 for the others.
+# balloc->4096, ctg-> 65536, cob-> 8192, emap-> 16384, confd->4096, dtm->8192
+btree_node_skip = {0x02: 4096, 0x03: 4096, 0x04: 16384, 0x05: 65536, 0x07: 8192,
+                   0x08: 8192, 0x09: 8192, 0x0a: 8192, 0x0b: 8192, 0x0c: 4096, 0x0e: 8192}
 
 bnt_h_node_type = {b'00000001': 'FF', b'00000002': 'FKVV', b'00000003': 'VKFV', b'00000004': 'VKVV'}
 
+EMAP_TREE = "M0_BT_EMAP_EM_MAPPING"
+# FKVV node header at node offset + 64: used/level/ksize, nsize, footer magic
+FKVV_HEADER = struct.Struct('<QQQ')
+FKVV_KEYS_START = 104
+# EMAP key: hd_magic, hd_bits, ek_prefix (container, key), ek_offset, footer, checksum,
+# value offset from the node end
+EMAP_KEY = struct.Struct('<QQQQQQQI')
+# EMAP record: hd_magic, hd_bits, er_start, er_value, er_unit_size, er_cs_nob, then
+# er_cs_nob bytes of checksum, footer and CRC
+EMAP_REC_HEADER = struct.Struct('<QQQQQQ')
+EMAP_REC_MAX_SIZE = 16384
+FNV1_OFFSET_BASIS = 14695981039346656037
+FNV1_PRIME = 1099511628211
+# Records hashed together by fnv1_hash_batch
+FNV1_BATCH_CHUNK = 65536
+
+
+def fnv1_hash(data):
+    """64 bit FNV-1 hash of bytes in metadata order, as m0_hash_fnc_fnv1() in motr."""
+    val = FNV1_OFFSET_BASIS
+    mask = (1 << 64) - 1
+    for byte in data:
+        val = ((val * FNV1_PRIME) & mask) ^ byte
+    return val
+
+
+def fnv1_hash_batch(mdata, offsets, length):
+    """
+    FNV-1 hash of length bytes at each of offsets, vectorized across offsets with numpy
+    :param mdata: buffer with the data, e.g. mmap
+    :param offsets: start offsets
+    :param length: bytes to hash at every offset
+    returns list of hashes in the order of offsets
+    """
+    if np is None or len(offsets) < 2:
+        return [fnv1_hash(mdata[offset:offset + length]) for offset in offsets]
+    data = np.frombuffer(mdata, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    prime = np.uint64(FNV1_PRIME)
+    hashes = []
+    # Memory is bounded by the chunk: one byte column of the chunk is read at a time
+    for start in range(0, len(offsets), FNV1_BATCH_CHUNK):
+        chunk = offsets[start:start + FNV1_BATCH_CHUNK]
+        val = np.full(len(chunk), FNV1_OFFSET_BASIS, dtype=np.uint64)
+        for index in range(length):
+            # uint64 arithmetic wraps modulo 2**64 as the C implementation does
+            val = (val * prime) ^ data[chunk + index].astype(np.uint64)
+        hashes += [int(crc) for crc in val]
+    return hashes
+
+
+VERIFY_REPORT_FIELDS = ["key_offset", "rec_offset", "crc_offset", "fid", "device_id",
+                        "er_unit_size", "er_cs_nob", "crc", "computed_crc", "crc_ok"]
+
+
+class EmapRecord(namedtuple("EmapRecord", [
+        "key_offset", "rec_offset", "container", "key", "ek_offset", "er_start", "er_value",
+        "er_unit_size", "er_cs_nob", "checksum", "footer_offset", "crc"])):
+    """EMAP key and record decoded from metadata, offsets are absolute."""
+
+    __slots__ = ()
+
+    @property
+    def fid(self):
+        """Stob fid as accepted by -corrupt_emap."""
+        return "{}:{}".format(hex(self.container), hex(self.key))
+
+    @property
+    def device_id(self):
+        """Device id of the cob."""
+        return MetadataParser.ConvertAdstob2Cob(hex(self.container), hex(self.key))[2]
+
+    @property
+    def crc_offset(self):
+        """Offset of the record CRC."""
+        return self.footer_offset + 8
+
+    def as_dict(self):
+        """Record as JSON serializable dict."""
+        rec = self._asdict()
+        rec.update(fid=self.fid, device_id=self.device_id, crc_offset=self.crc_offset,
+                   checksum=list(self.checksum))
+        return rec
+
 
 class MetadataParser:
     """Meta data parser library"""
 
-    def __init__(self, filename, parse_size=270469216):
+    def __init__(self, filename, parse_size=270469216, start_offset=0):
         """
-        initialize all dictionaries
+        initialize parser state, metadata is mapped on first use
+        :param filename: metadata file or device
+        :param parse_size: scan node headers up to this offset, whole file if None or 0
+        :param start_offset: scan node headers from this offset
         """
         self.ff_dict = {}
         self.fkvv_dict = {}
@@ -72,6 +177,48 @@ class MetadataParser:
         self.BeBnodeTypeKeys = {}
         self.filename = filename
         self.parse_size = parse_size  # default parse_size is 256Kb
+        self.start_offset = start_offset - start_offset % 8
+        self.mdata = None
+        self.btree_offsets = None
+        self._emap_records = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        """Memory map the metadata file read only, a device is mapped in full."""
+        if self.mdata is None:
+            with open(self.filename, "rb") as mdf:
+                size = os.lseek(mdf.fileno(), 0, os.SEEK_END)
+                self.mdata = mmap.mmap(mdf.fileno(), size, access=mmap.ACCESS_READ)
+        return self.mdata
+
+    def close(self):
+        """Unmap the metadata."""
+        if self.mdata is not None:
+            self.mdata.close()
+            self.mdata = None
+
+    def _read(self, offset, size):
+        """Bytes of metadata at offset."""
+        return self.open()[offset:offset + size]
+
+    def _word(self, offset):
+        """Little endian 8 byte word at offset."""
+        return struct.unpack_from('<Q', self.open(), offset)[0]
+
+    def _find_footer(self, offset, end=None):
+        """Offset of the first footer word at or after offset, -1 if none."""
+        mdata = self.open()
+        end = len(mdata) if end is None else min(end, len(mdata))
+        pos = mdata.find(FOOTER_BYTES, offset, end)
+        while pos != -1 and (pos - offset) % 8:
+            pos = mdata.find(FOOTER_BYTES, pos + 1, end)
+        return pos
 
     def ReadTypeSize(self, byte):
         """
@@ -85,51 +232,23 @@ class MetadataParser:
 
     def fmt_seg_header_parser(self, offset):
         """
-        Format and segment header parser function
-        """
-        with open(self.filename, "rb") as md:
-            md.seek(offset)
-            hd_magic = binascii.hexlify((md.read(8))[::-1])
-            hd_bits = binascii.hexlify((md.read(8))[::-1])
-            h_type = binascii.hexlify((md.read(8))[::-1])
-            h_tree_type = h_type[:8]
-            h_tree_type = h_tree_type[6:8]
-            h_node_type = h_type[8:]
-            h_crc_type = binascii.hexlify((md.read(8))[::-1])
-            h_gen = binascii.hexlify((md.read(8))[::-1])
-            h_fid = binascii.hexlify((md.read(16))[::-1])
-            h_opaque = binascii.hexlify((md.read(8))[::-1])
-
-            if h_tree_type in m0_btree_types:
-                m0_btree_types_dict[m0_btree_types[h_tree_type]].append(offset)
-
-            # print(f"Node_header: [Header start offset: {offset}, hd_magic:{hd_magic}, hd_bits:{
-            # hd_bits}, h_node_type: {h_node_type}, h_tree_type: {h_tree_type}, h_crc_type: {
-            # h_crc_type}, h_gen: {h_gen}, h_fid: {h_fid}, h_opaque: {h_opaque}]") balloc->4096,
-            # ctg-> 65536, cob-> 8192, emap-> 16384, confd->4096, dtm->8192
-            if h_tree_type in [b'02', b'03']:
-                r_offset = offset + 4096
-            elif h_tree_type in [b'04']:
-                r_offset = offset + 16384
-            elif h_tree_type in [b'05']:
-                r_offset = offset + 65536
-            elif h_tree_type in [b'07', b'08', b'09', b'0a', b'0b']:
-                r_offset = offset + 8192
-            elif h_tree_type in [b'0c']:
-                r_offset = offset + 4096
-            elif h_tree_type in [b'0e']:
-                r_offset = offset + 8192
-            else:
-                r_offset = offset + 8
-        return r_offset
+        Format and segment header parser function, indexes the node offset by tree type
+        returns offset to continue the scan from
+        """
+        h_type = self._word(offset + 16)
+        h_tree_type = (h_type >> 32) & 0xff
+        if h_tree_type in btree_type_names:
+            self.btree_offsets[btree_type_names[h_tree_type]].append(offset)
+        return offset + btree_node_skip.get(h_tree_type, 8)
 
-    @staticmethod
-    def get_emap_length():
+    def get_emap_length(self):
         """
         Find length of emap entries in m0_btree_type
         return length of emap entries
         """
-        return len(m0_btree_types_dict['M0_BT_EMAP_EM_MAPPING'])
+        if self.btree_offsets is None:
+            self.read_metadata_file()
+        return len(self.btree_offsets[EMAP_TREE])
 
     def get_fkvv_used(self, offset):
         """
@@ -137,12 +256,8 @@ class MetadataParser:
         input - offset of fkvv
         return fkvv_used
         """
-        with open(self.filename, "rb") as md:
-            md.seek(offset)
-            # read level, ksize and all in single read
-            fkvv_first_pack = binascii.hexlify((md.read(8))[::-1])
-            fkvv_used = fkvv_first_pack[12:16]
-        return fkvv_used
+        fkvv_first_pack = binascii.hexlify(self._read(offset, 8)[::-1])
+        return fkvv_first_pack[12:16]
 
     def get_fkvv_node_size(self, offset):
         """
@@ -150,54 +265,45 @@ class MetadataParser:
         input - offset of fkvv
         return fkvv_node_size
         """
-        with open(self.filename, "rb") as md:
-            md.seek(offset + 8)
-            # read level, ksize and all in single read
-            fkvv_first_pack = binascii.hexlify((md.read(8))[::-1])
-            fkvv_node_size = fkvv_first_pack[8:]
-        return fkvv_node_size
+        fkvv_first_pack = binascii.hexlify(self._read(offset + 8, 8)[::-1])
+        return fkvv_first_pack[8:]
+
+    def _fkvv_header(self, offset):
+        """
+        Decode FKVV node header
+        returns used count, node size and whether it is a valid leaf node
+        """
+        first, second, ft_magic = FKVV_HEADER.unpack_from(self.open(), offset)
+        used = first & 0xffff
+        level = (first >> 16) & 0xffff
+        nsize = second & 0xffffffff
+        return used, nsize, level == 0 and used != 0 and ft_magic == FOOTER_WORD
+
+    def _emap_keys(self, node_offset):
+        """
+        Decode all keys of an EMAP leaf node
+        returns list of (key start offset, nsize, key fields), empty if not a leaf node
+        """
+        used, nsize, leaf = self._fkvv_header(node_offset + 64)
+        if not leaf:
+            return []
+        start = node_offset + FKVV_KEYS_START
+        used = min(used, (len(self.mdata) - start) // EMAP_KEY.size)
+        return [(start + index * EMAP_KEY.size, nsize, fields) for index, fields in
+                enumerate(EMAP_KEY.iter_unpack(self._read(start, used * EMAP_KEY.size)))]
 
     def emap_key_parser(self, offset):
         """
         EMAP KEY PARSER, It will store EMAP key related data like node offset, size, length
         return emap key dictionary
         """
-        cnt = 1
-        fkvv_used = self.get_fkvv_used(offset + 64)
-        fkvv_nsize = self.get_fkvv_node_size(offset + 64)
-
-        if self.fkvv_parser(offset + 64):
-            with open(self.filename, "rb") as md:
-                r_offset = offset + 104
-                node_start_offset = offset
-                while int(fkvv_used, 16) >= cnt:
-                    md.seek(r_offset)
-                    emap_key_header = binascii.hexlify((md.read(8))[::-1])
-                    emap_key_hd_bits = binascii.hexlify((md.read(8))[::-1])
-                    rec_type, rec_size = self.ReadTypeSize(emap_key_hd_bits)
-                    ek_prefix = binascii.hexlify((md.read(16))[::-1])
-                    ek_offset = binascii.hexlify((md.read(8))[::-1])
-                    ek_footer = binascii.hexlify((md.read(8))[::-1])
-                    ek_chksum = binascii.hexlify((md.read(8))[::-1])
-                    value_offset = binascii.hexlify((md.read(4))[::-1])
-                    # print(f"[****fkvv_key_start_offset: {node_start_offset}, emap_key_header: {
-                    # emap_key_header}, rec_type: {rec_type}, rec_size: {rec_size} key prefix: {
-                    # ek_prefix}, ek_offset: {ek_offset}, ek_footer: {ek_footer}, ek_chksum: {
-                    # ek_chksum}, value_offset: {value_offset}]")
-                    emap_key_offset = r_offset
-                    node_length = fkvv_nsize
-                    key_index = cnt
-                    # value_offset = binascii.hexlify(((md.read(4)))[::-1])
-                    # value_offset = value_offset[8:]
-                    emap_key_list = [key_index, node_start_offset, emap_key_offset,
-                                     int(node_length, 16), int(value_offset, 16)]
-                    # print(f"*** Respective emap_key_list: {emap_key_list}")
-                    self.emap_key_dict.setdefault(node_start_offset, []).append(emap_key_list)
-                    cnt = cnt + 1
-                    r_offset = r_offset + 60
-        else:
+        keys = self._emap_keys(offset)
+        if not keys:
             print("Cannot parse as it is not leaf fkvv node")
-            # assert "Cannot parse as node is not FKVV"
+            return self.emap_key_dict
+        self.emap_key_dict[offset] = [[index, offset, key_offset, nsize, fields[-1]]
+                                      for index, (key_offset, nsize, fields)
+                                      in enumerate(keys, 1)]
         return self.emap_key_dict
 
     def ff_parser(self, offset):
@@ -205,72 +311,48 @@ class MetadataParser:
         FF header parser
         returns offset and length of header
         """
-        total_node_header_len = 0
-        ff_nsize = b'0'
-        with open(self.filename, "rb") as md:
-            md.seek(offset)
-            # read ff used, ff level, ff k_size, ff vsize and first byte of ff nsize
-            ff_first_pack = binascii.hexlify((md.read(8))[::-1])
-            ff_used = ff_first_pack[12:16]  # 2 bytes ff used
-            ff_level = ff_first_pack[10:12]  # ff level 1 byte
-            ff_ksize = ff_first_pack[6:10]  # ksize 2 byte
-            ff_vsize = ff_first_pack[2:6]  # vsize 2 byte
-            # read next 8 bytes first 3 of nsize and remaining of ftmagic
-            ff_second_pack = binascii.hexlify((md.read(8))[::-1])
-            # nsize 1 byte from firstpack and 3 bytes from second pack
-            ff_nsize = ff_second_pack[10:16] + ff_first_pack[:2]
-            # read next 8 bytes first 3 of ft_magic and remaining of ft_checksum
-            ff_third_pack = binascii.hexlify((md.read(8))[::-1])
-            # ft_magic 3 bytes of third pack and 5 of second pack
-            ft_magic = ff_third_pack[10:16] + ff_second_pack[:10]
-            # read next 8 bytes first 3 bytes of ft_checksum and remaining of ft_opaque
-            ff_fourth_pack = binascii.hexlify((md.read(8))[::-1])
-            # ft_checksum 3 bytes of fourth pack and 5 from third pack
-            ft_checksum = ff_fourth_pack[10:16] + ff_third_pack[:10]
-            ff_last_pack = binascii.hexlify((md.read(3))[::-1])  # read remaining bytes of ft_opaque
-            # ft_checksum 3 bytes of last pack and 5 from fourth pack
-            ft_opaque = ff_last_pack[:6] + ff_fourth_pack[:10]
+        # ff used, ff level, ff k_size, ff vsize and first byte of ff nsize
+        ff_first_pack = binascii.hexlify(self._read(offset, 8)[::-1])
+        ff_used = ff_first_pack[12:16]  # 2 bytes ff used
+        ff_level = ff_first_pack[10:12]  # ff level 1 byte
+        ff_ksize = ff_first_pack[6:10]  # ksize 2 byte
+        ff_vsize = ff_first_pack[2:6]  # vsize 2 byte
+        # next 8 bytes first 3 of nsize and remaining of ftmagic
+        ff_second_pack = binascii.hexlify(self._read(offset + 8, 8)[::-1])
+        # nsize 1 byte from firstpack and 3 bytes from second pack
+        ff_nsize = ff_second_pack[10:16] + ff_first_pack[:2]
+        # next 8 bytes first 3 of ft_magic and remaining of ft_checksum
+        ff_third_pack = binascii.hexlify(self._read(offset + 16, 8)[::-1])
+        # ft_magic 3 bytes of third pack and 5 of second pack
+        ft_magic = ff_third_pack[10:16] + ff_second_pack[:10]
+        # next 8 bytes first 3 bytes of ft_checksum and remaining of ft_opaque
+        ff_fourth_pack = binascii.hexlify(self._read(offset + 24, 8)[::-1])
+        # ft_checksum 3 bytes of fourth pack and 5 from third pack
+        ft_checksum = ff_fourth_pack[10:16] + ff_third_pack[:10]
+        ff_last_pack = binascii.hexlify(self._read(offset + 32, 3)[::-1])  # rest of ft_opaque
+        # ft_checksum 3 bytes of last pack and 5 from fourth pack
+        ft_opaque = ff_last_pack[:6] + ff_fourth_pack[:10]
+        print(
+            f"[ff start offset:{offset}, ff_used: {ff_used}, ff_level:{ff_level},"
+            f" ff_ksize:{ff_ksize}, ff_vsize:{ff_vsize}, ff_nsize:{ff_nsize},"
+            f" ff_ft_magic:{ft_magic}, ff_ft_checksum:{ft_checksum}, ff_ft_opaque:{ft_opaque}]")
+        if ff_level == b'0000' and ff_used != b'0000' and ft_magic == MAGIC_FOOTER:
+            print("At Leaf FF level Zero node. So reading further...")
+            self.ff_dict[offset] = [offset, ff_nsize, ff_used]
+        else:
             print(
-                f"[ff start offset:{offset}, ff_used: {ff_used}, ff_level:{ff_level},"
-                f" ff_ksize:{ff_ksize}, ff_vsize:{ff_vsize}, ff_nsize:{ff_nsize},"
-                f" ff_ft_magic:{ft_magic}, ff_ft_checksum:{ft_checksum}, ff_ft_opaque:{ft_opaque}]")
-            if ff_level == b'0000' and ff_used != b'0000' and ft_magic == MAGIC_FOOTER:
-                print("At Leaf FF level Zero node. So reading further...")
-                self.ff_dict[offset] = [offset, ff_nsize, ff_used]
-                key_start_offset = offset + 35
-                r_offset = offset + 35
-            else:
-                print(
-                    f"Leaf node level is non zero: {ff_level} or ff_used is Zero {ff_used},"
-                    f"So skipping collecting data")
-                r_offset = offset + 35
+                f"Leaf node level is non zero: {ff_level} or ff_used is Zero {ff_used},"
+                f"So skipping collecting data")
+        r_offset = offset + 35
         total_node_header_len = int(ff_nsize, 16) if int(ff_nsize, 16) > 0 else 35
         return r_offset, total_node_header_len
 
     def fkvv_parser(self, offset):
         """
         FKVV header parser
-        returns offset and length of header
+        returns True if it is a leaf node with valid entries
         """
-        with open(self.filename, "rb") as md:
-            md.seek(offset)
-            fkvv_first_pack = binascii.hexlify(
-                (md.read(8))[::-1])  # read level, ksize and all in single read
-            fkvv_used = fkvv_first_pack[12:16]  # used 2 bytes valid entry
-            fkvv_level = fkvv_first_pack[8:12]  # level 1 byte + 1 byte pad
-            fkvv_ksize = fkvv_first_pack[:8]  # kzise 2 bytes + 2 byte pad
-            fkvv_nsize = binascii.hexlify(
-                (md.read(8))[::-1])  # total Node size 4 nsize and 4 byte padding
-            fkvv_nsize = fkvv_nsize[8:]  # read First 4 bytes for node size
-            ft_magic = binascii.hexlify((md.read(8))[::-1])  # magic Footer 8 bytes
-            ft_checksum = binascii.hexlify((md.read(8))[::-1])  # checksum     8 bytes
-            ft_opaque = binascii.hexlify((md.read(8))[::-1])  # opaque       8 bytes
-
-            if fkvv_level == b'0000' and fkvv_used != b'0000' and ft_magic == MAGIC_FOOTER:
-                # print(f"[fkvv start offset:{offset}, fkvv_used: {fkvv_used}, fkvv_level:{fkvv_level}, fkvv_ksize:{fkvv_ksize}, fkvv_nsize:{fkvv_nsize}, ft_magic:{ft_magic}, ft_checksum:{ft_checksum}, ft_opaque:{ft_opaque}]")
-                return True
-            else:
-                return False
+        return self._fkvv_header(offset)[2]
 
     def vkvv_parser(self, offset):
         """
@@ -288,80 +370,182 @@ class MetadataParser:
 
     def read_metadata_file(self):
         """
-        Metadata read file function
-        """
-        offset: int = 0
-        with open(self.filename, "rb") as metadata:
-            while 1:
-                byte = metadata.read(8)
-                if not byte:
-                    break
-                byte = binascii.hexlify(byte[::-1])
-                if byte == MAGIC_HEADER:
-                    offset = self.fmt_seg_header_parser(offset)
-                else:
-                    offset = offset + 8
-                metadata.seek(offset)
-                if offset > self.parse_size:
-                    break
-
-    def EditEmapMetadata(self, emap_rec_full, offset, crc_offset):
-        """Edit emap metadata with the fixed pattern of 0x1111222244443333."""
+        Scan metadata once for node headers and index node offsets per tree type
+        return dict of tree type to node offsets
+        """
+        mdata = self.open()
+        end = len(mdata)
+        if self.parse_size:
+            end = min(end, self.parse_size + 8)
+        self.btree_offsets = {name: [] for name in m0_btree_types.values()}
+        self._emap_records = None
+        self.emap_key_dict = {}
+        offset = self.start_offset
+        while True:
+            offset = mdata.find(HEADER_BYTES, offset, end)
+            if offset == -1:
+                break
+            if offset % 8:
+                # Headers are 8 byte aligned, magic bytes elsewhere are data.
+                offset += 8 - offset % 8
+                continue
+            offset = self.fmt_seg_header_parser(offset)
+        return self.btree_offsets
+
+    def emap_record_at(self, key_offset, rec_offset):
+        """
+        Decode an EMAP record without scanning the metadata
+        :param key_offset: offset of the EMAP key prefix
+        :param rec_offset: offset of the EMAP record header
+        return EmapRecord, None if no complete record is found at rec_offset
+        """
+        mdata = self.open()
+        if key_offset + 24 > len(mdata) or rec_offset + EMAP_REC_HEADER.size > len(mdata):
+            return None
+        container, key, ek_offset = struct.unpack_from('<QQQ', mdata, key_offset)
+        footer = self._find_footer(rec_offset, rec_offset + EMAP_REC_MAX_SIZE)
+        if footer < rec_offset + EMAP_REC_HEADER.size or footer + 16 > len(mdata):
+            return None
+        header = EMAP_REC_HEADER.unpack_from(mdata, rec_offset)
+        cksum_start = rec_offset + EMAP_REC_HEADER.size
+        checksum = struct.unpack_from('<%dQ' % ((footer - cksum_start) // 8), mdata, cksum_start)
+        return EmapRecord(key_offset, rec_offset, container, key, ek_offset, header[2],
+                          header[3], header[4], header[5], checksum, footer,
+                          self._word(footer + 8))
+
+    def emap_records(self):
+        """
+        Decode EMAP keys with a valid ek_offset and their records from all indexed EMAP nodes
+        return list of EmapRecord, decoded once per scan
+        """
+        if self.btree_offsets is None:
+            self.read_metadata_file()
+        if self._emap_records is None:
+            records = []
+            for node_offset in self.btree_offsets[EMAP_TREE]:
+                for key_start, nsize, fields in self._emap_keys(node_offset):
+                    if fields[4] == MAX_WORD:
+                        continue
+                    record = self.emap_record_at(key_start + 16,
+                                                 node_offset + nsize - fields[-1])
+                    if record:
+                        records.append(record)
+            self._emap_records = records
+        return self._emap_records
+
+    def record_crc(self, record):
+        """Compute FNV-1 hash of an EMAP record from its header up to the footer."""
+        return fnv1_hash(self._read(record.rec_offset,
+                                    record.footer_offset - record.rec_offset))
+
+    def emap_crcs(self, records=None):
+        """
+        Compute CRC of EMAP records in batches of equal record length
+        :param records: EmapRecord list, all EMAP records if None
+        return list of computed CRCs in the order of records
+        """
+        records = self.emap_records() if records is None else records
+        by_length = defaultdict(list)
+        for index, record in enumerate(records):
+            by_length[record.footer_offset - record.rec_offset].append(index)
+        crcs = [None] * len(records)
+        for length, indexes in by_length.items():
+            hashes = fnv1_hash_batch(self.open(), [records[i].rec_offset for i in indexes],
+                                     length)
+            for index, crc in zip(indexes, hashes):
+                crcs[index] = crc
+        return crcs
+
+    def verify_emap_records(self, records=None):
+        """
+        Verify CRC of EMAP records
+        :param records: EmapRecord list, all EMAP records if None
+        return list of dicts with VERIFY_REPORT_FIELDS keys, one per record
+        """
+        records = self.emap_records() if records is None else records
+        report = []
+        for record, computed in zip(records, self.emap_crcs(records)):
+            report.append({"key_offset": record.key_offset, "rec_offset": record.rec_offset,
+                           "crc_offset": record.crc_offset, "fid": record.fid,
+                           "device_id": record.device_id, "er_unit_size": record.er_unit_size,
+                           "er_cs_nob": record.er_cs_nob, "crc": "0x{:016x}".format(record.crc),
+                           "computed_crc": "0x{:016x}".format(computed),
+                           "crc_ok": record.crc == computed})
+        return report
+
+    @staticmethod
+    def write_verify_report(report, path=None, fmt="json"):
+        """
+        Write verify_emap_records() report
+        :param report: report entries
+        :param path: output file, stdout if None
+        :param fmt: json for a document with a summary and records, csv for one row per record
+        """
+        mismatches = [entry for entry in report if not entry["crc_ok"]]
+        out = open(path, "w", newline="") if path else None
+        try:
+            stream = out or sys.stdout
+            if fmt == "csv":
+                writer = csv.DictWriter(stream, fieldnames=VERIFY_REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(report)
+            else:
+                json.dump({"records": len(report), "mismatches": len(mismatches),
+                           "mismatch_offsets": [entry["rec_offset"] for entry in mismatches],
+                           "report": report}, stream, indent=1)
+                stream.write("\n")
+        finally:
+            if out:
+                out.close()
+        return len(mismatches)
+
+    def EditEmapMetadata(self, record):
+        """
+        Edit first checksum word of an emap record with the fixed pattern of
+        0x1111222244443333 and rewrite the record CRC to match.
+        """
+        offset = record.rec_offset + EMAP_REC_HEADER.size
+        body = bytearray(self._read(record.rec_offset,
+                                    record.footer_offset - record.rec_offset))
+        body[EMAP_REC_HEADER.size:EMAP_REC_HEADER.size + 8] = CORRUPT_PATTERN
+        val = fnv1_hash(body)
         with open(self.filename, 'r+b') as wbfr:
             print("** Corrupting 8byte of Metadata at offset {}"
                   " with b'1111222244443333' **".format(offset))
             wbfr.seek(offset)
-            wbfr.flush()
-            wbfr.write(b'\x33\x33\x44\x44\x22\x22\x11\x11')
-            emap_rec_full[7] = '1111222244443333'
-            val = self.ComputeCRC(emap_rec_full, len(emap_rec_full) - 2)
+            wbfr.write(CORRUPT_PATTERN)
             print("Newly computed CRC : ", hex(val), " val to byte : ", val.to_bytes(8, 'little'),
-                  " offset : ", offset, " crc offset : ", crc_offset)
-            wbfr.seek(crc_offset)
+                  " offset : ", offset, " crc offset : ", record.crc_offset)
+            wbfr.seek(record.crc_offset)
             wbfr.write(val.to_bytes(8, 'little'))
             wbfr.flush()
-            wbfr.seek(offset)
-            wbfr.flush()
+        self._emap_records = None
 
     def ReadMetadata(self, offset):
         """Verifies that meta-data contains the valid footer at the given offset."""
-        with open(self.filename, "rb") as mdata:
-            mdata.seek(offset)
-            data = binascii.hexlify((mdata.read(8))[::-1])
-            if data == MAGIC_FOOTER:
-                return True, data
-            return False, data
+        data = binascii.hexlify(self._read(offset, 8)[::-1])
+        if data == MAGIC_FOOTER:
+            return True, data
+        return False, data
 
     def ReadCompleteRecord(self, offset):
         """Function read complete record starting after header and until footer for record."""
-        curr_record = []
-        while 1:
-            footerFound, data = self.ReadMetadata(offset)
-            if footerFound:
-                break
-            curr_record.append(data.decode('utf-8'))
-            offset = offset + 8  # check next 8 bytes
-
+        footer = self._find_footer(offset)
+        if footer == -1:
+            raise ValueError("No footer found after offset {}".format(offset))
+        curr_record = struct.unpack_from('<%dQ' % ((footer - offset) // 8), self.open(), offset)
         # Convert list to hex representation
-        curr_record = [hex(int(i, 16)) for i in curr_record]
-        return curr_record, offset  # Return record data and footer offset
+        curr_record = [hex(i) for i in curr_record]
+        return curr_record, footer  # Return record data and footer offset
 
     def ReadCompleteRecordIncCRC(self, offset):
         """Function read complete record starting after header and until footer for record."""
-        curr_record = []
-        while 1:
-            footerFound, data = self.ReadMetadata(offset)
-            curr_record.append(data.decode('utf-8'))
-            offset = offset + 8  # check next 8 bytes
-            if footerFound:
-                _, data = self.ReadMetadata(offset)
-                curr_record.append(data.decode('utf-8'))
-                offset = offset + 8
-                break
-
-        # Convert list to hex representation
-        # curr_record = [ hex(int(i, 16)) for i in curr_record]
-        return curr_record, offset  # Return record data and footer offset
+        footer = self._find_footer(offset)
+        if footer == -1:
+            raise ValueError("No footer found after offset {}".format(offset))
+        curr_record = struct.unpack_from('<%dQ' % ((footer - offset) // 8 + 2), self.open(), offset)
+        curr_record = ['{:016x}'.format(i) for i in curr_record]
+        return curr_record, footer + 16  # Return record data and offset after CRC
 
     @staticmethod
     def m0_hash_fnc_fnv1(buffer, length):
@@ -413,145 +597,94 @@ class MetadataParser:
 
         return stob_f_container, stob_f_key
 
-    def CorruptEmap(self, emap_entry):
-        """Method corrupts EMAP record specified by Cob ID."""
+    @staticmethod
+    def print_emap_record(record, title):
+        """Print all fields of an EMAP record."""
+        print("** {} offset {},"
+              " BE_EMAP_REC er_start = 0x{:016x},"
+              " er_value = 0x{:016x}, er_unit_sz = 0x{:016x},"
+              " er_cksm_nob = 0x{:016x}, checksum = {}"
+              " footer offset = {}, CRC = 0x{:016x}"
+              .format(title, record.rec_offset, record.er_start, record.er_value,
+                      record.er_unit_size, record.er_cs_nob,
+                      ",".join("0x{:016x}".format(word) for word in record.checksum),
+                      record.footer_offset, record.crc))
+
+    def CorruptEmap(self, emap_entry, key_offset=None, rec_offset=None):
+        """
+        Method corrupts EMAP record specified by Cob ID.
+        :param emap_entry: stob fid as container:key
+        :param key_offset: key offset of the record from emap_records(), skips the scan
+        :param rec_offset: record offset of the record from emap_records(), skips the scan
+        """
         count = 0
-        stob_f_container, stob_f_key = emap_entry.split(":")
-        stob_f_container = hex(int(stob_f_container, 16))
-        stob_f_key = hex(int(stob_f_key, 16))
-        # print(f"stob_f_container: {stob_f_container}, stob_f_key: {stob_f_key}")
-        # stop_f_key_1 = "0x{:02x}".format(stob_f_key[2:])
-        emap_keys_list = self.ListAllEmapPerDevice()
-        emap_key = [
-            key
-            for key in emap_keys_list
-            if stob_f_container in key and (stob_f_key in key)
-        ]
-
-        offset = emap_key[0][1]
-        emap_key_data, r_offset = self.ReadCompleteRecord(offset)
-
-        if (stob_f_container in emap_key_data) and \
-                (stob_f_key in emap_key_data) and \
-                ("0xffffffffffffffff" not in emap_key_data):
-            # 16 bytes of BE_EMAP_KEY (footer) + 16 bytes of BE_EMAP_REC(header)
-
-            rec_hdr_offset = emap_key[0][2]  # offset + 32
-            emap_rec_data, _ = self.ReadCompleteRecord(rec_hdr_offset)
-            # Skip key CRC
-            emap_rec_data_full, _ = self.ReadCompleteRecordIncCRC(rec_hdr_offset)
-            # Check er_cs_nob and if it is not 0 then go and corrupt last checksum 8 bytes
-            if emap_rec_data[5] != "0x0":
-                print("** Metadata key at offset {},"
-                      " BE_EMAP_KEY ek_prefix = {}:{},"
-                      " ek_offset = {}".format(offset - 24,
-                                               emap_key_data[0], emap_key_data[1],
-                                               emap_key_data[2]))
-                print("** Metadata val at offset {},"
-                      " BE_EMAP_REC er_start = {},"
-                      " er_value = {}, er_unit_size = {},"
-                      " er_cs_nob = {}, checksum = {}".format(
-                    rec_hdr_offset, emap_rec_data[2],
-                    emap_rec_data[3], emap_rec_data[4],
-                    emap_rec_data[5], emap_rec_data[6:]))
-                print("** Full Record before edit offset {},"
-                      " BE_EMAP_REC hd_magic = {},"
-                      " hd_bits = {}, er_start = {},"
-                      " er_value = {}, er_unit_sz = {},"
-                      " er_cksm_nob = {}, checksum = {},{},{},{}"
-                      " footer = {}, CRC = {}"
-                      .format(offset, emap_rec_data_full[0],
-                              emap_rec_data_full[1], emap_rec_data_full[2],
-                              emap_rec_data_full[3], emap_rec_data_full[4],
-                              emap_rec_data_full[5], emap_rec_data_full[6],
-                              emap_rec_data_full[7], emap_rec_data_full[8],
-                              emap_rec_data_full[9], emap_rec_data_full[10],
-                              emap_rec_data_full[11]))
-                self.EditEmapMetadata(emap_rec_data_full, rec_hdr_offset + 48,
-                                      rec_hdr_offset + 84 + round(
-                                          int(emap_rec_data_full[5], 16) / 8))
-                print("** Full Record after edit offset {},"
-                      " BE_EMAP_REC hd_magic = {},"
-                      " hd_bits = {}, er_start = {},"
-                      " er_value = {}, er_unit_sz = {},"
-                      " er_cksm_nob = {}, checksum = {},{},{},{}"
-                      " footer = {}, CRC = {}"
-                      .format(offset, emap_rec_data_full[0],
-                              emap_rec_data_full[1], emap_rec_data_full[2],
-                              emap_rec_data_full[3], emap_rec_data_full[4],
-                              emap_rec_data_full[5], emap_rec_data_full[6],
-                              emap_rec_data_full[7], emap_rec_data_full[8],
-                              emap_rec_data_full[9], emap_rec_data_full[10],
-                              emap_rec_data_full[11]))
-                emap_rec_data, _ = self.ReadCompleteRecord(rec_hdr_offset)
-                count = count + 1
+        stob_f_container, stob_f_key = (int(part, 16) for part in emap_entry.split(":"))
+        if key_offset is not None and rec_offset is not None:
+            records = [self.emap_record_at(key_offset, rec_offset)]
+        else:
+            records = self.emap_records()
+        emap_key = [record for record in records if record and
+                    (record.container, record.key) == (stob_f_container, stob_f_key)]
+        if not emap_key:
+            print("No EMAP record found for {}".format(emap_entry))
+            return count
+
+        record = emap_key[0]
+        # Check er_cs_nob and if it is not 0 then go and corrupt first checksum 8 bytes
+        if record.er_cs_nob:
+            print("** Metadata key at offset {},"
+                  " BE_EMAP_KEY ek_prefix = {}:{},"
+                  " ek_offset = {}".format(record.key_offset - 24, hex(record.container),
+                                           hex(record.key), hex(record.ek_offset)))
+            self.print_emap_record(record, "Full Record before edit")
+            self.EditEmapMetadata(record)
+            self.print_emap_record(self.emap_record_at(record.key_offset, record.rec_offset),
+                                   "Full Record after edit")
+            count = count + 1
 
         return count
 
-    # emap_key_list = [key_index, node_start_offset, emap_key_offset, node_length, key_size, value_offset]
-
     def ListAllEmapPerDevice(self):
-        # print("*****Listing all emap keys and emap records with device id*****")
+        """
+        Print all emap keys and emap records with device id
+        return list of [count, key offset, record offset, stob container, stob key]
+        """
         count = 0
         emap_key_per_device = []
-        assert len(m0_btree_types_dict["M0_BT_EMAP_EM_MAPPING"]) != 0, "No EMAP Entry found, Read more metadata"
-        node_offsets = m0_btree_types_dict["M0_BT_EMAP_EM_MAPPING"]
-
-        for node_offset in node_offsets:
-            ek_dict = self.emap_key_parser(node_offset)
-        # print("emap_key_dict:{}".format(ek_dict))
-        for key in ek_dict:
-            values = ek_dict[key]
-            # print(f"VALUES: {values}")
-            for emap_key_list in values:
-                # print(f"emap_key_list: {emap_key_list}")
-                key_offset = emap_key_list[2] + 16
-                emap_key_data, _ = self.ReadCompleteRecord(key_offset)
-                stob_f_container_hex = emap_key_data[0]
-                stob_f_key_hex = emap_key_data[1]
-                _, _, device_id = self.ConvertAdstob2Cob(stob_f_container_hex, stob_f_key_hex)
-                # print(f"==emap_key_list: {emap_key_list}")
-                # print("==emap_key_data: {}".format(emap_key_data))
-                if emap_key_data[2] != '0xffffffffffffffff':
-                    # Jump to Record using offsets
-                    rec_hdr_offset = emap_key_list[1] + emap_key_list[3] - emap_key_list[-1]
-                    emap_key_per_device.append(
-                        [count, key_offset, rec_hdr_offset, stob_f_container_hex, stob_f_key_hex])
-
-                    emap_rec_data_full, _ = self.ReadCompleteRecordIncCRC(rec_hdr_offset)
-                    # print("==EMAP key per device: {}".format(emap_key_per_device))
-                    # print("==emap_rec_data_full: {}".format(emap_rec_data_full))
-                    if len(emap_rec_data_full) > 4 and emap_rec_data_full[4] != '0000000000000000':
-                        print("=============[ Count :", count, " Key offset : ", key_offset,
-                              " Val offset : ",
-                              rec_hdr_offset, "]==============")
-                        print("** Metadata key"
-                              " BE_EMAP_KEY ek_prefix = {}:{},"
-                              " ek_offset = {}, Device ID = {}".format(
-                            emap_key_data[0], emap_key_data[1], emap_key_data[2], device_id))
-                        print("** Metadata val"
-                              " BE_EMAP_REC er_start = 0x{},"
-                              " er_value = 0x{}, er_unit_size = 0x{},"
-                              " er_cs_nob = 0x{}"
-                              .format(emap_rec_data_full[2],
-                                      emap_rec_data_full[3], emap_rec_data_full[4],
-                                      emap_rec_data_full[5]))
-                        if emap_rec_data_full[5] != '0000000000000000':
-                            cksum_count = round(int(emap_rec_data_full[5], 16) / 8)
-                            print("Checksum : ", end=" ")
-                            for i in range(cksum_count):
-                                print("0x{}".format(emap_rec_data_full[6 + i]), end=" ")
-                            comp_crc = self.ComputeCRC(emap_rec_data_full,
-                                                       len(emap_rec_data_full) - 2)
-                            print("** Additional Record Data"
-                                  " BE_EMAP_REC hd_magic = 0x{},"
-                                  " hd_bits = 0x{}, footer = 0x{}, CRC = 0x{},"
-                                  " Computed CRC = {}"
-                                  .format(emap_rec_data_full[0],
-                                          emap_rec_data_full[1], emap_rec_data_full[-2],
-                                          emap_rec_data_full[-1], "0x{:016x}".format(comp_crc)))
-                            if emap_rec_data_full[-1] != "0x{:016x}".format(comp_crc)[2:]:
-                                print("**** Computed CRC Missmatch ****")
-                            print()
-                        count = count + 1
+        if self.btree_offsets is None:
+            self.read_metadata_file()
+        assert len(self.btree_offsets[EMAP_TREE]) != 0, "No EMAP Entry found, Read more metadata"
+
+        records = self.emap_records()
+        crcs = self.emap_crcs(records)
+        for record, comp_crc in zip(records, crcs):
+            emap_key_per_device.append([count, record.key_offset, record.rec_offset,
+                                        hex(record.container), hex(record.key)])
+            if not record.er_unit_size:
+                continue
+            print("=============[ Count :", count, " Key offset : ", record.key_offset,
+                  " Val offset : ", record.rec_offset, "]==============")
+            print("** Metadata key"
+                  " BE_EMAP_KEY ek_prefix = {}:{},"
+                  " ek_offset = {}, Device ID = {}".format(
+                      hex(record.container), hex(record.key), hex(record.ek_offset),
+                      record.device_id))
+            print("** Metadata val"
+                  " BE_EMAP_REC er_start = 0x{:016x},"
+                  " er_value = 0x{:016x}, er_unit_size = 0x{:016x},"
+                  " er_cs_nob = 0x{:016x}"
+                  .format(record.er_start, record.er_value, record.er_unit_size,
+                          record.er_cs_nob))
+            if record.er_cs_nob:
+                print("Checksum : ", end=" ")
+                for word in record.checksum[:round(record.er_cs_nob / 8)]:
+                    print("0x{:016x}".format(word), end=" ")
+                print("** Additional Record Data"
+                      " footer offset = {}, CRC = 0x{:016x},"
+                      " Computed CRC = 0x{:016x}"
+                      .format(record.footer_offset, record.crc, comp_crc))
+                if record.crc != comp_crc:
+                    print("**** Computed CRC Missmatch ****")
+                print()
+            count = count + 1
         return emap_key_per_device
@@ -19,6 +19,7 @@
 #
 """ Wrapper to run the EMAP list and corrupt """
 
+import json
 import os
 import sys
 
@@ -37,6 +38,20 @@ parser.add_argument('-list_emap', action='store_true', default=False, dest='list
                          '-list_emap -m '
                          '/var/motr/m0d-0x7200000000000001:0xc/db/o/100000000000000:2a '
                          '-parse_size 10485760')
+parser.add_argument('-verify_emap', action='store_true', default=False, dest='verify_emap',
+                    help='Verify CRC of all Emap records and write a report,'
+                         ' exit status 2 on mismatches')
+parser.add_argument('-report', action='store', dest='report',
+                    help='Report file of -verify_emap, stdout if not given')
+parser.add_argument('-report_format', action='store', default='json', choices=['json', 'csv'],
+                    dest='report_format', help='Report format of -verify_emap')
+parser.add_argument('-json', action='store_true', default=False, dest='json_out',
+                    help='With -list_emap print one JSON object per Emap record')
+parser.add_argument('-key_offset', action='store', type=int, dest='key_offset',
+                    help='Key offset of the -corrupt_emap record from -list_emap -json,'
+                         ' skips parsing the metadata when given with -rec_offset')
+parser.add_argument('-rec_offset', action='store', type=int, dest='rec_offset',
+                    help='Record offset of the -corrupt_emap record from -list_emap -json')
 parser.add_argument('-parse_size', action='store', dest='parse_size', type=int,
                     help='Limit for metadata parsing size in bytes for list_emap and verify option')
 parser.add_argument('-offset', action='store', default=0, type=int, dest='seek_offset',
@@ -49,13 +64,22 @@ oid = args.corrupt_emap
 parse_size = args.parse_size
 offset = args.seek_offset
 
-md = metadata_parser.MetadataParser(filename, parse_size)
-if not os.walk(filename):
+if not filename or not os.path.exists(filename):
     print('Failed: The path specified does not exist or Missing file path')
     sys.exit(1)
-md.read_metadata_file()
 
-if args.list_emap:
-    md.ListAllEmapPerDevice()
-elif args.corrupt_emap:
-    md.CorruptEmap(oid)
+with metadata_parser.MetadataParser(filename, parse_size, offset) as md:
+    if args.corrupt_emap and args.key_offset is not None and args.rec_offset is not None:
+        md.CorruptEmap(oid, args.key_offset, args.rec_offset)
+    elif args.verify_emap:
+        mismatches = md.write_verify_report(md.verify_emap_records(), args.report,
+                                            args.report_format)
+        if mismatches:
+            sys.exit(2)
+    elif args.list_emap and args.json_out:
+        for record in md.emap_records():
+            print(json.dumps(record.as_dict()))
+    elif args.list_emap:
+        md.ListAllEmapPerDevice()
+    elif args.corrupt_emap:
+        md.CorruptEmap(oid)
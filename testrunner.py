@@ -397,7 +397,7 @@ def trigger_runner_process(args, kafka_msg, client):
     if kafka_msg.parallel and args.force_serial_run != "True":
         trigger_unexecuted_tests(args, kafka_msg.test_list)
     # Release lock on acquired target.
-    lock_released = lock_task.unlock_target(args.target, client)
+    lock_released = lock_task.release_target(args.target, client)
     if lock_released:
         LOGGER.debug("lock released on target {}".format(args.target))
     else:
@@ -496,50 +496,16 @@ def trigger_tests_from_te(args, jira_obj):
             runner.stop_parallel_io(thread_io, event)
 
 
-def acquire_target(target, client, lock_type, convert_to_shared=False):
-    """
-    Check for target which will be used for sequential execution.
-    """
-    lock_task = LockingServer()
-    found_target = ""
-    if target != "":
-        LOGGER.debug("target found {}".format(target))
-        lock_success = lock_task.lock_target(target, client, lock_type, convert_to_shared)
-        if lock_success:
-            LOGGER.debug("lock acquired {}".format(target))
-            confirm_lock_success = lock_task.is_target_locked(target, client, lock_type)
-            if confirm_lock_success:
-                found_target = target
-                LOGGER.debug("lock confirmed {}".format(target))
-    return found_target
-
-
 def get_available_target(kafka_msg, client):
     """
     Check available target from target list
     Get lock on target if available
     """
     lock_task = LockingServer()
-    acquired_target = ""
     HealthCheck(runner.get_db_credential()).health_check(kafka_msg.target_list)
     LOGGER.info("Acquiring available target for test execution.")
-    while acquired_target == "":
-        if kafka_msg.parallel:
-            target = lock_task.find_free_target(kafka_msg.target_list, common_cnst.SHARED_LOCK)
-            if target == "":
-                seq_target = lock_task.find_free_target(kafka_msg.target_list,
-                                                        common_cnst.EXCLUSIVE_LOCK)
-                if seq_target != "":
-                    acquired_target = acquire_target(seq_target, client, common_cnst.SHARED_LOCK,
-                                                     True)
-            else:
-                acquired_target = acquire_target(target, client, common_cnst.SHARED_LOCK)
-        else:
-            seq_target = lock_task.find_free_target(kafka_msg.target_list,
-                                                    common_cnst.EXCLUSIVE_LOCK)
-            if seq_target != "":
-                acquired_target = acquire_target(seq_target, client,
-                                                 common_cnst.EXCLUSIVE_LOCK)
+    lock_type = common_cnst.SHARED_LOCK if kafka_msg.parallel else common_cnst.EXCLUSIVE_LOCK
+    acquired_target = lock_task.acquire(kafka_msg.target_list, client, lock_type)
     LOGGER.info("Acquired available target %s for test execution.", str(acquired_target))
     return acquired_target
 
@@ -584,9 +550,11 @@ def check_kafka_msg_trigger_test(args):
                 args.target = acquired_target
                 # force serial run within testrunner till xdist issue is fixed
                 args.force_serial_run = "True"
+                heartbeat = LockingServer().start_heartbeat(acquired_target, client)
                 p = Process(target=trigger_runner_process, args=(args, kafka_msg, client))
                 p.start()
                 p.join()
+                heartbeat.set()
         except KeyboardInterrupt:
             break
         except BaseException as exce:
@@ -627,7 +627,7 @@ class TestMultipartUploadPartCopy:
         mpu_id2 = resp[1]["UploadId"]
         parts2 = list()
         self.log.info("Step 6: Parallelly upload part1 by copying object1 to both these uploadIDs.")
-        gevent_pool = GeventPool(2)
+        gevent_pool = GeventPool(2, keep_results=True)
         gevent_pool.wait_available()
         # 'bytes=1-1073741824' 1GB object size.
         gevent_pool.spawn(self.s3mpu_obj.upload_part_copy, f"{self.bucket_name}/{self.object_name}",
@@ -232,6 +232,7 @@ def main():
                         "testID": test["key"],
                         "latest": True
                     },
+                    "limit": 1
                 }
 
                 test_issue = jira_api.get_issue_details(test["key"], username, password)
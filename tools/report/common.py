@@ -25,6 +25,8 @@ from urllib.parse import quote_plus
 
 import requests
 
+import mongodb_api
+
 TIMINGS_PARAMETERS = {
     "nodeRebootTime": "Node Reboot",
     "allServicesStartTime": "Start All Services",
@@ -137,28 +139,53 @@ def get_timings_data_from_db(payload, rest_ep):
 
 
 def get_timing_summary(test_plan_ids, builds, rest_ep, db_username, db_password):
-    """Timings data from database"""
+    """Timings data from database, averages of all test plans in one summary request"""
     data = [["Timing Summary (Seconds)"]]
     row = ["Parameters"]
     row.extend(builds)
     data.extend([row])
+    payload = {
+        "query": {'testPlanID': {"$in": [tp_id for tp_id in test_plan_ids if tp_id]}},
+        "group_by": "testPlanID",
+        "fields": list(TIMINGS_PARAMETERS),
+        "db_username": db_username, "db_password": db_password
+    }
+    summary = get_timings_data_from_db(payload, rest_ep.rstrip("/") + "/summary") or {}
     for param, val in TIMINGS_PARAMETERS.items():
         row = [val]
         for tp_id in test_plan_ids:
-            payload = {
-                "query": {'testPlanID': tp_id, param: {"$exists": True}},
-                "projection": {param: True},
-                "db_username": db_username, "db_password": db_password
-            }
-            parameter_data = get_timings_data_from_db(payload, rest_ep)
-            if parameter_data:
-                row.append(round_off(sum(x[param] for x in parameter_data) / len(parameter_data)))
+            if keys_exists(summary, tp_id, param, "avg") and summary[tp_id][param]["count"]:
+                row.append(round_off(summary[tp_id][param]["avg"]))
             else:
                 row.append("-")
         data.extend([row])
     return data
 
 
+def get_perf_data(match, group_keys, fields, uri, db_name, db_collection):
+    """
+    Read performance data of all table cells in one aggregation.
+
+    Args:
+        match: Query of the table documents
+        group_keys: Keys identifying a table cell
+        fields: Output name to document path of values read from the first document of
+            each cell
+        uri: URI of MongoDB database
+        db_name: Database name
+        db_collection: Collection name in database
+
+    Returns:
+        dict of tuple of group_keys values to dict of fields, missing fields are None
+    """
+    group = {"_id": {key: f"${key}" for key in group_keys}}
+    group.update({name: {"$first": f"${path}"} for name, path in fields.items()})
+    results = mongodb_api.aggregate([{"$match": match}, {"$group": group}], uri=uri,
+                                    db_name=db_name, collection=db_collection)
+    return {tuple(result["_id"].get(key) for key in group_keys):
+            {name: result.get(name) for name in fields} for result in results}
+
+
 def get_args():
     """Parse arguments and collect database information"""
     parser = argparse.ArgumentParser()
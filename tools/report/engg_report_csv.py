@@ -24,7 +24,6 @@ from copy import deepcopy
 
 import common
 import jira_api
-import mongodb_api
 
 OPERATIONS = ["write", "read"]
 STATS = ["Throughput", "Latency", "IOPS"]
@@ -86,6 +85,12 @@ def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
     data = [["Single Bucket Performance Statistics (Average) using S3Bench"], row_2]
     operations = ["Write", "Read"]
     stats = ["Throughput", "Latency", "IOPS", "TTFB"]
+    match = {'Branch': branch, 'Build': build, 'Operation': {"$in": operations},
+             'Object_Size': {"$in": OBJECTS_SIZES}}
+    fields = {"Throughput": "Throughput", "Latency": "Latency.Avg", "IOPS": "IOPS",
+              "TTFB": "TTFB.Avg", "Count_of_Servers": "Count_of_Servers"}
+    perf_data = common.get_perf_data(match, ["Operation", "Object_Size"], fields, uri,
+                                     db_name, db_collection)
     for operation in operations:
         for stat in stats:
             if stat in ["Latency", "TTFB"]:
@@ -95,22 +100,17 @@ def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
             else:
                 temp_data = [f"{operation} {stat}"]
             for obj_size in OBJECTS_SIZES:
-                query = {'Branch': branch, 'Build': build, 'Operation': operation,
-                         'Object_Size': obj_size}
-                count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                                    collection=db_collection)
-                db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                                     collection=db_collection)
+                values = perf_data.get((operation, obj_size), {})
                 if stat in ["Latency", "TTFB"]:
-                    if count > 0 and common.keys_exists(db_data[0], stat, "Avg"):
-                        temp_data.append(common.round_off(db_data[0][stat]["Avg"] * 1000))
+                    if values.get(stat) is not None:
+                        temp_data.append(common.round_off(values[stat] * 1000))
                     else:
                         temp_data.append("-")
                 else:
-                    if count > 0 and common.keys_exists(db_data[0], stat) \
-                            and "Count_of_Servers" in db_data[0]:
+                    if values.get(stat) is not None \
+                            and values["Count_of_Servers"] is not None:
                         temp_data.append(
-                            common.round_off(db_data[0][stat] / db_data[0]["Count_of_Servers"]))
+                            common.round_off(values[stat] / values["Count_of_Servers"]))
                     else:
                         temp_data.append("-")
             data.extend([temp_data])
@@ -120,6 +120,13 @@ def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
 def get_tool_data(build, db_data, tool):
     """Get data for given tool."""
     temp_data = []
+    match = {'Build': build, 'Name': tool, 'Operation': {"$in": OPERATIONS},
+             'Object_Size': {"$in": OBJECTS_SIZES}, "Branch": db_data['branch']}
+    fields = {stat: stat for stat in STATS}
+    fields["Count_of_Servers"] = "Count_of_Servers"
+    perf_data = common.get_perf_data(match, ["Operation", "Object_Size", "Buckets", "Sessions"],
+                                     fields, db_data['uri'], db_data['db_name'],
+                                     db_data['db_collection'])
     for configs in CONFIG:
         row_num = 0
         for operation in OPERATIONS:
@@ -134,22 +141,12 @@ def get_tool_data(build, db_data, tool):
                     head = f"{configs[1]} Sessions"
                 temp_data = [head, f"{operation.capitalize()} {stat}"]
                 for obj_size in OBJECTS_SIZES:
-                    query = {'Build': build, 'Name': tool, 'Operation': operation,
-                             'Object_Size': obj_size, 'Buckets': configs[0],
-                             'Sessions': configs[1], "Branch": db_data['branch']}
-                    count = mongodb_api.count_documents(query=query, uri=db_data['uri'],
-                                                        db_name=db_data['db_name'],
-                                                        collection=db_data['db_collection'])
-                    db_data = mongodb_api.find_documents(query=query, uri=db_data['uri'],
-                                                         db_name=db_data['db_name'],
-                                                         collection=db_data['db_collection'])
-
-                    if count > 0 and stat == "Throughput" and common.keys_exists(db_data[0],
-                                                                                 stat):
+                    values = perf_data.get((operation, obj_size, configs[0], configs[1]), {})
+                    if values.get(stat) is not None and stat == "Throughput":
                         temp_data.append(
-                            common.round_off(db_data[0][stat] / db_data[0]["Count_of_Servers"]))
-                    elif count > 0 and common.keys_exists(db_data[0], stat):
-                        temp_data.append(common.round_off(db_data[0][stat]))
+                            common.round_off(values[stat] / values["Count_of_Servers"]))
+                    elif values.get(stat) is not None:
+                        temp_data.append(common.round_off(values[stat]))
                     else:
                         temp_data.append("-")
     return temp_data
@@ -182,14 +179,14 @@ def get_metadata_latencies(build, uri, db_name, db_collection):
     heading = ["Add / Edit Object Tags", "Read Object Tags", "Read Object Metadata"]
     data = [["Metadata Latencies (captured with 1KB object)"],
             ["Operation Latency (ms)", "Response Time"]]
+    match = {'Name': 'S3bench', 'Build': build, 'Object_Size': '1Kb',
+             'Operation': {"$in": operations}}
+    perf_data = common.get_perf_data(match, ["Operation"], {"Latency": "Latency.Avg"}, uri,
+                                     db_name, db_collection)
     for ops, head in zip(operations, heading):
-        query = {'Name': 'S3bench', 'Build': build, 'Object_Size': '1Kb', 'Operation': ops}
-        count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                            collection=db_collection)
-        db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                             collection=db_collection)
-        if count > 0 and common.keys_exists(db_data[0], "Latency", "Avg"):
-            data.append([head, db_data[0]['Latency']['Avg'] * 1000])
+        latency = perf_data.get((ops,), {}).get("Latency")
+        if latency is not None:
+            data.append([head, latency * 1000])
         else:
             data.append([head, "-"])
     return data
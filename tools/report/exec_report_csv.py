@@ -26,7 +26,6 @@ from jira import JIRA
 
 import common
 import jira_api
-import mongodb_api
 
 
 def get_feature_breakdown_summary_table_data(test_plan: str, username: str, password: str):
@@ -101,6 +100,11 @@ def get_single_bucket_perf_data(build, uri, db_name, db_collection):
     operations = ["Write", "Read"]
     stats = ["Throughput", "Latency"]
     objects_sizes = ["4Kb", "256Mb"]
+    match = {'Build': build, 'Name': 'S3bench', 'Object_Size': {"$in": objects_sizes},
+             'Operation': {"$in": operations}}
+    perf_data = common.get_perf_data(match, ["Operation", "Object_Size"],
+                                     {"Throughput": "Throughput", "Latency": "Latency.Avg"},
+                                     uri, db_name, db_collection)
     for operation in operations:
         for stat in stats:
             if stat == "Latency":
@@ -108,20 +112,15 @@ def get_single_bucket_perf_data(build, uri, db_name, db_collection):
             else:
                 temp_data = [f"{operation} {stat} (ms)"]
             for objects_size in objects_sizes:
-                query = {'Build': build, 'Name': 'S3bench', 'Object_Size': objects_size,
-                         'Operation': operation}
-                count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                                    collection=db_collection)
-                db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                                     collection=db_collection)
+                values = perf_data.get((operation, objects_size), {})
                 if stat == "Latency":
-                    if count > 0 and common.keys_exists(db_data[0], stat, "Avg"):
-                        temp_data.append(common.round_off(db_data[0][stat]["Avg"] * 1000))
+                    if values.get(stat) is not None:
+                        temp_data.append(common.round_off(values[stat] * 1000))
                     else:
                         temp_data.append("-")
                 elif stat == "Throughput":
-                    if count > 0 and common.keys_exists(db_data[0], stat):
-                        temp_data.append(common.round_off(db_data[0][stat]))
+                    if values.get(stat) is not None:
+                        temp_data.append(common.round_off(values[stat]))
                     else:
                         temp_data.append("-")
                 else:
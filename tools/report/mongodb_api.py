@@ -98,3 +98,27 @@ def find_documents(query: dict,
         tests = pymongo_db[collection]
         result = tests.find(query)
         return result
+
+
+@pymongo_exception
+def aggregate(pipeline: list,
+              uri: str,
+              db_name: str,
+              collection: str
+              ) -> list:
+    """
+    Return results of aggregation pipeline from MongoDB database
+
+    Args:
+        pipeline: Aggregation pipeline
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On success returns list of results
+    """
+    with MongoClient(uri) as client:
+        pymongo_db = client[db_name]
+        tests = pymongo_db[collection]
+        return list(tests.aggregate(pipeline))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Create the indexes used by the REST server in MongoDB, run once per database."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+# Building an index scans the whole collection, so it is done here and not by requests.
+# Usage, from this directory with the config.ini of the server:
+#     python3 create_indexes.py --db_username <user> --db_password <password>
+# A running server hints new indexes within SEARCH_INDEX_TTL seconds.
+
+import argparse
+import sys
+from urllib.parse import quote_plus
+
+from rest_app import read_config
+from rest_app.test_execution_api import create_search_indexes
+
+
+def main():
+    """Create search indexes of the results collection"""
+    parser = argparse.ArgumentParser(description="Create MongoDB indexes of the REST server")
+    parser.add_argument("--db_username", required=True,
+                        help="MongoDB user with createIndex permission")
+    parser.add_argument("--db_password", required=True, help="Password of db_username")
+    args = parser.parse_args()
+    uri = read_config.MONGODB_URI.format(quote_plus(args.db_username),
+                                         quote_plus(args.db_password),
+                                         read_config.db_hostname)
+    result = create_search_indexes(uri)
+    if not result[0]:
+        print(f"Could not create indexes: {result[1][1]}")
+        sys.exit(1)
+    print(f"Indexes of {read_config.results_collection}: {', '.join(result[1])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Summary aggregations and aggregation result cache, used by summary endpoints."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from . import mongodbapi, read_config
+
+
+class TTLCache:
+    """Thread safe cache of values which expire ttl seconds after they are put."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        """
+        Args:
+            ttl: Seconds a value is kept
+            max_entries: Max number of values, the oldest one is dropped first
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Value of key, None if not present or expired"""
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._values[key]
+                return None
+            return item[1]
+
+    def put(self, key, value) -> None:
+        """Put value of key"""
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (time.monotonic() + self.ttl, value)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+
+
+def cached_aggregate(cache: TTLCache,
+                     data: list,
+                     uri: str,
+                     db_name: str,
+                     collection: str
+                     ) -> (bool, list):
+    """
+    mongodbapi.aggregate with the list of results cached per URI and pipeline
+
+    Args:
+        cache: Cache of results
+        data: Aggregation pipeline
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns list of results
+    """
+    # URI is part of the key, a user never gets results cached for another user
+    key = (uri, db_name, collection, json.dumps(data, sort_keys=True, default=str))
+    result = cache.get(key)
+    if result is not None:
+        return True, result
+    aggregate_results = mongodbapi.aggregate(data, uri, db_name, collection)
+    if not aggregate_results[0]:
+        return aggregate_results
+    result = list(aggregate_results[1])
+    cache.put(key, result)
+    return True, result
+
+
+def summary_pipeline(query: dict, group_by: str, fields: list, percentiles: list) -> list:
+    """
+    Pipeline computing count of documents and count/avg/min/max of fields per group_by value
+
+    Args:
+        query: Documents to summarize
+        group_by: Field to group by
+        fields: Numeric fields to summarize
+        percentiles: Values of fields are collected too if not empty
+
+    Returns:
+        Aggregation pipeline
+    """
+    group = {"_id": f"${group_by}", "count": {"$sum": 1}}
+    # Field names may not be valid output names, use their index
+    for index, field in enumerate(fields):
+        group[f"count{index}"] = {"$sum": {"$cond": [{"$gt": [f"${field}", None]}, 1, 0]}}
+        group[f"avg{index}"] = {"$avg": f"${field}"}
+        group[f"min{index}"] = {"$min": f"${field}"}
+        group[f"max{index}"] = {"$max": f"${field}"}
+        if percentiles:
+            group[f"values{index}"] = {"$push": f"${field}"}
+    return [{"$match": query}, {"$group": group}]
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Percentile of values with linear interpolation between closest ranks
+
+    Args:
+        values: Sorted list of numbers
+        percent: Percentile from 0 to 100
+
+    Returns:
+        Percentile, None if no values
+    """
+    if not values:
+        return None
+    rank = (len(values) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def summarize(results: list, fields: list, percentiles: list) -> dict:
+    """
+    Summary of results of summary_pipeline
+
+    Args:
+        results: Results of summary_pipeline
+        fields: Fields given to summary_pipeline
+        percentiles: Percentiles to compute
+
+    Returns:
+        dict of group_by value to count and field to count/avg/min/max/p<percentile> dict
+    """
+    summary = {}
+    for result in results:
+        group = {"count": result["count"]}
+        for index, field in enumerate(fields):
+            stats = {"count": result[f"count{index}"], "avg": result[f"avg{index}"],
+                     "min": result[f"min{index}"], "max": result[f"max{index}"]}
+            if percentiles:
+                values = sorted(value for value in result[f"values{index}"]
+                                if isinstance(value, (int, float))
+                                and not isinstance(value, bool))
+                for percent in percentiles:
+                    stats[f"p{percent:g}"] = percentile(values, percent)
+            group[field] = stats
+        summary[str(result["_id"])] = group
+    return summary
+
+
+SUMMARY_CACHE = TTLCache(read_config.aggregate_cache_ttl)
+
+
+def get_summary(json_data: dict, uri: str, db_name: str, collection: str) -> (bool, dict):
+    """
+    Summary of a validated summary request in one aggregation, cached in SUMMARY_CACHE
+
+    Args:
+        json_data: Request with query, group_by, fields and percentiles
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns summary, see summarize
+    """
+    fields = json_data.get("fields", [])
+    percentiles = json_data.get("percentiles", [])
+    pipeline = summary_pipeline(json_data.get("query", {}), json_data["group_by"], fields,
+                                percentiles)
+    results = cached_aggregate(SUMMARY_CACHE, pipeline, uri, db_name, collection)
+    if not results[0]:
+        return results
+    return True, summarize(results[1], fields, percentiles)
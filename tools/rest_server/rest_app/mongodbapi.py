@@ -17,12 +17,48 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+import itertools
+import threading
 from http import HTTPStatus
 
+from pymongo import IndexModel
 from pymongo import MongoClient
+from pymongo import UpdateMany
 from pymongo.errors import PyMongoError
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 
+# One client, i.e. one connection pool, per URI (credential set) for the whole process.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(uri: str) -> MongoClient:
+    """
+    Get the pooled client of uri, created on first use
+
+    Args:
+        uri: URI of MongoDB database
+
+    Returns:
+        MongoClient shared by all requests with the same URI
+    """
+    client = _clients.get(uri)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(uri)
+            if client is None:
+                client = MongoClient(uri)
+                _clients[uri] = client
+    return client
+
+
+def close_client(uri: str) -> None:
+    """Close and forget the pooled client of uri"""
+    with _clients_lock:
+        client = _clients.pop(uri, None)
+    if client is not None:
+        client.close()
+
 
 def pymongo_exception(func):
     """Decorator for pymongo exceptions"""
@@ -36,6 +72,10 @@ def pymongo_exception(func):
                            "Unable to connect to mongoDB. Probably MongoDB server is down")
         except OperationFailure as ops_exception:
             if ops_exception.code == 18:
+                # Do not keep a pool for wrong credentials
+                close_client(kwargs.get("uri") or next(
+                    (arg for arg in args if isinstance(arg, str) and arg.startswith(
+                        "mongodb://")), None))
                 return False, (HTTPStatus.UNAUTHORIZED, f"Wrong username/password. {ops_exception}")
             if ops_exception.code == 13:
                 return False, (HTTPStatus.FORBIDDEN,
@@ -68,19 +108,23 @@ def count_documents(query: dict,
         On failure returns http status code and message
         On success returns number of documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.count_documents(query)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.count_documents(query)
+    return True, result
 
 
+# pylint: disable=too-many-arguments
 @pymongo_exception
 def find_documents(query: dict,
                    projection: dict,
                    uri: str,
                    db_name: str,
-                   collection: str
+                   collection: str,
+                   sort: list = None,
+                   limit: int = 0,
+                   hint: list = None
                    ) -> (bool, str):
     """
     Return search results for query from MongoDB database
@@ -91,16 +135,86 @@ def find_documents(query: dict,
         uri: URI of MongoDB database
         db_name: Database name
         collection: Collection name in database
+        sort: List of (key, direction) to sort by
+        limit: Max number of documents, 0 for no limit
+        hint: Index to use, list of (key, direction)
 
     Returns:
         On failure returns http status code and message
-        On success returns documents
+        On success returns cursor of documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.find(query, projection)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.find(query, projection, sort=sort, limit=limit, hint=hint)
+    return True, result
+
+
+@pymongo_exception
+def next_documents(cursor, count: int) -> (bool, list):
+    """
+    Read next documents of a cursor returned by find_documents
+
+    Args:
+        cursor: Cursor of documents
+        count: Max number of documents to read
+
+    Returns:
+        On failure returns http status code and message
+        On success returns list of documents
+    """
+    return True, list(itertools.islice(cursor, count))
+
+
+@pymongo_exception
+def create_indexes(indexes: list,
+                   uri: str,
+                   db_name: str,
+                   collection: str
+                   ) -> (bool, list):
+    """
+    Create indexes if not present
+
+    Args:
+        indexes: List of indexes, each one a list of (key, direction)
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns names of the indexes
+    """
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.create_indexes([IndexModel(index) for index in indexes])
+    return True, result
+
+
+@pymongo_exception
+def list_indexes(uri: str,
+                 db_name: str,
+                 collection: str
+                 ) -> (bool, list):
+    """
+    List indexes of collection
+
+    Args:
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns list of indexes, each one a list of (key, direction)
+    """
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = [[tuple(key) for key in info["key"]]
+              for info in tests.index_information().values()]
+    return True, result
 
 
 @pymongo_exception
@@ -122,11 +236,11 @@ def add_document(data: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.insert_one(data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.insert_one(data)
+    return True, result
 
 
 @pymongo_exception
@@ -150,11 +264,11 @@ def update_documents(query: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.update_many(query, data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.update_many(query, data)
+    return True, result
 
 
 # pylint: disable=too-many-arguments
@@ -181,11 +295,11 @@ def update_document(query: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        database = client[db_name]
-        tests = database[collection]
-        result = tests.find_one_and_update(query, data, upsert=upsert)
-        return True, result
+    client = get_client(uri)
+    database = client[db_name]
+    tests = database[collection]
+    result = tests.find_one_and_update(query, data, upsert=upsert)
+    return True, result
 
 
 @pymongo_exception
@@ -209,11 +323,11 @@ def distinct_fields(field: str,
         On failure returns http status code and message
         On success returns number of documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.distinct(field, query)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.distinct(field, query)
+    return True, result
 
 
 @pymongo_exception
@@ -235,8 +349,61 @@ def aggregate(data: list,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.aggregate(data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.aggregate(data)
+    return True, result
+
+
+@pymongo_exception
+def add_documents(data: list,
+                  uri: str,
+                  db_name: str,
+                  collection: str
+                  ) -> (bool, str):
+    """
+    Add documents in MongoDB database in one batch
+
+    Args:
+        data: List of documents to be created in MongoDB
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns InsertManyResult with created document IDs
+    """
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.insert_many(data)
+    return True, result
+
+
+@pymongo_exception
+def bulk_update_documents(updates: list,
+                          uri: str,
+                          db_name: str,
+                          collection: str
+                          ) -> (bool, str):
+    """
+    Search and update all documents found for each query in one batch
+
+    Args:
+        updates: List of (query, data) tuples
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns BulkWriteResult
+    """
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.bulk_write([UpdateMany(query, data) for query, data in updates],
+                              ordered=True)
+    return True, result
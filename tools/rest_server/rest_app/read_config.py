@@ -32,6 +32,8 @@ try:
     system_collection = config["MongoDB"]["system_info_collection"]
     timing_collection = config["MongoDB"]["timing_collection"]
     vm_pool_collection = config["MongoDB"]["pool_vm_collection"]
+    # Seconds summary aggregation results are cached
+    aggregate_cache_ttl = config["MongoDB"].getfloat("aggregate_cache_ttl", fallback=60)
 except KeyError:
     print("Could not start REST server. Please verify config.ini file")
     sys.exit(1)
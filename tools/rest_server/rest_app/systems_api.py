@@ -23,7 +23,7 @@ from urllib.parse import quote_plus
 import flask
 from flask_restx import Resource, Namespace
 
-from . import mongodbapi, read_config, validations
+from . import mongodbapi, read_config, target_locks, validations
 
 api = Namespace('Systems', path="/systemdb", description='Systems related operations')
 
@@ -182,3 +182,145 @@ class UpdateSystems(Resource):
 
     def __str__(self):
         return self.__class__.__name__
+
+
+@api.route("/lock/acquire", doc={"description": "Lock one of given targets, waiting up to timeout"})
+@api.response(200, "Success")
+@api.response(204, "No Content: No target was free before timeout, retry.")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(404, "Not Found: None of the targets is present in MongoDB.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class AcquireTargetLock(Resource):
+    """
+         Rest API: lock/acquire
+         Endpoint: /systemdb/lock/acquire
+         Atomically lock one of targets for client, long poll up to timeout seconds.
+         Waiters of the same targets are served in arrival order.
+      """
+
+    @staticmethod
+    def post():
+        """Acquire target lock"""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_lock_request(json_data, target_locks.LOCK_TYPES)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        lease = json_data.get("lease", validations.DEFAULT_LOCK_LEASE)
+        lock_result = target_locks.acquire(json_data["client"], json_data["targets"],
+                                           json_data["lock_type"], lease,
+                                           json_data.get("timeout", 0), uri)
+        if not lock_result[0]:
+            return flask.Response(status=lock_result[1][0], response=lock_result[1][1])
+        if lock_result[1] is None:
+            return flask.Response(status=HTTPStatus.NO_CONTENT)
+        return flask.jsonify({'result': {"target": lock_result[1], "lease": lease}})
+
+    def __str__(self):
+        return self.__class__.__name__
+
+
+@api.route("/lock/release", doc={"description": "Release lock of client on target"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(404, "Not Found: Client has no lock on target.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class ReleaseTargetLock(Resource):
+    """
+         Rest API: lock/release
+         Endpoint: /systemdb/lock/release
+         Atomically release lock of client on target, wakes up waiters.
+      """
+
+    @staticmethod
+    def post():
+        """Release target lock"""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_lock_request(json_data)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        release_result = target_locks.release(json_data["target"], json_data["client"], uri)
+        if not release_result[0]:
+            return flask.Response(status=release_result[1][0], response=release_result[1][1])
+        if release_result[1] is None:
+            return flask.Response(status=HTTPStatus.NOT_FOUND,
+                                  response=f"{json_data['client']} has no lock on "
+                                           f"{json_data['target']}")
+        return flask.Response(status=HTTPStatus.OK, response="Lock released.")
+
+    def __str__(self):
+        return self.__class__.__name__
+
+
+@api.route("/lock/heartbeat", doc={"description": "Renew lease of client on target"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(404, "Not Found: Client has no lock on target, e.g. lease expired.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class TargetLockHeartbeat(Resource):
+    """
+         Rest API: lock/heartbeat
+         Endpoint: /systemdb/lock/heartbeat
+         Renew lease of client on target, a lock not renewed before its lease
+         expires is released.
+      """
+
+    @staticmethod
+    def post():
+        """Renew target lock lease"""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_lock_request(json_data)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        lease = json_data.get("lease", validations.DEFAULT_LOCK_LEASE)
+        heartbeat_result = target_locks.heartbeat(json_data["target"], json_data["client"],
+                                                  lease, uri)
+        if not heartbeat_result[0]:
+            return flask.Response(status=heartbeat_result[1][0],
+                                  response=heartbeat_result[1][1])
+        if heartbeat_result[1] is None:
+            return flask.Response(status=HTTPStatus.NOT_FOUND,
+                                  response=f"{json_data['client']} has no lock on "
+                                           f"{json_data['target']}")
+        return flask.Response(status=HTTPStatus.OK, response="Lease renewed.")
+
+    def __str__(self):
+        return self.__class__.__name__
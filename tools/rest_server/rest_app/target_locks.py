@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""Lease based locking of targets (setups) in the systems collection."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+# Every lock change is a compare and set: one find_one_and_update whose filter is the
+# state of the target read before, so two clients can never both take the same target.
+# The fields read by other tools (is_setup_free, setup_in_useby, in_use_for_parallel,
+# parallel_client_cnt) are kept as before; lock_holders additionally has the client and
+# lease expiry of every holder.
+# A holder which does not renew its lease with a heartbeat is released by the next
+# acquire of the target.
+#
+# Clients waiting for targets are queued in arrival order in this server process: a waiter
+# tries to lock only when no earlier waiter wants one of its targets, and is woken up by
+# releases instead of polling MongoDB.
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+from . import mongodbapi, read_config
+
+SHARED_LOCK = "shared"
+EXCLUSIVE_LOCK = "exclusive"
+LOCK_TYPES = [SHARED_LOCK, EXCLUSIVE_LOCK]
+# Seconds a waiter sleeps before trying again without a release, e.g. to see targets
+# released by older clients or becoming healthy
+RECHECK_INTERVAL = 5
+
+_waiters = deque()
+_waiters_cond = threading.Condition()
+
+
+def _holder(client: str, lease: float) -> dict:
+    """lock_holders item of client"""
+    return {"client": client, "expiry": datetime.utcnow() + timedelta(seconds=lease)}
+
+
+def _exclusive_lock(target: str, client: str, lease: float) -> tuple:
+    """Query and update taking a free target for one client"""
+    return ({"setupname": target, "is_setup_healthy": True, "is_setup_free": True,
+             "setup_in_useby": ""},
+            {"$set": {"is_setup_free": False, "setup_in_useby": client,
+                      "in_use_for_parallel": False, "parallel_client_cnt": 0,
+                      "lock_holders": [_holder(client, lease)]}})
+
+
+def _shared_lock(target: str, client: str, lease: float) -> tuple:
+    """Query and update taking a free target for clients running in parallel"""
+    return ({"setupname": target, "is_setup_healthy": True, "is_setup_free": True,
+             "setup_in_useby": ""},
+            {"$set": {"is_setup_free": False, "setup_in_useby": client,
+                      "in_use_for_parallel": True, "parallel_client_cnt": 1,
+                      "lock_holders": [_holder(client, lease)]}})
+
+
+def _join_shared_lock(document: dict, client: str, lease: float) -> tuple:
+    """Query and update adding client to the clients of a shared target as read in document"""
+    clients = document.get("setup_in_useby") or ""
+    return ({"setupname": document["setupname"], "is_setup_healthy": True,
+             "is_setup_free": False, "in_use_for_parallel": True, "setup_in_useby": clients,
+             "lock_holders.client": {"$ne": client}},
+            {"$set": {"setup_in_useby": f"{clients} {client}".strip()},
+             "$inc": {"parallel_client_cnt": 1},
+             "$push": {"lock_holders": _holder(client, lease)}})
+
+
+def _unlock(document: dict, client: str) -> tuple:
+    """Query and update removing client from the clients of a target as read in document"""
+    clients = [name for name in (document.get("setup_in_useby") or "").split() if name != client]
+    shared = bool(document.get("in_use_for_parallel")) and bool(clients)
+    return ({"setupname": document["setupname"], "lock_holders.client": client,
+             "setup_in_useby": document.get("setup_in_useby")},
+            {"$set": {"setup_in_useby": " ".join(clients), "is_setup_free": not clients,
+                      "in_use_for_parallel": shared,
+                      "parallel_client_cnt": len(clients) if shared else 0},
+             "$pull": {"lock_holders": {"client": client}}})
+
+
+def _find(query: dict, projection: dict, count: int, uri: str) -> (bool, list):
+    """Up to count target documents of query"""
+    found = mongodbapi.find_documents(query, projection, uri, read_config.db_name,
+                                      read_config.system_collection)
+    if not found[0]:
+        return found
+    return mongodbapi.next_documents(found[1], count)
+
+
+def _update(query_update: tuple, uri: str) -> (bool, dict):
+    """Apply query/update to one target, document before update or None if no match"""
+    return mongodbapi.update_document(query_update[0], query_update[1], uri,
+                                      read_config.db_name, read_config.system_collection,
+                                      upsert=False)
+
+
+def release(target: str, client: str, uri: str) -> (bool, dict):
+    """
+    Release lock of client on target and wake up waiters
+
+    Args:
+        target: Setup name
+        client: Lock holder
+        uri: URI of MongoDB database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns target document before release, None if client had no lock
+    """
+    # Compare and set, retried if setup_in_useby changed in between
+    while True:
+        found = _find({"setupname": target, "lock_holders.client": client},
+                      {"setupname": True, "setup_in_useby": True, "in_use_for_parallel": True},
+                      1, uri)
+        if not found[0]:
+            return found
+        if not found[1]:
+            return True, None
+        result = _update(_unlock(found[1][0], client), uri)
+        if not result[0]:
+            return result
+        if result[1] is not None:
+            with _waiters_cond:
+                _waiters_cond.notify_all()
+            return result
+
+
+def heartbeat(target: str, client: str, lease: float, uri: str) -> (bool, dict):
+    """
+    Renew lease of client on target
+
+    Args:
+        target: Setup name
+        client: Lock holder
+        lease: Seconds from now the lock is kept without next heartbeat
+        uri: URI of MongoDB database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns target document, None if client has no lock (anymore)
+    """
+    return _update(({"setupname": target, "lock_holders.client": client},
+                    {"$set": {"lock_holders.$.expiry": _holder(client, lease)["expiry"]}}), uri)
+
+
+def _release_expired(targets: list, uri: str) -> (bool, None):
+    """Release locks of targets whose lease expired"""
+    now = datetime.utcnow()
+    found = _find({"setupname": {"$in": targets}, "lock_holders.expiry": {"$lt": now}},
+                  {"setupname": True, "lock_holders": True}, len(targets), uri)
+    if not found[0]:
+        return found
+    for document in found[1]:
+        for holder in document["lock_holders"]:
+            if holder["expiry"] < now:
+                result = release(document["setupname"], holder["client"], uri)
+                if not result[0]:
+                    return result
+    return True, None
+
+
+def _try_lock(client: str, targets: list, lock_type: str, lease: float,
+              uri: str) -> (bool, str):
+    """One attempt to lock one of targets, target name or None if all are busy"""
+    result = _release_expired(targets, uri)
+    if not result[0]:
+        return result
+    found = _find({"setupname": {"$in": targets}, "is_setup_healthy": True},
+                  {"setupname": True, "is_setup_free": True, "in_use_for_parallel": True,
+                   "setup_in_useby": True}, len(targets), uri)
+    if not found[0]:
+        return found
+    states = {document["setupname"]: document for document in found[1]}
+    candidates = [states[target] for target in targets if target in states]
+    attempts = []
+    if lock_type == SHARED_LOCK:
+        # Share a target already in parallel use before taking a free one
+        attempts += [_join_shared_lock(document, client, lease)
+                     for document in candidates
+                     if not document.get("is_setup_free") and document.get(
+                         "in_use_for_parallel")]
+        attempts += [_shared_lock(document["setupname"], client, lease)
+                     for document in candidates if document.get("is_setup_free")]
+    else:
+        attempts += [_exclusive_lock(document["setupname"], client, lease)
+                     for document in candidates if document.get("is_setup_free")]
+    for attempt in attempts:
+        result = _update(attempt, uri)
+        if not result[0]:
+            return result
+        if result[1] is not None:
+            return True, result[1]["setupname"]
+    return True, None
+
+
+def _blocked(waiter: dict) -> bool:
+    """Waiter has to wait for an earlier waiter of one of its targets"""
+    for other in _waiters:
+        if other is waiter:
+            return False
+        if other["targets"] & waiter["targets"]:
+            return True
+    return False
+
+
+# pylint: disable=too-many-arguments
+def acquire(client: str, targets: list, lock_type: str, lease: float, timeout: float,
+            uri: str) -> (bool, str):
+    """
+    Lock one of targets, waiting in line up to timeout seconds
+
+    Args:
+        client: Lock holder
+        targets: Setup names, tried in order
+        lock_type: SHARED_LOCK or EXCLUSIVE_LOCK
+        lease: Seconds the lock is kept without heartbeat
+        timeout: Max seconds to wait
+        uri: URI of MongoDB database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns locked target, None if no target was free before timeout
+    """
+    count = mongodbapi.count_documents({"setupname": {"$in": targets}}, uri,
+                                       read_config.db_name, read_config.system_collection)
+    if not count[0]:
+        return count
+    if count[1] == 0:
+        return False, (HTTPStatus.NOT_FOUND, f"Targets {targets} are not present in DB")
+    deadline = time.monotonic() + timeout
+    waiter = {"client": client, "targets": set(targets)}
+    with _waiters_cond:
+        _waiters.append(waiter)
+    try:
+        while True:
+            with _waiters_cond:
+                while _blocked(waiter):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return True, None
+                    _waiters_cond.wait(min(remaining, RECHECK_INTERVAL))
+            result = _try_lock(client, targets, lock_type, lease, uri)
+            if not result[0] or result[1] is not None:
+                return result
+            with _waiters_cond:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True, None
+                _waiters_cond.wait(min(remaining, RECHECK_INTERVAL))
+    finally:
+        with _waiters_cond:
+            _waiters.remove(waiter)
+            _waiters_cond.notify_all()
@@ -17,18 +17,99 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+import itertools
+import json
 from http import HTTPStatus
 from urllib.parse import quote_plus
 
 import flask
+from bson import ObjectId
 from flask_restx import Resource, Namespace
 
-from . import mongodbapi, read_config, validations
+from . import aggregations, mongodbapi, read_config, validations
 
 api = Namespace('Test Execution', path="/reportsdb",
                 description='Test execution related operations')
 
 
+# Indexes of the common search fields, most selective first. The index of the first field
+# present in a search query is hinted, _id is the sort key of pages. They are created by
+# create_indexes.py, a search never builds them.
+SEARCH_INDEXES = {"testID": [("testID", 1), ("_id", 1)],
+                  "testPlanID": [("testPlanID", 1), ("_id", 1)],
+                  "buildNo": [("buildNo", 1), ("_id", 1)]}
+# Seconds the list of existing SEARCH_INDEXES is cached
+SEARCH_INDEX_TTL = 300
+# Header with the after value of the next page of a NDJSON search
+NEXT_PAGE_HEADER = "X-Next-After"
+# Documents per chunk of a streamed search response
+STREAM_CHUNK_SIZE = 256
+
+_search_indexes = aggregations.TTLCache(SEARCH_INDEX_TTL)
+
+
+def create_search_indexes(uri: str) -> (bool, list):
+    """
+    Create SEARCH_INDEXES in results collection, builds the indexes on all existing entries
+
+    Args:
+        uri: URI of MongoDB database, user needs createIndex permission
+
+    Returns:
+        On failure returns http status code and message
+        On success returns names of the indexes
+    """
+    return mongodbapi.create_indexes(list(SEARCH_INDEXES.values()), uri, read_config.db_name,
+                                     read_config.results_collection)
+
+
+def search_hint(query: dict, uri: str) -> list:
+    """
+    Existing index of SEARCH_INDEXES to hint for query
+
+    Args:
+        query: Search query
+        uri: URI of MongoDB database
+
+    Returns:
+        Index as list of (key, direction), None if no index fits
+    """
+    key = (read_config.db_name, read_config.results_collection)
+    indexes = _search_indexes.get(key)
+    if indexes is None:
+        existing = mongodbapi.list_indexes(uri, read_config.db_name,
+                                           read_config.results_collection)
+        existing = [[(field, int(direction)) for field, direction in index]
+                    for index in existing[1]] if existing[0] else []
+        indexes = [index for index in SEARCH_INDEXES.values() if index in existing]
+        _search_indexes.put(key, indexes)
+    for field, index in SEARCH_INDEXES.items():
+        if field in query and index in indexes:
+            return index
+    return None
+
+
+def stream_documents(documents, ndjson: bool):
+    """
+    Serialize documents in chunks, as one JSON object with result list or as JSON lines.
+
+    Args:
+        documents: Iterable of documents
+        ndjson: One JSON document per line
+    """
+    separator = "\n" if ndjson else ", "
+    if not ndjson:
+        yield '{"result": ['
+    chunk = []
+    for document in documents:
+        chunk.append(json.dumps(document, default=str))
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield separator.join(chunk) + separator
+            chunk = []
+    # The last chunk closes the list/line
+    yield separator.join(chunk) + ("\n" if ndjson else "]}\n")
+
+
 # pylint: disable=too-few-public-methods
 @api.route("/search", doc={"description": "Search test execution entries in MongoDB"})
 @api.response(200, "Success")
@@ -40,10 +121,16 @@ api = Namespace('Test Execution', path="/reportsdb",
 class Search(Resource):
     """Search endpoint"""
 
-    # pylint: disable=too-many-return-statements
+    # pylint: disable=too-many-return-statements, too-many-locals
     @staticmethod
     def get():
-        """Get test execution entry."""
+        """
+        Get test execution entries.
+
+        Without limit all results are streamed. With limit one page is returned, sorted by
+        _id, with the after value of the next page in next (JSON) or in the X-Next-After
+        header (NDJSON); next is null on the last page. format is json (default) or ndjson.
+        """
         json_data = flask.request.get_json()
         if not json_data:
             return flask.Response(status=HTTPStatus.BAD_REQUEST,
@@ -64,30 +151,61 @@ class Search(Resource):
         del json_data["db_password"]
 
         # Projection can be used to return certain fields from documents
-        projection = None
+        projection = {}
         # Received request with projection field and projection is not empty dictionary
         if "projection" in json_data and bool(json_data["projection"]):
-            projection = json_data["projection"]
-
-        count_results = mongodbapi.count_documents(json_data["query"], uri, read_config.db_name,
-                                                   read_config.results_collection)
-        if not count_results[0]:
-            return flask.Response(status=count_results[1][0],
-                                  response=count_results[1][1])
-        if count_results[0] and count_results[1] == 0:
+            projection = dict(json_data["projection"])
+        limit = json_data.get("limit", 0)
+        ndjson = json_data.get("format") == "ndjson"
+        query = json_data["query"]
+        hint = search_hint(query, uri)
+
+        if not limit:
+            # _id is not returned, drop it in MongoDB
+            projection["_id"] = False
+            query_results = mongodbapi.find_documents(query, projection, uri,
+                                                      read_config.db_name,
+                                                      read_config.results_collection,
+                                                      hint=hint)
+            if not query_results[0]:
+                return flask.Response(status=query_results[1][0], response=query_results[1][1])
+            first = mongodbapi.next_documents(query_results[1], 1)
+            if not first[0]:
+                return flask.Response(status=first[1][0], response=first[1][1])
+            if not first[1]:
+                return flask.Response(status=HTTPStatus.NOT_FOUND,
+                                      response=f"No results for query {json_data}")
+            return flask.Response(
+                flask.stream_with_context(stream_documents(
+                    itertools.chain(first[1], query_results[1]), ndjson)),
+                mimetype="application/x-ndjson" if ndjson else "application/json")
+
+        # _id is the sort key and after value of pages
+        projection.pop("_id", None)
+        if "after" in json_data:
+            query = dict(query, _id={"$gt": ObjectId(json_data["after"])})
+        query_results = mongodbapi.find_documents(query, projection or None, uri,
+                                                  read_config.db_name,
+                                                  read_config.results_collection,
+                                                  sort=[("_id", 1)], limit=limit + 1, hint=hint)
+        if not query_results[0]:
+            return flask.Response(status=query_results[1][0], response=query_results[1][1])
+        page = mongodbapi.next_documents(query_results[1], limit + 1)
+        if not page[0]:
+            return flask.Response(status=page[1][0], response=page[1][1])
+        output = page[1][:limit]
+        if not output and "after" not in json_data:
             return flask.Response(status=HTTPStatus.NOT_FOUND,
                                   response=f"No results for query {json_data}")
-
-        query_results = mongodbapi.find_documents(json_data["query"], projection, uri,
-                                                  read_config.db_name,
-                                                  read_config.results_collection)
-        if query_results[0]:
-            output = []
-            for results in query_results[1]:
-                del results["_id"]
-                output.append(results)
-            return flask.jsonify({'result': output})
-        return flask.Response(status=query_results[1][0], response=query_results[1][1])
+        next_after = str(output[-1]["_id"]) if len(page[1]) > limit else None
+        for results in output:
+            del results["_id"]
+        if ndjson:
+            headers = {NEXT_PAGE_HEADER: next_after} if next_after else {}
+            return flask.Response(stream_documents(output, ndjson=True), headers=headers,
+                                  mimetype="application/x-ndjson")
+        return flask.Response(json.dumps({"result": output, "next": next_after}, default=str),
+                              mimetype="application/json")
 
 
 # pylint: disable=too-few-public-methods
@@ -206,6 +324,122 @@ class Update(Resource):
         return flask.Response(status=update_result[1][0], response=update_result[1][1])
 
 
+# pylint: disable=too-few-public-methods
+@api.route("/bulk_create", doc={"description": "Add test execution entries in MongoDB"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class BulkCreate(Resource):
+    """Bulk create endpoint"""
+
+    # pylint: disable=too-many-return-statements
+    @staticmethod
+    def post():
+        """Create test execution entries, all or none of them are validated."""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_bulk_request(json_data, "entries")
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        entries = json_data["entries"]
+        for index, entry in enumerate(entries):
+            # Credentials are given once for the whole request
+            entry.pop("db_username", None)
+            entry.pop("db_password", None)
+            response = validations.check_db_keys(entry)
+            if not response[0]:
+                return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                      response=f"entries[{index}]: Unknown fields given or "
+                                               f"mandatory fields missing  {response[1]}")
+            validate_result = validations.validate_mandatory_db_fields(entry)
+            if not validate_result[0]:
+                return flask.Response(status=validate_result[1][0],
+                                      response=f"entries[{index}]: {validate_result[1][1]}")
+            entry["testStartTime"] = validate_result[1]
+            valid_result = validations.validate_extra_db_fields(entry)
+            if not valid_result[0]:
+                return flask.Response(status=valid_result[1][0],
+                                      response=f"entries[{index}]: {valid_result[1][1]}")
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+
+        # Same as Create for each entry: older entries of the test are no longer latest,
+        # including older entries of the test in this request.
+        latest = {}
+        for entry in entries:
+            key = (entry["testPlanID"], entry["testExecutionID"], entry["testID"])
+            if key in latest:
+                latest[key]["latest"] = False
+            latest[key] = entry
+        update_field = {"$set": {"latest": False}}
+        updates = [({"testPlanID": key[0], "testExecutionID": key[1], "testID": key[2],
+                     "latest": True}, update_field) for key in latest]
+        update_result = mongodbapi.bulk_update_documents(updates, uri, read_config.db_name,
+                                                         read_config.results_collection)
+        if not update_result[0]:
+            return flask.Response(status=update_result[1][0], response=update_result[1][1])
+
+        add_result = mongodbapi.add_documents(entries, uri, read_config.db_name,
+                                              read_config.results_collection)
+        if not add_result[0]:
+            return flask.Response(status=add_result[1][0], response=add_result[1][1])
+        return flask.jsonify({"result": {"inserted_count": len(add_result[1].inserted_ids),
+                                         "inserted_ids": [str(inserted_id) for inserted_id
+                                                          in add_result[1].inserted_ids]}})
+
+
+@api.route("/bulk_update", doc={"description": "Update test execution entries in MongoDB"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class BulkUpdate(Resource):
+    """Bulk update endpoint"""
+
+    @staticmethod
+    def patch():
+        """Apply filter/update pairs in order, all or none of them are validated."""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_bulk_request(json_data, "updates")
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+        for index, update in enumerate(json_data["updates"]):
+            validate_result = validations.validate_update_request(update)
+            if not validate_result[0]:
+                return flask.Response(status=validate_result[1][0],
+                                      response=f"updates[{index}]: {validate_result[1][1]}")
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        updates = [(update["filter"], update["update"]) for update in json_data["updates"]]
+        update_result = mongodbapi.bulk_update_documents(updates, uri, read_config.db_name,
+                                                         read_config.results_collection)
+        if update_result[0]:
+            return flask.jsonify({"result": {"matched_count": update_result[1].matched_count,
+                                             "modified_count": update_result[1].modified_count}})
+        return flask.Response(status=update_result[1][0], response=update_result[1][1])
+
+
 @api.route("/distinct", doc={"description": "Get distinct values for given key"})
 @api.response(200, "Success")
 @api.response(400, "Bad Request: Missing parameters. Do not retry.")
@@ -332,3 +566,45 @@ class Count(Resource):
             return flask.Response(status=HTTPStatus.NOT_FOUND,
                                   response=f"No results for query {json_data}")
         return flask.jsonify({'result': count_results[1]})
+
+
+@api.route("/summary", doc={"description": "Summary of test executions per build or test plan"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class Summary(Resource):
+    """Summary endpoint"""
+
+    @staticmethod
+    def get():
+        """
+        Get test execution summary.
+
+        Body has group_by field, optional query, fields to summarize and percentiles.
+        Result maps each group_by value to its number of documents and the count, avg,
+        min, max and p<percentile> of each field.
+        """
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_summary_request(
+            json_data, validations.db_keys + validations.extra_db_keys, validations.db_keys_str,
+            validations.db_keys_int + validations.db_keys_float)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        summary = aggregations.get_summary(json_data, uri, read_config.db_name,
+                                           read_config.results_collection)
+        if not summary[0]:
+            return flask.Response(status=summary[1][0], response=summary[1][1])
+        return flask.jsonify({'result': summary[1]})
@@ -23,7 +23,7 @@ from urllib.parse import quote_plus
 import flask
 from flask_restx import Resource, Namespace
 
-from . import mongodbapi, read_config, validations
+from . import aggregations, mongodbapi, read_config, validations
 
 api = Namespace('Timings API', path="/", description='Timings related operations')
 
@@ -132,3 +132,45 @@ class Timings(Resource):
                 output.append(results)
             return flask.jsonify({'result': output})
         return flask.Response(status=query_results[1][0], response=query_results[1][1])
+
+
+@api.route("/timings/summary", doc={"description": "Summary of timings per build or test plan"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class TimingsSummary(Resource):
+    """Summary endpoint"""
+
+    @staticmethod
+    def get():
+        """
+        Get timings summary.
+
+        Body has group_by field, optional query, fields to summarize and percentiles.
+        Result maps each group_by value to its number of documents and the count, avg,
+        min, max and p<percentile> of each field.
+        """
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+        validate_result = validations.validate_summary_request(
+            json_data, validations.timing_keys + validations.extra_timing_keys,
+            validations.timing_keys_str, validations.extra_timing_keys)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+        summary = aggregations.get_summary(json_data, uri, read_config.db_name,
+                                           read_config.timing_collection)
+        if not summary[0]:
+            return flask.Response(status=summary[1][0], response=summary[1][1])
+        return flask.jsonify({'result': summary[1]})
@@ -21,6 +21,8 @@
 from datetime import datetime
 from http import HTTPStatus
 
+from bson import ObjectId
+
 db_keys_int = ["noOfNodes"]
 db_keys_float = ["testExecutionTime"]
 db_keys_array = ["nodesHostname", "testIDLabels", "testTags", "drID", "featureID"]
@@ -39,6 +41,17 @@ extra_db_keys = extra_db_keys_bool + extra_db_keys_array + extra_db_keys_str
 
 mongodb_operators = ["$and", "$nor", "$or"]
 
+# Max entries/updates in one bulk request
+MAX_BULK_ITEMS = 10000
+# Max documents in one page of search
+MAX_PAGE_SIZE = 10000
+search_formats = ["json", "ndjson"]
+# Seconds of target lock leases and max seconds of a lock long poll
+MIN_LOCK_LEASE = 10
+MAX_LOCK_LEASE = 3600
+DEFAULT_LOCK_LEASE = 300
+MAX_LOCK_WAIT = 120
+
 cmi_keys_float = ["cmi"]
 cmi_keys_string = ["testPlanLabel", "buildType", "buildNo"]
 
@@ -108,6 +121,16 @@ def validate_search_fields(json_data: dict) -> (bool, tuple):
         if key not in db_keys and key not in extra_db_keys and key not in mongodb_operators:
             return False, (HTTPStatus.BAD_REQUEST,
                            f"{key} is not correct db field")
+    if "limit" in json_data and (not isinstance(json_data["limit"], int) or isinstance(
+            json_data["limit"], bool) or not 0 < json_data["limit"] <= MAX_PAGE_SIZE):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"Please provide limit as integer from 1 to {MAX_PAGE_SIZE}")
+    if "after" in json_data and not ObjectId.is_valid(json_data["after"]):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       "Please provide after as next token of previous page")
+    if json_data.get("format", "json") not in search_formats:
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"Please provide format as one of {search_formats}")
     return True, None
 
 
@@ -278,6 +301,106 @@ def validate_update_request(json_data: dict) -> (bool, tuple):
     return True, None
 
 
+def validate_bulk_request(json_data: dict, key: str) -> (bool, tuple):
+    """
+    Validate that key of bulk request is a non empty list of dictionaries
+
+    Args:
+        json_data: Data from request
+        key: Key of the list of items
+
+    Returns:
+        On failure returns http status code and message
+        On success returns True
+    """
+    if key not in json_data or not isinstance(json_data[key], list) or not json_data[key]:
+        return False, (HTTPStatus.BAD_REQUEST, f"Please provide {key} as non empty list")
+    if len(json_data[key]) > MAX_BULK_ITEMS:
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"{key} should not have more than {MAX_BULK_ITEMS} items")
+    for index, item in enumerate(json_data[key]):
+        if not isinstance(item, dict):
+            return False, (HTTPStatus.BAD_REQUEST, f"{key}[{index}] should be dictionary")
+    return True, None
+
+
+# pylint: disable=too-many-return-statements
+def validate_summary_request(json_data: dict, query_keys: list, group_keys: list,
+                             value_keys: list) -> (bool, tuple):
+    """
+    Validate format of fields in summary request
+
+    Args:
+        json_data: Data from request
+        query_keys: Fields allowed in query
+        group_keys: Fields allowed in group_by
+        value_keys: Fields allowed in fields
+
+    Returns:
+        On failure returns http status code and message
+        On success returns True
+    """
+    if "query" in json_data:
+        if not isinstance(json_data["query"], dict):
+            return False, (HTTPStatus.BAD_REQUEST, "Please provide query key as dictionary")
+        for key in json_data["query"]:
+            if key not in query_keys and key not in mongodb_operators:
+                return False, (HTTPStatus.BAD_REQUEST, f"{key} is not correct db field")
+    if json_data.get("group_by") not in group_keys:
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"Please provide group_by key as one of {group_keys}")
+    fields = json_data.get("fields", [])
+    if not isinstance(fields, list) or any(field not in value_keys for field in fields):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"Please provide fields key as list of {value_keys}")
+    percentiles = json_data.get("percentiles", [])
+    if not isinstance(percentiles, list) or any(
+            not isinstance(percent, (int, float)) or isinstance(percent, bool)
+            or not 0 <= percent <= 100 for percent in percentiles):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       "Please provide percentiles key as list of numbers from 0 to 100")
+    return True, None
+
+
+# pylint: disable=too-many-return-statements
+def validate_lock_request(json_data: dict, lock_types: list = None) -> (bool, tuple):
+    """
+    Validate format of fields in target lock request
+
+    Args:
+        json_data: Data from request
+        lock_types: Allowed lock types if request is to acquire a lock, else None
+
+    Returns:
+        On failure returns http status code and message
+        On success returns True
+    """
+    if not isinstance(json_data.get("client"), str) or not json_data["client"]:
+        return False, (HTTPStatus.BAD_REQUEST, "Please provide client key as string")
+    if lock_types is None:
+        if not isinstance(json_data.get("target"), str):
+            return False, (HTTPStatus.BAD_REQUEST, "Please provide target key as string")
+    else:
+        targets = json_data.get("targets")
+        if not isinstance(targets, list) or not targets or any(
+                not isinstance(target, str) for target in targets):
+            return False, (HTTPStatus.BAD_REQUEST,
+                           "Please provide targets key as non empty list of string")
+        if json_data.get("lock_type") not in lock_types:
+            return False, (HTTPStatus.BAD_REQUEST,
+                           f"Please provide lock_type key as one of {lock_types}")
+        timeout = json_data.get("timeout", 0)
+        if not isinstance(timeout, (int, float)) or not 0 <= timeout <= MAX_LOCK_WAIT:
+            return False, (HTTPStatus.BAD_REQUEST,
+                           f"Please provide timeout from 0 to {MAX_LOCK_WAIT} seconds")
+    lease = json_data.get("lease", DEFAULT_LOCK_LEASE)
+    if not isinstance(lease, (int, float)) or not MIN_LOCK_LEASE <= lease <= MAX_LOCK_LEASE:
+        return False, (HTTPStatus.BAD_REQUEST,
+                       f"Please provide lease from {MIN_LOCK_LEASE} to {MAX_LOCK_LEASE} "
+                       f"seconds")
+    return True, None
+
+
 def check_add_cmi_request_fields(json_data: dict):
     """
     Check if all fields present in request
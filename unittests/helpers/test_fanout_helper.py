@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test fan-out command execution helper."""
+
+import logging
+import time
+
+from commons.helpers.fanout_helper import run_on_all
+from commons.utils import assert_utils
+
+
+class FakeNode:
+    """Node stub which sleeps for delay seconds per command."""
+
+    def __init__(self, hostname, delay):
+        self.hostname = hostname
+        self.delay = delay
+
+    def execute_cmd(self, cmd, **kwargs):
+        """Return hostname and command, fail for negative delay."""
+        if self.delay < 0:
+            raise IOError(["command failed"])
+        time.sleep(self.delay)
+        return f"{self.hostname}:{cmd}".encode()
+
+
+class TestFanoutHelper:
+    """Test fan-out helper functions."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize variables."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_run_on_all(self):
+        """Test concurrent execution, per target failures and timeouts."""
+        nodes = [FakeNode(f"node{i}", 0.2) for i in range(16)]
+        nodes += [FakeNode("failed", -1), FakeNode("hung", 5)]
+        start = time.perf_counter()
+        results = run_on_all(nodes, "uptime", nworkers=16, timeout=1)
+        assert_utils.assert_true(time.perf_counter() - start < 2)
+        assert_utils.assert_equal(list(results), [node.hostname for node in nodes])
+        assert_utils.assert_equal(results["node3"].output, b"node3:uptime")
+        assert_utils.assert_false(results["failed"].success)
+        assert_utils.assert_true(isinstance(results["hung"].error, TimeoutError))
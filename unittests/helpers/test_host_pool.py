@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test pooled SSH connections."""
+
+import os
+
+from commons.helpers import host
+from commons.utils import assert_utils
+
+
+class FakeClient:
+    """SSHClient stub with an active transport."""
+
+    closed = False
+
+    def get_transport(self):
+        """Return self as transport."""
+        return self
+
+    @staticmethod
+    def is_active():
+        """Transport is active."""
+        return True
+
+    def send_ignore(self):
+        """Keep alive."""
+
+    def close(self):
+        """Record close."""
+        self.closed = True
+
+
+class FakeAbsHost:
+    """AbsHost stub connecting a new FakeClient."""
+
+    def __init__(self, hostname, username, password):
+        self.host_obj = None
+
+    def connect(self, **kwargs):
+        """Connect a new client."""
+        self.host_obj = FakeClient()
+
+
+class TestSSHConnectionPool:
+    """Test SSHConnectionPool."""
+
+    def test_forked_child_gets_fresh_client(self, monkeypatch):
+        """A forked child connects again instead of using the client of the parent."""
+        monkeypatch.setattr(host, "AbsHost", FakeAbsHost)
+        parent = host.SSH_POOL.get("node1", "root", "secret")
+        assert_utils.assert_true(host.SSH_POOL.get("node1", "root", "secret") is parent)
+        pid = os.fork()
+        if pid == 0:
+            child = host.SSH_POOL.get("node1", "root", "secret")
+            os._exit(0 if child is not parent and not parent.closed else 1)
+        _, status = os.waitpid(pid, 0)
+        assert_utils.assert_equal(os.WEXITSTATUS(status), 0)
+        assert_utils.assert_true(host.SSH_POOL.get("node1", "root", "secret") is parent)
+        host.SSH_POOL.discard(parent)
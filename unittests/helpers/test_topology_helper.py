@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test cached cluster topology."""
+
+import json
+import time
+
+from commons import commands
+from commons.helpers.topology_helper import ClusterTopology
+from commons.utils import assert_utils
+
+
+def pods_list(pods: dict) -> dict:
+    """kubectl pod list of pod name to resource version, list resourceVersion is empty."""
+    return {"kind": "List", "metadata": {"resourceVersion": ""},
+            "items": [{"metadata": {"name": name, "resourceVersion": version},
+                       "spec": {"nodeName": "node1", "containers": [{"name": "cnt"}]},
+                       "status": {"podIP": "10.0.0.1", "phase": "Running"}}
+                      for name, version in pods.items()]}
+
+
+class FakeNode:
+    """Master node stub answering kubectl commands from a pod snapshot."""
+
+    hostname = "master"
+    username = "root"
+
+    def __init__(self, pods):
+        self.pods = pods
+
+    def execute_cmd(self, cmd, **kwargs):
+        """Return kubectl output of the current snapshot, in any namespace."""
+        cmd = cmd.split(" -n ")[0]
+        if cmd == commands.KUBECTL_GET_PODS_RESOURCE_VERSION:
+            return " ".join(self.pods.values()).encode()
+        if cmd == commands.KUBECTL_GET_JSON.format("pods"):
+            return json.dumps(pods_list(self.pods)).encode()
+        return json.dumps({"items": []}).encode()
+
+
+class TestTopologyHelper:
+    """Test ClusterTopology."""
+
+    def test_watch_invalidates_on_pod_change(self):
+        """Watch keeps an unchanged snapshot and invalidates a changed one."""
+        node = FakeNode({"data-pod-1": "100", "data-pod-2": "101"})
+        topology = ClusterTopology(node, ttl=None)
+        assert_utils.assert_equal(sorted(topology.pod_names()), ["data-pod-1", "data-pod-2"])
+        topology.start_watch(interval=0.05)
+        try:
+            time.sleep(0.3)
+            assert_utils.assert_equal(topology.refreshes, 1)
+            assert_utils.assert_is_not_none(topology.refreshed_at)
+            node.pods = {"data-pod-1": "100", "data-pod-3": "205"}
+            deadline = time.monotonic() + 2
+            while topology.refreshed_at is not None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert_utils.assert_true(topology.refreshed_at is None)
+            assert_utils.assert_equal(sorted(topology.pod_names()),
+                                      ["data-pod-1", "data-pod-3"])
+        finally:
+            topology.stop_watch()
+
+    def test_invalidate_host_across_namespaces(self):
+        """Invalidating the node drops the snapshots of every namespace of that node."""
+        node = FakeNode({"data-pod-1": "100"})
+        other = FakeNode({"data-pod-1": "100"})
+        other.hostname = "other-master"
+        default = ClusterTopology.get(node)
+        cortx = ClusterTopology.get(node, namespace="cortx")
+        unrelated = ClusterTopology.get(other, namespace="cortx")
+        for topology in (default, cortx, unrelated):
+            topology.pod_names()
+        node.pods = {"data-pod-2": "300"}
+        ClusterTopology.invalidate_host(node)
+        assert_utils.assert_equal(cortx.pod_names(), ["data-pod-2"])
+        assert_utils.assert_true(default.refreshed_at is None)
+        assert_utils.assert_is_not_none(unrelated.refreshed_at)
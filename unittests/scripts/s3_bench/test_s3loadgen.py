@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test native S3 load generator statistics."""
+
+from commons.utils import assert_utils
+from scripts.s3_bench.s3loadgen import OpStats
+from scripts.s3_bench.s3loadgen import S3LoadGen
+from scripts.s3_bench.s3loadgen import parse_duration
+
+
+class TestS3LoadGen:
+    """Test duration parsing and per operation statistics of worker processes."""
+
+    def test_duration(self):
+        """Test s3bench duration strings and seconds are accepted."""
+        assert_utils.assert_equal(parse_duration("1h24m10s"), 5050)
+        assert_utils.assert_equal(parse_duration("0h2m"), 120)
+        assert_utils.assert_equal(parse_duration(30), 30)
+
+    def test_merge_snapshots(self):
+        """Test stats merged from worker snapshots give totals and percentiles."""
+        first, second = OpStats(), OpStats()
+        for i in range(90):
+            first.observe(100.0 + i * 0.01, 0.010, 1024)
+        for i in range(10):
+            second.observe(100.0 + i * 0.01, 1.0, 1024)
+        second.observe(101.0, 0.5, error="HTTP 503")
+        merged = OpStats()
+        merged.merge(OpStats.from_snapshot(first.snapshot()))
+        merged.merge(OpStats.from_snapshot(second.snapshot()))
+        stats = merged.as_dict()
+        assert_utils.assert_equal((stats["count"], stats["errors"]), (101, {"HTTP 503": 1}))
+        assert_utils.assert_equal(stats["total_transferred"], 100 / 1024)
+        assert_utils.assert_true(0.010 <= stats["latency"]["50th"] < 0.012,
+                                 stats["latency"])
+        assert_utils.assert_true(0.8 < stats["latency"]["99th"] <= 1.0, stats["latency"])
+        assert_utils.assert_equal(stats["latency"]["Min"], 0.010)
+
+    def test_timeouts(self):
+        """Test only given timeouts override the botocore defaults."""
+        loadgen = S3LoadGen("access", "secret", connect_timeout=2, read_timeout=300)
+        assert_utils.assert_equal(loadgen.spec["timeouts"],
+                                  {"connect_timeout": 2, "read_timeout": 300})
+        assert_utils.assert_equal(S3LoadGen("access", "secret").spec["timeouts"], {})
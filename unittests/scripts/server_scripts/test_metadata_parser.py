@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Metadata parser unit tests on a synthetic EMAP metadata file."""
+import os
+import struct
+import tempfile
+
+from commons.utils import assert_utils
+from scripts.server_scripts import metadata_parser as mdp
+
+NODE_SIZE = 16384
+NODES = 2
+KEYS = 4
+
+
+def write_words(buf, offset, *words):
+    """Pack little endian words into buf at offset."""
+    struct.pack_into('<%dQ' % len(words), buf, offset, *words)
+
+
+def build_metadata(path):
+    """Write NODES EMAP leaf nodes of KEYS keys, record of key 2 has a bad CRC."""
+    buf = bytearray(4096 + NODES * NODE_SIZE * 2)
+    header = int(mdp.MAGIC_HEADER, 16)
+    # Unaligned header magic is data, not a node.
+    buf[1001:1009] = mdp.HEADER_BYTES
+    for node in range(NODES):
+        node_offset = 4096 + node * NODE_SIZE * 2
+        write_words(buf, node_offset, header, 0, (0x04 << 32) | 2)
+        write_words(buf, node_offset + 64, KEYS | (24 << 32), NODE_SIZE, mdp.FOOTER_WORD)
+        for key in range(KEYS):
+            value_offset = 2000 - key * 120
+            mdp.EMAP_KEY.pack_into(buf, node_offset + 104 + key * mdp.EMAP_KEY.size, 0, 0,
+                                   0x200000500000017 + node, 0x15 + key, 0x1000 * key,
+                                   mdp.FOOTER_WORD, 0, value_offset)
+            rec = node_offset + NODE_SIZE - value_offset
+            write_words(buf, rec, header, 0, key, 0x99, 0x1000, 32, 1, 2, 3, 4, mdp.FOOTER_WORD)
+            crc = mdp.fnv1_hash(bytes(buf[rec:rec + 80]))
+            write_words(buf, rec + 88, crc if key != 2 else 7)
+    with open(path, "wb") as mdf:
+        mdf.write(buf)
+
+
+class TestMetadataParser:
+    """Metadata parser test suite."""
+
+    @classmethod
+    def setup_class(cls):
+        """Create the metadata file."""
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, "metadata")
+        build_metadata(cls.path)
+
+    @classmethod
+    def teardown_class(cls):
+        """Remove the metadata file."""
+        cls.tmp_dir.cleanup()
+
+    def test_emap_records(self):
+        """Nodes are indexed in one scan and every EMAP record is decoded."""
+        with mdp.MetadataParser(self.path, None) as parser:
+            offsets = parser.read_metadata_file()
+            records = parser.emap_records()
+            assert_utils.assert_equal(offsets[mdp.EMAP_TREE], [4096, 4096 + NODE_SIZE * 2])
+            assert_utils.assert_equal(len(records), NODES * KEYS)
+            assert_utils.assert_equal(records[1].fid, "0x200000500000017:0x16")
+            assert_utils.assert_equal(records[1].device_id, 5)
+            assert_utils.assert_equal(records[1].checksum, (1, 2, 3, 4))
+            bad = [rec.key for rec in records if parser.record_crc(rec) != rec.crc]
+            assert_utils.assert_equal(bad, [0x17] * NODES)
+            listed = parser.ListAllEmapPerDevice()
+            assert_utils.assert_equal(listed[0], [0, records[0].key_offset,
+                                                  records[0].rec_offset,
+                                                  "0x200000500000017", "0x15"])
+
+    def test_corrupt_emap_record(self):
+        """Corruption by offsets edits the first checksum word and keeps the CRC valid."""
+        with mdp.MetadataParser(self.path, None) as parser:
+            record = parser.emap_records()[-1]
+            count = parser.CorruptEmap(record.fid, record.key_offset, record.rec_offset)
+            edited = parser.emap_record_at(record.key_offset, record.rec_offset)
+            assert_utils.assert_equal(count, 1)
+            assert_utils.assert_equal(edited.checksum[0], 0x1111222244443333)
+            assert_utils.assert_equal(parser.record_crc(edited), edited.crc)
+
+    def test_verify_emap_records(self):
+        """Batch CRC verification reports the records with a bad CRC."""
+        report_path = os.path.join(self.tmp_dir.name, "report.csv")
+        with mdp.MetadataParser(self.path, None) as parser:
+            records = parser.emap_records()
+            report = parser.verify_emap_records()
+            mismatches = parser.write_verify_report(report, report_path, "csv")
+            assert_utils.assert_equal(parser.emap_crcs(records),
+                                      [parser.record_crc(rec) for rec in records])
+        assert_utils.assert_equal(mismatches, NODES)
+        assert_utils.assert_equal([entry["fid"] for entry in report if not entry["crc_ok"]],
+                                  ["0x200000500000017:0x17", "0x200000500000018:0x17"])
+        with open(report_path) as report_file:
+            assert_utils.assert_equal(len(report_file.readlines()), NODES * KEYS + 1)
+
+    def test_fnv1_hash_batch_chunks(self):
+        """Batched hashes match fnv1_hash across chunk boundaries."""
+        data = os.urandom(4096)
+        offsets = list(range(0, 4000, 7))
+        chunk = mdp.FNV1_BATCH_CHUNK
+        mdp.FNV1_BATCH_CHUNK = 64
+        try:
+            hashes = mdp.fnv1_hash_batch(data, offsets, 80)
+        finally:
+            mdp.FNV1_BATCH_CHUNK = chunk
+        assert_utils.assert_equal(hashes, [mdp.fnv1_hash(data[offset:offset + 80])
+                                           for offset in offsets])
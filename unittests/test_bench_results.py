@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test benchmark result parsers, store and build comparison."""
+
+import json
+import os
+
+from commons.utils import assert_utils
+from commons.utils.bench_results import BenchmarkStore
+from commons.utils.bench_results import parse_hsbench_json
+from commons.utils.bench_results import parse_s3bench_log
+
+S3BENCH_LOG = """Test parameters
+objectSize:       1.0000 MB
+numClients:       8
+numSamples:       100
+Results Summary for Write Operation(s)
+Total Throughput:  50.00 MB/s
+Total Duration:    2.000 s
+Number of Errors:  1
+Write times Max:       0.500 s
+Write times 99th %ile: 0.400 s
+"""
+
+
+class TestBenchResults:
+    """Test parsing tool output and flagging regressions between builds."""
+
+    def test_parse_and_compare(self, tmp_path):
+        """Test s3bench and hsbench results are stored and compared per workload."""
+        log_path = os.path.join(tmp_path, "s3bench.log")
+        with open(log_path, "w") as log_file:
+            log_file.write(S3BENCH_LOG)
+        write = parse_s3bench_log(log_path, build="1")[0]
+        assert_utils.assert_equal((write.operation, write.object_size, write.clients,
+                                   write.iops, write.latency_p99, write.error_count),
+                                  ("write", 1024 ** 2, 8, 50.0, 0.4, 1))
+        json_path = os.path.join(tmp_path, "hsbench.json")
+        with open(json_path, "w") as json_file:
+            json.dump([{"IntervalName": "0", "Mode": "PUT"},
+                       {"IntervalName": "TOTAL", "Mode": "PUT", "Seconds": 10, "Ops": 100,
+                        "Mbps": 10.0, "Iops": 10.0, "MinLat": 1, "AvgLat": 20,
+                        "MaxLat": 80}], json_file)
+        put = parse_hsbench_json(json_path, object_size="4Kb", clients=2, build="1")
+        assert_utils.assert_equal((len(put), put[0].latency_mean, put[0].object_size),
+                                  (1, 0.02, 4096))
+
+        store = BenchmarkStore(os.path.join(tmp_path, "bench.db"))
+        store.add([write, *put])
+        write.build, write.throughput, write.error_count = "2", 40.0, 1
+        store.add([write])
+        assert_utils.assert_equal(store.builds(), ["1", "2"])
+        assert_utils.assert_equal(len(store.query(build="1", tool="hsbench")), 1)
+        regressions = {row["metric"]: row["regression"]
+                       for row in store.compare("1", "2", threshold=0.1)}
+        assert_utils.assert_equal(regressions["throughput"], True)
+        assert_utils.assert_equal(regressions["error_count"], False)
+        assert_utils.assert_equal(regressions["latency_p99"], False)
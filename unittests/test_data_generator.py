@@ -0,0 +1,77 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test DI seeded data generator."""
+
+import logging
+import zlib
+
+import pytest
+
+from commons.utils import assert_utils
+from libs.di.data_generator import KB
+from libs.di.data_generator import MB
+from libs.di.data_generator import SeededDataGenerator
+
+
+class TestSeededDataGenerator:
+    """Test seeded data generator class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize variables."""
+        cls.log = logging.getLogger(__name__)
+        cls.seed = 1234
+
+    @pytest.mark.parametrize("size", [1, 4 * KB - 1, 4 * KB, MB + 17, 9 * MB])
+    def test_generate_exact_size(self, size):
+        """Test generated buffer is byte exact and reproducible from seed."""
+        gen = SeededDataGenerator(c_ratio=2, d_ratio=2)
+        buf1, csum1 = gen.generate(size, seed=self.seed)
+        buf2, csum2 = gen.generate(size, seed=self.seed)
+        assert_utils.assert_equal(len(buf1), size, "Size mismatch")
+        assert_utils.assert_equal(buf1, buf2, "Buffer is not reproducible")
+        assert_utils.assert_equal(csum1, csum2, "Checksum is not reproducible")
+
+    @pytest.mark.parametrize("c_ratio", [1, 2, 4])
+    def test_compression_ratio(self, c_ratio):
+        """Test generated buffer compresses close to requested ratio."""
+        buf, _ = SeededDataGenerator(c_ratio=c_ratio).generate(4 * MB, seed=self.seed)
+        ratio = len(buf) / len(zlib.compress(buf))
+        self.log.info("Requested ratio %s achieved %s", c_ratio, ratio)
+        assert_utils.assert_true(abs(ratio - c_ratio) / c_ratio < 0.1, ratio)
+
+    @pytest.mark.parametrize("d_ratio", [1, 2, 4])
+    def test_dedupe_ratio(self, d_ratio):
+        """Test generated buffer has requested share of duplicate blocks."""
+        gen = SeededDataGenerator(d_ratio=d_ratio)
+        buf, _ = gen.generate(4 * MB, seed=self.seed)
+        blocks = [buf[i:i + gen.block_size] for i in range(0, len(buf), gen.block_size)]
+        assert_utils.assert_equal(len(blocks) / len(set(blocks)), d_ratio)
+
+    def test_generate_range(self):
+        """Test any byte range can be regenerated without generating whole object."""
+        size = 3 * MB + 100
+        gen = SeededDataGenerator(c_ratio=3, d_ratio=2, chunk_size=MB)
+        buf, _ = gen.generate(size, seed=self.seed)
+        for offset, length in ((0, 1), (4 * KB - 1, 2), (MB - 5, MB + 10), (3 * MB, 100)):
+            assert_utils.assert_equal(gen.generate_range(size, self.seed, offset, length),
+                                      buf[offset:offset + length])
+        chunks = list(bytes(chunk) for chunk in gen.generate_chunks(size, self.seed))
+        assert_utils.assert_equal(b''.join(chunks), buf)
+        assert_utils.assert_true(max(len(chunk) for chunk in chunks) <= MB)
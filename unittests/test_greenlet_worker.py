@@ -0,0 +1,70 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test gevent pool streaming and bookkeeping."""
+
+import logging
+
+import gevent
+
+from commons.greenlet_worker import GeventPool
+from commons.utils import assert_utils
+
+
+def square(x_arg):
+    """Return square of x_arg after yielding, fails for 7."""
+    gevent.sleep(0.001)
+    if x_arg == 7:
+        raise ValueError("bad item")
+    return x_arg * x_arg
+
+
+class TestGeventPool:
+    """Test gevent pool class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize variables."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_stream_results(self):
+        """Test results are streamed with bounded in flight greenlets and no retained state."""
+        pool = GeventPool(8, stream=True)
+        max_in_flight = 0
+        for i in range(1000):
+            pool.spawn(square, i)
+            max_in_flight = max(max_in_flight, pool.in_flight)
+        results = list(pool.iter_results(timeout=10))
+        assert_utils.assert_equal(len(results), 1000)
+        assert_utils.assert_true(max_in_flight <= 8, max_in_flight)
+        assert_utils.assert_equal(sorted(val for _, ok, val in results if ok),
+                                  sorted(i * i for i in range(1000) if i != 7))
+        assert_utils.assert_equal(pool.stats(), {"spawned": 1000, "in_flight": 0,
+                                                 "completed": 999, "failed": 1})
+        assert_utils.assert_equal(len(pool.pool), 0)
+        assert_utils.assert_equal(pool.result(), {})
+        assert_utils.assert_equal(pool.greenlets, [])
+
+    def test_join_group_and_map(self):
+        """Test join_group responses and pool_map iterator."""
+        pool = GeventPool(4, keep_results=True)
+        names = [pool.add_handler(square, i).name for i in range(10)]
+        pool.join_group()
+        assert_utils.assert_equal(pool.result()[names[3]], 9)
+        assert_utils.assert_equal(sorted(pool.pool_map(square, range(5))), [0, 1, 4, 9, 16])
+        pool.shutdown()
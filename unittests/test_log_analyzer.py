@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test streaming log analyzers."""
+
+import io
+
+from commons.utils import assert_utils
+from commons.utils.log_analyzer import M0TraceAnalyzer
+from commons.utils.log_analyzer import PatternSet
+from commons.utils.log_analyzer import S3BenchLogAnalyzer
+
+S3BENCH_LOG = """Test parameters
+bucket:           dd-bucket
+Results Summary for Write Operation(s)
+Total Transferred: 15.259 MB
+Total Throughput:  0.36 MB/s
+Number of Errors:  0
+Write times Max:       15.592 s
+Write times 99th %ile: 15.589 s
+Write times 50th %ile: 7.367 s
+Results Summary for Read Operation(s)
+Total Throughput:  1.23 MB/s
+Read times 90th %ile: 3.328 s
+Errors Count:  0
+Read failed with Status Code 503
+"""
+
+
+class TestLogAnalyzer:
+    """Test pattern matching, s3bench and m0trace analyzers."""
+
+    def test_s3bench_summary(self):
+        """Test per operation statistics, error counts and error strings are extracted."""
+        summary = S3BenchLogAnalyzer().analyze(io.StringIO(S3BENCH_LOG))
+        assert_utils.assert_equal(summary["operations"]["Write"]["latency"],
+                                  {"Max": 15.592, "99th": 15.589, "50th": 7.367})
+        assert_utils.assert_equal(summary["operations"]["Read"]["total_throughput"], 1.23)
+        assert_utils.assert_equal(summary["error_counts"], [0])
+        assert_utils.assert_equal(summary["first_error"][0], "status code")
+        assert_utils.assert_equal(S3BenchLogAnalyzer.parse_report(S3BENCH_LOG)["bucket"],
+                                  "dd-bucket")
+        assert_utils.assert_equal(PatternSet(["Panic"]).count([b"PANIC\n", "ok\n"]),
+                                  {"Panic": 1})
+
+    def test_m0trace_block_fids(self):
+        """Test unit lines take the latest unused target fid."""
+        lines = ["t1, tfid <0x1:0x2>, x\n", "t2, UTyp [D], x\n",
+                 "t3, tfid <0x3:0x4>, x\n", "t4, tfid <0x5:0x6>, x\n",
+                 "t5, UTyp [P], x\n", "t6, UTyp [D], x\n"]
+        lines = [line.replace("tfid", "prepare io fops tfid") for line in lines]
+        assert_utils.assert_equal(M0TraceAnalyzer.block_fids(lines),
+                                  {"DATA0": "0x1:0x2", "PARITY0": "0x5:0x6",
+                                   "DATA1": "0x3:0x4"})
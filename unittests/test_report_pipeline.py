@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test background reporting pipeline."""
+
+import os
+from types import SimpleNamespace
+
+from commons.report_pipeline import ReportPipeline
+from commons.utils import assert_utils
+
+
+class FakeJira:
+    """Records xray imports, fails them while failing is set."""
+
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.imports = []
+
+    def update_tests_jira_status(self, te_id, tests):
+        """Record an import."""
+        self.imports.append((te_id, [test["status"] for test in tests]))
+        return SimpleNamespace(status_code=500 if self.failing else 200, text="")
+
+
+class FakeReportClient:
+    """Records batches of DB entries, rejects entries with code set."""
+
+    def __init__(self):
+        self.batches = []
+
+    def create_db_entries(self, entries):
+        """Record a batch."""
+        self.batches.append(len(entries))
+        return [entry.get("code", 200) for entry in entries]
+
+
+class TestReportPipeline:
+    """Test coalescing, batching and spooling of reporting items."""
+
+    def test_coalesce_and_spool(self, tmp_path):
+        """Test statuses coalesce per test, entries batch and unsent items are spooled."""
+        jira, client = FakeJira(), FakeReportClient()
+        pipeline = ReportPipeline(jira_factory=lambda: jira, report_client=client,
+                                  interval=60, backoff=0)
+        pipeline.set_status("TE-1", "T-1", "Executing")
+        pipeline.set_status("TE-1", "T-1", "PASS")
+        pipeline.set_status("TE-1", "T-2", "FAIL")
+        for test_id in range(3):
+            pipeline.add_db_entry({"test_id": test_id})
+        assert_utils.assert_true(pipeline.flush(10))
+        pipeline.close(10)
+        assert_utils.assert_equal(jira.imports, [("TE-1", ["PASS", "FAIL"])])
+        assert_utils.assert_equal(client.batches, [3])
+
+        spool_path = os.path.join(tmp_path, "spool.jsonl")
+        failing = FakeJira(failing=True)
+        pipeline = ReportPipeline(jira_factory=lambda: failing, interval=60, retries=1,
+                                  backoff=0, spool_path=spool_path)
+        pipeline.set_status("TE-1", "T-3", "FAIL")
+        pipeline.close(10)
+        assert_utils.assert_equal(len(failing.imports), 2)
+        failing.failing = False
+        pipeline = ReportPipeline(jira_factory=lambda: failing, interval=60,
+                                  spool_path=spool_path)
+        assert_utils.assert_equal(pipeline.requeue_spool(), 1)
+        pipeline.close(10)
+        assert_utils.assert_equal(failing.imports[-1], ("TE-1", ["FAIL"]))
+        assert_utils.assert_false(os.path.exists(spool_path))
+
+    def test_rejected_db_entries(self):
+        """Test server errors are retried and entries rejected by the server are not."""
+        client = FakeReportClient()
+        pipeline = ReportPipeline(report_client=client, interval=60, retries=1, backoff=0)
+        pipeline.add_db_entry({"test_id": "T-1"})
+        pipeline.add_db_entry({"test_id": "T-2", "code": 400})
+        pipeline.add_db_entry({"test_id": "T-3", "code": 503})
+        pipeline.close(10)
+        assert_utils.assert_equal(client.batches, [3, 1])
+
+    def test_retried_status_keeps_newer(self):
+        """Test a retried status does not overwrite a status queued after it."""
+        jira = FakeJira(failing=True)
+        pipeline = ReportPipeline(jira_factory=lambda: jira, interval=60, retries=1, backoff=0)
+        update = jira.update_tests_jira_status
+
+        def update_once(te_id, tests):
+            """Fail the first import, the test passes meanwhile."""
+            response = update(te_id, tests)
+            jira.failing = False
+            jira.update_tests_jira_status = update
+            pipeline.set_status("TE-1", "T-1", "PASS")
+            return response
+
+        jira.update_tests_jira_status = update_once
+        pipeline.set_status("TE-1", "T-1", "Executing")
+        assert_utils.assert_true(pipeline.flush(10))
+        pipeline.close(10)
+        assert_utils.assert_equal(jira.imports, [("TE-1", ["Executing"]), ("TE-1", ["PASS"])])
+        assert_utils.assert_equal(pipeline.failed, [])
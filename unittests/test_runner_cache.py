@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test runner LRU cache and in memory DB."""
+
+import logging
+import time
+
+import pytest
+
+from commons.utils import assert_utils
+from core.runner import InMemoryDB
+from core.runner import LRUCache
+
+
+class TestLRUCache:
+    """Test LRU cache and in memory DB classes."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize variables."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_lru_ttl_and_stats(self):
+        """Test lookups refresh recency, entries expire and counters are kept."""
+        cache = LRUCache(2, ttl=0.2)
+        cache.store("a", 1)
+        cache.store("b", 2)
+        assert_utils.assert_equal(cache.lookup("a"), 1)
+        cache.store("c", 3)
+        with pytest.raises(KeyError):
+            cache.lookup("b")
+        time.sleep(0.3)
+        with pytest.raises(KeyError):
+            cache.lookup("a")
+        assert_utils.assert_equal(cache.stats(), {"size": 1, "hits": 1, "misses": 2,
+                                                  "evictions": 1, "expirations": 1})
+
+    def test_pop_one(self):
+        """Test random pops drain the DB and keep the key index consistent."""
+        mem_db = InMemoryDB(100)
+        for i in range(150):
+            mem_db.store(f"bkt/obj{i}", i)
+        mem_db.delete("bkt/obj120")
+        popped = dict()
+        while True:
+            key, val = mem_db.pop_one()
+            if key is False:
+                break
+            popped[key] = val
+            assert_utils.assert_equal(len(mem_db.keys), len(mem_db.table))
+        assert_utils.assert_equal(popped, {f"bkt/obj{i}": i for i in range(50, 150) if i != 120})
+        assert_utils.assert_equal(mem_db.index, {})
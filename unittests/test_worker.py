@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test bounded executor worker pool."""
+
+import logging
+import threading
+import time
+
+from commons.utils import assert_utils
+from commons.worker import BoundedExecutor
+
+
+def double(x_arg):
+    """Return double of x_arg, fails for 3 and sleeps for 5."""
+    if x_arg == 3:
+        raise ValueError("bad item")
+    if x_arg == 5:
+        time.sleep(1)
+    return 2 * x_arg
+
+
+class TestBoundedExecutor:
+    """Test bounded executor class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize variables."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_results_errors_and_timeout(self):
+        """Test futures carry results, task errors after retries and timeouts."""
+        with BoundedExecutor(nworkers=4, retries=2) as executor:
+            futures = [executor.submit(double, i, timeout=0.3) for i in range(20)]
+            for i, future in enumerate(futures):
+                if i in (3, 5):
+                    assert_utils.assert_is_not_none(future.exception())
+                else:
+                    assert_utils.assert_equal(future.result(), 2 * i)
+        stats = executor.stats.as_dict()
+        self.log.info("Executor stats %s", stats)
+        assert_utils.assert_equal(stats['failed'], 1)
+        assert_utils.assert_equal(stats['retried'], 2)
+        assert_utils.assert_equal(stats['timed_out'], 1)
+        assert_utils.assert_equal(sum(stats['histogram']), 20)
+
+    def test_stop_event_cancels_queued(self):
+        """Test setting stop event cancels queued tasks and unblocks producer."""
+        event = threading.Event()
+        executor = BoundedExecutor(nworkers=2, max_queued=2, stop_event=event)
+        futures = []
+        producer = threading.Thread(target=lambda: futures.extend(
+            executor.submit(time.sleep, 0.1) for _ in range(50)))
+        producer.start()
+        time.sleep(0.25)
+        event.set()
+        producer.join()
+        executor.shutdown()
+        cancelled = sum(future.cancelled() for future in futures)
+        assert_utils.assert_equal(len(futures), 50)
+        assert_utils.assert_true(cancelled >= 40, cancelled)
+        assert_utils.assert_equal(executor.stats.as_dict()['cancelled'], cancelled)
+
+    def test_queued_timeout_counted_once(self):
+        """Test a task timed out while queued is counted once and fails with TimeoutError."""
+        with BoundedExecutor(nworkers=1, max_queued=4) as executor:
+            futures = [executor.submit(time.sleep, 0.3, timeout=0.1) for _ in range(3)]
+            for future in futures:
+                assert_utils.assert_true(isinstance(future.exception(), TimeoutError))
+        stats = executor.stats.as_dict()
+        assert_utils.assert_equal(stats['timed_out'], 3)
+        assert_utils.assert_equal(stats['cancelled'], 0)
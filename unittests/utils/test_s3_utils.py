@@ -119,3 +119,23 @@ class TestS3Utils:
         resp = s3_utils.get_unaligned_parts(self.fpath, total_parts=total_parts, random=True)
         self.log.info(resp.keys())
         self.log.info("ENDED: get aligned parts.")
+
+    @pytest.mark.parametrize("random", [False, True])
+    def test_iter_file_parts(self, random):
+        """Test lazy file parts and running multipart checksum match whole file helpers."""
+        self.log.info("STARTED: iterate file parts.")
+        resp = system_utils.create_file(self.fpath, count=23)
+        assert_utils.assert_true(resp[0], resp[1])
+        part_sizes = s3_utils.get_part_sizes(os.stat(self.fpath).st_size, total_parts=4,
+                                             aligned=False)
+        parts = {}
+        mpu_csum = s3_utils.MultipartChecksum()
+        for part_number, data, content_md5 in s3_utils.iter_file_parts(
+                self.fpath, part_sizes, random=random):
+            parts[part_number] = [bytes(data), content_md5]
+            mpu_csum.update(part_number, data)
+        assert_utils.assert_equal(len(parts), len(part_sizes))
+        assert_utils.assert_equal(mpu_csum.etag(), s3_utils.get_multipart_etag(parts))
+        if not random:
+            assert_utils.assert_equal(mpu_csum.checksum(), s3_utils.calc_checksum(self.fpath))
+        self.log.info("ENDED: iterate file parts.")